@@ -107,6 +107,12 @@ class Appointment {
     return '예약';
   }
 
+  /// 보강 자동 배정 초안 여부 (scripts/assign_makeup_slots.py 가 기록, 확정 전까지 화면에 표시하지 않음)
+  static bool isDraftData(Map<String, dynamic> data) {
+    return data['is_draft'] == true ||
+        (data['status'] as String?)?.toUpperCase() == 'DRAFT';
+  }
+
   /// Firestore 데이터로부터 객체 생성
   factory Appointment.fromFirestore(Map<String, dynamic> data, String id) {
     return Appointment(
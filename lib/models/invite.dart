@@ -12,6 +12,7 @@ enum InviteStatus {
 class Invite {
   final String id;
   final String codeHash;           // SHA256 해시된 코드 (보안)
+  final String? codeLookup;        // SHA256(코드 + 전역 pepper): 센터를 모를 때 조회용
   final String email;              // 초대 대상 이메일
   final String role;               // therapist | guardian
   final String centerId;           // 센터 ID
@@ -29,6 +30,7 @@ class Invite {
   Invite({
     required this.id,
     required this.codeHash,
+    this.codeLookup,
     required this.email,
     required this.role,
     required this.centerId,
@@ -49,6 +51,7 @@ class Invite {
     return Invite(
       id: id,
       codeHash: data['code_hash'] as String? ?? '',
+      codeLookup: data['code_lookup'] as String?,
       email: data['email'] as String? ?? '',
       role: data['role'] as String? ?? 'therapist',
       centerId: data['center_id'] as String? ?? '',
@@ -71,6 +74,7 @@ class Invite {
   Map<String, dynamic> toFirestore() {
     return {
       'code_hash': codeHash,
+      'code_lookup': codeLookup,
       'email': email,
       'role': role,
       'center_id': centerId,
@@ -157,6 +161,7 @@ class Invite {
   Invite copyWith({
     String? id,
     String? codeHash,
+    String? codeLookup,
     String? email,
     String? role,
     String? centerId,
@@ -174,6 +179,7 @@ class Invite {
     return Invite(
       id: id ?? this.id,
       codeHash: codeHash ?? this.codeHash,
+      codeLookup: codeLookup ?? this.codeLookup,
       email: email ?? this.email,
       role: role ?? this.role,
       centerId: centerId ?? this.centerId,
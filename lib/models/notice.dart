@@ -18,6 +18,7 @@ class Notice {
   final String authorName;
   final DateTime createdAt;
   final DateTime? updatedAt;
+  final bool isRead; // 수신함(users/{uid}/notice_inbox) 읽음 여부
 
   Notice({
     required this.id,
@@ -36,6 +37,7 @@ class Notice {
     required this.authorName,
     required this.createdAt,
     this.updatedAt,
+    this.isRead = false,
   });
 
   /// Firestore 데이터로부터 객체 생성
@@ -63,6 +65,7 @@ class Notice {
       updatedAt: data['updated_at'] != null
           ? (data['updated_at'] as dynamic).toDate()
           : null,
+      isRead: data['is_read'] as bool? ?? false,
     );
   }
 
@@ -87,6 +90,9 @@ class Notice {
     };
   }
 
+  /// Firestore 에 저장되는 type 값 (쿼리 조건용)
+  static String typeToFirestore(NoticeType type) => _noticeTypeToString(type);
+
   static NoticeType _parseNoticeType(String? type) {
     switch (type?.toUpperCase()) {
       case 'CENTER':
@@ -178,6 +184,7 @@ class Notice {
     String? authorName,
     DateTime? createdAt,
     DateTime? updatedAt,
+    bool? isRead,
   }) {
     return Notice(
       id: id ?? this.id,
@@ -196,6 +203,7 @@ class Notice {
       authorName: authorName ?? this.authorName,
       createdAt: createdAt ?? this.createdAt,
       updatedAt: updatedAt ?? this.updatedAt,
+      isRead: isRead ?? this.isRead,
     );
   }
 }
@@ -3,6 +3,7 @@ import 'package:cloud_firestore/cloud_firestore.dart';
 import 'package:provider/provider.dart';
 import '../providers/app_state.dart';
 import '../models/user.dart';
+import '../models/appointment.dart';
 
 /// 센터장 홈 화면 - 운영 + 한눈에 파악
 /// 공통 원칙: Action-first, 메뉴 탐색 금지, '지금 해야 할 것'부터 보여주기
@@ -45,17 +46,20 @@ class _AdminHomeScreenState extends State<AdminHomeScreen> {
       final endOfDay = DateTime(today.year, today.month, today.day, 23, 59, 59);
 
       // 1. 오늘 수업 수
-      final todaySchedules = await _firestore
+      final todaySnapshot = await _firestore
           .collection('appointments')
           .where('appointment_date', isGreaterThanOrEqualTo: Timestamp.fromDate(startOfDay))
           .where('appointment_date', isLessThanOrEqualTo: Timestamp.fromDate(endOfDay))
           .get();
+      final todaySchedules = todaySnapshot.docs
+          .where((doc) => !Appointment.isDraftData(doc.data()))
+          .toList();
       
-      _todayScheduleCount = todaySchedules.docs.length;
+      _todayScheduleCount = todaySchedules.length;
 
       // 2. 출석 완료 / 미처리
-      _attendedCount = todaySchedules.docs.where((doc) => doc.data()['attended'] == true).length;
-      _pendingAttendanceCount = todaySchedules.docs.where((doc) {
+      _attendedCount = todaySchedules.where((doc) => doc.data()['attended'] == true).length;
+      _pendingAttendanceCount = todaySchedules.where((doc) {
         final data = doc.data();
         return data['attended'] != true && data['status'] != 'cancelled';
       }).length;
@@ -4,6 +4,11 @@ import 'package:provider/provider.dart';
 import '../providers/app_state.dart';
 import '../models/user.dart';
 import '../models/patient.dart';
+import '../models/appointment.dart';
+import '../models/notice.dart';
+import '../constants/enums.dart';
+import '../services/notice_service.dart';
+import 'notice_list_screen.dart';
 import '../constants/app_theme.dart';
 import 'guardian_report_screen.dart';
 import 'guardian_home_program_screen.dart';
@@ -69,25 +74,36 @@ class _GuardianHomeScreenState extends State<GuardianHomeScreen> {
         final patientIds = _myPatients.map((p) => p.id).toList();
         
         final now = DateTime.now();
-        final appointmentsSnapshot = await _firestore
+        Query<Map<String, dynamic>> query = _firestore
             .collection('appointments')
             .where('patient_id', whereIn: patientIds)
             .where('appointment_date', isGreaterThanOrEqualTo: Timestamp.fromDate(now))
             .orderBy('appointment_date')
-            .limit(1)
-            .get();
+            .limit(5);
 
-        if (appointmentsSnapshot.docs.isNotEmpty) {
-          _upcomingAppointment = appointmentsSnapshot.docs.first.data();
-          _upcomingAppointment!['id'] = appointmentsSnapshot.docs.first.id;
+        // 보강 배정 초안은 건너뛰고 가장 가까운 실제 예약을 찾음
+        Map<String, dynamic>? upcoming;
+        while (upcoming == null) {
+          final appointmentsSnapshot = await query.get();
+          for (final doc in appointmentsSnapshot.docs) {
+            if (Appointment.isDraftData(doc.data())) continue;
+            upcoming = {...doc.data(), 'id': doc.id};
+            break;
+          }
+          if (appointmentsSnapshot.docs.length < 5) break;
+          query = query.startAfterDocument(appointmentsSnapshot.docs.last);
+        }
+        if (upcoming != null) {
+          _upcomingAppointment = upcoming;
         }
       }
 
       // 3. 읽지 않은 리포트 수 (예시)
       _unreadReportsCount = 0; // 실제로는 sessions에서 guardian_viewed == false인 것들
 
-      // 4. 읽지 않은 공지사항 수 (예시)
-      _unreadNoticesCount = 0;
+      // 4. 읽지 않은 공지사항 수 (scripts/notice_fanout.py 가 채운 수신함)
+      final inboxNotices = await _loadInboxNotices(user.id);
+      _unreadNoticesCount = inboxNotices.where((n) => !n.isRead).length;
 
       setState(() {
         _isLoading = false;
@@ -104,6 +120,17 @@ class _GuardianHomeScreenState extends State<GuardianHomeScreen> {
     }
   }
 
+  /// 수신함 공지 조회 (실패해도 홈 화면의 나머지 데이터는 그대로 표시)
+  Future<List<Notice>> _loadInboxNotices(String userId) async {
+    try {
+      return await NoticeService()
+          .getInboxNotices(userId, NoticeType.customer, limit: 20);
+    } catch (e) {
+      print('⚠️ 수신함 공지 조회 실패: $e');
+      return [];
+    }
+  }
+
   @override
   Widget build(BuildContext context) {
     final appState = Provider.of<AppState>(context, listen: false);
@@ -547,10 +574,14 @@ class _GuardianHomeScreenState extends State<GuardianHomeScreen> {
         icon: Icons.notifications,
         iconColor: const Color(0xFFFF9800),
         message: '새 공지사항 $_unreadNoticesCount건',
-        onTap: () {
-          ScaffoldMessenger.of(context).showSnackBar(
-            const SnackBar(content: Text('공지사항 화면으로 이동합니다')),
+        onTap: () async {
+          await Navigator.push(
+            context,
+            MaterialPageRoute(
+              builder: (context) => NoticeListScreen(inboxUserId: widget.user.id),
+            ),
           );
+          _loadHomeData();
         },
       ));
     }
@@ -2,24 +2,66 @@ import 'package:flutter/material.dart';
 import 'package:intl/intl.dart';
 import '../models/notice.dart';
 import '../constants/enums.dart';
+import '../services/notice_service.dart';
 
 /// 공지사항 화면
+/// inboxUserId 를 주면 해당 사용자의 수신함(users/{uid}/notice_inbox)에서 inboxType 공지만 표시 (보호자용)
 class NoticeListScreen extends StatefulWidget {
-  const NoticeListScreen({Key? key}) : super(key: key);
+  final String? inboxUserId;
+  final NoticeType inboxType;
+
+  const NoticeListScreen({
+    Key? key,
+    this.inboxUserId,
+    this.inboxType = NoticeType.customer,
+  }) : super(key: key);
 
   @override
   State<NoticeListScreen> createState() => _NoticeListScreenState();
 }
 
 class _NoticeListScreenState extends State<NoticeListScreen> {
+  final NoticeService _noticeService = NoticeService();
   List<Notice> _notices = [];
   NoticeType _selectedType = NoticeType.center;
   bool _isLoading = false;
 
+  bool get _isInbox => widget.inboxUserId != null;
+
   @override
   void initState() {
     super.initState();
-    _loadNotices();
+    if (_isInbox) {
+      _selectedType = widget.inboxType;
+      _loadInbox();
+    } else {
+      _loadNotices();
+    }
+  }
+
+  /// 수신함 공지 로드
+  Future<void> _loadInbox() async {
+    setState(() {
+      _isLoading = true;
+    });
+
+    try {
+      final notices = await _noticeService.getInboxNotices(
+          widget.inboxUserId!, widget.inboxType);
+      if (!mounted) return;
+      setState(() {
+        _notices = notices;
+        _isLoading = false;
+      });
+    } catch (e) {
+      if (!mounted) return;
+      setState(() {
+        _isLoading = false;
+      });
+      ScaffoldMessenger.of(context).showSnackBar(
+        SnackBar(content: Text('공지사항 로드 실패: $e')),
+      );
+    }
   }
 
   void _loadNotices() {
@@ -106,37 +148,39 @@ class _NoticeListScreenState extends State<NoticeListScreen> {
       appBar: AppBar(
         title: const Text('공지사항'),
         actions: [
-          IconButton(
-            icon: const Icon(Icons.add),
-            onPressed: _showCreateNotice,
-          ),
+          if (!_isInbox)
+            IconButton(
+              icon: const Icon(Icons.add),
+              onPressed: _showCreateNotice,
+            ),
         ],
       ),
       body: Column(
         children: [
-          // 탭 선택
-          Padding(
-            padding: const EdgeInsets.all(16),
-            child: Row(
-              children: [
-                Expanded(
-                  child: _buildTabButton(
-                    '센터 공지',
-                    NoticeType.center,
-                    _selectedType == NoticeType.center,
+          // 탭 선택 (수신함은 한 유형만 표시)
+          if (!_isInbox)
+            Padding(
+              padding: const EdgeInsets.all(16),
+              child: Row(
+                children: [
+                  Expanded(
+                    child: _buildTabButton(
+                      '센터 공지',
+                      NoticeType.center,
+                      _selectedType == NoticeType.center,
+                    ),
                   ),
-                ),
-                const SizedBox(width: 12),
-                Expanded(
-                  child: _buildTabButton(
-                    '고객 공지',
-                    NoticeType.customer,
-                    _selectedType == NoticeType.customer,
+                  const SizedBox(width: 12),
+                  Expanded(
+                    child: _buildTabButton(
+                      '고객 공지',
+                      NoticeType.customer,
+                      _selectedType == NoticeType.customer,
+                    ),
                   ),
-                ),
-              ],
+                ],
+              ),
             ),
-          ),
 
           // 공지사항 목록
           Expanded(
@@ -258,6 +302,9 @@ class _NoticeListScreenState extends State<NoticeListScreen> {
   }
 
   void _showNoticeDetail(Notice notice) {
+    if (_isInbox && !notice.isRead) {
+      _markRead(notice);
+    }
     showDialog(
       context: context,
       builder: (context) => AlertDialog(
@@ -291,6 +338,21 @@ class _NoticeListScreenState extends State<NoticeListScreen> {
     );
   }
 
+  /// 수신함 공지 읽음 표시
+  Future<void> _markRead(Notice notice) async {
+    try {
+      await _noticeService.markInboxRead(widget.inboxUserId!, notice.id);
+      if (!mounted) return;
+      setState(() {
+        _notices = _notices
+            .map((n) => n.id == notice.id ? n.copyWith(isRead: true) : n)
+            .toList();
+      });
+    } catch (e) {
+      print('⚠️ 공지 읽음 표시 실패: $e');
+    }
+  }
+
   void _showCreateNotice() {
     final titleController = TextEditingController();
     final contentController = TextEditingController();
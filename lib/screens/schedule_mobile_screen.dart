@@ -57,6 +57,7 @@ class _ScheduleMobileScreenState extends State<ScheduleMobileScreen> {
       
       setState(() {
         _appointments = querySnapshot.docs
+            .where((doc) => !Appointment.isDraftData(doc.data() as Map<String, dynamic>))
             .map((doc) => Appointment.fromFirestore(doc.data() as Map<String, dynamic>, doc.id))
             .toList();
         _appointments.sort((a, b) => a.appointmentDate.compareTo(b.appointmentDate));
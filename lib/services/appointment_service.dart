@@ -44,6 +44,7 @@ class AppointmentService {
           .get();
 
       final appointments = querySnapshot.docs
+          .where((doc) => !Appointment.isDraftData(doc.data()))
           .map((doc) => Appointment.fromFirestore(doc.data(), doc.id))
           .toList();
       
@@ -65,6 +66,7 @@ class AppointmentService {
           .get();
 
       final appointments = querySnapshot.docs
+          .where((doc) => !Appointment.isDraftData(doc.data()))
           .map((doc) => Appointment.fromFirestore(doc.data(), doc.id))
           .toList();
 
@@ -91,6 +93,7 @@ class AppointmentService {
           .get();
 
       final allAppointments = querySnapshot.docs
+          .where((doc) => !Appointment.isDraftData(doc.data()))
           .map((doc) => Appointment.fromFirestore(doc.data(), doc.id))
           .toList();
 
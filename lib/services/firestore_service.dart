@@ -1,5 +1,6 @@
 import 'package:cloud_firestore/cloud_firestore.dart';
 import 'package:flutter/foundation.dart';
+import '../models/appointment.dart';
 
 /// Firestore 데이터베이스 서비스
 /// 
@@ -170,6 +171,7 @@ class FirestoreService {
             };
           })
           .where((doc) {
+            if (Appointment.isDraftData(doc)) return false;
             final appointmentDate = (doc['appointment_date'] as Timestamp?)?.toDate();
             if (appointmentDate == null) return false;
             return appointmentDate.isAfter(startOfDay.subtract(const Duration(seconds: 1))) &&
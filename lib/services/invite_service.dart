@@ -15,6 +15,9 @@ class InviteService {
     return List.generate(length, (index) => chars[random.nextInt(chars.length)]).join();
   }
 
+  /// 센터를 모를 때 조회용 해시의 전역 pepper (scripts/invite_codes.py LOOKUP_PEPPER 와 동일)
+  static const String _lookupPepper = 'rehab-nexus-invite';
+
   /// 초대 코드 해시 생성 (SHA256)
   String _hashInviteCode(String code, String salt) {
     final bytes = utf8.encode(code + salt);
@@ -22,6 +25,9 @@ class InviteService {
     return digest.toString();
   }
 
+  /// 조회용 코드 해시 (code_lookup): 센터 목록 없이 입력 코드만으로 계산
+  String _lookupInviteCode(String code) => _hashInviteCode(code, _lookupPepper);
+
   /// 초대 생성 (센터장 전용)
   /// 
   /// [email]: 초대할 사용자 이메일
@@ -60,6 +66,7 @@ class InviteService {
       final invite = Invite(
         id: inviteRef.id,
         codeHash: codeHash,
+        codeLookup: _lookupInviteCode(code),
         email: email,
         role: role,
         centerId: centerId,
@@ -105,47 +112,58 @@ class InviteService {
       // 1. 코드 정규화 (대문자 변환)
       final normalizedCode = code.toUpperCase().trim();
       
-      // 2. 모든 센터의 초대 검색 (centerId 없을 경우)
-      Query query = _firestore
-          .collection('invites')
-          .where('status', isEqualTo: 'invited')
-          .limit(50);
-      
-      final snapshot = await query.get();
-      
-      // 3. 각 초대에 대해 해시 비교
-      for (var doc in snapshot.docs) {
-        final invite = Invite.fromFirestore(doc.data() as Map<String, dynamic>, doc.id);
-        
-        // 해시 계산
-        final codeHash = _hashInviteCode(normalizedCode, invite.centerId);
-        
-        // 해시 일치 확인
-        if (codeHash == invite.codeHash) {
-          // 만료 확인
-          if (invite.isExpired) {
-            return {
-              'success': false,
-              'error': '만료된 초대 코드입니다',
-              'errorCode': 'EXPIRED',
-            };
-          }
-          
-          // 사용 가능 확인
-          if (!invite.isUsable) {
-            return {
-              'success': false,
-              'error': '이미 사용되었거나 취소된 초대 코드입니다',
-              'errorCode': 'USED_OR_CANCELLED',
-            };
-          }
-          
+      // 2. 서버에서 해시로 바로 조회 (초대를 가져와 하나씩 해시하지 않으므로 초대 수와 무관)
+      //    센터를 알면 센터 salt 해시(code_hash), 모르면 전역 pepper 해시(code_lookup)
+      final invites = _firestore.collection('invites');
+      var docs = (centerId != null
+              ? await invites
+                  .where('code_hash', isEqualTo: _hashInviteCode(normalizedCode, centerId))
+                  .get()
+              : await invites
+                  .where('code_lookup', isEqualTo: _lookupInviteCode(normalizedCode))
+                  .get())
+          .docs;
+
+      // code_lookup 이 없는 이전 초대: 대기 중인 초대를 가져와 센터 salt 로 비교
+      if (docs.isEmpty && centerId == null) {
+        docs = (await invites
+                .where('status', isEqualTo: 'invited')
+                .limit(50)
+                .get())
+            .docs;
+      }
+
+      for (var doc in docs) {
+        final invite = Invite.fromFirestore(doc.data(), doc.id);
+
+        // 초대의 센터 salt 로 만든 해시인지 확인
+        if (_hashInviteCode(normalizedCode, invite.centerId) != invite.codeHash) {
+          continue;
+        }
+
+        // 만료 확인
+        if (invite.isExpired) {
+          return {
+            'success': false,
+            'error': '만료된 초대 코드입니다',
+            'errorCode': 'EXPIRED',
+          };
+        }
+
+        // 사용 가능 확인
+        if (!invite.isUsable) {
           return {
-            'success': true,
-            'invite': invite,
-            'inviteId': invite.id,
+            'success': false,
+            'error': '이미 사용되었거나 취소된 초대 코드입니다',
+            'errorCode': 'USED_OR_CANCELLED',
           };
         }
+
+        return {
+          'success': true,
+          'invite': invite,
+          'inviteId': invite.id,
+        };
       }
       
       return {
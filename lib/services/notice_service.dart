@@ -116,6 +116,60 @@ class NoticeService {
     }
   }
 
+  /// 사용자 수신함 공지 조회 (scripts/notice_fanout.py 가 기록한 users/{userId}/notice_inbox)
+  /// type 은 서버에서 거르고 (type + publish_date 복합 인덱스), 만료된 공지를 거른 뒤에도
+  /// limit 건이 찰 때까지 다음 페이지를 이어서 읽는다.
+  Future<List<Notice>> getInboxNotices(String userId, NoticeType type,
+      {int limit = 50}) async {
+    try {
+      Query<Map<String, dynamic>> query = _firestore
+          .collection('users')
+          .doc(userId)
+          .collection('notice_inbox')
+          .where('type', isEqualTo: Notice.typeToFirestore(type))
+          .orderBy('publish_date', descending: true)
+          .limit(limit);
+
+      final notices = <Notice>[];
+      while (notices.length < limit) {
+        final querySnapshot = await query.get();
+        notices.addAll(querySnapshot.docs
+            .map((doc) => Notice.fromFirestore(doc.data(), doc.id))
+            .where((notice) => notice.isActive));
+        if (querySnapshot.docs.length < limit) break;
+        query = query.startAfterDocument(querySnapshot.docs.last);
+      }
+      if (notices.length > limit) {
+        notices.removeRange(limit, notices.length);
+      }
+
+      // 상단 고정 우선 (나머지는 최신순 유지)
+      notices.sort((a, b) {
+        if (a.isPinned && !b.isPinned) return -1;
+        if (!a.isPinned && b.isPinned) return 1;
+        return b.publishDate.compareTo(a.publishDate);
+      });
+
+      return notices;
+    } catch (e) {
+      throw Exception('Firebase 연결 오류: $e');
+    }
+  }
+
+  /// 수신함 공지 읽음 표시
+  Future<void> markInboxRead(String userId, String noticeId) async {
+    try {
+      await _firestore
+          .collection('users')
+          .doc(userId)
+          .collection('notice_inbox')
+          .doc(noticeId)
+          .update({'is_read': true, 'read_at': DateTime.now()});
+    } catch (e) {
+      throw Exception('Firebase 연결 오류: $e');
+    }
+  }
+
   /// 공지사항 수정
   Future<void> updateNotice(String noticeId, Map<String, dynamic> data) async {
     try {
@@ -73,6 +73,7 @@ class _RoleBasedDashboardState extends State<RoleBasedDashboard> {
       final appointmentsSnapshot = await appointmentsQuery.get();
 
       _todayAppointments = appointmentsSnapshot.docs
+          .where((doc) => !Appointment.isDraftData(doc.data() as Map<String, dynamic>))
           .map((doc) => Appointment.fromFirestore(doc.data() as Map<String, dynamic>, doc.id))
           .toList();
 
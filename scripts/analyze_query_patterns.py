@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""
+Dart 서비스 쿼리 패턴 분석 → 복합 인덱스(firestore.indexes.json) 생성 및 읽기 비용 추정
+
+lib/services/*.dart 의 Firestore 쿼리 체인(collection → where → orderBy → limit → get)과
+쿼리 직후 메모리에서 수행하는 정렬(.sort)/필터(.where((x) ...))를 찾아,
+메모리 처리를 서버 쿼리로 옮겼을 때 필요한 복합 인덱스를 만든다.
+
+스냅샷(firestore_snapshot.py)을 주면 컬렉션별 카디널리티로 현재/최적화 후
+쿼리당 읽기 수를 추정하고, 필요 이상으로 읽는(over-read) 쿼리를 표시한다.
+
+사용법:
+    python scripts/analyze_query_patterns.py                          # 분석 + firestore.indexes.json
+    python scripts/analyze_query_patterns.py --snapshot snapshots/latest --threshold 2
+    python scripts/analyze_query_patterns.py --check                  # 인덱스 파일이 최신인지 확인
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SERVICES_DIR = os.path.join(REPO_ROOT, "lib", "services")
+DEFAULT_MODELS_DIR = os.path.join(REPO_ROOT, "lib", "models")
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "firestore.indexes.json")
+
+WHERE_OPS = {
+    "isEqualTo": "==",
+    "isNotEqualTo": "!=",
+    "isLessThan": "<",
+    "isLessThanOrEqualTo": "<=",
+    "isGreaterThan": ">",
+    "isGreaterThanOrEqualTo": ">=",
+    "arrayContains": "array-contains",
+    "arrayContainsAny": "array-contains-any",
+    "whereIn": "in",
+    "whereNotIn": "not-in",
+}
+EQUALITY_OPS = ("==", "in", "array-contains", "array-contains-any")
+RANGE_OPS = ("<", "<=", ">", ">=", "!=", "not-in")
+
+_FUNCTION_RE = re.compile(r"^\s+(?:static\s+)?(?:Future|Stream)\b[^\n(]*?\s(\w+)\s*\(", re.M)
+_CONST_RE = re.compile(r"(?:static\s+)?(?:const|final)\s+String\s+(\w+)\s*=\s*'([^']+)'")
+_COLLECTION_RE = re.compile(r"\.collection\(\s*")
+_STRING_RE = re.compile(r"^\s*'([^']*)'")
+
+
+# ---------------------------------------------------------------------------
+# Dart 파싱
+# ---------------------------------------------------------------------------
+
+
+def _balanced(text, start):
+    """text[start] == '(' 일 때 짝이 맞는 ')' 다음 위치"""
+    depth = 0
+    i = start
+    quote = None
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(text)
+
+
+def _skip_ws(text, i):
+    while i < len(text):
+        if text[i].isspace():
+            i += 1
+        elif text.startswith("//", i):
+            i = text.find("\n", i)
+            if i < 0:
+                return len(text)
+        else:
+            return i
+    return i
+
+
+def _calls(text, i):
+    """i 위치부터 이어지는 .method(args) 체인 → [(method, args)], 끝 위치"""
+    calls = []
+    while True:
+        j = _skip_ws(text, i)
+        if j >= len(text) or text[j] != ".":
+            return calls, i
+        m = re.match(r"\.(\w+)\s*", text[j:])
+        if not m or j + m.end() >= len(text) or text[j + m.end()] != "(":
+            return calls, i
+        open_at = j + m.end()
+        close_at = _balanced(text, open_at)
+        calls.append((m.group(1), text[open_at + 1:close_at - 1]))
+        i = close_at
+
+
+def _camel_to_snake(name):
+    return re.sub(r"(?<!^)([A-Z])", r"_\1", name).lower()
+
+
+def load_field_map(models_dir):
+    """모델 fromFirestore 의 `propName: ... data['field']` 매핑"""
+    mapping = {}
+    for path in glob.glob(os.path.join(models_dir, "*.dart")):
+        with open(path, encoding="utf-8") as f:
+            for prop, field in re.findall(r"(\w+):\s*[^,\n]*?data\['(\w+)'\]", f.read()):
+                mapping.setdefault(prop, field)
+    return mapping
+
+
+class QueryPattern:
+    """서비스 메서드 하나의 쿼리 + 메모리 후처리"""
+
+    def __init__(self, file, line, function, collection):
+        self.file = file
+        self.line = line
+        self.function = function
+        self.collection = collection
+        self.filters = []            # [(field, op, conditional)]
+        self.orders = []             # [(field, descending)]
+        self.limit = None
+        self.client_filters = []     # [(field, op)] 메모리 필터
+        self.client_sort = None      # (field, descending)
+        self.range_hint = None       # 'now' | 'day' | 'month' | None
+        self.listens = False
+
+    @property
+    def location(self):
+        return f"{os.path.relpath(self.file, REPO_ROOT)}:{self.line}"
+
+    def server_equality(self):
+        return [(f, op) for f, op, _ in self.filters if op in EQUALITY_OPS]
+
+    def server_ranges(self):
+        return [(f, op) for f, op, _ in self.filters if op in RANGE_OPS]
+
+    def describe(self):
+        parts = [f"collection('{self.collection}')"]
+        for field, op, conditional in self.filters:
+            parts.append(f"where('{field}' {op}){'?' if conditional else ''}")
+        for field, desc in self.orders:
+            parts.append(f"orderBy('{field}'{' desc' if desc else ''})")
+        if self.limit:
+            parts.append(f"limit({self.limit})")
+        return ".".join(parts)
+
+    def describe_client(self):
+        parts = [f"{field} {op}" for field, op in self.client_filters]
+        if self.client_sort:
+            field, desc = self.client_sort
+            parts.append(f"sort({field}{' desc' if desc else ''})")
+        return ", ".join(parts)
+
+    def optimized(self):
+        """
+        메모리 필터/정렬을 서버로 옮긴 쿼리 → (equality, range_field, orders)
+        Firestore 제약: 범위 조건 필드가 첫 orderBy 여야 한다
+        """
+        equality = self.server_equality() + [(f, op) for f, op in self.client_filters if op == "=="]
+        ranges = self.server_ranges() + [(f, op) for f, op in self.client_filters if op != "=="]
+        range_field = ranges[0][0] if ranges else None
+        orders = list(self.orders)
+        if self.client_sort and not orders:
+            orders = [self.client_sort]
+        if range_field and (not orders or orders[0][0] != range_field):
+            direction = orders[0][1] if orders and orders[0][0] == range_field else False
+            orders = [(range_field, direction)] + [o for o in orders if o[0] != range_field]
+        return equality, range_field, orders
+
+    def without_conditionals(self):
+        """조건부 필터(query = query.where(...))가 빠진 변형"""
+        base = QueryPattern(self.file, self.line, self.function, self.collection)
+        base.filters = [f for f in self.filters if not f[2]]
+        base.orders = self.orders
+        base.client_filters = self.client_filters
+        base.client_sort = self.client_sort
+        return base
+
+    def index_fields(self):
+        """
+        필요한 복합 인덱스 필드 목록
+        등호 조건만 있는 쿼리는 단일 필드 인덱스 병합으로 처리되므로 None
+        """
+        equality, range_field, orders = self.optimized()
+        if not orders and not range_field:
+            return None
+        fields = []
+        seen = set()
+        for field, op in equality:
+            if field in seen:
+                continue
+            seen.add(field)
+            if op.startswith("array-contains"):
+                fields.append({"fieldPath": field, "arrayConfig": "CONTAINS"})
+            else:
+                fields.append({"fieldPath": field, "order": "ASCENDING"})
+        for field, desc in orders:
+            if field in seen:
+                continue
+            seen.add(field)
+            fields.append({"fieldPath": field, "order": "DESCENDING" if desc else "ASCENDING"})
+        if range_field and range_field not in seen:
+            fields.append({"fieldPath": range_field, "order": "ASCENDING"})
+        return fields if len(fields) > 1 else None
+
+
+def _parse_where(args):
+    field = _STRING_RE.match(args)
+    if not field:
+        return None
+    for named, op in WHERE_OPS.items():
+        if re.search(rf"\b{named}\s*:", args):
+            return field.group(1), op
+    return None
+
+
+def _parse_order(args):
+    field = _STRING_RE.match(args)
+    if not field:
+        return None
+    return field.group(1), bool(re.search(r"descending\s*:\s*true", args))
+
+
+def _lambda_params(body):
+    m = re.match(r"\s*\(\s*(\w+)(?:\s*,\s*(\w+))?\s*\)", body)
+    return (m.group(1), m.group(2)) if m else (None, None)
+
+
+def _prop_field(prop, field_map):
+    return field_map.get(prop, _camel_to_snake(prop))
+
+
+def _client_sort(args, field_map):
+    a, b = _lambda_params(args)
+    if not a or not b:
+        return None
+    # a['created_at'] 를 지역 변수로 꺼낸 뒤 비교하는 경우
+    aliases = {}
+    for var, src, field in re.findall(r"final\s+(\w+)\s*=\s*(\w+)\['(\w+)'\]", args):
+        aliases[var] = (src, field)
+    m = re.search(r"([\w.\[\]']+)\.compareTo\(\s*([\w.\[\]']+)\s*\)", args)
+    if not m:
+        return None
+    left = m.group(1)
+    root = left.split(".")[0].split("[")[0]
+    if root in aliases:
+        src, field = aliases[root]
+        return field, src == b
+    field_m = re.match(rf"(\w+)(?:\.(\w+)|\['(\w+)'\])", left)
+    if not field_m or field_m.group(1) not in (a, b):
+        return None
+    field = field_m.group(3) or _prop_field(field_m.group(2), field_map)
+    return field, field_m.group(1) == b
+
+
+def _client_filters(args, field_map):
+    var, _ = _lambda_params(args)
+    if not var:
+        return []
+    # 모델 속성(x.scheduleDate) / 맵 필드(x['schedule_date']) / 지역 변수로 꺼낸 맵 필드
+    fields = {}
+    for prop in set(re.findall(rf"\b{var}\.(\w+)", args)):
+        fields[rf"\b{var}\.{prop}"] = _prop_field(prop, field_map)
+    for field in set(re.findall(rf"\b{var}\['(\w+)'\]", args)):
+        fields[rf"\b{var}\['{field}'\]"] = field
+    for alias, field in re.findall(rf"final\s+(\w+)\s*=\s*\(?\s*{var}\['(\w+)'\]", args):
+        fields[rf"\b{alias}\b"] = field
+
+    filters = []
+    for expr, field in fields.items():
+        if re.search(rf"{expr}\s*==(?!\s*null)", args):
+            filters.append((field, "=="))
+        if re.search(rf"{expr}\??\.is(?:After|Before)\(", args) or \
+                re.search(rf"is(?:After|Before)\(\s*{expr}\s*\)", args):
+            filters.append((field, "range"))
+    return sorted(set(filters))
+
+
+def _range_hint(body):
+    if "DateTime.now().isBefore" in body or "DateTime.now().isAfter" in body:
+        return "now"
+    if re.search(r"startOfDay|endOfDay", body):
+        return "day"
+    if re.search(r"DateTime\(\s*year\s*,\s*month", body):
+        return "month"
+    return None
+
+
+def parse_services(services_dir, field_map):
+    patterns = []
+    for path in sorted(glob.glob(os.path.join(services_dir, "*.dart"))):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        constants = dict(_CONST_RE.findall(text))
+        functions = [(m.start(), m.group(1)) for m in _FUNCTION_RE.finditer(text)]
+        bounds = [start for start, _ in functions] + [len(text)]
+
+        for index, (start, name) in enumerate(functions):
+            body = text[start:bounds[index + 1]]
+            for m in _COLLECTION_RE.finditer(body):
+                open_at = m.start() + len(".collection")
+                close_at = _balanced(body, open_at)
+                arg = body[open_at + 1:close_at - 1].strip()
+                literal = _STRING_RE.match(arg)
+                collection = literal.group(1) if literal else constants.get(arg)
+                if not collection:
+                    continue
+                calls, end = _calls(body, close_at)
+                methods = [c[0] for c in calls]
+                if not calls or "doc" in methods or "add" in methods:
+                    continue
+                if methods[-1] not in ("get", "snapshots") and not re.match(r"\s*;", body[end:]):
+                    continue
+
+                line = text.count("\n", 0, start + m.start()) + 1
+                pattern = QueryPattern(path, line, name, collection)
+                for method, args in calls:
+                    if method == "where":
+                        parsed = _parse_where(args)
+                        if parsed:
+                            pattern.filters.append((parsed[0], parsed[1], False))
+                    elif method == "orderBy":
+                        parsed = _parse_order(args)
+                        if parsed:
+                            pattern.orders.append(parsed)
+                    elif method == "limit":
+                        pattern.limit = int(args) if args.strip().isdigit() else args.strip()
+                    elif method == "snapshots":
+                        pattern.listens = True
+
+                # query = query.where(...) 형태의 조건부 필터
+                var = re.search(r"(?:Query\S*|final|var)\s+(\w+)\s*=\s*[\w.]*\s*$", body[:m.start()])
+                if var:
+                    for cond in re.finditer(rf"\b{var.group(1)}\s*=\s*{var.group(1)}\s*", body[end:]):
+                        cond_calls, _ = _calls(body, end + cond.end())
+                        for method, args in cond_calls:
+                            if method == "where" and _parse_where(args):
+                                field, op = _parse_where(args)
+                                pattern.filters.append((field, op, True))
+                            elif method == "orderBy" and _parse_order(args):
+                                pattern.orders.append(_parse_order(args))
+
+                # 쿼리 이후의 메모리 정렬/필터
+                rest = body[end:]
+                for sort in re.finditer(r"\.sort\(", rest):
+                    close = _balanced(rest, sort.end() - 1)
+                    pattern.client_sort = pattern.client_sort or _client_sort(
+                        rest[sort.end():close - 1], field_map)
+                for where in re.finditer(r"\.where\(\s*\(", rest):
+                    close = _balanced(rest, where.end() - 2)
+                    pattern.client_filters.extend(_client_filters(rest[where.end() - 1:close - 1], field_map))
+                pattern.range_hint = _range_hint(rest)
+                patterns.append(pattern)
+    return patterns
+
+
+# ---------------------------------------------------------------------------
+# 인덱스 정의
+# ---------------------------------------------------------------------------
+
+
+def build_indexes(patterns):
+    indexes = []
+    seen = set()
+    for pattern in patterns:
+        variants = [pattern]
+        if any(conditional for _, _, conditional in pattern.filters):
+            variants.append(pattern.without_conditionals())
+        for variant in variants:
+            fields = variant.index_fields()
+            if not fields:
+                continue
+            key = (pattern.collection, json.dumps(fields, sort_keys=True))
+            if key in seen:
+                continue
+            seen.add(key)
+            indexes.append({"collectionGroup": pattern.collection, "queryScope": "COLLECTION", "fields": fields})
+    indexes.sort(key=lambda i: (i["collectionGroup"], json.dumps(i["fields"])))
+    return {"indexes": indexes, "fieldOverrides": []}
+
+
+# ---------------------------------------------------------------------------
+# 비용 추정
+# ---------------------------------------------------------------------------
+
+RANGE_WINDOW_DAYS = {"day": 1, "month": 31}
+
+
+class CollectionStats:
+    """스냅샷 1회 순회로 쿼리별 그룹 크기와 범위 필드 분포 집계"""
+
+    def __init__(self, patterns):
+        self.count = 0
+        self.groups = {}      # 필드 튜플 → Counter(값 튜플)
+        self.times = {}       # 필드 → [min, max, 미래 건수]
+        self.now = datetime.now(timezone.utc)
+        for pattern in patterns:
+            equality, range_field, _ = pattern.optimized()
+            self.groups.setdefault(tuple(f for f, _ in pattern.server_equality()), Counter())
+            self.groups.setdefault(tuple(f for f, _ in equality), Counter())
+            if range_field:
+                self.times.setdefault(range_field, [None, None, 0])
+
+    @staticmethod
+    def _hashable(value):
+        if isinstance(value, list):
+            return tuple(value)
+        if isinstance(value, dict):
+            return json.dumps(value, sort_keys=True, default=str)
+        return value
+
+    def add(self, data):
+        self.count += 1
+        for fields, counter in self.groups.items():
+            if fields:
+                counter[tuple(self._hashable(data.get(f)) for f in fields)] += 1
+        for field, stat in self.times.items():
+            value = data.get(field)
+            if not isinstance(value, datetime):
+                continue
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            stat[0] = value if stat[0] is None or value < stat[0] else stat[0]
+            stat[1] = value if stat[1] is None or value > stat[1] else stat[1]
+            if value > self.now:
+                stat[2] += 1
+
+    def mean_group(self, fields):
+        """파라미터가 기존 값 중 하나라고 가정한 쿼리당 평균 결과 수"""
+        if not fields:
+            return float(self.count)
+        counter = self.groups.get(tuple(fields))
+        if not counter:
+            return 0.0
+        return sum(counter.values()) / len(counter)
+
+    def range_selectivity(self, field, hint, default_days):
+        stat = self.times.get(field)
+        if not stat or stat[0] is None or not self.count:
+            return 1.0
+        if hint == "now":
+            return stat[2] / self.count
+        span_days = max((stat[1] - stat[0]).total_seconds() / 86400, 1.0)
+        return min(1.0, RANGE_WINDOW_DAYS.get(hint, default_days) / span_days)
+
+
+def estimate_costs(patterns, snapshot_dir, default_days):
+    from firestore_snapshot import SnapshotReader
+
+    reader = SnapshotReader(snapshot_dir)
+    by_collection = {}
+    for pattern in patterns:
+        by_collection.setdefault(pattern.collection, []).append(pattern)
+
+    estimates = {}
+    for collection, items in by_collection.items():
+        stats = CollectionStats(items)
+        for _, data, _ in reader.iter_docs(collection):
+            stats.add(data)
+        for pattern in items:
+            current = stats.mean_group([f for f, _ in pattern.server_equality()])
+            if isinstance(pattern.limit, int):
+                current = min(current, pattern.limit)
+            equality, range_field, _ = pattern.optimized()
+            optimized = stats.mean_group([f for f, _ in equality])
+            if range_field:
+                optimized *= stats.range_selectivity(range_field, pattern.range_hint, default_days)
+            if isinstance(pattern.limit, int):
+                optimized = min(optimized, pattern.limit)
+            estimates[id(pattern)] = (max(current, 1.0), max(optimized, 1.0), stats.count)
+    return estimates
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+
+def analyze_query_patterns(services_dir, models_dir, output, snapshot_dir, threshold, default_days, check):
+    """쿼리 패턴 분석 및 인덱스 파일 생성"""
+
+    try:
+        field_map = load_field_map(models_dir)
+        patterns = parse_services(services_dir, field_map)
+
+        print("=" * 80)
+        print("🔎 Firestore 쿼리 패턴 분석")
+        print("=" * 80)
+        print(f"   서비스 쿼리: {len(patterns)}개")
+
+        estimates = estimate_costs(patterns, snapshot_dir, default_days) if snapshot_dir else {}
+        over_reads = 0
+        for pattern in patterns:
+            print(f"\n📋 {pattern.function}  ({pattern.location})")
+            print(f"   서버: {pattern.describe()}")
+            client = pattern.describe_client()
+            if client:
+                print(f"   메모리: {client}")
+            fields = pattern.index_fields()
+            if fields:
+                desc = ", ".join(f"{f['fieldPath']} {f.get('order', f.get('arrayConfig'))}" for f in fields)
+                print(f"   인덱스: {desc}")
+            if id(pattern) in estimates:
+                current, optimized, total = estimates[id(pattern)]
+                if not total:
+                    print("   읽기/호출: 스냅샷에 문서 없음")
+                    continue
+                ratio = current / optimized
+                flag = ""
+                if ratio >= threshold:
+                    over_reads += 1
+                    flag = f"  ⚠️  over-read x{ratio:,.1f}"
+                print(f"   읽기/호출: 현재 {current:,.1f} → 최적화 {optimized:,.1f} (컬렉션 {total:,}건){flag}")
+
+        config = build_indexes(patterns)
+        rendered = json.dumps(config, ensure_ascii=False, indent=2) + "\n"
+
+        print("\n" + "=" * 80)
+        print(f"📊 복합 인덱스: {len(config['indexes'])}개")
+        if estimates:
+            print(f"⚠️  over-read 쿼리: {over_reads}개 (기준 x{threshold})")
+
+        if check:
+            existing = open(output, encoding="utf-8").read() if os.path.exists(output) else ""
+            if existing != rendered:
+                print(f"❌ {os.path.relpath(output, REPO_ROOT)} 가 최신이 아닙니다. --check 없이 다시 실행하세요.")
+                print("=" * 80)
+                return False
+            print(f"✅ {os.path.relpath(output, REPO_ROOT)} 최신 상태")
+        else:
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(rendered)
+            print(f"✅ 인덱스 정의 저장: {os.path.relpath(output, REPO_ROOT)}")
+            print("   배포: firebase deploy --only firestore:indexes")
+        print("=" * 80)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dart 쿼리 패턴 분석 및 복합 인덱스 생성")
+    parser.add_argument("--services", default=DEFAULT_SERVICES_DIR)
+    parser.add_argument("--models", default=DEFAULT_MODELS_DIR)
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="firestore.indexes.json 경로")
+    parser.add_argument("--snapshot", help="카디널리티 추정용 스냅샷 디렉토리")
+    parser.add_argument("--threshold", type=float, default=2.0, help="over-read 판정 배수")
+    parser.add_argument("--range-days", type=float, default=30.0, help="기간을 알 수 없는 범위 조건의 추정 기간(일)")
+    parser.add_argument("--check", action="store_true", help="파일을 쓰지 않고 최신 여부만 확인")
+    args = parser.parse_args()
+
+    success = analyze_query_patterns(args.services, args.models, args.out, args.snapshot,
+                                     args.threshold, args.range_days, args.check)
+    sys.exit(0 if success else 1)
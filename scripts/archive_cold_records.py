@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+오래된 출석/예약/세션 기록 콜드 스토리지 보관 + 월별 요약(rollup)
+
+attendances, appointments, session_records 는 계속 쌓이기만 하고, Dart 서비스는
+매번 전체 이력을 읽는다. 보존 기간(--retention-days)보다 오래된 문서를
+
+    1. 월 단위 압축 샤드 파일(<root>/<collection>/<YYYY-MM>/<run>.jsonl.gz)로 저장하고
+    2. 환자별 월 요약 문서(monthly_rollups/<collection>_<patient_id>_<YYYY-MM>)를 기록한 뒤
+    3. 원본을 배치(500건)로 삭제한다. 삭제는 샤드에 저장한 update_time 을 전제 조건으로 걸어,
+       보관한 뒤에 수정된 문서는 지우지 않고 같은 달의 새 샤드로 다시 보관한다
+       (이전 샤드의 사본은 요약에서 제외).
+
+진행 상태는 <root>/archive_state.json 에 샤드 단위로 기록되어, 중간에 중단되어도
+다시 실행하면 남은 단계(요약 기록, 삭제)부터 이어서 진행한다.
+요약은 해당 월의 모든 샤드를 문서 ID 기준으로 중복 제거해 다시 계산하므로
+몇 번을 다시 실행해도 같은 결과가 된다.
+
+사용법:
+    python scripts/archive_cold_records.py                                  # dry-run: 월별 보관 대상 수
+    python scripts/archive_cold_records.py --apply --root archives --retention-days 365
+    python scripts/archive_cold_records.py --apply --collections attendances --months 3
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from firestore_common import get_db
+from firestore_snapshot import decode_doc_line, encode_doc_line
+
+ARCHIVE_SPECS = {
+    "attendances": {"date_field": "schedule_date", "duration_field": None},
+    "appointments": {"date_field": "appointment_date", "duration_field": None},
+    "session_records": {"date_field": "session_date", "duration_field": "duration"},
+}
+ROLLUP_COLLECTION = "monthly_rollups"
+STATE_FILE = "archive_state.json"
+DEFAULT_ROOT = "archives"
+BATCH_SIZE = 500
+PAGE_SIZE = 1000
+REARCHIVE_ROUNDS = 3        # 보관 중 수정된 문서를 같은 실행에서 다시 보관하는 최대 횟수
+
+
+# ---------------------------------------------------------------------------
+# 상태 파일
+# ---------------------------------------------------------------------------
+
+
+def load_state(root):
+    path = os.path.join(root, STATE_FILE)
+    if not os.path.exists(path):
+        return {"shards": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(root, state):
+    path = os.path.join(root, STATE_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# 조회
+# ---------------------------------------------------------------------------
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def _next_month(value):
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _as_utc(value):
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _oldest(db, collection, date_field):
+    docs = db.collection(collection).order_by(date_field).limit(1).get()
+    for doc in docs:
+        value = (doc.to_dict() or {}).get(date_field)
+        if isinstance(value, datetime):
+            return _as_utc(value)
+    return None
+
+
+def _iter_range(db, collection, date_field, start, end):
+    """date_field 가 [start, end) 인 문서를 (날짜, ID) 순으로 페이지 조회"""
+    query = (db.collection(collection)
+             .where(date_field, ">=", start)
+             .where(date_field, "<", end)
+             .order_by(date_field)
+             .order_by("__name__")
+             .limit(PAGE_SIZE))
+    last = None
+    while True:
+        page = (query.start_after(last) if last else query).get()
+        for doc in page:
+            yield doc
+        if len(page) < PAGE_SIZE:
+            return
+        last = page[-1]
+
+
+def count_range(db, collection, date_field, start, end):
+    """집계 쿼리로 구간 문서 수만 조회 (문서를 읽지 않음)"""
+    result = (db.collection(collection)
+              .where(date_field, ">=", start)
+              .where(date_field, "<", end)
+              .count()
+              .get())
+    return result[0][0].value
+
+
+def months_to_archive(db, collection, cutoff, max_months):
+    """보관 대상 월 구간 [(월 시작, 구간 끝)] (가장 오래된 달부터)"""
+    oldest = _oldest(db, collection, ARCHIVE_SPECS[collection]["date_field"])
+    if oldest is None or oldest >= cutoff:
+        return []
+    months = []
+    start = _month_start(oldest)
+    while start < cutoff and len(months) < max_months:
+        months.append((start, min(_next_month(start), cutoff)))
+        start = _next_month(start)
+    return months
+
+
+# ---------------------------------------------------------------------------
+# 샤드 / 요약 / 삭제
+# ---------------------------------------------------------------------------
+
+
+def write_shard(db, root, collection, start, end, run_tag):
+    """월 구간 문서를 압축 샤드로 저장, (상대 경로, 문서 수) 반환 (문서가 없으면 None)"""
+    date_field = ARCHIVE_SPECS[collection]["date_field"]
+    month_dir = os.path.join(root, collection, start.strftime("%Y-%m"))
+    os.makedirs(month_dir, exist_ok=True)
+    path = os.path.join(month_dir, f"{run_tag}.jsonl.gz")
+    tmp = path + ".tmp"
+    count = 0
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        for doc in _iter_range(db, collection, date_field, start, end):
+            f.write(encode_doc_line(doc.id, doc.to_dict(), doc.update_time))
+            count += 1
+    if count == 0:
+        os.remove(tmp)
+        return None
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return os.path.relpath(path, root), count
+
+
+def iter_shard(root, shard):
+    with gzip.open(os.path.join(root, shard), "rt", encoding="utf-8") as f:
+        for line in f:
+            yield decode_doc_line(line)
+
+
+def _stale_ids(state):
+    """샤드 → 보관 뒤 수정되어 삭제하지 않은 문서 ID 집합"""
+    return {key: set(entry.get("stale", ())) for key, entry in state["shards"].items()}
+
+
+def compute_rollups(root, collection, month, stale=None):
+    """
+    해당 월의 모든 샤드를 문서 ID로 중복 제거해 환자별 요약 계산
+    (최근 샤드 우선, stale 에 든 샤드별 문서는 건너뜀)
+    """
+    spec = ARCHIVE_SPECS[collection]
+    stale = stale or {}
+    shards = sorted(os.path.relpath(p, root) for p in
+                    glob.glob(os.path.join(root, collection, month, "*.jsonl.gz")))
+    seen = set()
+    rollups = {}
+    for shard in reversed(shards):
+        skip = stale.get(shard, ())
+        for doc_id, data, _ in iter_shard(root, shard):
+            if doc_id in seen or doc_id in skip:
+                continue
+            seen.add(doc_id)
+            patient_id = data.get("patient_id") or "_unknown"
+            rollup = rollups.get(patient_id)
+            if rollup is None:
+                rollup = rollups[patient_id] = {
+                    "collection": collection,
+                    "patient_id": patient_id,
+                    "patient_name": data.get("patient_name"),
+                    "month": month,
+                    "count": 0,
+                    "statuses": Counter(),
+                    "therapist_ids": set(),
+                    "duration_minutes": 0,
+                    "first_date": None,
+                    "last_date": None,
+                }
+            rollup["count"] += 1
+            rollup["statuses"][str(data.get("status") or "UNKNOWN")] += 1
+            if data.get("therapist_id"):
+                rollup["therapist_ids"].add(data["therapist_id"])
+            if spec["duration_field"]:
+                duration = data.get(spec["duration_field"])
+                if isinstance(duration, (int, float)):
+                    rollup["duration_minutes"] += duration
+            date = data.get(spec["date_field"])
+            if isinstance(date, datetime):
+                if rollup["first_date"] is None or date < rollup["first_date"]:
+                    rollup["first_date"] = date
+                if rollup["last_date"] is None or date > rollup["last_date"]:
+                    rollup["last_date"] = date
+
+    now = datetime.now(timezone.utc)
+    for rollup in rollups.values():
+        rollup["statuses"] = dict(rollup["statuses"])
+        rollup["therapist_ids"] = sorted(rollup["therapist_ids"])
+        rollup["archive_shards"] = shards
+        rollup["updated_at"] = now
+    return rollups
+
+
+def write_rollups(db, collection, month, rollups):
+    """요약 문서를 덮어쓰기(set)로 기록 (재실행해도 같은 결과)"""
+    col = db.collection(ROLLUP_COLLECTION)
+    batch = db.batch()
+    for patient_id, rollup in rollups.items():
+        batch.set(col.document(f"{collection}_{patient_id}_{month}"), rollup)
+        if len(batch) >= BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+    if len(batch):
+        batch.commit()
+
+
+def _precondition_failed(error):
+    """google.api_core.exceptions.FailedPrecondition 여부 (가짜 클라이언트도 같은 이름 사용)"""
+    return any(cls.__name__ == "FailedPrecondition" for cls in type(error).__mro__)
+
+
+def _delete_chunk(db, col, chunk, stale):
+    """
+    (문서 ID, update_time) 묶음을 update_time 전제 조건으로 삭제.
+    배치는 하나라도 전제 조건이 깨지면 통째로 실패하므로, 그때만 문서별로 다시 삭제해
+    보관 뒤 수정된(또는 update_time 이 없는) 문서를 stale 에 모은다.
+    """
+    batch = db.batch()
+    for doc_id, update_time in chunk:
+        if update_time is None:
+            stale.append(doc_id)
+            continue
+        batch.delete(col.document(doc_id), option=db.write_option(last_update_time=update_time))
+    if not len(batch):
+        return
+    try:
+        batch.commit()
+        return
+    except Exception as e:
+        if not _precondition_failed(e):
+            raise
+    for doc_id, update_time in chunk:
+        if update_time is None:
+            continue
+        try:
+            col.document(doc_id).delete(option=db.write_option(last_update_time=update_time))
+        except Exception as e:
+            if not _precondition_failed(e):
+                raise
+            stale.append(doc_id)
+
+
+def delete_archived(db, root, state, shard_key):
+    """
+    샤드에 기록된 원본 문서를 배치 삭제, 배치마다 진행 위치를 체크포인트.
+    보관 뒤 수정되어 지우지 않은 문서 ID 목록을 반환 (entry["stale"] 에도 기록)
+    """
+    entry = state["shards"][shard_key]
+    stale = entry.setdefault("stale", [])
+    col = db.collection(entry["collection"])
+    done = entry["deleted"]
+    chunk = []
+    for index, (doc_id, _, update_time) in enumerate(iter_shard(root, shard_key)):
+        if index < done:
+            continue
+        chunk.append((doc_id, update_time))
+        if len(chunk) >= BATCH_SIZE:
+            _delete_chunk(db, col, chunk, stale)
+            entry["deleted"] = index + 1
+            save_state(root, state)
+            chunk = []
+    if chunk:
+        _delete_chunk(db, col, chunk, stale)
+    entry["deleted"] = entry["count"]
+    save_state(root, state)
+    return stale
+
+
+def _write_month_rollups(db, root, state, entry):
+    rollups = compute_rollups(root, entry["collection"], entry["month"], _stale_ids(state))
+    write_rollups(db, entry["collection"], entry["month"], rollups)
+    entry["rolled_up"] = True
+    save_state(root, state)
+
+
+def finish_shard(db, root, state, shard_key):
+    """
+    요약 기록 → 원본 삭제 → (보관 뒤 수정된 문서가 있으면) 그 문서를 빼고 요약 다시 기록
+    (이미 끝난 단계는 건너뜀)
+    """
+    entry = state["shards"][shard_key]
+    if not entry["rolled_up"]:
+        _write_month_rollups(db, root, state, entry)
+    if entry["deleted"] < entry["count"]:
+        if delete_archived(db, root, state, shard_key):
+            entry["rolled_up"] = False
+            save_state(root, state)
+            _write_month_rollups(db, root, state, entry)
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+
+def archive_cold_records(collections, root, retention_days, max_months, apply):
+    """보존 기간이 지난 기록 보관 및 월별 요약"""
+
+    try:
+        db = get_db()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+
+        print("=" * 70)
+        print(f"🧊 콜드 스토리지 보관 {'(적용)' if apply else '(dry-run)'}")
+        print("=" * 70)
+        print(f"   보존 기간: {retention_days}일 (기준: {cutoff:%Y-%m-%d} 이전)")
+        print(f"   보관 위치: {root}")
+
+        os.makedirs(root, exist_ok=True)
+        state = load_state(root)
+        run_tag = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+        # 이전 실행에서 중단된 샤드 마무리
+        pending = [key for key, entry in state["shards"].items()
+                   if entry["collection"] in collections
+                   and (not entry["rolled_up"] or entry["deleted"] < entry["count"])]
+        if pending:
+            print(f"\n🔁 중단된 샤드 {len(pending)}개 이어서 처리")
+            if apply:
+                for key in pending:
+                    finish_shard(db, root, state, key)
+                    print(f"   ✅ {key}")
+
+        total = 0
+        for collection in collections:
+            spec = ARCHIVE_SPECS[collection]
+            months = months_to_archive(db, collection, cutoff, max_months)
+            print(f"\n📋 {collection} ({spec['date_field']}): 대상 {len(months)}개월")
+            for start, end in months:
+                month = start.strftime("%Y-%m")
+                if not apply:
+                    count = count_range(db, collection, spec["date_field"], start, end)
+                    total += count
+                    print(f"   - {month}: {count:,}건")
+                    continue
+
+                # 삭제 전제 조건이 깨진 (보관 뒤 수정된) 문서는 남은 원본을 새 샤드로 다시 보관
+                for attempt in range(REARCHIVE_ROUNDS + 1):
+                    tag = run_tag if attempt == 0 else f"{run_tag}_r{attempt}"
+                    shard = write_shard(db, root, collection, start, end, tag)
+                    if shard is None:
+                        break
+                    key, count = shard
+                    state["shards"][key] = {"collection": collection, "month": month, "count": count,
+                                            "rolled_up": False, "deleted": 0, "stale": []}
+                    save_state(root, state)
+                    finish_shard(db, root, state, key)
+                    stale = len(state["shards"][key]["stale"])
+                    total += count - stale
+                    size = os.path.getsize(os.path.join(root, key))
+                    print(f"   ✅ {month}: {count:,}건 보관 ({size / 1024:,.1f} KB), 요약 기록, 원본 삭제"
+                          + (f" (보관 중 수정된 {stale:,}건 다시 보관)" if stale else ""))
+                    if not stale:
+                        break
+
+        print("\n" + "=" * 70)
+        if apply:
+            print(f"✅ 총 {total:,}건 보관 완료 (요약: {ROLLUP_COLLECTION})")
+        else:
+            print(f"⚠️  총 {total:,}건 보관 대상 (--apply 로 실행)")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--root": DEFAULT_ROOT}))
+
+    parser = argparse.ArgumentParser(description="오래된 기록 콜드 스토리지 보관 및 월별 요약")
+    parser.add_argument("--collections", nargs="+", default=list(ARCHIVE_SPECS), choices=list(ARCHIVE_SPECS))
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="샤드/상태 파일 디렉토리")
+    parser.add_argument("--retention-days", type=int, default=365, help="이 기간보다 오래된 문서를 보관")
+    parser.add_argument("--months", type=int, default=120, help="컬렉션별 한 번에 처리할 최대 개월 수")
+    parser.add_argument("--apply", action="store_true", help="실제로 보관/삭제 (기본은 dry-run)")
+    args = parser.parse_args()
+
+    success = archive_cold_records(args.collections, args.root, args.retention_days, args.months, args.apply)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+평가 점수 코호트 백분위 / 규준표 (NumPy 벡터화, 증분 갱신)
+
+assessments 의 scores (balance, coordination, strength, flexibility 및 템플릿 항목) 는
+환자 한 명씩만 조회된다. 이 스크립트는 전체 평가를 항목 단위 열 배열로 모아
+
+    - 코호트: 전체 / 연령대(평가일 기준, birth_date) / 진단명(diagnosis 첫 번째) / 센터(organization_id)
+    - 코호트별 항목 규준: n, 평균, 표준편차, p10/p25/p50/p75/p90
+    - 환자별 항목 백분위(mid-rank)와 z 점수
+
+를 계산한다. 환자마다 항목별 가장 최근 평가 점수 하나만 코호트에 넣는다 (평가를 자주 받은 환자가
+규준을 치우치지 않도록). 정렬 한 번과 reduceat 으로 모든 코호트를 동시에 계산하므로
+Python 루프는 문서 변환과 기록에만 남는다.
+
+기록:
+    assessment_norms/<코호트>__<값>        {dimension, value, items: {항목: {n, mean, std, p10..p90}}}
+    assessment_percentiles/<patient_id>    {items: {항목: {score, assessment_date, percentile: {...}, z: {...}}}}
+
+증분 갱신:
+    항목 점수 열과 환자 속성을 --cache (npz) 에 저장하고, 다음 실행에서는 watermark 이후 변경된
+    평가/환자만 반영한다 (firestore_backup 과 같은 --mode scan / field, 기본 field).
+    통계는 메모리의 전체 배열로 다시 계산하지만 읽기는 변경분뿐이다. 환자 문서는
+        - 자기 평가 점수나 환자 속성(생년월일/진단명/센터)이 바뀐 환자는 항상,
+        - 코호트 변화만으로 백분위가 움직인 환자는 마지막 기록 대비 --min-change (기본 5%p) 이상일 때
+    다시 기록한다. 점수가 1~5 의 이산값이라 동점 구간이 넓어서, 코호트에 평가 몇 건만 들어와도
+    구간 전체의 mid-rank 백분위가 1%p 안팎으로 함께 움직인다. 기준이 작으면 증분 실행이 거의 모든
+    환자를 다시 쓰게 되므로 기본값을 5%p 로 둔다. (삭제된 평가는 --full 로 다시 계산할 때 반영)
+
+사용법:
+    python scripts/assessment_norms.py                     # dry-run: 코호트 요약
+    python scripts/assessment_norms.py --apply             # 최초 전체, 이후 변경분
+    python scripts/assessment_norms.py --apply --full
+    python scripts/assessment_norms.py bench --patients 30000
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from firestore_backup import _changed_docs, add_mode_argument, run_watermark, warn_field_mode
+from firestore_common import get_db, iter_collection
+from firestore_models import Patient
+
+NORM_COLLECTION = "assessment_norms"
+PERCENTILE_COLLECTION = "assessment_percentiles"
+DEFAULT_CACHE = "assessment_norms_cache.npz"
+DIMENSIONS = ("all", "age_band", "diagnosis", "center")
+QUANTILES = (0.10, 0.25, 0.50, 0.75, 0.90)
+AGE_EDGES = (3, 6, 9, 13, 19)
+AGE_BANDS = ("0-2세", "3-5세", "6-8세", "9-12세", "13-18세", "19세 이상")
+UNKNOWN = "미상"
+SECONDS_PER_YEAR = 365.25 * 86400
+BATCH_SIZE = 500
+MIN_CHANGE = 5.0    # 코호트 변화만으로 다시 기록할 최소 백분위 변화 (%p)
+
+
+# ---------------------------------------------------------------------------
+# 문서 → 행
+# ---------------------------------------------------------------------------
+
+
+def _epoch(value):
+    if not isinstance(value, datetime):
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def score_items(scores):
+    """scores Map({항목: 점수}) 또는 List([{item_id, score}]) → [(항목, 점수)] (숫자만)"""
+    if isinstance(scores, dict):
+        pairs = scores.items()
+    elif isinstance(scores, list):
+        pairs = ((s.get("item_id"), s.get("score")) for s in scores if isinstance(s, dict))
+    else:
+        return []
+    return [(str(item), float(value)) for item, value in pairs
+            if item and isinstance(value, (int, float))]
+
+
+def assessment_rows(doc):
+    """평가 문서 → [(patient_id, 항목, 점수, 평가 시각, assessment_id)]"""
+    data = doc.to_dict() or {}
+    patient_id = data.get("patient_id") or data.get("patientId")
+    if not patient_id:
+        return []
+    when = _epoch(data.get("assessment_date") or data.get("assessmentDate") or data.get("created_at"))
+    if np.isnan(when):
+        when = _epoch(doc.update_time)
+    return [(patient_id, item, score, when, doc.id) for item, score in score_items(data.get("scores"))]
+
+
+# ---------------------------------------------------------------------------
+# 캐시 (열 배열)
+# ---------------------------------------------------------------------------
+
+
+class Columns:
+    """(환자, 항목) 별 최신 점수 열 + 환자 속성"""
+
+    def __init__(self):
+        self.patient = np.array([], dtype=str)
+        self.item = np.array([], dtype=str)
+        self.score = np.array([], dtype=np.float64)
+        self.time = np.array([], dtype=np.float64)
+        self.assessment = np.array([], dtype=str)
+        self.written = np.empty((0, len(DIMENSIONS)), dtype=np.float64)   # 마지막으로 기록한 백분위
+        self.dirty = np.zeros(0, dtype=bool)   # 이번 실행에서 점수/환자 속성이 바뀐 행 (캐시에 저장하지 않음)
+        self.patients = {}          # patient_id → (birth epoch, 진단명, 센터)
+        self.watermarks = {}
+
+    @classmethod
+    def load(cls, path):
+        columns = cls()
+        if not path or not os.path.exists(path):
+            return columns
+        with np.load(path, allow_pickle=False) as data:
+            for name in ("patient", "item", "score", "time", "assessment", "written"):
+                setattr(columns, name, data[name])
+            columns.dirty = np.zeros(len(columns.patient), dtype=bool)
+            columns.patients = {pid: (float(birth), diag, center) for pid, birth, diag, center in
+                                zip(data["p_id"].tolist(), data["p_birth"], data["p_diag"].tolist(),
+                                    data["p_center"].tolist())}
+            columns.watermarks = json.loads(str(data["meta"]))["watermarks"]
+        return columns
+
+    def save(self, path):
+        ids = sorted(self.patients)
+        values = [self.patients[pid] for pid in ids]
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path, patient=self.patient, item=self.item, score=self.score, time=self.time,
+            assessment=self.assessment, written=self.written,
+            p_id=np.array(ids, dtype=str), p_birth=np.array([v[0] for v in values], dtype=np.float64),
+            p_diag=np.array([v[1] for v in values], dtype=str), p_center=np.array([v[2] for v in values], dtype=str),
+            meta=np.array(json.dumps({"watermarks": self.watermarks})))
+        os.replace(tmp_path, path)
+
+    def merge(self, rows):
+        """새 행을 합치고 (환자, 항목) 마다 평가 시각이 가장 늦은 행만 남긴다 (결과는 환자, 항목 순)"""
+        if not rows:
+            return
+        patient, item, score, when, assessment = zip(*rows)
+        n_new = len(rows)
+        self.patient = np.concatenate([self.patient, np.array(patient, dtype=str)])
+        self.item = np.concatenate([self.item, np.array(item, dtype=str)])
+        self.score = np.concatenate([self.score, np.array(score, dtype=np.float64)])
+        self.time = np.concatenate([self.time, np.array(when, dtype=np.float64)])
+        self.assessment = np.concatenate([self.assessment, np.array(assessment, dtype=str)])
+        self.written = np.concatenate([self.written, np.full((n_new, len(DIMENSIONS)), np.nan)])
+        self.dirty = np.concatenate([self.dirty, np.ones(n_new, dtype=bool)])
+
+        # 안정 정렬이므로 시각이 같으면 나중에 들어온 행이 뒤에 온다
+        order = np.lexsort((self.time, self.item, self.patient))
+        p, i = self.patient[order], self.item[order]
+        same_key = (p[1:] == p[:-1]) & (i[1:] == i[:-1])
+        last = np.r_[~same_key, True]
+
+        # watermark 겹침 구간에서 다시 읽힌 같은 평가는 바뀐 행이 아니다: 기록 상태를 이어받는다
+        a, sc, t = self.assessment[order], self.score[order], self.time[order]
+        reread = np.flatnonzero(last[1:] & same_key & (a[1:] == a[:-1]) & (sc[1:] == sc[:-1]) & (t[1:] == t[:-1])) + 1
+        self.written[order[reread]] = self.written[order[reread - 1]]
+        self.dirty[order[reread]] = self.dirty[order[reread - 1]]
+        keep = order[last]
+        for name in ("patient", "item", "score", "time", "assessment", "written", "dirty"):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def touch(self, patient_ids):
+        """속성이 바뀐 환자의 행을 다시 기록 대상으로 표시"""
+        if patient_ids:
+            self.dirty |= np.isin(self.patient, np.array(sorted(patient_ids), dtype=str))
+
+    def demographics(self):
+        """행별 (연령대, 진단명, 센터) 문자열 배열"""
+        n = len(self.patient)
+        ids = np.array(sorted(self.patients), dtype=str)
+        if not n or not len(ids):
+            unknown = np.full(n, UNKNOWN)
+            return unknown, unknown, unknown
+        births = np.array([self.patients[pid][0] for pid in ids.tolist()], dtype=np.float64)
+        diags = np.array([self.patients[pid][1] for pid in ids.tolist()], dtype=str)
+        centers = np.array([self.patients[pid][2] for pid in ids.tolist()], dtype=str)
+
+        pos = np.minimum(np.searchsorted(ids, self.patient), len(ids) - 1)
+        found = ids[pos] == self.patient
+        age = np.where(found, (self.time - births[pos]) / SECONDS_PER_YEAR, np.nan)
+        bands = np.array(AGE_BANDS + (UNKNOWN,))
+        band = bands[np.where(np.isnan(age) | (age < 0), len(AGE_BANDS), np.digitize(np.nan_to_num(age), AGE_EDGES))]
+        return band, np.where(found, diags[pos], UNKNOWN), np.where(found, centers[pos], UNKNOWN)
+
+
+# ---------------------------------------------------------------------------
+# 코호트 통계
+# ---------------------------------------------------------------------------
+
+
+def cohort_stats(group, score, min_cohort):
+    """
+    그룹 코드별 통계 (정렬 1회)
+    → (행별 백분위, 행별 z, {그룹 코드 배열, n, mean, std, quantiles (그룹 × 분위)})
+    """
+    n = len(score)
+    order = np.lexsort((score, group))
+    g, s = group[order], score[order]
+
+    group_start = np.r_[True, g[1:] != g[:-1]]
+    starts = np.flatnonzero(group_start)
+    counts = np.diff(np.r_[starts, n])
+    gid = np.cumsum(group_start) - 1
+
+    means = np.add.reduceat(s, starts) / counts
+    std = np.sqrt(np.add.reduceat((s - means[gid]) ** 2, starts) / counts)
+
+    # 같은 점수 구간(run): mid-rank 백분위 = (아래 개수 + 동점 수 / 2) / n
+    run_start = group_start | np.r_[True, s[1:] != s[:-1]]
+    run_starts = np.flatnonzero(run_start)
+    run_len = np.diff(np.r_[run_starts, n])
+    run_id = np.cumsum(run_start) - 1
+    below = run_starts[run_id] - starts[gid]
+    pct_sorted = (below + 0.5 * run_len[run_id]) / counts[gid] * 100.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_sorted = np.where(std[gid] > 0, (s - means[gid]) / std[gid], 0.0)
+    small = counts[gid] < min_cohort
+    pct_sorted[small] = np.nan
+    z_sorted[small] = np.nan
+
+    pct, z = np.empty(n), np.empty(n)
+    pct[order], z[order] = pct_sorted, z_sorted
+
+    # 선형 보간 분위수
+    q = np.array(QUANTILES)
+    position = starts[:, None] + q[None, :] * (counts[:, None] - 1)
+    lo = np.floor(position).astype(np.int64)
+    hi = np.ceil(position).astype(np.int64)
+    quantiles = s[lo] + (s[hi] - s[lo]) * (position - lo)
+
+    table = {"group": g[starts], "n": counts, "mean": means, "std": std, "quantiles": quantiles}
+    return pct, z, table
+
+
+def compute(columns, min_cohort):
+    """모든 코호트 기준의 백분위/z 행렬 (행 × 차원) 과 규준표"""
+    band, diagnosis, center = columns.demographics()
+    categories = {"all": np.full(len(columns.patient), "all"), "age_band": band,
+                  "diagnosis": diagnosis, "center": center}
+    items, item_code = np.unique(columns.item, return_inverse=True)
+
+    pct = np.full((len(columns.patient), len(DIMENSIONS)), np.nan)
+    z = np.full_like(pct, np.nan)
+    norms = {}
+    for d, dimension in enumerate(DIMENSIONS):
+        values, cat_code = np.unique(categories[dimension], return_inverse=True)
+        group = item_code.astype(np.int64) * len(values) + cat_code
+        pct[:, d], z[:, d], table = cohort_stats(group, columns.score, min_cohort)
+        for k, code in enumerate(table["group"].tolist()):
+            value = str(values[code % len(values)])
+            entry = {"n": int(table["n"][k]), "mean": round(float(table["mean"][k]), 3),
+                     "std": round(float(table["std"][k]), 3)}
+            entry.update({f"p{int(q * 100)}": round(float(v), 3) for q, v in zip(QUANTILES, table["quantiles"][k])})
+            norms.setdefault((dimension, value), {})[str(items[code // len(values)])] = entry
+    return pct, z, norms, categories
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+
+def _doc_id(dimension, value):
+    return f"{dimension}__{re.sub(r'[/.]', '_', value)}"
+
+
+def _by_dimension(row):
+    """[값 × 차원] → {차원: 값} (NaN → None)"""
+    return {d: (v if v == v else None) for d, v in zip(DIMENSIONS, row)}
+
+
+def _fetch(db, collection, watermark, full, mode, overlap):
+    """(문서들, 새 watermark)"""
+    since = None if full or not watermark else datetime.fromisoformat(watermark)
+    mark = run_watermark(overlap)
+    docs = list(iter_collection(db, collection) if since is None
+                else _changed_docs(db, collection, since, mode, overlap))
+    return docs, mark.isoformat()
+
+
+def assessment_norms(cache_path, full, min_cohort, min_change, apply, overlap_minutes=10, mode="field"):
+    try:
+        db = get_db()
+        overlap = timedelta(minutes=overlap_minutes)
+
+        print("=" * 70)
+        print("📊 평가 점수 코호트 백분위 / 규준표")
+        print("=" * 70)
+        if not apply:
+            print("🔍 dry-run: 계산 결과만 출력합니다 (--apply 로 기록)")
+        warn_field_mode(mode)
+
+        columns = Columns() if full else Columns.load(cache_path)
+        started = time.perf_counter()
+        patient_docs, patient_mark = _fetch(db, "patients", columns.watermarks.get("patients"), full, mode, overlap)
+        touched = set()
+        for doc in patient_docs:
+            patient = Patient.from_snapshot(doc)
+            attributes = (_epoch(patient.birth_date),
+                          patient.diagnosis[0] if patient.diagnosis else UNKNOWN,
+                          patient.organization_id or UNKNOWN)
+            if columns.patients.get(doc.id) != attributes:
+                touched.add(doc.id)
+            columns.patients[doc.id] = attributes
+        columns.touch(touched)
+        assessment_docs, assessment_mark = _fetch(db, "assessments", columns.watermarks.get("assessments"),
+                                                  full, mode, overlap)
+        columns.merge([row for doc in assessment_docs for row in assessment_rows(doc)])
+        print(f"📥 변경 조회: 환자 {len(patient_docs):,}명, 평가 {len(assessment_docs):,}건 "
+              f"({time.perf_counter() - started:.1f}초)")
+        print(f"   항목 점수 {len(columns.patient):,}개 (환자 {len(np.unique(columns.patient)):,}명)")
+        if not len(columns.patient):
+            print("✅ 평가 데이터가 없습니다.")
+            return True
+
+        started = time.perf_counter()
+        pct, z, norms, categories = compute(columns, min_cohort)
+        print(f"🧮 코호트 {len(norms):,}개 계산 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+        for dimension in DIMENSIONS:
+            values = sorted(v for d, v in norms if d == dimension)
+            print(f"   {dimension}: {len(values)}개 ({', '.join(values[:8])}{' ...' if len(values) > 8 else ''})")
+
+        # 자기 행이 바뀐 환자 + 코호트 변화로 백분위가 min_change 이상 움직인 환자만 기록
+        same = (np.abs(pct - columns.written) < min_change) | (np.isnan(pct) & np.isnan(columns.written))
+        row_changed = columns.dirty | ~same.all(axis=1)
+        patient_start = np.flatnonzero(np.r_[True, columns.patient[1:] != columns.patient[:-1]])
+        patient_changed = np.logical_or.reduceat(row_changed, patient_start)
+        bounds = np.r_[patient_start, len(columns.patient)]
+        changed = np.flatnonzero(patient_changed)
+        print(f"👤 다시 기록할 환자: {len(changed):,}명 / {len(patient_start):,}명")
+
+        if not apply:
+            return True
+
+        now = datetime.now(timezone.utc)
+        batch, pending = db.batch(), 0
+        for (dimension, value), items in norms.items():
+            batch.set(db.collection(NORM_COLLECTION).document(_doc_id(dimension, value)),
+                      {"dimension": dimension, "value": value, "items": items, "updated_at": now})
+            pending += 1
+            if pending >= BATCH_SIZE:
+                batch.commit()
+                batch, pending = db.batch(), 0
+
+        written_patients = 0
+        pct_rounded, z_rounded = np.round(pct, 2), np.round(z, 2)
+        item_names, scores, assessments = columns.item.tolist(), columns.score.tolist(), columns.assessment.tolist()
+        times, bands = columns.time.tolist(), categories["age_band"].tolist()
+        for k in changed.tolist():
+            lo, hi = int(bounds[k]), int(bounds[k + 1])
+            patient_id = str(columns.patient[lo])
+            items = {}
+            for r, pct_row, z_row in zip(range(lo, hi), pct_rounded[lo:hi].tolist(), z_rounded[lo:hi].tolist()):
+                items[item_names[r]] = {
+                    "score": scores[r],
+                    "assessment_id": assessments[r],
+                    "assessment_date": datetime.fromtimestamp(times[r], timezone.utc),
+                    "age_band": bands[r],
+                    "percentile": _by_dimension(pct_row),
+                    "z": _by_dimension(z_row),
+                }
+            batch.set(db.collection(PERCENTILE_COLLECTION).document(patient_id), {
+                "patient_id": patient_id,
+                "organization_id": str(categories["center"][lo]),
+                "diagnosis": str(categories["diagnosis"][lo]),
+                "items": items,
+                "updated_at": now,
+            })
+            pending += 1
+            if pending >= BATCH_SIZE:
+                batch.commit()
+                batch, pending = db.batch(), 0
+            columns.written[lo:hi] = pct[lo:hi]
+            columns.dirty[lo:hi] = False
+            written_patients += 1
+        if pending:
+            batch.commit()
+
+        columns.watermarks = {"patients": patient_mark, "assessments": assessment_mark}
+        columns.save(cache_path)
+
+        print("\n" + "=" * 70)
+        print(f"✅ 규준표 {len(norms):,}개, 환자 백분위 {written_patients:,}명 기록")
+        print(f"💾 캐시: {cache_path}")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크
+# ---------------------------------------------------------------------------
+
+
+def bench(args):
+    """가짜 Firestore: 전체 계산 후 새 평가 일부만 추가해 증분 실행"""
+    import random
+    import tempfile
+
+    import firestore_fake
+
+    rng = random.Random(args.random_seed)
+    items = ["balance", "coordination", "strength", "flexibility"] + [f"item_{k:02d}" for k in range(21)]
+    diagnoses = ["뇌성마비", "발달지연", "자폐스펙트럼", "다운증후군", "근이영양증"]
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    patients, assessments = {}, {}
+    for p in range(args.patients):
+        patients[f"p{p:06d}"] = {"name": f"환자{p}", "organization_id": f"org_{p % 12:02d}",
+                                 "birth_date": base - timedelta(days=rng.randrange(365, 365 * 20)),
+                                 "diagnosis": [rng.choice(diagnoses)]}
+        level = rng.gauss(3, 0.7)
+        for a in range(args.assessments):
+            assessments[f"a{p:06d}_{a}"] = {
+                "patient_id": f"p{p:06d}", "assessment_date": base + timedelta(days=30 * a),
+                "scores": {item: max(1, min(5, round(level + rng.gauss(0, 0.8) + 0.2 * a))) for item in items},
+            }
+
+    client = firestore_fake.FakeFirestore()
+    client.load({"patients": patients, "assessments": assessments})
+    firestore_fake.install(client)
+    print(f"🏁 환자 {args.patients:,}명, 평가 {len(assessments):,}건 (항목 {len(items)}개)")
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = os.path.join(root, "norms.npz")
+        started = time.perf_counter()
+        success = assessment_norms(cache, False, 10, args.min_change, apply=True)
+        print(f"   전체 실행 {time.perf_counter() - started:.1f}초, 읽기 {client.stats['reads']:,} / "
+              f"쓰기 {client.stats['writes']:,}")
+
+        time.sleep(0.01)
+        now = datetime.now(timezone.utc)
+        for n in range(args.new):
+            pid = f"p{rng.randrange(args.patients):06d}"
+            client.collection("assessments").document(f"new_{n:05d}").set({
+                "patient_id": pid, "assessment_date": now, "created_at": now,
+                "scores": {item: rng.randrange(1, 6) for item in items}})
+        client.reset_stats()
+        started = time.perf_counter()
+        success = assessment_norms(cache, False, 10, args.min_change, apply=True) and success
+        print(f"   증분 실행 (새 평가 {args.new}건) {time.perf_counter() - started:.1f}초, "
+              f"읽기 {client.stats['reads']:,} / 쓰기 {client.stats['writes']:,}")
+    return success
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--cache": DEFAULT_CACHE}))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench_parser = argparse.ArgumentParser(description="코호트 백분위 벤치마크")
+        bench_parser.add_argument("--patients", type=int, default=30000)
+        bench_parser.add_argument("--assessments", type=int, default=3, help="환자당 평가 수")
+        bench_parser.add_argument("--new", type=int, default=200, help="증분 실행 전에 추가할 평가 수")
+        bench_parser.add_argument("--min-change", type=float, default=MIN_CHANGE)
+        bench_parser.add_argument("--random-seed", type=int, default=42)
+        args = bench_parser.parse_args(sys.argv[2:])
+        sys.exit(0 if bench(args) else 1)
+
+    parser = argparse.ArgumentParser(description="평가 점수 코호트 백분위 / 규준표 계산")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="증분 계산용 열 배열 캐시")
+    parser.add_argument("--full", action="store_true", help="캐시 없이 전체 다시 계산")
+    parser.add_argument("--min-cohort", type=int, default=10, help="백분위를 매길 최소 코호트 크기")
+    parser.add_argument("--min-change", type=float, default=MIN_CHANGE,
+                        help="코호트 변화만으로 환자 문서를 다시 기록할 최소 백분위 변화 (%%p, 자기 평가가 바뀐 환자는 항상 기록)")
+    parser.add_argument("--apply", action="store_true", help="규준표 / 환자 백분위 기록 (기본은 dry-run)")
+    add_mode_argument(parser)
+    args = parser.parse_args()
+
+    success = assessment_norms(args.cache, args.full, args.min_cohort, args.min_change, args.apply,
+                               mode=args.mode)
+    sys.exit(0 if success else 1)
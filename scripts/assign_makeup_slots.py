@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+보강권(makeup_tickets) 자동 배정: 최소 비용 유량으로 빈 시간대 제안
+
+사용 가능(AVAILABLE)한 보강권을 담당 치료사의 빈 시간대에 배정한다.
+
+    - 시간대: 업무시간 설정(settings/work_hours, 치료사 문서의 work_hours_settings 가
+      있으면 그것을 우선)의 요일별 시작~종료 시각을 --slot-minutes 단위로 나눈 것
+    - 제외: 휴무일/공휴일, 기존 예약(취소 제외)과 겹치는 시간대, 보강권 만료일 이후,
+      같은 환자가 다른 예약을 가진 시각
+
+치료사별로 보강권 → 시간대 이분 그래프를 만들고 최소 비용 최대 유량을 구한다.
+배정 수를 최대로 한 뒤, 그 안에서 빠른 날짜 / 원래 시간대와 같은 시각을 우선한다.
+(앞에서부터 채우는 방식은 만료가 늦은 보강권이 만료가 이른 보강권의 유일한
+시간대를 먼저 가져가 배정 수가 줄어들 수 있다.)
+한 환자가 여러 치료사의 보강권을 가진 경우 같은 시각에 겹치면 해당 간선을 제외하고
+그 치료사만 다시 계산한다.
+
+제안은 예약(appointments)에 초안(status DRAFT, is_draft true)으로 기록하며
+문서 ID 는 makeup_draft_<보강권 ID> 이므로 다시 실행하면 같은 문서를 갱신한다.
+PENDING 은 보호자 예약 요청 상태이므로 쓰지 않는다. 앱은 초안을 표시하지 않으며
+(Appointment.isDraftData), 확정은 status 를 CONFIRMED 로, is_draft 를 false 로 바꾸는 것이다.
+보강권 상태는 바꾸지 않는다 (초안을 확정할 때 기존 화면에서 사용 처리).
+
+사용법:
+    python scripts/assign_makeup_slots.py --organization org_xxx              # dry-run: 제안만 출력
+    python scripts/assign_makeup_slots.py --organization org_xxx --apply --weeks 4
+    python scripts/assign_makeup_slots.py bench --therapists 50 --weeks 4     # 가짜 Firestore 로 시간 측정
+"""
+
+import argparse
+import heapq
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from firestore_common import get_db
+from firestore_models import Patient, User
+
+KST = timezone(timedelta(hours=9))
+WEEKDAYS = "월화수목금토일"          # datetime.weekday() 순서
+DEFAULT_WEEKDAY_SETTINGS = {
+    day: {"isWorking": day not in "토일", "startTime": "09:00", "endTime": "18:00"} for day in WEEKDAYS
+}
+DRAFT_PREFIX = "makeup_draft_"
+DRAFT_STATUS = "DRAFT"
+BATCH_SIZE = 500
+INF = float("inf")
+
+
+# ---------------------------------------------------------------------------
+# 업무시간 / 시간대
+# ---------------------------------------------------------------------------
+
+
+def parse_minutes(value):
+    """'09:30' → 570"""
+    hour, minute = value.strip().split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_time_slot(value):
+    """'09:00-10:00' → (540, 600), 형식이 다르면 None"""
+    try:
+        start, end = value.split("-")
+        return parse_minutes(start), parse_minutes(end)
+    except (AttributeError, ValueError):
+        return None
+
+
+class WorkHours:
+    """work_hours_settings_screen.dart 가 저장하는 구조 (weekday_settings, regular_holidays, holidays)"""
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.weekdays = dict(DEFAULT_WEEKDAY_SETTINGS)
+        self.weekdays.update(data.get("weekday_settings") or {})
+        self.closed_weekdays = set()
+        for rule in data.get("regular_holidays") or []:
+            # '매주 일요일'
+            for i, day in enumerate(WEEKDAYS):
+                if rule.startswith("매주") and f"{day}요일" in rule:
+                    self.closed_weekdays.add(i)
+        self.holidays = {h.get("date") for h in data.get("holidays") or [] if isinstance(h, dict)}
+
+    def window(self, day):
+        """그날의 (시작 분, 종료 분), 쉬는 날이면 None"""
+        weekday = day.weekday()
+        setting = self.weekdays.get(WEEKDAYS[weekday]) or {}
+        if weekday in self.closed_weekdays or day.isoformat() in self.holidays:
+            return None
+        if not setting.get("isWorking"):
+            return None
+        start, end = parse_minutes(setting.get("startTime", "09:00")), parse_minutes(setting.get("endTime", "18:00"))
+        return (start, end) if start < end else None
+
+    def slots(self, first_day, days, slot_minutes):
+        """[(날짜, 시작 분, 종료 분)] (날짜/시각 순)"""
+        result = []
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            window = self.window(day)
+            if window is None:
+                continue
+            start = window[0]
+            while start + slot_minutes <= window[1]:
+                result.append((day, start, start + slot_minutes))
+                start += slot_minutes
+        return result
+
+
+def _kst_date(value):
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(KST).date()
+
+
+def _overlaps(busy, day, start, end):
+    return any(s < end and start < e for s, e in busy.get(day, ()))
+
+
+# ---------------------------------------------------------------------------
+# 최소 비용 유량 (연속 최단 경로 + 포텐셜, 용량 1 간선 위주)
+# ---------------------------------------------------------------------------
+
+
+class MinCostFlow:
+    def __init__(self, n):
+        self.n = n
+        self.graph = [[] for _ in range(n)]     # 간선: [도착, 용량, 비용, 역방향 간선 인덱스]
+
+    def add_edge(self, u, v, cap, cost):
+        self.graph[u].append([v, cap, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return len(self.graph[u]) - 1
+
+    def flow(self, s, t, limit=None):
+        """(유량, 비용) — 유량을 최대로, 그 안에서 비용 최소"""
+        n, graph = self.n, self.graph
+        potential = [0] * n
+        total_flow = total_cost = 0
+        while limit is None or total_flow < limit:
+            dist = [INF] * n
+            prev = [None] * n
+            dist[s] = 0
+            heap = [(0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if u == t:
+                    break
+                pu = potential[u]
+                for i, (v, cap, cost, _) in enumerate(graph[u]):
+                    if cap > 0:
+                        nd = d + cost + pu - potential[v]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            prev[v] = (u, i)
+                            heapq.heappush(heap, (nd, v))
+            if dist[t] == INF:
+                break
+            # t 까지의 거리로 잘린 다익스트라: 확정되지 않은 노드는 dist[t] 로 맞춰 포텐셜 유지
+            bound = dist[t]
+            for v in range(n):
+                potential[v] += min(dist[v], bound)
+            # 용량 1 경로이므로 1씩 흘림
+            v = t
+            while v != s:
+                u, i = prev[v]
+                edge = graph[u][i]
+                edge[1] -= 1
+                graph[v][edge[3]][1] += 1
+                total_cost += edge[2]
+                v = u
+            total_flow += 1
+        return total_flow, total_cost
+
+
+def solve_therapist(tickets, slots, patient_busy, banned, first_day):
+    """
+    치료사 한 명의 보강권 → 시간대 배정 {ticket_id: 시간대}
+    tickets: [ticket dict], slots: [(날짜, 시작, 종료)] (예약과 겹치지 않는 빈 시간대)
+    banned: {(ticket_id, 날짜, 시작)} 환자 시각 충돌로 제외된 간선
+    """
+    if not tickets or not slots:
+        return {}
+    source, sink = 0, 1 + len(tickets) + len(slots)
+    mcf = MinCostFlow(sink + 1)
+    slot_base = 1 + len(tickets)
+    for j in range(len(slots)):
+        mcf.add_edge(slot_base + j, sink, 1, 0)
+
+    edges = []
+    for i, ticket in enumerate(tickets):
+        node = 1 + i
+        mcf.add_edge(source, node, 1, 0)
+        original = parse_time_slot(ticket.get("original_time_slot"))
+        busy = patient_busy.get(ticket["patient_id"], {})
+        for j, (day, start, end) in enumerate(slots):
+            if day > ticket["expiry"]:
+                break
+            if (ticket["id"], day, start) in banned or _overlaps(busy, day, start, end):
+                continue
+            # 빠른 날짜 우선, 같은 날이면 원래 시각 우선
+            cost = (day - first_day).days * 2 + (0 if original and original[0] == start else 1)
+            edges.append((i, j, mcf.add_edge(node, slot_base + j, 1, cost)))
+
+    mcf.flow(source, sink)
+    assigned = {}
+    for i, j, index in edges:
+        if mcf.graph[1 + i][index][1] == 0:
+            assigned[tickets[i]["id"]] = slots[j]
+    return assigned
+
+
+# ---------------------------------------------------------------------------
+# 데이터 로드
+# ---------------------------------------------------------------------------
+
+
+def load_therapists(db, organization):
+    query = db.collection("users")
+    if organization:
+        query = query.where("organization_id", "==", organization)
+    therapists = {}
+    raw = {}
+    for doc in query.stream():
+        user = User.from_snapshot(doc)
+        if user.has_role("therapist"):
+            therapists[user.id] = user
+            raw[user.id] = (doc.to_dict() or {}).get("work_hours_settings")
+    return therapists, raw
+
+
+def load_tickets(db, therapist_ids, first_day):
+    tickets = []
+    for doc in db.collection("makeup_tickets").where("status", "==", "AVAILABLE").stream():
+        data = doc.to_dict() or {}
+        expiry = _kst_date(data.get("expiry_date"))
+        if data.get("therapist_id") not in therapist_ids or expiry is None or expiry < first_day:
+            continue
+        data["id"] = doc.id
+        data["expiry"] = expiry
+        tickets.append(data)
+    # 만료가 이른 보강권부터 (출력/간선 순서용, 배정 결과에는 영향 없음)
+    tickets.sort(key=lambda t: (t["expiry"], t["id"]))
+    return tickets
+
+
+def load_appointments(db, first_day, days):
+    """
+    구간 내 예약 → (치료사별 바쁜 시간, 환자별 바쁜 시간, 기존 초안 {ticket_id: doc_id})
+    바쁜 시간: {id: {날짜: [(시작, 종료)]}}
+    """
+    start = datetime(first_day.year, first_day.month, first_day.day, tzinfo=KST)
+    end = start + timedelta(days=days)
+    therapist_busy = defaultdict(lambda: defaultdict(list))
+    patient_busy = defaultdict(lambda: defaultdict(list))
+    drafts = {}
+    query = (db.collection("appointments")
+             .where("appointment_date", ">=", start)
+             .where("appointment_date", "<", end))
+    for doc in query.stream():
+        data = doc.to_dict() or {}
+        if data.get("is_draft") or str(data.get("status", "")).upper() == DRAFT_STATUS:
+            if data.get("makeup_ticket_id"):
+                drafts[data["makeup_ticket_id"]] = doc.id
+            continue
+        if str(data.get("status", "")).upper() == "CANCELLED":
+            continue
+        day = _kst_date(data.get("appointment_date"))
+        span = parse_time_slot(data.get("time_slot"))
+        if day is None or span is None:
+            continue
+        if data.get("therapist_id"):
+            therapist_busy[data["therapist_id"]][day].append(span)
+        if data.get("patient_id"):
+            patient_busy[data["patient_id"]][day].append(span)
+    return therapist_busy, patient_busy, drafts
+
+
+# ---------------------------------------------------------------------------
+# 배정
+# ---------------------------------------------------------------------------
+
+
+def assign(tickets, free_slots, patient_busy, first_day):
+    """
+    치료사별 배정 후 환자 시각 충돌을 제거하며 반복
+    반환: {ticket_id: (치료사 ID, 날짜, 시작, 종료)}, 반복 횟수
+    """
+    by_therapist = defaultdict(list)
+    for ticket in tickets:
+        by_therapist[ticket["therapist_id"]].append(ticket)
+    patients = {t["id"]: t["patient_id"] for t in tickets}
+
+    banned = set()
+    results = {}
+    dirty = set(by_therapist)
+    rounds = 0
+    while dirty:
+        rounds += 1
+        for therapist_id in dirty:
+            results[therapist_id] = solve_therapist(
+                by_therapist[therapist_id], free_slots.get(therapist_id, []),
+                patient_busy, banned, first_day)
+        dirty = set()
+
+        # 같은 환자가 여러 치료사에게 같은 시각으로 배정된 경우: 뒤쪽 배정의 간선 제외
+        seen = {}
+        for therapist_id in sorted(results):
+            for ticket_id, (day, start, end) in sorted(results[therapist_id].items()):
+                patient_id = patients[ticket_id]
+                for other_day, other_start, other_end in seen.get(patient_id, ()):
+                    if other_day == day and other_start < end and start < other_end:
+                        banned.add((ticket_id, day, start))
+                        dirty.add(therapist_id)
+                        break
+                else:
+                    seen.setdefault(patient_id, []).append((day, start, end))
+
+    assignments = {}
+    for therapist_id, result in results.items():
+        for ticket_id, (day, start, end) in result.items():
+            assignments[ticket_id] = (therapist_id, day, start, end)
+    return assignments, rounds
+
+
+def draft_document(ticket, therapist, patient, slot, run_id, now):
+    therapist_id, day, start, end = slot
+    return {
+        "patient_id": ticket["patient_id"],
+        "patient_name": ticket.get("patient_name") or (patient.name if patient else ""),
+        "guardian_id": patient.guardian_ids[0] if patient and patient.guardian_ids else "",
+        "therapist_id": therapist_id,
+        "therapist_name": ticket.get("therapist_name") or therapist.name or "",
+        "appointment_date": datetime(day.year, day.month, day.day, start // 60, start % 60, tzinfo=KST),
+        "time_slot": f"{format_minutes(start)}-{format_minutes(end)}",
+        "status": DRAFT_STATUS,
+        "notes": "보강 자동 배정 제안",
+        "attended": False,
+        "session_recorded": False,
+        "is_makeup": True,
+        "makeup_ticket_id": ticket["id"],
+        "is_draft": True,
+        "proposal_run": run_id,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def write_drafts(db, documents, stale):
+    """초안 기록 + 더 이상 배정되지 않은 이전 초안 삭제 (배치 500건)"""
+    col = db.collection("appointments")
+    batch = db.batch()
+    for doc_id, data in documents:
+        batch.set(col.document(doc_id), data)
+        if len(batch) >= BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+    for doc_id in stale:
+        batch.delete(col.document(doc_id))
+        if len(batch) >= BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+    if len(batch):
+        batch.commit()
+
+
+def assign_makeup_slots(organization, start, weeks, slot_minutes, apply, verbose=True):
+    """보강권 배정 제안 (apply=True 이면 초안 예약 기록)"""
+
+    try:
+        db = get_db()
+        first_day = start or (datetime.now(KST) + timedelta(days=1)).date()
+        days = weeks * 7
+
+        print("=" * 70)
+        print(f"🎫 보강권 시간대 배정 {'(적용)' if apply else '(dry-run)'}")
+        print("=" * 70)
+        print(f"   기간: {first_day} ~ {first_day + timedelta(days=days - 1)} ({weeks}주), 시간대 {slot_minutes}분")
+
+        started = time.perf_counter()
+        settings = db.collection("settings").document("work_hours").get()
+        center_hours = WorkHours(settings.to_dict() if settings.exists else None)
+        therapists, overrides = load_therapists(db, organization)
+        tickets = load_tickets(db, set(therapists), first_day)
+        therapist_busy, patient_busy, drafts = load_appointments(db, first_day, days)
+        loaded = time.perf_counter() - started
+
+        free_slots = {}
+        total_slots = 0
+        for therapist_id in therapists:
+            hours = WorkHours(overrides[therapist_id]) if overrides.get(therapist_id) else center_hours
+            busy = therapist_busy.get(therapist_id, {})
+            slots = [s for s in hours.slots(first_day, days, slot_minutes) if not _overlaps(busy, *s)]
+            free_slots[therapist_id] = slots
+            total_slots += len(slots)
+        print(f"   치료사 {len(therapists)}명, 보강권 {len(tickets):,}장, 빈 시간대 {total_slots:,}개 "
+              f"(로드 {loaded:.1f}초)")
+
+        started = time.perf_counter()
+        assignments, rounds = assign(tickets, free_slots, patient_busy, first_day)
+        solved = time.perf_counter() - started
+        print(f"   배정 {len(assignments):,}/{len(tickets):,}장 (계산 {solved:.2f}초, 충돌 조정 {rounds - 1}회)")
+
+        now = datetime.now(timezone.utc)
+        run_id = now.strftime("%Y%m%dT%H%M%SZ")
+        tickets_by_id = {t["id"]: t for t in tickets}
+        patient_ids = sorted({tickets_by_id[t]["patient_id"] for t in assignments})
+        patients = {}
+        for i in range(0, len(patient_ids), 100):
+            refs = [db.collection("patients").document(pid) for pid in patient_ids[i:i + 100]]
+            for doc in db.get_all(refs):
+                if doc.exists:
+                    patients[doc.id] = Patient.from_snapshot(doc)
+
+        documents = []
+        for ticket_id, slot in sorted(assignments.items(), key=lambda item: (item[1][1], item[1][2], item[1][0])):
+            ticket = tickets_by_id[ticket_id]
+            data = draft_document(ticket, therapists[slot[0]], patients.get(ticket["patient_id"]), slot, run_id, now)
+            documents.append((DRAFT_PREFIX + ticket_id, data))
+            if verbose and len(documents) <= 20:
+                print(f"   - {data['appointment_date']:%m/%d} {data['time_slot']} {data['therapist_name']} ← "
+                      f"{data['patient_name']} (만료 {ticket['expiry']:%m/%d})")
+        if verbose and len(documents) > 20:
+            print(f"   ... 외 {len(documents) - 20:,}건")
+
+        stale = [doc_id for ticket_id, doc_id in drafts.items()
+                 if ticket_id in tickets_by_id and ticket_id not in assignments]
+        unassigned = len(tickets) - len(assignments)
+
+        print("\n" + "=" * 70)
+        if apply:
+            write_drafts(db, documents, stale)
+            print(f"✅ 초안 예약 {len(documents):,}건 기록, 이전 초안 {len(stale):,}건 삭제")
+        else:
+            print(f"⚠️  초안 예약 {len(documents):,}건 제안 (--apply 로 기록)")
+        if unassigned:
+            print(f"   배정하지 못한 보강권 {unassigned:,}장 (만료 전 빈 시간대 없음)")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크
+# ---------------------------------------------------------------------------
+
+
+def bench(args):
+    """가짜 Firestore 에 합성 센터 데이터를 넣고 배정 시간 측정"""
+    import firestore_fake
+
+    rng = random.Random(args.random_seed)
+    first_day = (datetime.now(KST) + timedelta(days=1)).date()
+    hours = WorkHours()
+    slot_list = hours.slots(first_day, args.weeks * 7, 60)
+
+    users, patients, appointments, tickets = {}, {}, {}, {}
+    for t in range(args.therapists):
+        users[f"t{t:03d}"] = {"name": f"치료사{t}", "role": "THERAPIST", "organization_id": "org_bench"}
+    for p in range(args.therapists * 15):
+        patients[f"p{p:05d}"] = {"name": f"환자{p}", "guardian_uids": [f"g{p:05d}"], "organization_id": "org_bench"}
+    for t in range(args.therapists):
+        for day, start, end in slot_list:
+            if rng.random() < args.occupancy:
+                p = rng.randrange(len(patients))
+                appointments[f"a{len(appointments):07d}"] = {
+                    "patient_id": f"p{p:05d}", "therapist_id": f"t{t:03d}", "status": "CONFIRMED",
+                    "appointment_date": datetime(day.year, day.month, day.day, tzinfo=KST),
+                    "time_slot": f"{format_minutes(start)}-{format_minutes(end)}",
+                }
+        for _ in range(args.tickets_per_therapist):
+            p = rng.randrange(len(patients))
+            expiry = first_day + timedelta(days=rng.randrange(3, args.weeks * 7 + 14))
+            tickets[f"m{len(tickets):06d}"] = {
+                "patient_id": f"p{p:05d}", "patient_name": f"환자{p}", "therapist_id": f"t{t:03d}",
+                "therapist_name": f"치료사{t}", "status": "AVAILABLE", "original_time_slot": "10:00-11:00",
+                "expiry_date": datetime(expiry.year, expiry.month, expiry.day, tzinfo=KST),
+            }
+
+    client = firestore_fake.FakeFirestore()
+    client.load({"users": users, "patients": patients, "appointments": appointments, "makeup_tickets": tickets})
+    firestore_fake.install(client)
+    print(f"🏁 합성 센터: 치료사 {args.therapists}명, 기존 예약 {len(appointments):,}건, 보강권 {len(tickets):,}장")
+    started = time.perf_counter()
+    success = assign_makeup_slots("org_bench", first_day, args.weeks, 60, apply=True, verbose=False)
+    print(f"   전체 {time.perf_counter() - started:.2f}초, 쓰기 {client.stats['writes']:,}건 "
+          f"(커밋 {client.stats['rpcs']:,}회 중)")
+    return success
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench_parser = argparse.ArgumentParser(description="보강권 배정 벤치마크")
+        bench_parser.add_argument("--therapists", type=int, default=50)
+        bench_parser.add_argument("--weeks", type=int, default=4)
+        bench_parser.add_argument("--occupancy", type=float, default=0.8, help="기존 예약 비율")
+        bench_parser.add_argument("--tickets-per-therapist", type=int, default=30)
+        bench_parser.add_argument("--random-seed", type=int, default=42)
+        args = bench_parser.parse_args(sys.argv[2:])
+        sys.exit(0 if bench(args) else 1)
+
+    parser = argparse.ArgumentParser(description="보강권 빈 시간대 자동 배정 (초안 예약 생성)")
+    parser.add_argument("--organization", help="센터 organization_id (기본: 전체 치료사)")
+    parser.add_argument("--start", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
+                        help="배정 시작일 YYYY-MM-DD (기본: 내일)")
+    parser.add_argument("--weeks", type=int, default=4, help="배정 기간 (주)")
+    parser.add_argument("--slot-minutes", type=int, default=60, help="시간대 길이 (분)")
+    parser.add_argument("--apply", action="store_true", help="초안 예약 기록 (기본은 dry-run)")
+    args = parser.parse_args()
+
+    success = assign_makeup_slots(args.organization, args.start, args.weeks, args.slot_minutes, args.apply)
+    sys.exit(0 if success else 1)
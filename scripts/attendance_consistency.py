@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+예약 / 출석 / 세션 기록 정합성 점검
+
+appointments 는 status, attended, session_recorded 플래그를 갖고, 실제 출석(attendances)과
+세션 기록은 따로 저장된다. 세션 기록은 앱이 sessions 에, 시드 / 테스트 스크립트
+(migrate_firestore_structure.py, create_test_patient.py) 가 session_reports 에 쓰므로 둘을 합쳐 본다. 화면마다 플래그를 따로 갱신하고, migrate_firestore_structure.py 도
+COMPLETED 예약을 session_recorded: False 로 만들기 때문에 세 컬렉션이 서로 어긋나 있다.
+
+예약 / 출석 / 세션 기록을 patient_id 순으로 동시에 스트리밍해 한 번에 merge-join 한다:
+    - 서버 정렬은 patient_id 단일 필드 (자동 단일 필드 인덱스, 복합 인덱스 불필요)
+      patientId 로 저장된 문서도 있으므로 (컬렉션, 별칭 필드) 마다 정렬 스트림을 만들어 heapq.merge
+    - 환자 한 명의 문서가 모이면 그 안에서만 (KST 날짜, 시각) 으로 정렬해 짝지음
+      → 메모리는 컬렉션 크기와 무관하게 환자 한 명 분량 (가장 긴 이력) 만 사용
+    - 짝짓기: 문서 ID 연결(session_id) → 같은 time_slot → 같은 날 시각 순
+
+보고 항목:
+    completed_no_attendance   COMPLETED 예약인데 그날 출석 기록 없음
+    completed_no_report       COMPLETED 예약인데 그날 세션 기록 없음
+    orphan_attendance         예약 없는 출석
+    stale_attended            출석(PRESENT/MAKEUP)이 있는데 attended=false         (--repair 대상)
+    stale_session_recorded    세션 기록이 있는데 session_recorded=false           (--repair 대상)
+    recorded_without_report   session_recorded=true 인데 세션 기록 없음
+    attended_but_absent       attended=true 인데 출석 상태가 ABSENT/CANCELLED
+
+--repair 는 근거 문서가 있는 플래그만 true 로 고친다 (false 로 되돌리는 수정은 하지 않음).
+patient_id 가 없거나 날짜가 없는 문서는 짝지을 수 없으므로 건수만 보고한다.
+문제가 하나라도 남아 있으면 (--repair --apply 로 고친 것 제외) 종료 코드 1.
+
+사용법:
+    python scripts/attendance_consistency.py check
+    python scripts/attendance_consistency.py check --out issues.csv
+    python scripts/attendance_consistency.py check --repair            # dry-run: 고칠 건수만
+    python scripts/attendance_consistency.py check --repair --apply
+    python scripts/attendance_consistency.py bench --patients 20000
+"""
+
+import argparse
+import csv
+import heapq
+import itertools
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from firestore_common import get_db
+from firestore_models import Appointment, Attendance, Session, SessionReport
+from firestore_rate import AdaptiveLimiter, add_rate_arguments
+
+KST = timezone(timedelta(hours=9))
+BATCH_SIZE = 500
+PAGE_SIZE = 1000
+PRESENT_STATUSES = ("PRESENT", "MAKEUP")
+ABSENT_STATUSES = ("ABSENT", "CANCELLED")
+
+ISSUES = {
+    "completed_no_attendance": "완료 예약인데 출석 기록 없음",
+    "completed_no_report": "완료 예약인데 세션 기록 없음",
+    "orphan_attendance": "예약 없는 출석",
+    "stale_attended": "출석이 있는데 attended=false",
+    "stale_session_recorded": "세션 기록이 있는데 session_recorded=false",
+    "recorded_without_report": "session_recorded=true 인데 세션 기록 없음",
+    "attended_but_absent": "attended=true 인데 결석/취소 출석",
+}
+REPAIRABLE = ("stale_attended", "stale_session_recorded")
+
+# merge-join 순서 (예약, 출석, 세션 기록) → 각 쪽을 이루는 컬렉션 모델
+SOURCES = (
+    (Appointment,),
+    (Attendance,),
+    (Session, SessionReport),
+)
+PATIENT_ALIASES = ("patient_id", "patientId")
+
+
+# ---------------------------------------------------------------------------
+# 정렬 스트림
+# ---------------------------------------------------------------------------
+
+
+def iter_sorted(db, model, field, page_size=PAGE_SIZE, stats=None):
+    """
+    field 순 (같으면 문서 ID 순) 으로 모델 순회. 모델 필드만 select 해 읽는 양을 줄이고,
+    현재 페이지를 처리하는 동안 다음 페이지를 미리 받아 RPC 지연을 join 과 겹침 (메모리는 2페이지)
+    """
+    query = db.collection(model.COLLECTION).order_by(field).select(sorted(model._known_keys()))
+
+    def fetch(last):
+        page_query = query.limit(page_size)
+        if last is not None:
+            page_query = page_query.start_after(last)
+        return list(page_query.stream())
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(fetch, None)
+        while future is not None:
+            page = future.result()
+            future = pool.submit(fetch, page[-1]) if len(page) == page_size else None
+            if stats is not None:
+                stats[model.COLLECTION] += len(page)
+            for doc in page:
+                yield model.from_snapshot(doc)
+
+
+def patient_stream(db, models, page_size=PAGE_SIZE, stats=None):
+    """
+    (컬렉션, 별칭 필드) 별 정렬 스트림을 patient_id 로 합쳐 (patient_id, [문서]) 를 순서대로 생성
+    Firestore 는 문자열을 UTF-8 바이트 순으로 정렬하므로 파이썬 문자열 비교와 순서가 같다.
+    문자열이 아닌 patient_id 는 짝지을 수 없어 invalid 로만 센다.
+    """
+    streams = [_valid(iter_sorted(db, model, alias, page_size, stats), model, stats)
+               for model in models for alias in PATIENT_ALIASES]
+    merged = heapq.merge(*streams, key=lambda m: m.patient_id)
+    for patient_id, group in itertools.groupby(merged, key=lambda m: m.patient_id):
+        seen = set()
+        docs = []
+        for doc in group:
+            key = (doc.COLLECTION, doc.id)
+            if key not in seen:    # 두 철자 필드를 모두 가진 문서는 양쪽 스트림에 나옴
+                seen.add(key)
+                docs.append(doc)
+        yield patient_id, docs
+
+
+def _valid(stream, model, stats):
+    for doc in stream:
+        if doc.patient_id is None:
+            if stats is not None:
+                stats[f"{model.COLLECTION}_invalid"] += 1
+            continue
+        yield doc
+
+
+def merge_patients(*streams):
+    """patient_id 순 스트림 여러 개를 merge-join → (patient_id, [스트림별 문서 목록])"""
+    heads = [next(stream, None) for stream in streams]
+    while True:
+        keys = [head[0] for head in heads if head is not None]
+        if not keys:
+            return
+        patient_id = min(keys)
+        groups = []
+        for i, head in enumerate(heads):
+            if head is not None and head[0] == patient_id:
+                groups.append(head[1])
+                heads[i] = next(streams[i], None)
+            else:
+                groups.append([])
+        yield patient_id, groups
+
+
+# ---------------------------------------------------------------------------
+# 환자 단위 점검
+# ---------------------------------------------------------------------------
+
+
+def _by_day(docs, date_attr, stats):
+    days = defaultdict(list)
+    for doc in docs:
+        when = getattr(doc, date_attr)
+        if when is None:
+            stats[f"{doc.COLLECTION}_no_date"] += 1
+            continue
+        days[when.astimezone(KST).date()].append(doc)
+    for items in days.values():
+        items.sort(key=lambda d: (getattr(d, date_attr), d.id))
+    return days
+
+
+def _pair(appointments, others, matchers):
+    """matchers 순서대로 예약과 상대 문서를 1:1 로 짝지음 → ({예약 ID: 문서}, 남은 문서)"""
+    paired = {}
+    left = others
+    for match in matchers:
+        remaining = []
+        for other in left:
+            apt = next((a for a in appointments if a.id not in paired and match(a, other)), None)
+            if apt is None:
+                remaining.append(other)
+            else:
+                paired[apt.id] = other
+        left = remaining
+    return paired, left
+
+
+ATTENDANCE_MATCHERS = (
+    lambda a, o: o.session_id is not None and o.session_id in (a.id, a.session_id),
+    lambda a, o: a.time_slot is not None and a.time_slot == o.time_slot,
+    lambda a, o: (a.status == "CANCELLED") == (o.status == "CANCELLED"),
+    lambda a, o: True,
+)
+REPORT_MATCHERS = (
+    lambda a, o: a.session_id == o.id,
+    lambda a, o: a.status != "CANCELLED",
+)
+
+
+def check_patient(patient_id, appointments, attendances, reports, stats):
+    """환자 한 명 → 문제 목록 [(종류, patient_id, 날짜, 예약 ID, 상대 문서 ID, 수정 필드)]"""
+    issues = []
+    # 보강 배정 초안(assign_makeup_slots.py)은 확정 전이라 출석 / 세션 기록과 짝짓지 않음
+    appointments = [apt for apt in appointments if apt.status != "DRAFT"]
+    apt_days = _by_day(appointments, "appointment_date", stats)
+    att_days = _by_day(attendances, "schedule_date", stats)
+    rep_days = _by_day(reports, "session_date", stats)
+
+    for day in sorted(set(apt_days) | set(att_days)):
+        apts = apt_days.get(day, [])
+        att_pairs, orphans = _pair(apts, att_days.get(day, []), ATTENDANCE_MATCHERS)
+        rep_pairs, _ = _pair(apts, rep_days.get(day, []), REPORT_MATCHERS)
+        for att in orphans:
+            issues.append(("orphan_attendance", patient_id, day, None, att.id, None))
+
+        for apt in apts:
+            att = att_pairs.get(apt.id)
+            report = rep_pairs.get(apt.id)
+            if apt.status == "COMPLETED":
+                if att is None:
+                    issues.append(("completed_no_attendance", patient_id, day, apt.id, None, None))
+                if report is None:
+                    issues.append(("completed_no_report", patient_id, day, apt.id, None, None))
+            if att is not None and att.status in PRESENT_STATUSES and not apt.attended:
+                issues.append(("stale_attended", patient_id, day, apt.id, att.id,
+                               {"attended": True, "attended_at": att.created_at or att.schedule_date}))
+            if att is not None and att.status in ABSENT_STATUSES and apt.attended:
+                issues.append(("attended_but_absent", patient_id, day, apt.id, att.id, None))
+            if report is not None and not apt.session_recorded:
+                fix = {"session_recorded": True, "session_recorded_at": report.created_at or report.session_date}
+                if apt.session_id is None:
+                    fix["session_id"] = report.id
+                issues.append(("stale_session_recorded", patient_id, day, apt.id, report.id, fix))
+            if report is None and apt.session_recorded:
+                issues.append(("recorded_without_report", patient_id, day, apt.id, None, None))
+    return issues
+
+
+def iter_issues(db, page_size=PAGE_SIZE, stats=None):
+    """예약 / 출석 / 세션 기록 merge-join → 문제를 환자 순으로 생성 (stats 에 읽은 건수 / 최대 환자 문서 수)"""
+    stats = stats if stats is not None else Counter()
+    streams = [patient_stream(db, models, page_size, stats) for models in SOURCES]
+    for patient_id, (appointments, attendances, reports) in merge_patients(*streams):
+        stats["patients"] += 1
+        stats["max_patient_docs"] = max(stats["max_patient_docs"],
+                                         len(appointments) + len(attendances) + len(reports))
+        yield from check_patient(patient_id, appointments, attendances, reports, stats)
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ---------------------------------------------------------------------------
+# check
+# ---------------------------------------------------------------------------
+
+
+def run_check(db, args, limiter):
+    """점검 (--repair --apply 면 수정까지) 후 결과 출력 → (문제 종류별 건수, 수정 건수, 수정 실패 건수)"""
+    print("=" * 70)
+    print(f"🔎 예약 / 출석 / 세션 기록 정합성 점검 {'(플래그 수정)' if args.repair and args.apply else ''}")
+    print("=" * 70)
+    if args.repair and not args.apply:
+        print("🔍 dry-run: 고칠 건수만 셉니다 (--apply 로 기록)")
+
+    started = time.perf_counter()
+    stats = Counter()
+    counts = Counter()
+    samples = defaultdict(list)
+    out = open(args.out, "w", newline="", encoding="utf-8") if args.out else None
+    writer = csv.writer(out) if out else None
+    if writer:
+        writer.writerow(["issue", "patient_id", "date", "appointment_id", "other_id"])
+
+    def issues():
+        for issue in iter_issues(db, args.page_size, stats):
+            kind = issue[0]
+            counts[kind] += 1
+            if len(samples[kind]) < args.limit:
+                samples[kind].append(issue)
+            if writer:
+                writer.writerow([kind, issue[1], issue[2].isoformat(), issue[3] or "", issue[4] or ""])
+            yield issue
+
+    repairs = (issue for issue in issues() if issue[5] is not None and args.repair)
+    now = datetime.now(timezone.utc)
+
+    def commit(chunk):
+        batch = db.batch()
+        for _, _, _, apt_id, _, fix in chunk:
+            batch.update(db.collection("appointments").document(apt_id), dict(fix, updated_at=now))
+        batch.commit()
+        return len(chunk)
+
+    repaired = failed = 0
+    try:
+        if args.repair and args.apply:
+            # 문제 스트림을 소비하며 500건씩 바로 기록 (수정 대상을 모아 두지 않음)
+            collection = "appointments" if args.ramp else None
+            for chunk, count, error in limiter.map(commit, _chunks(repairs, BATCH_SIZE),
+                                                   collection=collection, ops=BATCH_SIZE):
+                if error:
+                    failed += len(chunk)
+                    print(f"   ❌ 배치 {len(chunk)}건 실패: {error}")
+                else:
+                    repaired += count
+        else:
+            for _ in repairs:
+                pass
+    finally:
+        if out:
+            out.close()
+
+    print(f"📥 환자 {stats['patients']:,}명, 예약 {stats['appointments']:,} / 출석 {stats['attendances']:,} / "
+          f"세션 {stats['sessions']:,} + {stats['session_reports']:,}건 ({time.perf_counter() - started:.1f}초), "
+          f"환자당 최대 {stats['max_patient_docs']:,}건만 메모리에 유지")
+    skipped = {key: value for key, value in stats.items() if key.endswith(("_invalid", "_no_date"))}
+    if skipped:
+        print(f"⚠️  짝지을 수 없는 문서: {', '.join(f'{k} {v:,}' for k, v in sorted(skipped.items()))}")
+
+    print()
+    for kind, label in ISSUES.items():
+        mark = "🔧" if kind in REPAIRABLE else "❗"
+        print(f"{mark} {label}: {counts[kind]:,}건")
+        for _, patient_id, day, apt_id, other_id, _ in samples[kind]:
+            print(f"      {patient_id} {day} 예약={apt_id or '-'} 상대={other_id or '-'}")
+
+    if args.repair and args.apply:
+        limiter.print_summary()
+
+    print("\n" + "=" * 70)
+    fixable = sum(counts[kind] for kind in REPAIRABLE)
+    if args.repair and args.apply:
+        print(f"✅ 예약 플래그 {repaired:,}건 수정")
+        if failed:
+            print(f"❌ {failed:,}건 수정 실패 — 다시 실행하면 남은 것만 수정합니다.")
+    elif fixable:
+        print(f"💡 --repair --apply 로 플래그 {fixable:,}건을 고칠 수 있습니다.")
+    remaining = sum(counts.values()) - repaired
+    if remaining:
+        print(f"❗ 남은 문제 {remaining:,}건")
+    else:
+        print("✅ 문제가 없습니다.")
+    if args.out:
+        print(f"📄 전체 목록: {args.out}")
+    print("=" * 70)
+    return counts, repaired, failed
+
+
+def check(args, limiter):
+    """남은 문제가 없으면 성공 (--repair --apply 로 고친 것은 남은 문제가 아님)"""
+    try:
+        counts, repaired, failed = run_check(get_db(), args, limiter)
+        return failed == 0 and sum(counts.values()) == repaired
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# bench
+# ---------------------------------------------------------------------------
+
+
+def bench(args):
+    """가짜 Firestore: 문제를 알려진 비율로 섞은 데이터에서 점검 / 수정 / 재점검"""
+    import random
+
+    import firestore_fake
+
+    rng = random.Random(args.random_seed)
+    base = datetime(2026, 1, 5, 1, 0, tzinfo=timezone.utc)
+    data = {"appointments": {}, "attendances": {}, "sessions": {}, "session_reports": {}}
+    expected = Counter()
+    for p in range(args.patients):
+        patient_id = f"p{rng.randrange(16 ** 8):08x}"    # ID 순서와 patient_id 순서가 다르도록
+        alias = "patientId" if p % 10 == 0 else "patient_id"
+        for week in range(args.weeks):
+            when = base + timedelta(days=7 * week + p % 5)
+            apt_id = f"apt{len(data['appointments']):09d}"
+            roll = rng.random()
+            apt = {alias: patient_id, "appointment_date": when, "time_slot": "10:00-11:00",
+                   "status": "COMPLETED", "attended": True, "session_recorded": True}
+            att = {"patient_id": patient_id, "schedule_date": when, "time_slot": "10:00-11:00",
+                   "status": "PRESENT", "created_at": when}
+            report = {"patient_id": patient_id, "session_date": when + timedelta(hours=1), "created_at": when}
+            if roll < 0.02:
+                att = None
+                expected["completed_no_attendance"] += 1
+            elif roll < 0.04:
+                report = None
+                apt["session_recorded"] = False
+                expected["completed_no_report"] += 1
+            elif roll < 0.10:
+                apt["session_recorded"] = False    # migrate_firestore_structure 시드와 같은 상태
+                expected["stale_session_recorded"] += 1
+            elif roll < 0.13:
+                apt["attended"] = False
+                expected["stale_attended"] += 1
+            elif roll < 0.14:
+                apt = None
+                report = None
+                expected["orphan_attendance"] += 1
+            if apt is not None:
+                data["appointments"][apt_id] = apt
+            if att is not None:
+                data["attendances"][f"att{len(data['attendances']):09d}"] = att
+            if report is not None:
+                reports = "session_reports" if week % 4 == 0 else "sessions"
+                data[reports][f"ses{len(data['sessions']) + len(data['session_reports']):09d}"] = report
+
+    client = firestore_fake.FakeFirestore(latency=args.latency_ms / 1000.0)
+    client.load(data)
+    firestore_fake.install(client)
+    print(f"🏁 환자 {args.patients:,}명, 예약 {len(data['appointments']):,} / 출석 {len(data['attendances']):,} / "
+          f"세션 {len(data['sessions']):,} + {len(data['session_reports']):,}건, RPC 지연 {args.latency_ms}ms")
+    del data
+
+    db = get_db()
+    found = []
+    for label, repair in (("점검 + 수정", True), ("수정 후 재점검", False)):
+        run_args = argparse.Namespace(out=None, limit=0, page_size=PAGE_SIZE, repair=repair, apply=repair, ramp=False)
+        started = time.perf_counter()
+        counts, _, _ = run_check(db, run_args, AdaptiveLimiter(initial=8, max_limit=64, ramp=False))
+        found.append(+counts)
+        print(f"\n⏱️  {label}: {time.perf_counter() - started:.1f}초, 읽기 {client.stats['reads']:,}, "
+              f"쓰기 {client.stats['writes']:,}\n")
+        client.reset_stats()
+    remaining = Counter({kind: n for kind, n in expected.items() if kind not in REPAIRABLE})
+    print(f"   심어 둔 문제: {dict(expected)}")
+    print(f"   재점검 결과: {dict(found[1])}")
+    return found[0] == +expected and found[1] == remaining
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--out": None}))
+
+    parser = argparse.ArgumentParser(description="예약 / 출석 / 세션 기록 정합성 점검")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = sub.add_parser("check", help="세 컬렉션 merge-join 점검")
+    check_parser.add_argument("--out", help="문제 전체 목록 CSV")
+    check_parser.add_argument("--limit", type=int, default=5, help="항목별 출력 개수")
+    check_parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="정렬 스트림 페이지 크기")
+    check_parser.add_argument("--repair", action="store_true", help="attended / session_recorded 플래그 수정")
+    check_parser.add_argument("--ramp", action="store_true", help="appointments 쓰기에 500/50/5 ramp-up 상한 적용")
+    check_parser.add_argument("--apply", action="store_true", help="--repair 기록 (기본은 dry-run)")
+    add_rate_arguments(check_parser)
+
+    bench_parser = sub.add_parser("bench", help="가짜 Firestore 로 점검 시간 측정")
+    bench_parser.add_argument("--patients", type=int, default=20000)
+    bench_parser.add_argument("--weeks", type=int, default=12, help="환자당 주 1회 예약 주 수")
+    bench_parser.add_argument("--latency-ms", type=float, default=20.0)
+    bench_parser.add_argument("--random-seed", type=int, default=42)
+
+    args = parser.parse_args()
+    if args.command == "check":
+        success = check(args, AdaptiveLimiter.from_args(args))
+    else:
+        success = bench(args)
+    sys.exit(0 if success else 1)
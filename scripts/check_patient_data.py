@@ -3,9 +3,18 @@
 김아쿠 환자 데이터 확인 및 therapist_id 설정
 """
 
+import sys
+
+# --plan 은 아래 모듈 수준 Firebase 초기화 전에 처리 (인증 정보/운영 연결 없이 가짜 클라이언트로 실행)
+if __name__ == "__main__" and "--plan" in sys.argv:
+    from firestore_plan import plan_script
+    sys.exit(plan_script(__file__))
+
 import firebase_admin
 from firebase_admin import credentials, firestore
 
+from firestore_models import Patient
+
 # Firebase Admin SDK 초기화
 cred = credentials.Certificate("/opt/flutter/firebase-admin-sdk.json")
 if not firebase_admin._apps:
@@ -25,29 +34,29 @@ def check_patient_data():
         print(f"❌ 환자({patient_id}) 없음")
         return
     
-    patient_data = patient_doc.to_dict()
+    patient = Patient.from_snapshot(patient_doc)
     
     print("=" * 60)
     print("김아쿠 환자 데이터 확인")
     print("=" * 60)
     print(f"\n📋 환자 정보:")
     print(f"   ID: {patient_id}")
-    print(f"   이름: {patient_data.get('name')}")
-    print(f"   환자번호: {patient_data.get('patient_code')}")
-    print(f"   상태: {patient_data.get('status')}")
-    print(f"   담당 치료사 ID: {patient_data.get('therapist_id')}")
-    print(f"   보호자 UIDs: {patient_data.get('guardian_uids', [])}")
-    
-    # therapist_id가 없거나 잘못된 경우 수정
-    if not patient_data.get('therapist_id'):
+    print(f"   이름: {patient.name}")
+    print(f"   환자번호: {patient.patient_code}")
+    print(f"   상태: {patient.status}")
+    print(f"   담당 치료사 ID: {patient.assigned_therapist_id}")
+    print(f"   보호자 UIDs: {list(patient.guardian_ids)}")
+    
+    # 담당 치료사가 어느 철자(therapist_id / primaryTherapistUid 등)로도 없으면 설정
+    if not patient.assigned_therapist_id:
         print(f"\n⚠️  therapist_id가 없습니다. 하유정으로 설정합니다.")
         patient_ref.update({
             "therapist_id": "user_hayujeong"
         })
         print(f"   ✅ therapist_id 설정 완료")
     
-    # status가 ACTIVE가 아니면 수정
-    if patient_data.get('status') != 'ACTIVE':
+    # status가 ACTIVE가 아니면 수정 (모델은 대소문자를 정규화하므로 저장값 그대로 비교)
+    if patient_doc.to_dict().get('status') != 'ACTIVE':
         print(f"\n⚠️  status가 ACTIVE가 아닙니다. 수정합니다.")
         patient_ref.update({
             "status": "ACTIVE"
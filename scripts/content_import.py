@@ -0,0 +1,701 @@
+#!/usr/bin/env python3
+"""
+치료 콘텐츠 라이브러리 일괄 등록 (contents)
+
+추천 엔진이 쓰는 contents 는 지금까지 손으로 입력했다 (firebase_initializer.dart 의 샘플 등).
+이 스크립트는 로컬 디렉터리 또는 manifest 의 영상/PDF/이미지를 해시해 콘텐츠 문서로 등록한다.
+
+콘텐츠 단위:
+    디렉터리: 같은 폴더의 같은 이름(확장자 제외) 파일들이 콘텐츠 하나
+        PT/균형/standing_balance_lv2.mp4   ┐
+        PT/균형/standing_balance_lv2.pdf   ├ 콘텐츠 1건 (영상 + 안내 PDF)
+        PT/균형/standing_balance_lv2.json  ┘ 메타데이터 (title, tags, contraindications ...)
+        PT/균형/_meta.json                   폴더 공통 기본값 (하위 폴더에 상속)
+      경로에서 유추: 폴더 이름이 AQUATIC/GENERAL/OT/PT(수중/일반/작업/물리) 면 type, 나머지는 category,
+      파일 이름의 lv2 / level_2 / 난이도2 는 difficulty_level
+    manifest (.json / .jsonl / .csv): 항목마다 path 또는 files 와 메타데이터 필드 (id 가 있으면 문서 ID 기준)
+
+처리 순서:
+    1. 파일 stat 을 로컬 해시 캐시(--cache)와 비교해 크기/수정 시각이 바뀐 파일만 다시 읽음
+    2. 바뀐 파일은 프로세스 풀에서 mmap 으로 SHA256 해시 + 미디어 정보 추출
+       (MP4 mvhd atom 재생 시간, PDF 페이지 수 — 해시하며 올라온 페이지를 그대로 사용)
+    3. 미디어 해시 조합이 같은 중복 콘텐츠는 병합(--duplicates merge) 또는 첫 항목만 사용(skip).
+       문서 ID 는 항목 경로(manifest 는 id 필드)에서 유도해 파일을 고쳐도 같은 문서를 갱신한다.
+       미디어 url 은 해시 기반이라 같은 파일은 한 번만 올리면 됨
+    4. 기존 contents 의 import_fingerprint 만 조회해 내용이 바뀐 문서만 500건씩 배치 upsert
+       (rating / created_at 은 새 문서에만 기록하므로 앱에서 매긴 평점은 유지)
+
+미디어 파일 업로드는 하지 않는다. --upload-list 로 (로컬 경로, url) 목록을 받아 gsutil 등으로 올린다.
+
+사용법:
+    python scripts/content_import.py import --root /data/content_library
+    python scripts/content_import.py import --root /data/content_library --media-base gs://BUCKET/contents --apply
+    python scripts/content_import.py import --manifest library.jsonl --org ORG_ID --upload-list upload.tsv --apply
+    python scripts/content_import.py import --root /data/content_library --prune --apply
+    python scripts/content_import.py bench --items 200
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from firestore_common import doc_hash, get_db
+from firestore_rate import AdaptiveLimiter, add_rate_arguments
+
+COLLECTION = "contents"
+IMPORT_SOURCE = "content_import"
+BATCH_SIZE = 500
+DIR_META = "_meta.json"
+DEFAULT_CACHE = "content_import_cache.json"
+DEFAULT_DIFFICULTY = "LEVEL_3"    # Content._parseDifficultyLevel 기본값
+
+MEDIA_TYPES = {
+    ".mp4": "VIDEO", ".m4v": "VIDEO", ".mov": "VIDEO", ".webm": "VIDEO",
+    ".pdf": "PDF",
+    ".jpg": "IMAGE", ".jpeg": "IMAGE", ".png": "IMAGE", ".gif": "IMAGE", ".webp": "IMAGE",
+}
+MEDIA_ORDER = {"VIDEO": 0, "PDF": 1, "IMAGE": 2}
+MP4_EXTENSIONS = (".mp4", ".m4v", ".mov")
+CONTENT_TYPES = {
+    "aquatic": "AQUATIC", "수중": "AQUATIC",
+    "general": "GENERAL", "일반": "GENERAL",
+    "ot": "OT", "작업": "OT", "작업치료": "OT",
+    "pt": "PT", "물리": "PT", "물리치료": "PT",
+}
+LIST_FIELDS = ("category", "target_goals", "tags", "equipment", "contraindications", "precautions")
+TEXT_FIELDS = ("title", "description", "instructions")
+DIFFICULTY_RE = re.compile(r"(?:level|lv|난이도)[ _-]?([1-5])", re.IGNORECASE)
+PDF_PAGE_RE = re.compile(rb"/Type\s*/Page\b")
+
+
+# ---------------------------------------------------------------------------
+# 해시 / 미디어 정보 (작업 프로세스)
+# ---------------------------------------------------------------------------
+
+
+def _find_atom(buf, pos, end, kind):
+    """[pos, end) 구간의 MP4 atom 중 kind 의 (본문 시작, 끝), 없으면 None"""
+    while pos + 8 <= end:
+        size, name = struct.unpack_from(">I4s", buf, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return None
+            size = struct.unpack_from(">Q", buf, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return None
+        if name == kind:
+            return pos + header, min(pos + size, end)
+        pos += size
+    return None
+
+
+def _mp4_duration(buf):
+    """moov/mvhd 의 재생 시간(초). mdat 는 건너뛰므로 큰 파일도 atom 헤더 몇 개만 읽는다"""
+    moov = _find_atom(buf, 0, len(buf), b"moov")
+    mvhd = moov and _find_atom(buf, moov[0], moov[1], b"mvhd")
+    if not mvhd or mvhd[1] - mvhd[0] < 32:
+        return None
+    start = mvhd[0]
+    if buf[start] == 1:
+        timescale, duration = struct.unpack_from(">IQ", buf, start + 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", buf, start + 12)
+    return round(duration / timescale, 1) if timescale else None
+
+
+def _probe(buf, ext):
+    if ext in MP4_EXTENSIONS:
+        duration = _mp4_duration(buf)
+        return {"duration_seconds": duration} if duration else {}
+    if ext == ".pdf":
+        pages = len(PDF_PAGE_RE.findall(buf))
+        return {"pages": pages} if pages else {}
+    return {}
+
+
+def hash_file(path):
+    """mmap 으로 파일 하나 해시 → 캐시 항목 (오류는 error 필드로 반환)"""
+    try:
+        with open(path, "rb") as f:
+            before = os.fstat(f.fileno())
+            digest = hashlib.sha256()
+            probe = {}
+            if before.st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mm, "madvise"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    digest.update(mm)
+                    probe = _probe(mm, os.path.splitext(path)[1].lower())
+            after = os.fstat(f.fileno())
+        if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+            return {"path": path, "error": "읽는 중 파일이 변경됨"}
+        return {"path": path, "size": before.st_size, "mtime_ns": before.st_mtime_ns,
+                "sha256": digest.hexdigest(), "probe": probe}
+    except OSError as e:
+        return {"path": path, "error": str(e)}
+
+
+# ---------------------------------------------------------------------------
+# 해시 캐시
+# ---------------------------------------------------------------------------
+
+
+def load_cache(path):
+    if not os.path.exists(path):
+        return {"files": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_cache(path, cache):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def hash_files(paths, cache, workers, rehash=False):
+    """
+    크기/수정 시각이 캐시와 다른 파일만 해시 → (path → 캐시 항목, 통계)
+    캐시에는 이번 목록의 파일만 남긴다 (지워진 파일 항목 정리)
+    """
+    cached = cache["files"]
+    records = {}
+    pending = []
+    stats = {"files": len(paths), "bytes": 0, "hashed": 0, "hashed_bytes": 0, "errors": []}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            stats["errors"].append((path, str(e)))
+            continue
+        stats["bytes"] += st.st_size
+        entry = cached.get(path)
+        if (not rehash and entry and entry["size"] == st.st_size
+                and entry["mtime_ns"] == st.st_mtime_ns):
+            records[path] = entry
+        else:
+            pending.append((st.st_size, path))
+
+    # 큰 파일부터 넣어 마지막에 한 프로세스만 큰 파일을 읽고 있는 꼬리를 줄임
+    pending.sort(reverse=True)
+    started = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(hash_file, [p for _, p in pending]):
+                path = result.pop("path")
+                if "error" in result:
+                    stats["errors"].append((path, result["error"]))
+                    continue
+                records[path] = result
+                stats["hashed"] += 1
+                stats["hashed_bytes"] += result["size"]
+    stats["seconds"] = time.perf_counter() - started
+    cache["files"] = records
+    return records, stats
+
+
+# ---------------------------------------------------------------------------
+# 항목 수집 / 메타데이터
+# ---------------------------------------------------------------------------
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in re.split(r"[,|]", value) if v.strip()]
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def normalize_difficulty(value):
+    """1~5 / "3" / "LEVEL_3" / "lv3" → LEVEL_n, 알 수 없으면 None"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        level = int(value)
+    else:
+        text = str(value).strip()
+        match = re.fullmatch(r"(?:LEVEL_)?([1-5])", text, re.IGNORECASE) or DIFFICULTY_RE.search(text)
+        level = int(match.group(1)) if match else None
+    return f"LEVEL_{level}" if level and 1 <= level <= 5 else None
+
+
+def infer_meta(rel_path):
+    """라이브러리 기준 상대 경로에서 type / category / difficulty_level / title 유추"""
+    parts = rel_path.replace(os.sep, "/").split("/")
+    meta = {"category": []}
+    for part in parts[:-1]:
+        content_type = CONTENT_TYPES.get(part.lower())
+        if content_type:
+            meta["type"] = content_type
+        else:
+            meta["category"].append(part)
+    stem = os.path.splitext(parts[-1])[0]
+    difficulty = normalize_difficulty(stem)
+    if difficulty:
+        meta["difficulty_level"] = difficulty
+    title = DIFFICULTY_RE.sub("", stem)
+    meta["title"] = re.sub(r"[_\-\s]+", " ", title).strip() or stem
+    return meta
+
+
+def merge_meta(base, override):
+    """override 의 값이 있는 필드만 덮어씀 (목록 필드도 교체 — 합치는 것은 중복 병합에서만)"""
+    merged = dict(base)
+    for key, value in override.items():
+        if value is None or value == "" or value == []:
+            continue
+        merged[key] = value
+    return merged
+
+
+def scan_directory(root):
+    """디렉터리 → 항목 목록 [{key, files, meta}] (같은 폴더·같은 이름의 미디어를 묶음)"""
+    root = os.path.abspath(root)
+    items = []
+    dir_meta = {root: {}}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        inherited = dir_meta.get(os.path.dirname(dirpath), {}) if dirpath != root else {}
+        meta = inherited
+        if DIR_META in filenames:
+            meta = merge_meta(inherited, _read_json(os.path.join(dirpath, DIR_META)))
+        dir_meta[dirpath] = meta
+
+        groups = {}
+        for name in sorted(filenames):
+            if name.startswith("."):
+                continue
+            stem, ext = os.path.splitext(name)
+            if ext.lower() in MEDIA_TYPES:
+                groups.setdefault(stem, []).append(os.path.join(dirpath, name))
+        for stem, files in groups.items():
+            rel = os.path.relpath(os.path.join(dirpath, stem), root)
+            item_meta = merge_meta(infer_meta(rel), meta)
+            sidecar = os.path.join(dirpath, stem + ".json")
+            if os.path.exists(sidecar):
+                item_meta = merge_meta(item_meta, _read_json(sidecar))
+            items.append({"key": rel.replace(os.sep, "/"), "files": files, "meta": item_meta})
+    return items
+
+
+def read_manifest(path):
+    """manifest → 항목 목록. 상대 경로는 manifest 위치 기준"""
+    base = os.path.dirname(os.path.abspath(path))
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = list(csv.DictReader(f))
+    elif path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+    else:
+        entries = _read_json(path)
+
+    items = []
+    for entry in entries:
+        entry = dict(entry)
+        files = _as_list(entry.pop("files", None)) or _as_list(entry.pop("path", None))
+        entry.pop("path", None)
+        if not files:
+            continue
+        files = [os.path.normpath(os.path.join(base, f)) for f in files]
+        rel = os.path.splitext(os.path.relpath(files[0], base))[0]
+        key = str(entry.pop("id", None) or rel.replace(os.sep, "/"))
+        items.append({"key": key, "files": files,
+                      "meta": merge_meta(infer_meta(rel), entry)})
+    return items
+
+
+def clean_meta(meta):
+    """Content 필드로 정규화 → (필드, 경고 목록)"""
+    warnings = []
+    fields = {key: str(meta.get(key) or "").strip() for key in TEXT_FIELDS}
+    for key in LIST_FIELDS:
+        fields[key] = list(dict.fromkeys(_as_list(meta.get(key))))
+
+    content_type = meta.get("type")
+    fields["type"] = CONTENT_TYPES.get(str(content_type or "general").lower(), str(content_type).upper())
+    if fields["type"] not in ("AQUATIC", "GENERAL", "OT", "PT"):
+        warnings.append(f"알 수 없는 type {content_type!r} → GENERAL")
+        fields["type"] = "GENERAL"
+
+    raw_difficulty = meta.get("difficulty_level", meta.get("difficulty"))
+    difficulty = normalize_difficulty(raw_difficulty)
+    if difficulty is None and raw_difficulty not in (None, ""):
+        warnings.append(f"알 수 없는 난이도 {raw_difficulty!r}")
+    fields["difficulty_level"] = difficulty or DEFAULT_DIFFICULTY
+
+    try:
+        fields["duration_minutes"] = int(meta.get("duration_minutes") or 0)
+    except (TypeError, ValueError):
+        warnings.append(f"duration_minutes {meta.get('duration_minutes')!r} 무시")
+        fields["duration_minutes"] = 0
+    return fields, warnings
+
+
+# ---------------------------------------------------------------------------
+# 콘텐츠 문서
+# ---------------------------------------------------------------------------
+
+
+def content_id(org, key):
+    """센터 + 항목 경로 → 문서 ID (파일을 고쳐도 같은 문서를 갱신하므로 평점이 유지됨)"""
+    return "lib_" + hashlib.sha256(f"{org or ''}:{key}".encode("utf-8")).hexdigest()[:24]
+
+
+def media_url(media_base, sha256, ext):
+    return f"{media_base.rstrip('/')}/{sha256}{ext}"
+
+
+def build_item(item, records, media_base):
+    """항목 하나 → (item_hash, 필드, 미디어 목록, 업로드 목록, 경고) — 해시 안 된 파일이 있으면 None"""
+    media = []
+    uploads = []
+    for path in item["files"]:
+        record = records.get(path)
+        if record is None:
+            return None
+        ext = os.path.splitext(path)[1].lower()
+        url = media_url(media_base, record["sha256"], ext)
+        media.append(dict({"type": MEDIA_TYPES[ext], "url": url, "sha256": record["sha256"],
+                           "bytes": record["size"]}, **record.get("probe", {})))
+        uploads.append((path, url))
+    media.sort(key=lambda m: (MEDIA_ORDER[m["type"]], m["url"]))
+    hashes = sorted(m["sha256"] for m in media)
+    item_hash = hashes[0] if len(hashes) == 1 else hashlib.sha256("\n".join(hashes).encode()).hexdigest()
+
+    fields, warnings = clean_meta(item["meta"])
+    if not fields["duration_minutes"]:
+        seconds = max((m.get("duration_seconds") or 0 for m in media), default=0)
+        fields["duration_minutes"] = -(-int(seconds) // 60)
+    return item_hash, fields, media, uploads, warnings
+
+
+def build_contents(items, records, org, media_base, duplicates="merge"):
+    """
+    항목 → 문서 ID 별 payload
+    같은 파일 구성(item_hash)이 여러 항목이면 첫 항목 경로의 문서 하나로 — merge: 목록 필드 합집합 / 나머지는 첫 항목 값,
+    skip: 첫 항목만 사용. 어느 쪽이든 중복 항목은 dup_groups 로 보고
+    """
+    built = {}
+    skipped = []
+    warnings = []
+    for item in sorted(items, key=lambda i: i["key"]):
+        result = build_item(item, records, media_base)
+        if result is None:
+            skipped.append(item["key"])
+            continue
+        item_hash, fields, media, uploads, item_warnings = result
+        warnings.extend((item["key"], w) for w in item_warnings)
+        entry = built.get(item_hash)
+        if entry is None:
+            built[item_hash] = {"hash": item_hash, "fields": fields, "media": media,
+                             "uploads": uploads, "keys": [item["key"]]}
+            continue
+        entry["keys"].append(item["key"])
+        if duplicates == "merge":
+            for key in LIST_FIELDS:
+                entry["fields"][key] = list(dict.fromkeys(entry["fields"][key] + fields[key]))
+            for key, value in fields.items():
+                if key not in LIST_FIELDS and not entry["fields"].get(key):
+                    entry["fields"][key] = value
+
+    docs = {}
+    dup_groups = []
+    for entry in built.values():
+        doc_id = content_id(org, entry["keys"][0])
+        if len(entry["keys"]) > 1:
+            dup_groups.append(entry["keys"])
+        keys = entry["keys"] if duplicates == "merge" else entry["keys"][:1]
+        docs[doc_id] = dict(entry["fields"], organization_id=org, media=entry["media"],
+                            content_hash=entry["hash"], source_paths=keys, import_source=IMPORT_SOURCE)
+    uploads = {url: path for entry in built.values() for path, url in entry["uploads"]}
+    return docs, uploads, dup_groups, skipped, warnings
+
+
+def load_fingerprints(db, org):
+    """이 스크립트가 등록한 같은 센터 콘텐츠의 import_fingerprint (본문은 읽지 않음)"""
+    fingerprints = {}
+    query = (db.collection(COLLECTION).where("import_source", "==", IMPORT_SOURCE)
+             .select(["import_fingerprint", "organization_id"]))
+    for doc in query.stream():
+        data = doc.to_dict() or {}
+        if data.get("organization_id") == org:
+            fingerprints[doc.id] = data.get("import_fingerprint")
+    return fingerprints
+
+
+def _human(num_bytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:,.0f}{unit}" if unit == "B" else f"{num_bytes:,.1f}{unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:,.1f}TB"
+
+
+# ---------------------------------------------------------------------------
+# import
+# ---------------------------------------------------------------------------
+
+
+def import_library(args, limiter):
+    try:
+        db = get_db()
+        source = args.root or args.manifest
+
+        print("=" * 70)
+        print(f"📚 콘텐츠 라이브러리 등록: {source} → {COLLECTION} "
+              f"({'센터 ' + args.org if args.org else '전체 공개'})")
+        print("=" * 70)
+        if not args.apply:
+            print("🔍 dry-run: 해시와 변경 확인만 합니다 (--apply 로 기록)")
+
+        started = time.perf_counter()
+        items = scan_directory(args.root) if args.root else read_manifest(args.manifest)
+        paths = sorted({path for item in items for path in item["files"]})
+        print(f"📂 콘텐츠 {len(items):,}건, 미디어 파일 {len(paths):,}개 ({time.perf_counter() - started:.1f}초)")
+
+        cache = load_cache(args.cache)
+        records, stats = hash_files(paths, cache, args.workers, rehash=args.rehash)
+        save_cache(args.cache, cache)
+        rate = stats["hashed_bytes"] / stats["seconds"] / 1024 / 1024 if stats["seconds"] else 0
+        print(f"#️⃣  전체 {_human(stats['bytes'])} 중 변경 {stats['hashed']:,}개 {_human(stats['hashed_bytes'])} 해시 "
+              f"({stats['seconds']:.1f}초, {rate:,.0f}MB/s, 작업 프로세스 {args.workers}개), "
+              f"캐시 사용 {len(records) - stats['hashed']:,}개")
+        for path, error in stats["errors"][:10]:
+            print(f"   ❌ {path}: {error}")
+
+        docs, uploads, dup_groups, skipped, warnings = build_contents(
+            items, records, args.org, args.media_base, args.duplicates)
+        if dup_groups:
+            print(f"♻️  같은 파일 구성의 중복 콘텐츠 {len(dup_groups):,}묶음 "
+                  f"({'병합' if args.duplicates == 'merge' else '첫 항목만 사용'})")
+            for keys in dup_groups[:5]:
+                print(f"   {' = '.join(keys)}")
+        for key, warning in warnings[:10]:
+            print(f"   ⚠️  {key}: {warning}")
+        if skipped:
+            print(f"⚠️  파일을 읽지 못해 건너뛴 콘텐츠 {len(skipped):,}건")
+
+        fingerprints = load_fingerprints(db, args.org)
+        now = datetime.now(timezone.utc)
+        writes = []
+        for doc_id, payload in docs.items():
+            fingerprint = doc_hash(payload).hex()
+            if fingerprints.get(doc_id) == fingerprint:
+                continue
+            payload = dict(payload, import_fingerprint=fingerprint, updated_at=now)
+            if doc_id not in fingerprints:
+                payload.update(rating=0.0, created_at=now)
+            writes.append((doc_id, payload))
+        # 읽지 못한 파일의 콘텐츠는 라이브러리에 그대로 있으므로 삭제하지 않음 (다시 만들면 평점이 초기화됨)
+        kept = set(docs) | {content_id(args.org, key) for key in skipped}
+        removed = sorted(set(fingerprints) - kept) if args.prune else []
+        created = sum(1 for doc_id, _ in writes if doc_id not in fingerprints)
+        print(f"📝 새 콘텐츠 {created:,}건, 변경 {len(writes) - created:,}건, "
+              f"그대로 {len(docs) - len(writes):,}건"
+              + (f", 삭제 대상 {len(removed):,}건" if args.prune else ""))
+
+        if args.upload_list:
+            changed_urls = {m["url"] for _, payload in writes for m in payload["media"]}
+            with open(args.upload_list, "w", encoding="utf-8") as f:
+                for url in sorted(changed_urls):
+                    f.write(f"{uploads[url]}\t{url}\n")
+            print(f"📄 업로드 목록 {len(changed_urls):,}개: {args.upload_list}")
+
+        if not args.apply:
+            for doc_id, payload in writes[:5]:
+                print(f"   {doc_id}: {payload['title']} [{payload['type']}/{payload['difficulty_level']}] "
+                      f"미디어 {len(payload['media'])}개")
+            return not stats["errors"]
+
+        ops = [("set", doc_id, payload) for doc_id, payload in writes] + [("delete", doc_id, None) for doc_id in removed]
+        chunks = [ops[i:i + BATCH_SIZE] for i in range(0, len(ops), BATCH_SIZE)]
+
+        def commit(chunk):
+            batch = db.batch()
+            for op, doc_id, payload in chunk:
+                ref = db.collection(COLLECTION).document(doc_id)
+                if op == "set":
+                    batch.set(ref, payload, merge=True)
+                else:
+                    batch.delete(ref)
+            batch.commit()
+            return len(chunk)
+
+        started = time.perf_counter()
+        written = failed = 0
+        collection = COLLECTION if args.ramp else None
+        for chunk, count, error in limiter.map(commit, chunks, collection=collection, ops=BATCH_SIZE):
+            if error:
+                failed += len(chunk)
+                print(f"   ❌ 배치 {len(chunk)}건 실패: {error}")
+            else:
+                written += count
+        if chunks:
+            limiter.print_summary()
+
+        print("\n" + "=" * 70)
+        print(f"✅ {COLLECTION} {written:,}건 기록 ({time.perf_counter() - started:.1f}초)")
+        if failed:
+            print(f"❌ {failed:,}건 기록 실패 — 다시 실행하면 바뀐 문서만 다시 기록합니다.")
+        if not args.upload_list and writes:
+            print("💡 미디어 파일은 올리지 않았습니다. --upload-list 로 업로드 목록을 받을 수 있습니다.")
+        print("=" * 70)
+        return failed == 0 and not stats["errors"]
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# bench
+# ---------------------------------------------------------------------------
+
+
+def _mp4_bytes(seconds, payload):
+    """ftyp + mdat + moov(mvhd) 최소 MP4 (moov 가 뒤에 있는 일반적인 녹화 파일 구조)"""
+    ftyp = struct.pack(">I4s4sI", 16, b"ftyp", b"isom", 0)
+    mdat = struct.pack(">I4s", 8 + len(payload), b"mdat") + payload
+    mvhd = struct.pack(">I4sB3xIIII", 108, b"mvhd", 0, 0, 0, 1000, int(seconds * 1000)) + bytes(80)
+    return ftyp + mdat + struct.pack(">I4s", 8 + len(mvhd), b"moov") + mvhd
+
+
+def _pdf_bytes(pages, payload):
+    body = b"".join(b"%d 0 obj << /Type /Page /Parent 1 0 R >> endobj\n" % (i + 2) for i in range(pages))
+    return b"%PDF-1.4\n1 0 obj << /Type /Pages /Count " + str(pages).encode() + b" >> endobj\n" + body + payload
+
+
+def bench(args):
+    """가짜 Firestore + 임시 라이브러리: 첫 등록 / 변경 없는 재실행 / 일부 변경 재실행"""
+    import random
+    import shutil
+    import tempfile
+
+    import firestore_fake
+
+    rng = random.Random(7)
+    client = firestore_fake.FakeFirestore(latency=args.latency_ms / 1000.0)
+    firestore_fake.install(client)
+
+    root = tempfile.mkdtemp(prefix="content_bench_")
+    try:
+        lib = os.path.join(root, "library")
+        kinds = ["PT", "OT", "수중", "GENERAL"]
+        written_bytes = 0
+        previous = None
+        for i in range(args.items):
+            folder = os.path.join(lib, kinds[i % len(kinds)], f"category_{i % 7}")
+            os.makedirs(folder, exist_ok=True)
+            stem = os.path.join(folder, f"exercise_{i:04d}_lv{i % 5 + 1}")
+            size = rng.randint(args.max_mb * 1024 * 1024 // 4, args.max_mb * 1024 * 1024)
+            if previous and i % 20 == 0:
+                # 다른 폴더에 같은 파일을 복사한 중복 콘텐츠
+                shutil.copyfile(previous + ".mp4", stem + ".mp4")
+                shutil.copyfile(previous + ".pdf", stem + ".pdf")
+            else:
+                with open(stem + ".mp4", "wb") as f:
+                    f.write(_mp4_bytes(rng.randint(60, 900), os.urandom(size)))
+                with open(stem + ".pdf", "wb") as f:
+                    f.write(_pdf_bytes(rng.randint(1, 6), os.urandom(size // 8)))
+                previous = stem
+            with open(stem + ".json", "w", encoding="utf-8") as f:
+                json.dump({"tags": [f"tag{i % 11}"], "contraindications": ["급성 통증"] if i % 3 == 0 else []},
+                          f, ensure_ascii=False)
+        for dirpath, _, filenames in os.walk(lib):
+            written_bytes += sum(os.path.getsize(os.path.join(dirpath, name)) for name in filenames)
+        print(f"🏁 콘텐츠 {args.items:,}건, 라이브러리 {_human(written_bytes)}")
+
+        run_args = argparse.Namespace(root=lib, manifest=None, org=None, media_base="gs://bench/contents",
+                                      cache=os.path.join(root, "cache.json"), workers=args.workers, rehash=False,
+                                      duplicates="merge", prune=True, upload_list=os.path.join(root, "upload.tsv"),
+                                      ramp=False, apply=True)
+
+        def run(label):
+            client.reset_stats()
+            started = time.perf_counter()
+            success = import_library(run_args, AdaptiveLimiter(initial=8, max_limit=64, ramp=False))
+            print(f"\n⏱️  {label}: {time.perf_counter() - started:.1f}초, 쓰기 {client.stats['writes']:,}\n")
+            return success
+
+        success = run("첫 등록")
+        success = run("변경 없는 재실행") and success
+
+        changed = sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(lib)
+                         for name in names if name.endswith(".pdf"))[:3]
+        for path in changed:
+            with open(path, "ab") as f:
+                f.write(b"%% revised\n")
+        sidecar = changed[0][:-4] + ".json"
+        with open(sidecar, "w", encoding="utf-8") as f:
+            json.dump({"tags": ["revised"], "difficulty_level": 4}, f)
+        success = run("PDF 3개 + 메타데이터 1개 변경 후 재실행") and success
+
+        docs = list(client.collection(COLLECTION).stream())
+        sample = docs[0].to_dict()
+        print(f"   문서 {len(docs):,}건, 예: {sample['title']} / {sample['type']} / {sample['difficulty_level']} / "
+              f"{sample['duration_minutes']}분 / {[m['type'] for m in sample['media']]}")
+        return success
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--cache": DEFAULT_CACHE, "--upload-list": None}))
+
+    parser = argparse.ArgumentParser(description="치료 콘텐츠 라이브러리 일괄 등록")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = sub.add_parser("import", help="디렉터리 / manifest 를 contents 에 등록")
+    source = import_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--root", help="라이브러리 디렉터리")
+    source.add_argument("--manifest", help="manifest 파일 (.json / .jsonl / .csv)")
+    import_parser.add_argument("--org", help="organization_id (기본: 전체 공개 콘텐츠)")
+    import_parser.add_argument("--media-base", default="contents", help="미디어 url 접두어 (url = <접두어>/<sha256><확장자>)")
+    import_parser.add_argument("--cache", default=DEFAULT_CACHE, help="로컬 해시 캐시 파일")
+    import_parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="해시 작업 프로세스 수")
+    import_parser.add_argument("--rehash", action="store_true", help="캐시를 무시하고 모든 파일 다시 해시")
+    import_parser.add_argument("--duplicates", choices=["merge", "skip"], default="merge",
+                               help="같은 파일 구성의 중복 콘텐츠 처리 (merge: 메타데이터 병합, skip: 첫 항목만)")
+    import_parser.add_argument("--prune", action="store_true", help="라이브러리에 없는 기존 등록 콘텐츠 삭제")
+    import_parser.add_argument("--upload-list", help="새로 올려야 할 미디어 (로컬 경로<TAB>url) 목록 파일")
+    import_parser.add_argument("--ramp", action="store_true", help="contents 쓰기에 500/50/5 ramp-up 상한 적용")
+    import_parser.add_argument("--apply", action="store_true", help="contents 기록 (기본은 dry-run)")
+    add_rate_arguments(import_parser)
+
+    bench_parser = sub.add_parser("bench", help="가짜 Firestore + 임시 라이브러리로 측정")
+    bench_parser.add_argument("--items", type=int, default=200)
+    bench_parser.add_argument("--max-mb", type=int, default=8, help="영상 파일 최대 크기 (MB)")
+    bench_parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    bench_parser.add_argument("--latency-ms", type=float, default=20.0)
+
+    args = parser.parse_args()
+    if args.command == "import":
+        success = import_library(args, AdaptiveLimiter.from_args(args))
+    else:
+        success = bench(args)
+    sys.exit(0 if success else 1)
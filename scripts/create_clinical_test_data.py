@@ -3,6 +3,13 @@
 김아쿠 환자 임상 테스트 데이터 생성 (평가/목표/세션/성과)
 """
 
+import sys
+
+# --plan 은 아래 모듈 수준 Firebase 초기화 전에 처리 (인증 정보/운영 연결 없이 가짜 클라이언트로 실행)
+if __name__ == "__main__" and "--plan" in sys.argv:
+    from firestore_plan import plan_script
+    sys.exit(plan_script(__file__))
+
 import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime, timedelta
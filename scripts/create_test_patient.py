@@ -3,6 +3,13 @@
 테스트 환자 (김아쿠) 생성 및 보호자 연결 스크립트
 """
 
+import sys
+
+# --plan 은 아래 모듈 수준 Firebase 초기화 전에 처리 (인증 정보/운영 연결 없이 가짜 클라이언트로 실행)
+if __name__ == "__main__" and "--plan" in sys.argv:
+    from firestore_plan import plan_script
+    sys.exit(plan_script(__file__))
+
 import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+재실행된 시드 스크립트로 생긴 중복 문서 탐지/정리
+
+create_test_patient.py, create_clinical_test_data.py, migrate_firestore_structure.py 는
+.add() 자동 ID를 사용하므로 재실행할 때마다 같은 내용의 문서가 하나씩 늘어난다.
+created_at/updated_at 을 제외한 정규화 내용 해시(fingerprint)로 중복을 묶고,
+가장 먼저 생성된 문서 하나만 남긴다.
+
+메모리는 fingerprint 테이블(고유 내용 1개당 항목 1개)로 제한되며,
+중복 목록은 임시 파일로 흘려보낸다. --partitions N 을 주면 fingerprint를
+N개 파일로 분할해 테이블 크기를 1/N 로 줄인다 (Firestore 읽기는 1회 그대로).
+
+사용법:
+    python scripts/dedupe_documents.py                       # dry-run 리포트만
+    python scripts/dedupe_documents.py --apply --archive     # <collection>_duplicates 로 보관 후 삭제
+    python scripts/dedupe_documents.py --collections goals --partitions 16 --report dedupe.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from firestore_common import doc_hash, get_db, iter_collection
+
+DEFAULT_COLLECTIONS = [
+    "appointments", "session_reports", "session_records",
+    "goals", "progress_records", "assessments",
+]
+DEFAULT_IGNORE_FIELDS = ["created_at", "updated_at"]
+BATCH_SIZE = 500
+GET_ALL_CHUNK = 100
+
+
+def _created_ts(doc):
+    if doc.create_time is not None:
+        return doc.create_time.timestamp()
+    created = (doc.to_dict() or {}).get("created_at")
+    return created.timestamp() if isinstance(created, datetime) else 0.0
+
+
+def _fingerprints(db, collection, ignore_fields):
+    """(fingerprint, 생성 시각, doc_id) 스트림"""
+    for doc in iter_collection(db, collection):
+        yield doc_hash(doc.to_dict(), ignore_fields), _created_ts(doc), doc.id
+
+
+def _group(rows, table, dup_file):
+    """
+    스트리밍 해시 맵: fingerprint → (생성 시각, 생존 문서 ID)
+    더 오래된 문서가 나타나면 생존 문서를 교체하고, 밀려난 문서를 중복으로 기록
+    """
+    rows_seen = 0
+    duplicates = 0
+    for fp, ts, doc_id in rows:
+        rows_seen += 1
+        current = table.get(fp)
+        if current is None:
+            table[fp] = (ts, doc_id)
+            continue
+        if (ts, doc_id) < current:
+            table[fp] = (ts, doc_id)
+            loser = current[1]
+        else:
+            loser = doc_id
+        dup_file.write(f"{fp.hex()}\t{loser}\n")
+        duplicates += 1
+    return rows_seen, duplicates
+
+
+def find_duplicates(db, collection, ignore_fields, partitions, work_dir):
+    """중복 (doc_id, 생존 문서 ID) 목록 파일 경로와 (문서 수, 중복 수) 반환"""
+    dup_path = os.path.join(work_dir, f"{collection}.dups")
+    total = 0
+    duplicates = 0
+    resolved_path = dup_path + ".resolved"
+
+    with open(dup_path, "w", encoding="utf-8") as dup_file, \
+            open(resolved_path, "w", encoding="utf-8") as resolved:
+        if partitions <= 1:
+            table = {}
+            total, duplicates = _group(_fingerprints(db, collection, ignore_fields), table, dup_file)
+            dup_file.flush()
+            _resolve(dup_path, table, resolved)
+        else:
+            # 1회 읽기로 fingerprint를 파티션 파일에 분산 → 파티션별로 테이블 구성
+            part_paths = [os.path.join(work_dir, f"{collection}.part{i}") for i in range(partitions)]
+            part_files = [open(p, "w", encoding="utf-8") for p in part_paths]
+            try:
+                for fp, ts, doc_id in _fingerprints(db, collection, ignore_fields):
+                    total += 1
+                    part_files[fp[0] % partitions].write(f"{fp.hex()}\t{ts!r}\t{doc_id}\n")
+            finally:
+                for f in part_files:
+                    f.close()
+            for part_path in part_paths:
+                table = {}
+                part_dup_path = part_path + ".dups"
+                with open(part_path, encoding="utf-8") as f, \
+                        open(part_dup_path, "w", encoding="utf-8") as part_dups:
+                    rows = ((bytes.fromhex(fp), float(ts), doc_id)
+                            for fp, ts, doc_id in (line.rstrip("\n").split("\t", 2) for line in f))
+                    duplicates += _group(rows, table, part_dups)[1]
+                _resolve(part_dup_path, table, resolved)
+                os.remove(part_path)
+                os.remove(part_dup_path)
+    os.remove(dup_path)
+    return resolved_path, total, duplicates
+
+
+def _resolve(dup_path, table, out):
+    """그룹핑이 끝난 뒤 각 중복의 최종 생존 문서 ID 기록"""
+    with open(dup_path, encoding="utf-8") as f:
+        for line in f:
+            fp_hex, doc_id = line.rstrip("\n").split("\t", 1)
+            out.write(f"{doc_id}\t{table[bytes.fromhex(fp_hex)][1]}\n")
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def remove_duplicates(db, collection, pairs, archive):
+    """중복 문서 삭제 (archive면 <collection>_duplicates 에 원본 보관 후 삭제)"""
+    col = db.collection(collection)
+    archive_col = db.collection(f"{collection}_duplicates")
+    per_batch = BATCH_SIZE // 2 if archive else BATCH_SIZE
+    now = datetime.now(timezone.utc)
+    removed = 0
+    for chunk in _chunks(pairs, per_batch):
+        batch = db.batch()
+        if archive:
+            survivors = dict(chunk)
+            for start in range(0, len(chunk), GET_ALL_CHUNK):
+                refs = [col.document(doc_id) for doc_id, _ in chunk[start:start + GET_ALL_CHUNK]]
+                for snap in db.get_all(refs):
+                    if not snap.exists:
+                        continue
+                    batch.set(archive_col.document(snap.id), {
+                        "data": snap.to_dict(),
+                        "duplicate_of": survivors[snap.id],
+                        "archived_at": now,
+                    })
+                    batch.delete(snap.reference)
+                    removed += 1
+        else:
+            for doc_id, _ in chunk:
+                batch.delete(col.document(doc_id))
+                removed += 1
+        batch.commit()
+    return removed
+
+
+def dedupe_documents(collections, ignore_fields, apply, archive, partitions, report_path, limit):
+    """컬렉션별 중복 탐지 및 정리"""
+
+    try:
+        db = get_db()
+
+        print("=" * 70)
+        print(f"🧹 중복 문서 정리 {'(적용)' if apply else '(dry-run)'}")
+        print("=" * 70)
+        print(f"   fingerprint 제외 필드: {', '.join(ignore_fields) or '없음'}")
+
+        report = open(report_path, "w", encoding="utf-8") if report_path else None
+        total_duplicates = 0
+        with tempfile.TemporaryDirectory(prefix="dedupe_") as work_dir:
+            for collection in collections:
+                resolved_path, total, duplicates = find_duplicates(
+                    db, collection, ignore_fields, partitions, work_dir)
+                total_duplicates += duplicates
+                print(f"\n📋 {collection}: 문서 {total:,}건, 중복 {duplicates:,}건")
+
+                def pairs():
+                    with open(resolved_path, encoding="utf-8") as f:
+                        for line in f:
+                            doc_id, survivor = line.rstrip("\n").split("\t", 1)
+                            yield doc_id, survivor
+
+                for i, (doc_id, survivor) in enumerate(pairs()):
+                    if i < limit:
+                        print(f"   - {doc_id} → 유지: {survivor}")
+                    if report:
+                        report.write(json.dumps({"collection": collection, "duplicate": doc_id,
+                                                 "survivor": survivor}, ensure_ascii=False) + "\n")
+
+                if apply and duplicates:
+                    removed = remove_duplicates(db, collection, pairs(), archive)
+                    action = "보관 후 삭제" if archive else "삭제"
+                    print(f"   ✅ {removed:,}건 {action} 완료")
+
+        if report:
+            report.close()
+            print(f"\n📝 리포트 저장: {report_path}")
+
+        print("\n" + "=" * 70)
+        if total_duplicates == 0:
+            print("✅ 중복 문서가 없습니다.")
+        elif apply:
+            print(f"✅ 총 {total_duplicates:,}건의 중복 문서 정리 완료")
+        else:
+            print(f"⚠️  총 {total_duplicates:,}건의 중복 문서 발견 (--apply 로 정리)")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__))
+
+    parser = argparse.ArgumentParser(description="중복 문서 탐지 및 정리")
+    parser.add_argument("--collections", nargs="+", default=DEFAULT_COLLECTIONS)
+    parser.add_argument("--ignore-fields", nargs="*", default=DEFAULT_IGNORE_FIELDS,
+                        help="fingerprint에서 제외할 최상위 필드")
+    parser.add_argument("--apply", action="store_true", help="실제로 삭제 (기본은 dry-run)")
+    parser.add_argument("--archive", action="store_true", help="삭제 전 <collection>_duplicates 에 보관")
+    parser.add_argument("--partitions", type=int, default=1, help="fingerprint 테이블 분할 수")
+    parser.add_argument("--report", help="중복 목록 JSONL 경로")
+    parser.add_argument("--limit", type=int, default=10, help="컬렉션별 출력할 중복 수")
+    args = parser.parse_args()
+
+    success = dedupe_documents(args.collections, args.ignore_fields, args.apply, args.archive,
+                               args.partitions, args.report, args.limit)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Firestore 증분(delta) 백업 / 압축(compaction) / 복원
+
+백업 디렉토리 구조:
+    backup_state.json          현재 base, delta 목록, 컬렉션별 watermark
+    base-<시각>/               전체 스냅샷 (firestore_snapshot.py 형식)
+    delta-<시각>/              <collection>.jsonl (변경 문서) + <collection>.deleted.txt (삭제 ID)
+    ids/<collection>.txt       삭제 감지용 문서 ID 목록 (--detect-deletes 사용 시)
+
+delta 백업은 문서의 update_time 이 지난 백업의 watermark 보다 새로운 문서만 기록한다.
+Firestore는 update_time 으로 쿼리할 수 없으므로 두 가지 방식이 있다:
+    --mode field  (기본) updated_at / created_at >= watermark 로 후보만 조회. 읽기가 변경량에 비례하지만
+                  이 필드를 갱신하지 않는 쓰기(fix_missing_organization_id.py,
+                  fix_guardian_patient_link.py 등)는 빠진다 — 그런 스크립트를 돌린 뒤에는 scan 으로 실행
+    --mode scan   전체를 읽고 update_time 으로 거름. 읽기는 컬렉션 크기, 쓰기는 변경량에 비례
+                  (--detect-deletes 는 이 조회에서 모은 ID 목록을 그대로 사용)
+
+사용법:
+    python scripts/firestore_backup.py full --root backups
+    python scripts/firestore_backup.py delta --root backups            # 매일 밤
+    python scripts/firestore_backup.py compact --root backups          # 주 1회: base + delta → 새 base
+    python scripts/firestore_backup.py restore --root backups --collections patients --dry-run
+    python scripts/firestore_backup.py status --root backups
+"""
+
+import argparse
+import heapq
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta, timezone
+
+from firestore_common import get_db, iter_collection
+from firestore_snapshot import (
+    DEFAULT_COLLECTIONS,
+    MANIFEST,
+    SnapshotReader,
+    decode_doc_line,
+    encode_doc_line,
+    write_collection,
+    write_manifest,
+)
+
+STATE_FILE = "backup_state.json"
+TIMESTAMP_FIELDS = ("updated_at", "created_at")
+CHANGE_MODES = ("field", "scan")
+BATCH_SIZE = 500
+DEFAULT_OVERLAP = timedelta(minutes=10)
+_DELETED = object()
+
+
+# ---------------------------------------------------------------------------
+# 상태 파일
+# ---------------------------------------------------------------------------
+
+
+def _new_dir(root, prefix):
+    """<prefix>-<UTC 시각> 디렉토리 생성 (같은 초에 여러 번 실행해도 겹치지 않게 번호 추가)"""
+    tag = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    name = f"{prefix}-{tag}"
+    seq = 1
+    while os.path.exists(os.path.join(root, name)):
+        seq += 1
+        name = f"{prefix}-{tag}-{seq}"
+    os.makedirs(os.path.join(root, name))
+    return name, os.path.join(root, name)
+
+
+def load_state(root):
+    path = os.path.join(root, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(root, state):
+    path = os.path.join(root, STATE_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _ids_path(root, collection):
+    return os.path.join(root, "ids", f"{collection}.txt")
+
+
+def _read_ids(root, collection):
+    path = _ids_path(root, collection)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def _write_ids(root, collection, ids):
+    path = _ids_path(root, collection)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        for doc_id in sorted(ids):
+            f.write(doc_id + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def run_watermark(overlap=DEFAULT_OVERLAP):
+    """
+    이번 실행이 남길 watermark = 조회 시작 시각 - overlap (조회 전에 호출)
+
+    본 문서들의 최대 update_time 을 쓰면, 조회 중에 커밋돼 그보다 이른 update_time 을 가진 쓰기를
+    다음 실행이 영영 건너뛴다. 시작 시각 기준이면 다음 실행이 그 구간을 다시 읽는다 (다시 반영해도 같은 결과).
+    overlap 은 로컬 시계와 서버 시계의 차이도 흡수한다.
+    """
+    return datetime.now(timezone.utc) - overlap
+
+
+# ---------------------------------------------------------------------------
+# 전체 / 증분 백업
+# ---------------------------------------------------------------------------
+
+
+def full_backup(db, root, collections, page_size):
+    """전체 스냅샷을 새 base로 기록하고 delta 목록 초기화"""
+    name, out_dir = _new_dir(root, "base")
+
+    reader = SnapshotReader(out_dir)
+    summary = {}
+    state = {"base": name, "deltas": [], "collections": {}}
+    for collection in collections:
+        mark = run_watermark()
+        count, size = write_collection(db, collection, out_dir, page_size)
+        summary[collection] = {"count": count, "bytes": size}
+        state["collections"][collection] = {"watermark": mark.isoformat()}
+        _write_ids(root, collection, (doc_id for doc_id, _, _ in reader.iter_docs(collection)))
+        print(f"   ✅ {collection}: {count:,}건 ({size / 1024:,.1f} KB)")
+
+    write_manifest(out_dir, "full", summary)
+    save_state(root, state)
+    return name
+
+
+def add_mode_argument(parser):
+    """변경분 조회 방식 옵션 (firestore_backup / firestore_replica / search_index / assessment_norms 공통)"""
+    parser.add_argument("--mode", choices=CHANGE_MODES, default="field",
+                        help="변경분 조회 방식 (field: updated_at/created_at >= watermark 조회 — 모든 쓰기가 "
+                             "updated_at 을 갱신할 때만 안전, scan: 전체 읽고 update_time 비교)")
+
+
+def warn_field_mode(mode):
+    if mode == "field":
+        print("⚠️  --mode field: updated_at / created_at 을 갱신하지 않는 쓰기는 변경분에서 빠집니다.")
+        print("    (fix_missing_organization_id.py, fix_guardian_patient_link.py 등) "
+              "놓친 변경은 --mode scan 또는 --full 로 다시 실행해야 반영됩니다.")
+
+
+def _scans(watermark, mode):
+    """_changed_docs 가 컬렉션 전체를 읽는지 (첫 실행 또는 scan)"""
+    return watermark is None or mode == "scan"
+
+
+def _changed_docs(db, collection, watermark, mode, overlap, ids=None):
+    """
+    watermark 이후 변경된 문서 스냅샷 (문서 ID 기준 중복 제거)
+    mode="field" 는 updated_at / created_at 을 갱신하지 않는 쓰기를 놓친다 (warn_field_mode)
+    전체를 읽는 경우 ids 에 모든 문서 ID 를 모아 삭제 감지에 다시 쓸 수 있게 한다
+    """
+    if _scans(watermark, mode):
+        for doc in iter_collection(db, collection):
+            if ids is not None:
+                ids.add(doc.id)
+            if watermark is None or (doc.update_time and doc.update_time > watermark):
+                yield doc
+        return
+
+    # 앱이 기록하는 시각 필드는 클라이언트 시계일 수 있으므로 overlap 만큼 앞당겨 조회
+    since = watermark - overlap
+    seen = set()
+    for field in TIMESTAMP_FIELDS:
+        query = db.collection(collection).where(field, ">=", since)
+        for doc in query.stream():
+            if doc.id in seen:
+                continue
+            seen.add(doc.id)
+            if doc.update_time and doc.update_time > watermark:
+                yield doc
+
+
+def _list_ids(db, collection):
+    """삭제 감지용 ID 목록 (필드 없이 문서 이름만 조회)"""
+    return {doc.id for doc in db.collection(collection).select([]).stream()}
+
+
+def delta_backup(db, root, state, collections, mode, overlap, detect_deletes):
+    """watermark 이후 변경분만 delta 디렉토리에 기록"""
+    name, out_dir = _new_dir(root, "delta")
+
+    summary = {}
+    for collection in collections:
+        info = state["collections"].setdefault(collection, {"watermark": None})
+        watermark = datetime.fromisoformat(info["watermark"]) if info["watermark"] else None
+
+        mark = run_watermark(overlap)
+        scanned = set()
+        changed = sorted(_changed_docs(db, collection, watermark, mode, overlap, scanned), key=lambda d: d.id)
+        size = 0
+        if changed:
+            with open(os.path.join(out_dir, f"{collection}.jsonl"), "w", encoding="utf-8") as f:
+                for doc in changed:
+                    line = encode_doc_line(doc.id, doc.to_dict(), doc.update_time)
+                    f.write(line)
+                    size += len(line.encode("utf-8"))
+
+        deleted = []
+        if detect_deletes:
+            known = _read_ids(root, collection)
+            current = scanned if _scans(watermark, mode) else _list_ids(db, collection)
+            if known is not None:
+                deleted = sorted(known - current)
+            if deleted:
+                with open(os.path.join(out_dir, f"{collection}.deleted.txt"), "w", encoding="utf-8") as f:
+                    for doc_id in deleted:
+                        f.write(doc_id + "\n")
+            _write_ids(root, collection, current)
+
+        info["watermark"] = mark.isoformat()
+        summary[collection] = {"count": len(changed), "deleted": len(deleted), "bytes": size}
+        print(f"   ✅ {collection}: 변경 {len(changed):,}건, 삭제 {len(deleted):,}건 ({size / 1024:,.1f} KB)")
+
+    write_manifest(out_dir, "delta", summary)
+    state["deltas"].append(name)
+    save_state(root, state)
+    return name
+
+
+# ---------------------------------------------------------------------------
+# base + delta 병합 (압축/복원 공용)
+# ---------------------------------------------------------------------------
+
+
+def _delta_overrides(root, deltas, collection):
+    """delta들을 순서대로 적용한 {doc_id: line | _DELETED} (delta는 작으므로 메모리에 적재)"""
+    overrides = {}
+    for name in deltas:
+        delta_dir = os.path.join(root, name)
+        path = os.path.join(delta_dir, f"{collection}.jsonl")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    overrides[json.loads(line)["id"]] = line
+        deleted_path = os.path.join(delta_dir, f"{collection}.deleted.txt")
+        if os.path.exists(deleted_path):
+            with open(deleted_path, encoding="utf-8") as f:
+                for doc_id in f:
+                    overrides[doc_id.rstrip("\n")] = _DELETED
+    return overrides
+
+
+def merged_lines(root, state, collection):
+    """base(ID 순 스트림)와 delta를 병합한 최종 (doc_id, line)을 ID 순으로 생성"""
+    overrides = _delta_overrides(root, state["deltas"], collection)
+    base_path = os.path.join(root, state["base"], f"{collection}.jsonl")
+
+    def base_rows():
+        if not os.path.exists(base_path):
+            return
+        with open(base_path, encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)["id"], line
+
+    def delta_rows():
+        for doc_id in sorted(overrides):
+            yield doc_id, overrides[doc_id]
+
+    previous = None
+    for doc_id, line in heapq.merge(delta_rows(), base_rows(), key=lambda row: row[0]):
+        # 같은 ID는 delta가 먼저 나오므로 base 버전은 건너뛴다
+        if doc_id == previous:
+            continue
+        previous = doc_id
+        if line is not _DELETED:
+            yield doc_id, line
+
+
+def compact(root, state, keep):
+    """base + delta를 새 base로 병합"""
+    name, out_dir = _new_dir(root, "base")
+
+    summary = {}
+    for collection in state["collections"]:
+        count = 0
+        size = 0
+        path = os.path.join(out_dir, f"{collection}.jsonl")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for _, line in merged_lines(root, state, collection):
+                f.write(line)
+                size += len(line.encode("utf-8"))
+                count += 1
+        os.replace(path + ".tmp", path)
+        summary[collection] = {"count": count, "bytes": size}
+        print(f"   ✅ {collection}: {count:,}건 ({size / 1024:,.1f} KB)")
+
+    write_manifest(out_dir, "compact", summary)
+    old = [state["base"]] + state["deltas"]
+    state["base"] = name
+    state["deltas"] = []
+    save_state(root, state)
+    if not keep:
+        for old_name in old:
+            shutil.rmtree(os.path.join(root, old_name), ignore_errors=True)
+    return name
+
+
+def restore(db, root, state, collections, dry_run, delete_extra):
+    """base + delta의 최종 상태를 batch write로 복원"""
+    for collection in collections:
+        col = db.collection(collection)
+        batch = db.batch()
+        restored = 0
+        restored_ids = set() if delete_extra else None
+        for doc_id, line in merged_lines(root, state, collection):
+            _, data, _ = decode_doc_line(line, db)
+            restored += 1
+            if restored_ids is not None:
+                restored_ids.add(doc_id)
+            if dry_run:
+                continue
+            batch.set(col.document(doc_id), data)
+            if len(batch) >= BATCH_SIZE:
+                batch.commit()
+                batch = db.batch()
+        if not dry_run and len(batch):
+            batch.commit()
+
+        removed = 0
+        if restored_ids is not None:
+            batch = db.batch()
+            for doc in col.select([]).stream():
+                if doc.id in restored_ids:
+                    continue
+                removed += 1
+                if dry_run:
+                    continue
+                batch.delete(doc.reference)
+                if len(batch) >= BATCH_SIZE:
+                    batch.commit()
+                    batch = db.batch()
+            if not dry_run and len(batch):
+                batch.commit()
+
+        prefix = "(dry-run) " if dry_run else ""
+        print(f"   ✅ {prefix}{collection}: 복원 {restored:,}건, 백업에 없는 문서 삭제 {removed:,}건")
+
+
+def print_status(root, state):
+    print(f"   base: {state['base']}")
+    print(f"   delta: {len(state['deltas'])}개")
+    for name in [state["base"]] + state["deltas"]:
+        manifest_path = os.path.join(root, name, MANIFEST)
+        if not os.path.exists(manifest_path):
+            continue
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        total = sum(c.get("bytes", 0) for c in manifest["collections"].values())
+        docs = sum(c.get("count", 0) for c in manifest["collections"].values())
+        print(f"   - {name}: {docs:,}건, {total / 1024:,.1f} KB")
+    for collection, info in state["collections"].items():
+        print(f"   {collection}: watermark {info['watermark']}")
+
+
+def firestore_backup(args):
+    """백업 명령 실행"""
+
+    try:
+        print("=" * 70)
+        print(f"💾 Firestore 백업 - {args.command}")
+        print("=" * 70)
+
+        os.makedirs(args.root, exist_ok=True)
+        state = load_state(args.root)
+        if args.command != "full" and state is None:
+            print(f"❌ 백업 상태가 없습니다: {args.root}/{STATE_FILE}")
+            print("💡 먼저 full 백업을 실행하세요.")
+            return False
+
+        if args.command == "full":
+            name = full_backup(get_db(args.cred), args.root, args.collections or DEFAULT_COLLECTIONS,
+                               args.page_size)
+        elif args.command == "delta":
+            warn_field_mode(args.mode)
+            collections = args.collections or list(state["collections"])
+            name = delta_backup(get_db(args.cred), args.root, state, collections, args.mode,
+                                timedelta(minutes=args.overlap_minutes), args.detect_deletes)
+        elif args.command == "compact":
+            name = compact(args.root, state, args.keep)
+        elif args.command == "restore":
+            collections = args.collections or list(state["collections"])
+            restore(get_db(args.cred), args.root, state, collections, args.dry_run, args.delete_extra)
+            name = None
+        else:
+            print_status(args.root, state)
+            name = None
+
+        print("\n" + "=" * 70)
+        print(f"✅ 완료{f': {name}' if name else ''}")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--root": None}))
+
+    parser = argparse.ArgumentParser(description="Firestore 증분 백업")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--root", required=True, help="백업 디렉토리")
+        p.add_argument("--collections", nargs="+")
+        p.add_argument("--cred", help="Admin SDK JSON (기본: /opt/flutter/firebase-admin-sdk.json)")
+        return p
+
+    common(sub.add_parser("full", help="전체 스냅샷 (새 base)")).add_argument(
+        "--page-size", type=int, default=1000)
+    delta_p = common(sub.add_parser("delta", help="지난 백업 이후 변경분"))
+    add_mode_argument(delta_p)
+    delta_p.add_argument("--overlap-minutes", type=float, default=10.0)
+    delta_p.add_argument("--detect-deletes", action="store_true", help="문서 ID 목록을 비교해 삭제 기록")
+    common(sub.add_parser("compact", help="base + delta 병합")).add_argument(
+        "--keep", action="store_true", help="이전 base/delta 유지")
+    restore_p = common(sub.add_parser("restore", help="base + delta 복원"))
+    restore_p.add_argument("--dry-run", action="store_true")
+    restore_p.add_argument("--delete-extra", action="store_true", help="백업에 없는 문서 삭제")
+    common(sub.add_parser("status", help="백업 상태"))
+
+    args = parser.parse_args()
+    success = firestore_backup(args)
+    sys.exit(0 if success else 1)
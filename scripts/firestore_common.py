@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+scripts/ 공용 Firestore 헬퍼
+- Admin SDK 초기화 (기존 스크립트와 동일한 경로/방식)
+- JSON 직렬화용 값 인코딩/디코딩 (datetime 등 Firestore 타입 보존)
+- 문서 내용 해시, 컬렉션 페이지 단위 순회
+"""
+
+import base64
+import hashlib
+import json
+from collections import namedtuple
+from datetime import datetime, timezone
+
+ADMIN_SDK_PATH = "/opt/flutter/firebase-admin-sdk.json"
+
+
+def get_db(cred_path=None):
+    """
+    Firebase Admin SDK 초기화 후 Firestore 클라이언트 반환
+    cred_path를 주면 해당 프로젝트용 앱을 별도 이름으로 초기화 (스테이징/운영 비교 등)
+    """
+    # firebase_admin은 실제 연결 시에만 필요 (firestore_fake.install() 이후에도 동작)
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    if cred_path and cred_path != ADMIN_SDK_PATH:
+        if cred_path not in firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.Certificate(cred_path), name=cred_path)
+        return firestore.client(firebase_admin._apps[cred_path])
+
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(ADMIN_SDK_PATH)
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+
+def iter_collection(db, collection, page_size=1000, start_after_id=None):
+    """문서 ID 순으로 페이지 단위 순회 (대용량 컬렉션을 한 번에 메모리에 올리지 않음)"""
+    col = db.collection(collection)
+    last = col.document(start_after_id) if start_after_id else None
+    while True:
+        query = col.order_by("__name__").limit(page_size)
+        if last is not None:
+            query = query.start_after([last])
+        page = list(query.stream())
+        for doc in page:
+            yield doc
+        if len(page) < page_size:
+            return
+        last = page[-1].reference
+
+
+class DocumentPath(str):
+    """db 없이 복원한 참조: 경로 문자열처럼 동작하고 encode_value() 하면 다시 {"$ref": 경로}"""
+
+    __slots__ = ()
+
+    @property
+    def path(self):
+        return str(self)
+
+    @property
+    def id(self):
+        return self.rsplit("/", 1)[-1]
+
+
+# 복원한 GeoPoint: (위도, 경도) 튜플처럼 동작하고 encode_value() 하면 다시 {"$geo": [...]}
+GeoPoint = namedtuple("GeoPoint", "latitude longitude")
+
+
+def encode_value(value):
+    """Firestore 값을 JSON 저장 가능한 형태로 변환 (타입 태그 보존)"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return {"$ts": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"$bytes": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, dict):
+        return {k: encode_value(v) for k, v in value.items()}
+    if hasattr(value, "path") and hasattr(value, "id"):
+        # DocumentReference / DocumentPath
+        return {"$ref": value.path}
+    if hasattr(value, "latitude") and hasattr(value, "longitude"):
+        return {"$geo": [value.latitude, value.longitude]}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(v) for v in value]
+    return value
+
+
+def decode_value(value, db=None):
+    """
+    encode_value()로 변환한 값을 원래 타입으로 복원
+    참조는 db 가 있으면 DocumentReference 로, 없으면 DocumentPath 로 (Firestore 에 다시 쓸 때는 db 필수)
+    decode_value → encode_value 는 원래 인코딩을 그대로 돌려주므로 doc_hash 가 실제 문서와 같다.
+    """
+    if isinstance(value, dict):
+        if len(value) == 1:
+            if "$ts" in value:
+                return datetime.fromisoformat(value["$ts"])
+            if "$bytes" in value:
+                return base64.b64decode(value["$bytes"])
+            if "$ref" in value:
+                return db.document(value["$ref"]) if db is not None else DocumentPath(value["$ref"])
+            if "$geo" in value:
+                return GeoPoint(*value["$geo"])
+        return {k: decode_value(v, db) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_value(v, db) for v in value]
+    return value
+
+
+def canonical_json(data, ignore_fields=()):
+    """필드 순서와 무관한 정규화 JSON (ignore_fields의 최상위 필드는 제외)"""
+    if ignore_fields:
+        data = {k: v for k, v in data.items() if k not in ignore_fields}
+    return json.dumps(encode_value(data), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def doc_hash(data, ignore_fields=()):
+    """문서 내용 해시 (16바이트)"""
+    return hashlib.sha256(canonical_json(data, ignore_fields).encode("utf-8")).digest()[:16]
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Firestore Merkle 해시 비교 (운영 vs 스냅샷, 스테이징 vs 운영)
+
+문서별 내용 해시를 문서 ID 범위 버킷(leaf)으로 묶어 컬렉션별 Merkle 트리를 만들고,
+두 원본의 트리를 루트부터 비교해 해시가 다른 버킷만 내려가 실제 문서를 읽는다.
+트리는 --cache-dir 에 저장되므로 한쪽 해시가 캐시되어 있으면
+Firestore에서는 차이가 있는 버킷 범위의 문서만 읽는다.
+
+원본 지정:
+    firestore                   기본 Admin SDK (/opt/flutter/firebase-admin-sdk.json)
+    firestore:<cred.json>       다른 프로젝트 (스테이징 등)
+    snapshot:<dir> 또는 <dir>   firestore_snapshot.py 로 만든 스냅샷
+
+사용법:
+    # 마이그레이션 전 스냅샷과 현재 운영 비교
+    python scripts/firestore_diff.py snapshot:snapshots/before firestore --collections appointments
+
+    # 운영 트리는 지난 실행 결과를 신뢰 (운영 쪽은 다른 버킷만 읽음)
+    python scripts/firestore_diff.py firestore:/opt/flutter/staging.json firestore --trust-cache b
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from firestore_common import doc_hash, get_db, iter_collection
+from firestore_snapshot import SnapshotReader
+
+DEFAULT_CACHE_DIR = ".merkle_cache"
+DEFAULT_BUCKET_SIZE = 256
+_EMPTY = hashlib.sha256(b"").digest()
+
+
+# ---------------------------------------------------------------------------
+# 원본 (Firestore / 스냅샷)
+# ---------------------------------------------------------------------------
+
+
+class FirestoreSource:
+    live = True
+
+    def __init__(self, cred_path=None):
+        self.cred_path = cred_path
+        self.label = f"firestore:{cred_path}" if cred_path else "firestore"
+        self.key = "firestore_" + hashlib.sha1((cred_path or "default").encode()).hexdigest()[:12]
+        self.db = get_db(cred_path)
+        self.reads = 0
+
+    def fingerprint(self, collection):
+        return None
+
+    def iter_docs(self, collection):
+        """(doc_id, data, offset) — ID 순"""
+        for doc in iter_collection(self.db, collection):
+            self.reads += 1
+            yield doc.id, doc.to_dict(), None
+
+    def read_range(self, collection, lo, hi, offset=None):
+        col = self.db.collection(collection)
+        query = col.order_by("__name__")
+        if lo:
+            query = query.start_at([col.document(lo)])
+        if hi is not None:
+            query = query.end_before([col.document(hi)])
+        for doc in query.stream():
+            self.reads += 1
+            yield doc.id, doc.to_dict()
+
+
+class SnapshotFileSource:
+    live = False
+
+    def __init__(self, path):
+        self.reader = SnapshotReader(path)
+        self.label = f"snapshot:{path}"
+        self.key = "snapshot_" + hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+        self.reads = 0
+
+    def fingerprint(self, collection):
+        if not os.path.exists(self.reader.collection_file(collection)):
+            return [0, 0]
+        return self.reader.fingerprint(collection)
+
+    def iter_docs(self, collection):
+        for doc_id, data, _, offset in self.reader.iter_docs(collection, with_offsets=True):
+            yield doc_id, data, offset
+
+    def read_range(self, collection, lo, hi, offset=None):
+        if offset is None:
+            rows = ((i, d) for i, d, _ in self.reader.iter_docs(collection) if i >= lo)
+        else:
+            rows = ((i, d) for i, d, _ in self.reader.read_range(collection, offset))
+        for doc_id, data in rows:
+            if hi is not None and doc_id >= hi:
+                return
+            yield doc_id, data
+
+
+def open_source(spec):
+    if spec == "firestore":
+        return FirestoreSource()
+    if spec.startswith("firestore:"):
+        return FirestoreSource(spec[len("firestore:"):])
+    if spec.startswith("snapshot:"):
+        spec = spec[len("snapshot:"):]
+    if not os.path.isdir(spec):
+        raise ValueError(f"알 수 없는 원본: {spec}")
+    return SnapshotFileSource(spec)
+
+
+# ---------------------------------------------------------------------------
+# Merkle 트리
+# ---------------------------------------------------------------------------
+
+
+class MerkleTree:
+    """leaf = 문서 ID 범위 버킷, 내부 노드 = 자식 해시의 해시"""
+
+    def __init__(self, boundaries, leaves):
+        # boundaries[i] = leaf i의 시작 ID (boundaries[0] == ""), leaves[i] = [count, hex, offset]
+        self.boundaries = boundaries
+        self.leaves = leaves
+        level = [bytes.fromhex(leaf[1]) for leaf in leaves] or [_EMPTY]
+        self.levels = [level]
+        while len(level) > 1:
+            level = [hashlib.sha256(b"".join(level[i:i + 2])).digest() for i in range(0, len(level), 2)]
+            self.levels.append(level)
+
+    @property
+    def root(self):
+        return self.levels[-1][0]
+
+    @property
+    def count(self):
+        return sum(leaf[0] for leaf in self.leaves)
+
+    def leaf_range(self, index):
+        lo = self.boundaries[index]
+        hi = self.boundaries[index + 1] if index + 1 < len(self.boundaries) else None
+        return lo, hi
+
+    def mismatched_leaves(self, other):
+        """루트에서부터 해시가 다른 노드만 내려가 다른 leaf 인덱스 반환"""
+        result = []
+        stack = [(len(self.levels) - 1, 0)]
+        while stack:
+            depth, index = stack.pop()
+            if self.levels[depth][index] == other.levels[depth][index]:
+                continue
+            if depth == 0:
+                result.append(index)
+                continue
+            for child in (2 * index + 1, 2 * index):
+                if child < len(self.levels[depth - 1]):
+                    stack.append((depth - 1, child))
+        return sorted(result)
+
+
+def build_tree(rows, boundaries=None, bucket_size=DEFAULT_BUCKET_SIZE, ignore_fields=()):
+    """
+    ID 순으로 들어오는 (doc_id, data, offset)로 트리 생성
+    boundaries가 없으면 bucket_size 문서마다 새 leaf를 열어 경계를 함께 정한다 (1회 순회)
+    """
+    new_layout = boundaries is None
+    boundaries = [""] if new_layout else boundaries
+    leaves = [[0, None, None] for _ in boundaries]
+    hasher = hashlib.sha256()
+    current = 0
+
+    def close(index):
+        if leaves[index][1] is None:
+            leaves[index][1] = hasher.hexdigest() if leaves[index][0] else _EMPTY.hex()
+
+    for doc_id, data, offset in rows:
+        if new_layout:
+            if leaves[current][0] >= bucket_size:
+                close(current)
+                boundaries.append(doc_id)
+                leaves.append([0, None, None])
+                hasher = hashlib.sha256()
+                current += 1
+            index = current
+        else:
+            index = bisect.bisect_right(boundaries, doc_id) - 1
+            if index != current:
+                close(current)
+                hasher = hashlib.sha256()
+                current = index
+        leaf = leaves[index]
+        if leaf[0] == 0:
+            leaf[2] = offset
+        leaf[0] += 1
+        hasher.update(doc_id.encode("utf-8") + b"\0" + doc_hash(data, ignore_fields))
+    close(current)
+    for leaf in leaves:
+        if leaf[1] is None:
+            leaf[1] = _EMPTY.hex()
+    return MerkleTree(boundaries, leaves)
+
+
+# ---------------------------------------------------------------------------
+# 캐시
+# ---------------------------------------------------------------------------
+
+
+class TreeCache:
+    """
+    <cache_dir>/layouts/<collection>.json          버킷 경계 (모든 원본이 공유)
+    <cache_dir>/trees/<source_key>/<collection>.json  leaf [count, hash, offset]
+    """
+
+    def __init__(self, cache_dir, ignore_fields):
+        self.cache_dir = cache_dir
+        self.ignore_fields = tuple(sorted(ignore_fields))
+
+    def _path(self, *parts):
+        path = os.path.join(self.cache_dir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    @staticmethod
+    def _read(path):
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write(path, payload):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def layout_digest(self, boundaries):
+        payload = json.dumps([boundaries, self.ignore_fields], ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def load_layout(self, collection):
+        layout = self._read(self._path("layouts", f"{collection}.json"))
+        return layout["boundaries"] if layout else None
+
+    def save_layout(self, collection, boundaries):
+        self._write(self._path("layouts", f"{collection}.json"), {"boundaries": boundaries})
+
+    def drop_collection(self, collection):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name == f"{collection}.json":
+                    os.remove(os.path.join(root, name))
+
+    def load_tree(self, source, collection, boundaries, fingerprint):
+        cached = self._read(self._path("trees", source.key, f"{collection}.json"))
+        if not cached or cached["layout"] != self.layout_digest(boundaries):
+            return None, None
+        if fingerprint is not None and cached.get("fingerprint") != fingerprint:
+            return None, None
+        return MerkleTree(boundaries, cached["leaves"]), cached.get("built_at")
+
+    def save_tree(self, source, collection, tree, fingerprint):
+        self._write(self._path("trees", source.key, f"{collection}.json"), {
+            "source": source.label,
+            "layout": self.layout_digest(tree.boundaries),
+            "fingerprint": fingerprint,
+            "built_at": datetime.now(timezone.utc).isoformat(),
+            "leaves": tree.leaves,
+        })
+
+
+def get_tree(source, collection, cache, trust_cache, bucket_size):
+    """캐시된 트리를 쓰거나 원본을 한 번 순회해 트리 생성 → (tree, 설명)"""
+    boundaries = cache.load_layout(collection)
+    fingerprint = source.fingerprint(collection)
+    if boundaries is not None and (trust_cache or not source.live):
+        tree, built_at = cache.load_tree(source, collection, boundaries, fingerprint)
+        if tree is not None:
+            return tree, f"캐시 사용 ({built_at})"
+
+    tree = build_tree(source.iter_docs(collection), boundaries, bucket_size, cache.ignore_fields)
+    if boundaries is None:
+        cache.save_layout(collection, tree.boundaries)
+    cache.save_tree(source, collection, tree, fingerprint)
+    return tree, f"전체 순회 ({tree.count:,}건)"
+
+
+# ---------------------------------------------------------------------------
+# 비교
+# ---------------------------------------------------------------------------
+
+
+def changed_fields(a, b, ignore_fields=()):
+    keys = (set(a) | set(b)) - set(ignore_fields)
+    return sorted(k for k in keys if doc_hash({"v": a.get(k)}) != doc_hash({"v": b.get(k)}))
+
+
+def diff_collection(collection, source_a, source_b, cache, trust, bucket_size):
+    tree_a, note_a = get_tree(source_a, collection, cache, "a" in trust, bucket_size)
+    tree_b, note_b = get_tree(source_b, collection, cache, "b" in trust, bucket_size)
+    print(f"\n📋 {collection}")
+    print(f"   A: {note_a}")
+    print(f"   B: {note_b}")
+
+    result = {"only_a": [], "only_b": [], "changed": {}, "buckets": 0}
+    if tree_a.root == tree_b.root:
+        print("   ✅ 동일 (루트 해시 일치)")
+        return result
+
+    leaves = tree_a.mismatched_leaves(tree_b)
+    result["buckets"] = len(leaves)
+    print(f"   🔍 다른 버킷: {len(leaves):,} / {len(tree_a.leaves):,}")
+
+    for index in leaves:
+        lo, hi = tree_a.leaf_range(index)
+        docs_a, docs_b = ({} if tree.leaves[index][0] == 0
+                          else dict(source.read_range(collection, lo, hi, tree.leaves[index][2]))
+                          for source, tree in ((source_a, tree_a), (source_b, tree_b)))
+        for doc_id in sorted(docs_a.keys() | docs_b.keys()):
+            if doc_id not in docs_b:
+                result["only_a"].append(doc_id)
+            elif doc_id not in docs_a:
+                result["only_b"].append(doc_id)
+            elif doc_hash(docs_a[doc_id], cache.ignore_fields) != doc_hash(docs_b[doc_id], cache.ignore_fields):
+                result["changed"][doc_id] = changed_fields(docs_a[doc_id], docs_b[doc_id], cache.ignore_fields)
+    return result
+
+
+def print_result(result, limit):
+    for label, ids in (("A에만 있음", result["only_a"]), ("B에만 있음", result["only_b"])):
+        if ids:
+            print(f"   ➖ {label}: {len(ids):,}건")
+            for doc_id in ids[:limit]:
+                print(f"      - {doc_id}")
+    if result["changed"]:
+        print(f"   ✏️  내용 변경: {len(result['changed']):,}건")
+        for doc_id, fields in list(result["changed"].items())[:limit]:
+            print(f"      - {doc_id}: {', '.join(fields)}")
+
+
+def firestore_diff(spec_a, spec_b, collections, cache_dir, trust, bucket_size,
+                   ignore_fields, relayout, limit, report_path):
+    """두 원본의 컬렉션 비교"""
+
+    try:
+        source_a = open_source(spec_a)
+        source_b = open_source(spec_b)
+        cache = TreeCache(cache_dir, ignore_fields)
+
+        print("=" * 70)
+        print("🔍 Firestore Merkle 비교")
+        print("=" * 70)
+        print(f"   A: {source_a.label}")
+        print(f"   B: {source_b.label}")
+
+        if not collections:
+            names = set()
+            for source in (source_a, source_b):
+                if not source.live:
+                    names.update(source.reader.collections())
+            collections = sorted(names)
+
+        report = {}
+        differences = 0
+        for collection in collections:
+            if relayout:
+                cache.drop_collection(collection)
+            result = diff_collection(collection, source_a, source_b, cache, trust, bucket_size)
+            print_result(result, limit)
+            report[collection] = result
+            differences += len(result["only_a"]) + len(result["only_b"]) + len(result["changed"])
+
+        print("\n" + "=" * 70)
+        for name, source in (("A", source_a), ("B", source_b)):
+            if source.live:
+                print(f"📊 {name} Firestore 문서 읽기: {source.reads:,}건")
+        if differences:
+            print(f"❌ 차이 {differences:,}건")
+        else:
+            print("✅ 차이 없음")
+        print("=" * 70)
+
+        if report_path:
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"📝 리포트 저장: {report_path}")
+
+        return differences == 0
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Firestore Merkle 해시 비교")
+    parser.add_argument("source_a", help="firestore | firestore:<cred.json> | snapshot:<dir>")
+    parser.add_argument("source_b", help="firestore | firestore:<cred.json> | snapshot:<dir>")
+    parser.add_argument("--collections", nargs="+", help="비교할 컬렉션 (기본: 스냅샷에 있는 전체)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--trust-cache", nargs="*", choices=["a", "b"], default=[],
+                        help="Firestore 원본의 캐시된 트리를 그대로 사용 (스냅샷은 항상 캐시 사용)")
+    parser.add_argument("--bucket-size", type=int, default=DEFAULT_BUCKET_SIZE, help="새 경계 생성 시 버킷당 문서 수")
+    parser.add_argument("--ignore-fields", nargs="*", default=[], help="해시에서 제외할 최상위 필드")
+    parser.add_argument("--relayout", action="store_true", help="버킷 경계를 다시 계산")
+    parser.add_argument("--limit", type=int, default=20, help="출력할 문서 ID 수")
+    parser.add_argument("--report", help="전체 결과 JSON 경로")
+    args = parser.parse_args()
+
+    success = firestore_diff(args.source_a, args.source_b, args.collections, args.cache_dir,
+                             set(args.trust_cache), args.bucket_size, args.ignore_fields,
+                             args.relayout, args.limit, args.report)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,1544 @@
+#!/usr/bin/env python3
+"""
+인메모리 Firestore 엔진 (로컬 테스트/벤치마크용)
+
+scripts/ 의 스크립트가 사용하는 firebase_admin.firestore API 부분집합을 구현:
+  collection / document / get / stream / where / order_by / limit / offset /
+  start_at / start_after / end_at / end_before / select / add / set(merge) /
+  update / delete / ArrayUnion / ArrayRemove / Increment / SERVER_TIMESTAMP /
+  DELETE_FIELD / batch / transaction / get_all / collection_group / count /
+  write_option(last_update_time / exists) 전제 조건
+
+쿼리는 필드별 해시 인덱스(==, in, array_contains)와 정렬 인덱스(범위/정렬)를
+필요할 때 만들고 이후 쓰기마다 갱신하므로, 동등/범위 조건이 전체 스캔을 하지 않는다.
+정렬 인덱스는 쓰기를 모아 두었다가 다음 조회 때 반영하고, load() 는 인덱스를
+버린 뒤 첫 쿼리에서 한 번 정렬해 다시 만든다 (대량 적재가 문서 수에 선형).
+지연(latency)/오류/쓰기 속도 제한을 주입할 수 있어 성능 테스트에 사용한다.
+
+사용법:
+    # 기존 스크립트를 수정 없이 가짜 Firestore 위에서 실행
+    python scripts/firestore_fake.py run scripts/verify_organization_id.py --seed seed.json
+    python scripts/firestore_fake.py run scripts/fix_missing_organization_id.py \\
+        --seed seed.json --latency-ms 20 --error-rate 0.01 -- <스크립트 인자>
+
+    # 인덱스 성능 벤치마크
+    python scripts/firestore_fake.py bench --docs 1000000
+"""
+
+import argparse
+import bisect
+import contextlib
+import gc
+import itertools
+import json
+import random
+import runpy
+import string
+import sys
+import threading
+import time
+import types
+from datetime import datetime, timedelta, timezone
+
+# ---------------------------------------------------------------------------
+# 예외 (google-api-core가 있으면 동일한 클래스를 사용)
+# ---------------------------------------------------------------------------
+
+try:
+    from google.api_core.exceptions import (
+        Aborted,
+        AlreadyExists,
+        DeadlineExceeded,
+        FailedPrecondition,
+        InvalidArgument,
+        NotFound,
+        ResourceExhausted,
+        ServiceUnavailable,
+    )
+except ImportError:
+    class GoogleAPICallError(Exception):
+        """google.api_core.exceptions.GoogleAPICallError 대체"""
+        code = None
+
+        def __init__(self, message, errors=()):
+            super().__init__(message)
+            self.message = message
+            self.errors = list(errors)
+
+        def __str__(self):
+            return f"{self.code} {self.message}"
+
+    class Aborted(GoogleAPICallError):
+        code = 409
+
+    class AlreadyExists(GoogleAPICallError):
+        code = 409
+
+    class DeadlineExceeded(GoogleAPICallError):
+        code = 504
+
+    class FailedPrecondition(GoogleAPICallError):
+        code = 400
+
+    class InvalidArgument(GoogleAPICallError):
+        code = 400
+
+    class NotFound(GoogleAPICallError):
+        code = 404
+
+    class ResourceExhausted(GoogleAPICallError):
+        code = 429
+
+    class ServiceUnavailable(GoogleAPICallError):
+        code = 503
+
+
+MAX_BATCH_WRITES = 500
+STREAM_CHUNK = 1000
+# 정렬 인덱스 대기 쓰기가 이보다 많으면 bisect 삽입 대신 한 번에 다시 정렬
+SORTED_INSORT_LIMIT = 64
+
+# ---------------------------------------------------------------------------
+# Sentinel / Transform
+# ---------------------------------------------------------------------------
+
+
+class _Sentinel:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+SERVER_TIMESTAMP = _Sentinel("SERVER_TIMESTAMP")
+DELETE_FIELD = _Sentinel("DELETE_FIELD")
+_MISSING = _Sentinel("MISSING")
+
+
+class ArrayUnion:
+    def __init__(self, values):
+        self.values = list(values)
+
+
+class ArrayRemove:
+    def __init__(self, values):
+        self.values = list(values)
+
+
+class Increment:
+    def __init__(self, value):
+        self.value = value
+
+
+class LastUpdateOption:
+    """client.write_option(last_update_time=...) 전제 조건: 문서의 update_time 이 같을 때만 쓰기"""
+
+    def __init__(self, last_update_time):
+        self.last_update_time = last_update_time
+
+
+class ExistsOption:
+    """client.write_option(exists=...) 전제 조건"""
+
+    def __init__(self, exists):
+        self.exists = exists
+
+
+class FieldFilter:
+    def __init__(self, field_path, op_string, value=None):
+        self.field_path = field_path
+        self.op_string = op_string
+        self.value = value
+
+
+class Query:
+    ASCENDING = "ASCENDING"
+    DESCENDING = "DESCENDING"
+
+
+# ---------------------------------------------------------------------------
+# 값 비교 (Firestore 타입 순서: null < bool < number < timestamp < string <
+# bytes < reference < geopoint < array < map)
+# ---------------------------------------------------------------------------
+
+
+def _ts(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+# 정확한 타입 → 타입 순서 (bool 은 int 의 하위 클래스라 type() 으로 먼저 구분)
+_SCALAR_ORDER = {bool: 1, int: 2, float: 2, str: 4, bytes: 5}
+
+
+def value_key(value):
+    """Firestore 정렬 순서를 따르는 해시 가능한 비교 키"""
+    order = _SCALAR_ORDER.get(type(value))
+    if order is not None:
+        return (order, value)
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, datetime):
+        return (3, _ts(value))
+    if isinstance(value, str):
+        return (4, value)
+    if isinstance(value, bytes):
+        return (5, value)
+    if isinstance(value, DocumentReference):
+        return (6, value.path)
+    if isinstance(value, (list, tuple)):
+        return (8, tuple(value_key(v) for v in value))
+    if isinstance(value, dict):
+        return (9, tuple(sorted((k, value_key(v)) for k, v in value.items())))
+    return (7, repr(value))
+
+
+# 복사/변환 없이 그대로 저장하는 불변 값 타입
+_IMMUTABLE = frozenset({str, int, float, bool, bytes, datetime, type(None)})
+
+
+def _copy(value):
+    if type(value) in _IMMUTABLE:
+        return value
+    if isinstance(value, dict):
+        return {k: v if type(v) in _IMMUTABLE else _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [v if type(v) in _IMMUTABLE else _copy(v) for v in value]
+    return value
+
+
+def get_field(data, field_path):
+    """'a.b.c' 경로의 값 (없으면 _MISSING)"""
+    if field_path in data:
+        return data[field_path]
+    value = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _resolve(value, old, now):
+    """Sentinel/Transform을 실제 값으로 변환"""
+    if type(value) in _IMMUTABLE:
+        return value
+    if value is SERVER_TIMESTAMP:
+        return now
+    if isinstance(value, ArrayUnion):
+        base = list(old) if isinstance(old, list) else []
+        keys = {value_key(v) for v in base}
+        for v in value.values:
+            k = value_key(v)
+            if k not in keys:
+                keys.add(k)
+                base.append(_copy(v))
+        return base
+    if isinstance(value, ArrayRemove):
+        remove = {value_key(v) for v in value.values}
+        base = list(old) if isinstance(old, list) else []
+        return [v for v in base if value_key(v) not in remove]
+    if isinstance(value, Increment):
+        base = old if isinstance(old, (int, float)) and not isinstance(old, bool) else 0
+        return base + value.value
+    if isinstance(value, dict):
+        return {k: v if type(v) in _IMMUTABLE else _resolve(v, _MISSING, now)
+                for k, v in value.items() if v is not DELETE_FIELD}
+    return _copy(value)
+
+
+def _set_path(data, parts, value, now):
+    parent = data
+    for part in parts[:-1]:
+        child = parent.get(part)
+        if not isinstance(child, dict):
+            child = {}
+            parent[part] = child
+        parent = child
+    leaf = parts[-1]
+    if value is DELETE_FIELD:
+        parent.pop(leaf, None)
+    else:
+        parent[leaf] = _resolve(value, parent.get(leaf, _MISSING), now)
+
+
+def _merge(data, new, now):
+    for key, value in new.items():
+        if isinstance(value, dict) and value and isinstance(data.get(key), dict):
+            _merge(data[key], value, now)
+        elif value is DELETE_FIELD:
+            data.pop(key, None)
+        else:
+            data[key] = _resolve(value, data.get(key, _MISSING), now)
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """대량 할당 (적재/인덱스 생성) 중 순환 GC 를 멈춘다: 할당마다 세대 GC 가 돌지 않도록"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _split_path(path):
+    return [p for p in path.strip("/").split("/") if p]
+
+
+_AUTO_ID_CHARS = string.ascii_letters + string.digits
+
+
+def _auto_id():
+    return "".join(random.choices(_AUTO_ID_CHARS, k=20))
+
+
+# ---------------------------------------------------------------------------
+# 저장소 + 인덱스
+# ---------------------------------------------------------------------------
+
+
+class _StoredDoc:
+    __slots__ = ("data", "create_time", "update_time")
+
+    def __init__(self, data, create_time, update_time):
+        self.data = data
+        self.create_time = create_time
+        self.update_time = update_time
+
+
+class _SortedIndex:
+    """
+    (value_key, doc_id) 정렬 리스트
+
+    쓰기는 추가/삭제 대기 집합에만 기록하고 다음 조회 때 한꺼번에 반영한다.
+    대기 항목이 적으면 bisect 로 넣고, 많으면 (대량 쓰기 후) 한 번 정렬한다.
+    """
+
+    __slots__ = ("entries", "added", "removed")
+
+    def __init__(self, entries):
+        entries.sort()
+        self.entries = entries
+        self.added = set()
+        self.removed = set()
+
+    def add(self, entry):
+        if entry in self.removed:
+            self.removed.discard(entry)
+        else:
+            self.added.add(entry)
+
+    def discard(self, entry):
+        if entry in self.added:
+            self.added.discard(entry)
+        else:
+            self.removed.add(entry)
+
+    def view(self):
+        """대기 중인 쓰기를 반영한 정렬 리스트"""
+        if not self.added and not self.removed:
+            return self.entries
+        entries = self.entries
+        if len(self.added) + len(self.removed) <= SORTED_INSORT_LIMIT:
+            for entry in self.removed:
+                i = bisect.bisect_left(entries, entry)
+                if i < len(entries) and entries[i] == entry:
+                    del entries[i]
+            for entry in self.added:
+                bisect.insort(entries, entry)
+        else:
+            if self.removed:
+                removed = self.removed
+                entries = [e for e in entries if e not in removed]
+            # 정렬된 앞부분 + 새 항목: Timsort 가 기존 런을 그대로 이어 붙인다
+            entries.extend(self.added)
+            entries.sort()
+            self.entries = entries
+        self.added = set()
+        self.removed = set()
+        return entries
+
+
+class _CollectionStore:
+    """컬렉션 하나의 문서와 보조 인덱스"""
+
+    def __init__(self, path):
+        self.path = path
+        self.docs = {}
+        # field -> {value_key: set(doc_id)}
+        self.hash_indexes = {}
+        # field -> {element_key: set(doc_id)}
+        self.array_indexes = {}
+        # field -> [(value_key, doc_id)] 정렬 리스트
+        self.sorted_indexes = {}
+
+    # --- 인덱스 생성 (첫 쿼리 시 1회) ---
+
+    def _field_values(self, field):
+        """[(doc_id, value)] — 필드가 있는 문서만 (최상위 필드는 get_field 호출 없이)"""
+        if "." in field:
+            pairs = [(doc_id, get_field(doc.data, field)) for doc_id, doc in self.docs.items()]
+        else:
+            pairs = [(doc_id, doc.data.get(field, _MISSING)) for doc_id, doc in self.docs.items()]
+        return [pair for pair in pairs if pair[1] is not _MISSING]
+
+    def hash_index(self, field):
+        index = self.hash_indexes.get(field)
+        if index is None:
+            index = {}
+            with _gc_paused():
+                for doc_id, value in self._field_values(field):
+                    key = value_key(value)
+                    ids = index.get(key)
+                    if ids is None:
+                        ids = index[key] = set()
+                    ids.add(doc_id)
+            self.hash_indexes[field] = index
+        return index
+
+    def array_index(self, field):
+        index = self.array_indexes.get(field)
+        if index is None:
+            index = {}
+            with _gc_paused():
+                for doc_id, value in self._field_values(field):
+                    if isinstance(value, list):
+                        for element in value:
+                            key = value_key(element)
+                            ids = index.get(key)
+                            if ids is None:
+                                ids = index[key] = set()
+                            ids.add(doc_id)
+            self.array_indexes[field] = index
+        return index
+
+    def sorted_index(self, field):
+        index = self.sorted_indexes.get(field)
+        if index is None:
+            with _gc_paused():
+                if field == "__name__":
+                    entries = [((4, doc_id), doc_id) for doc_id in self.docs]
+                else:
+                    entries = [(value_key(value), doc_id) for doc_id, value in self._field_values(field)]
+                index = self.sorted_indexes[field] = _SortedIndex(entries)
+        return index.view()
+
+    # --- 쓰기 시 인덱스 갱신 ---
+
+    def load(self, items, now):
+        """대량 적재: 인덱스는 건별로 고치지 않고 버린 뒤 다음 쿼리 때 한 번에 다시 만든다"""
+        docs = self.docs
+        for doc_id, data in items:
+            old = docs.get(doc_id)
+            if old:
+                old.data = data
+                old.update_time = now
+            else:
+                docs[doc_id] = _StoredDoc(data, now, now)
+        self.hash_indexes.clear()
+        self.array_indexes.clear()
+        self.sorted_indexes.clear()
+
+    def put(self, doc_id, data, now):
+        old = self.docs.get(doc_id)
+        old_data = old.data if old else None
+        if old:
+            old.data = data
+            old.update_time = now
+        else:
+            self.docs[doc_id] = _StoredDoc(data, now, now)
+        self._reindex(doc_id, old_data, data)
+
+    def remove(self, doc_id):
+        old = self.docs.pop(doc_id, None)
+        if old:
+            self._reindex(doc_id, old.data, None)
+
+    def _reindex(self, doc_id, old_data, new_data):
+        for field, index in self.hash_indexes.items():
+            old = get_field(old_data, field) if old_data is not None else _MISSING
+            new = get_field(new_data, field) if new_data is not None else _MISSING
+            old_k = value_key(old) if old is not _MISSING else _MISSING
+            new_k = value_key(new) if new is not _MISSING else _MISSING
+            if old_k == new_k:
+                continue
+            if old_k is not _MISSING:
+                ids = index.get(old_k)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del index[old_k]
+            if new_k is not _MISSING:
+                index.setdefault(new_k, set()).add(doc_id)
+
+        for field, index in self.array_indexes.items():
+            old = get_field(old_data, field) if old_data is not None else _MISSING
+            new = get_field(new_data, field) if new_data is not None else _MISSING
+            old_keys = {value_key(v) for v in old} if isinstance(old, list) else set()
+            new_keys = {value_key(v) for v in new} if isinstance(new, list) else set()
+            for k in old_keys - new_keys:
+                ids = index.get(k)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del index[k]
+            for k in new_keys - old_keys:
+                index.setdefault(k, set()).add(doc_id)
+
+        for field, index in self.sorted_indexes.items():
+            if field == "__name__":
+                old_k = (4, doc_id) if old_data is not None else _MISSING
+                new_k = (4, doc_id) if new_data is not None else _MISSING
+            else:
+                old = get_field(old_data, field) if old_data is not None else _MISSING
+                new = get_field(new_data, field) if new_data is not None else _MISSING
+                old_k = value_key(old) if old is not _MISSING else _MISSING
+                new_k = value_key(new) if new is not _MISSING else _MISSING
+            if old_k == new_k:
+                continue
+            if old_k is not _MISSING:
+                index.discard((old_k, doc_id))
+            if new_k is not _MISSING:
+                index.add((new_k, doc_id))
+
+
+# ---------------------------------------------------------------------------
+# 스냅샷 / 참조
+# ---------------------------------------------------------------------------
+
+
+class WriteResult:
+    def __init__(self, update_time):
+        self.update_time = update_time
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, data, create_time=None, update_time=None, read_time=None):
+        self.reference = reference
+        self._data = data
+        self.create_time = create_time
+        self.update_time = update_time
+        self.read_time = read_time
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return _copy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        if self._data is None:
+            return None
+        value = get_field(self._data, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return _copy(value)
+
+
+class DocumentReference:
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        parts = path.split("/")
+        self.id = parts[-1]
+        self._collection_path = "/".join(parts[:-1])
+
+    def __eq__(self, other):
+        return isinstance(other, DocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return f"<DocumentReference {self.path}>"
+
+    @property
+    def parent(self):
+        return CollectionReference(self._client, self._collection_path)
+
+    def collection(self, collection_id):
+        return CollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def collections(self):
+        return self._client._child_collections(self.path)
+
+    def get(self, field_paths=None, transaction=None):
+        self._client._rpc("read", 1, self.path)
+        return self._client._get_snapshot(self)
+
+    def set(self, document_data, merge=False):
+        return self._client._commit([("set", self, document_data, merge, None)])[0]
+
+    def create(self, document_data):
+        return self._client._commit([("create", self, document_data, False, None)])[0]
+
+    def update(self, field_updates, option=None):
+        return self._client._commit([("update", self, field_updates, False, option)])[0]
+
+    def delete(self, option=None):
+        return self._client._commit([("delete", self, None, False, option)])[0]
+
+
+class _Filter:
+    __slots__ = ("field", "op", "value")
+
+    def __init__(self, field, op, value):
+        op = {"array-contains": "array_contains", "array-contains-any": "array_contains_any"}.get(op, op)
+        if op not in ("==", "!=", "<", "<=", ">", ">=", "in", "not-in",
+                      "array_contains", "array_contains_any"):
+            raise InvalidArgument(f"Operator string {op!r} is invalid")
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def matches(self, doc_id, data):
+        if self.field == "__name__":
+            value = doc_id
+            target = self.value.id if isinstance(self.value, DocumentReference) else self.value
+            if isinstance(target, (list, tuple)):
+                target = [t.id if isinstance(t, DocumentReference) else t for t in target]
+        else:
+            value = get_field(data, self.field)
+            target = self.value
+        if value is _MISSING:
+            return False
+        op = self.op
+        if op == "array_contains":
+            if not isinstance(value, list):
+                return False
+            target_key = value_key(target)
+            return any(value_key(v) == target_key for v in value)
+        if op == "array_contains_any":
+            if not isinstance(value, list):
+                return False
+            keys = {value_key(v) for v in value}
+            return any(value_key(t) in keys for t in target)
+        key = value_key(value)
+        if op == "in":
+            return key in {value_key(t) for t in target}
+        if op == "not-in":
+            return value is not None and key not in {value_key(t) for t in target}
+        target_key = value_key(target)
+        if op == "==":
+            return key == target_key
+        if op == "!=":
+            return value is not None and key != target_key
+        if key[0] != target_key[0]:
+            return False
+        if op == "<":
+            return key < target_key
+        if op == "<=":
+            return key <= target_key
+        if op == ">":
+            return key > target_key
+        return key >= target_key
+
+
+_RANGE_OPS = ("<", "<=", ">", ">=")
+
+
+class BaseQuery:
+    """불변 쿼리 빌더 (CollectionReference가 상속)"""
+
+    def __init__(self, client, collection_path, all_descendants=False):
+        self._client = client
+        self._path = collection_path
+        self._all_descendants = all_descendants
+        self._filters = ()
+        self._orders = ()
+        self._limit = None
+        self._limit_to_last = False
+        self._offset = 0
+        self._start = None
+        self._end = None
+        self._projection = None
+
+    def _clone(self, **changes):
+        query = BaseQuery.__new__(BaseQuery)
+        query.__dict__.update(self.__dict__)
+        query.__dict__.update(changes)
+        return query
+
+    # --- 빌더 ---
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._clone(_filters=self._filters + (_Filter(field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=Query.ASCENDING):
+        return self._clone(_orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._clone(_limit=count, _limit_to_last=False)
+
+    def limit_to_last(self, count):
+        return self._clone(_limit=count, _limit_to_last=True)
+
+    def offset(self, num_to_skip):
+        return self._clone(_offset=num_to_skip)
+
+    def select(self, field_paths):
+        return self._clone(_projection=tuple(field_paths))
+
+    def start_at(self, document_fields_or_snapshot):
+        return self._clone(_start=(document_fields_or_snapshot, True))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._clone(_start=(document_fields_or_snapshot, False))
+
+    def end_at(self, document_fields_or_snapshot):
+        return self._clone(_end=(document_fields_or_snapshot, True))
+
+    def end_before(self, document_fields_or_snapshot):
+        return self._clone(_end=(document_fields_or_snapshot, False))
+
+    def count(self, alias=None):
+        return AggregationQuery(self, alias)
+
+    # --- 실행 ---
+
+    def get(self, transaction=None):
+        return list(self.stream(transaction=transaction))
+
+    def stream(self, transaction=None):
+        return self._client._run_query(self)
+
+
+class CollectionReference(BaseQuery):
+    def __init__(self, client, path):
+        super().__init__(client, path)
+        self.path = path
+        self.id = path.split("/")[-1]
+
+    def __repr__(self):
+        return f"<CollectionReference {self.path}>"
+
+    @property
+    def parent(self):
+        parts = self.path.split("/")
+        if len(parts) == 1:
+            return None
+        return DocumentReference(self._client, "/".join(parts[:-1]))
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, f"{self.path}/{document_id or _auto_id()}")
+
+    def add(self, document_data, document_id=None):
+        ref = self.document(document_id)
+        result = ref.create(document_data)
+        return result.update_time, ref
+
+    def list_documents(self, page_size=None):
+        store = self._client._stores.get(self.path)
+        ids = sorted(store.docs) if store else []
+        return [self.document(doc_id) for doc_id in ids]
+
+
+class AggregationResult:
+    def __init__(self, alias, value, read_time=None):
+        self.alias = alias
+        self.value = value
+        self.read_time = read_time
+
+
+class AggregationQuery:
+    def __init__(self, query, alias):
+        self._query = query
+        self._alias = alias or "field_1"
+
+    def get(self, transaction=None):
+        value = self._query._client._count(self._query)
+        return [[AggregationResult(self._alias, value, datetime.now(timezone.utc))]]
+
+    def stream(self, transaction=None):
+        return iter(self.get(transaction))
+
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def __len__(self):
+        return len(self._ops)
+
+    def set(self, reference, document_data, merge=False):
+        self._ops.append(("set", reference, document_data, merge, None))
+        return self
+
+    def create(self, reference, document_data):
+        self._ops.append(("create", reference, document_data, False, None))
+        return self
+
+    def update(self, reference, field_updates, option=None):
+        self._ops.append(("update", reference, field_updates, False, option))
+        return self
+
+    def delete(self, reference, option=None):
+        self._ops.append(("delete", reference, None, False, option))
+        return self
+
+    def commit(self):
+        ops, self._ops = self._ops, []
+        return self._client._commit(ops)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+
+
+class Transaction(WriteBatch):
+    """읽기는 즉시 수행하고 쓰기는 commit 시 원자적으로 반영"""
+
+    def get(self, ref_or_query):
+        if isinstance(ref_or_query, DocumentReference):
+            return iter([ref_or_query.get()])
+        return ref_or_query.stream()
+
+
+def transactional(func, max_attempts=5):
+    """firestore.transactional 대체: Aborted 발생 시 재시도"""
+    def wrapper(transaction, *args, **kwargs):
+        for attempt in range(max_attempts):
+            try:
+                result = func(transaction, *args, **kwargs)
+                transaction.commit()
+                return result
+            except Aborted:
+                transaction._ops = []
+                if attempt == max_attempts - 1:
+                    raise
+    return wrapper
+
+
+# ---------------------------------------------------------------------------
+# 클라이언트
+# ---------------------------------------------------------------------------
+
+
+class FakeFirestore:
+    """
+    인메모리 Firestore 클라이언트
+
+    latency: RPC당 지연(초), per_doc_latency: 읽은 문서당 추가 지연(초)
+    error_rate: RPC당 오류 발생 확률, error_types: 발생시킬 예외 클래스 목록
+    write_rate: 초당 허용 쓰기 수 (초과 시 ResourceExhausted, None이면 무제한)
+    """
+
+    def __init__(self, latency=0.0, per_doc_latency=0.0, error_rate=0.0,
+                 error_types=(ResourceExhausted, Aborted, ServiceUnavailable),
+                 write_rate=None, seed=None):
+        self.latency = latency
+        self.per_doc_latency = per_doc_latency
+        self.error_rate = error_rate
+        self.error_types = tuple(error_types)
+        self.write_rate = write_rate
+        self.project = "fake-project"
+        self.stats = {"rpcs": 0, "reads": 0, "writes": 0, "deletes": 0, "errors": 0}
+        self.collection_stats = {}      # 최상위 컬렉션 → {"rpcs", "queries", "reads", "writes", "deletes"}
+        self._stores = {}
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+        self._bucket_tokens = float(write_rate or 0)
+        self._bucket_time = time.monotonic()
+
+    # --- 공개 API ---
+
+    def collection(self, *path):
+        path = "/".join(path)
+        if len(_split_path(path)) % 2 != 1:
+            raise InvalidArgument(f"A collection must have an odd number of path elements: {path}")
+        return CollectionReference(self, "/".join(_split_path(path)))
+
+    def document(self, *path):
+        path = "/".join(path)
+        if len(_split_path(path)) % 2 != 0:
+            raise InvalidArgument(f"A document must have an even number of path elements: {path}")
+        return DocumentReference(self, "/".join(_split_path(path)))
+
+    def collection_group(self, collection_id):
+        return BaseQuery(self, collection_id, all_descendants=True)
+
+    def collections(self):
+        with self._lock:
+            ids = sorted({p for p in self._stores if "/" not in p and self._stores[p].docs})
+        return [CollectionReference(self, p) for p in ids]
+
+    def batch(self):
+        return WriteBatch(self)
+
+    @staticmethod
+    def write_option(**kwargs):
+        if len(kwargs) != 1:
+            raise TypeError("Exactly one of 'last_update_time' or 'exists' must be provided")
+        (name, value), = kwargs.items()
+        if name == "last_update_time":
+            return LastUpdateOption(value)
+        if name == "exists":
+            return ExistsOption(value)
+        raise TypeError(f"{name} is an invalid write option")
+
+    def transaction(self, **kwargs):
+        return Transaction(self)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        references = list(references)
+        self._rpc("read", len(references), references[0].path if references else None)
+        for ref in references:
+            yield self._get_snapshot(ref)
+
+    def close(self):
+        pass
+
+    def load(self, documents):
+        """{collection_path: {doc_id: data}} 일괄 적재 (RPC/지연 없이)"""
+        now = datetime.now(timezone.utc)
+        with self._lock, _gc_paused():
+            for path, docs in documents.items():
+                items = ((doc_id, _resolve(data, _MISSING, now)) for doc_id, data in docs.items())
+                self._store(path).load(items, now)
+        # 대량 적재한 문서는 순환 GC 추적 대상에서 제외 (쿼리 중 full GC 방지)
+        gc.freeze()
+
+    def reset_stats(self):
+        for key in self.stats:
+            self.stats[key] = 0
+        self.collection_stats.clear()
+
+    # --- 내부 ---
+
+    def _store(self, path, create=True):
+        store = self._stores.get(path)
+        if store is None and create:
+            store = self._stores[path] = _CollectionStore(path)
+        return store
+
+    def _child_collections(self, doc_path):
+        prefix = doc_path + "/"
+        with self._lock:
+            ids = sorted({p for p in self._stores
+                          if p.startswith(prefix) and "/" not in p[len(prefix):] and self._stores[p].docs})
+        return [CollectionReference(self, p) for p in ids]
+
+    def _tally(self, path, key, n=1):
+        """최상위 컬렉션별 통계 (lock 안에서 호출)"""
+        name = path.split("/", 1)[0]
+        counts = self.collection_stats.get(name)
+        if counts is None:
+            counts = self.collection_stats[name] = {"rpcs": 0, "queries": 0, "reads": 0, "writes": 0, "deletes": 0}
+        counts[key] += n
+
+    def _rpc(self, kind, docs=1, path=None):
+        """RPC 1회: 통계 집계, 지연/오류/쓰기 제한 주입"""
+        with self._lock:
+            self.stats["rpcs"] += 1
+            if path:
+                self._tally(path, "rpcs")
+                if kind == "query":
+                    self._tally(path, "queries")
+            if kind == "read":
+                self.stats["reads"] += max(docs, 1)
+                if path:
+                    self._tally(path, "reads", max(docs, 1))
+            fail = self.error_rate and self._random.random() < self.error_rate
+            if not fail and kind == "write" and self.write_rate:
+                now = time.monotonic()
+                self._bucket_tokens = min(float(self.write_rate),
+                                          self._bucket_tokens + (now - self._bucket_time) * self.write_rate)
+                self._bucket_time = now
+                if self._bucket_tokens < docs:
+                    self.stats["errors"] += 1
+                    raise ResourceExhausted("Quota exceeded (write_rate)")
+                self._bucket_tokens -= docs
+            error = self._random.choice(self.error_types) if fail else None
+        delay = self.latency + self.per_doc_latency * docs
+        if delay > 0:
+            time.sleep(delay)
+        if error is not None:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise error(f"Injected {error.__name__} ({kind})")
+
+    def _get_snapshot(self, ref):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            store = self._store(ref._collection_path, create=False)
+            doc = store.docs.get(ref.id) if store else None
+            if doc is None:
+                return DocumentSnapshot(ref, None, read_time=now)
+            return DocumentSnapshot(ref, doc.data, doc.create_time, doc.update_time, now)
+
+    def _commit(self, ops):
+        if len(ops) > MAX_BATCH_WRITES:
+            raise InvalidArgument(f"maximum {MAX_BATCH_WRITES} writes allowed per request")
+        if not ops:
+            return []
+        self._rpc("write", len(ops), ops[0][1].path)
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            # 검증 먼저 (원자성)
+            pending = {}
+            for kind, ref, _, _, option in ops:
+                exists = pending.get(ref.path)
+                if exists is None:
+                    store = self._store(ref._collection_path, create=False)
+                    current = store.docs.get(ref.id) if store else None
+                    exists = current is not None
+                    if isinstance(option, LastUpdateOption) and (
+                            current is None or current.update_time != option.last_update_time):
+                        raise FailedPrecondition(f"update_time precondition failed: {ref.path}")
+                    if isinstance(option, ExistsOption) and exists != option.exists:
+                        raise FailedPrecondition(f"exists precondition failed: {ref.path}")
+                if kind == "create" and exists:
+                    raise AlreadyExists(f"Document already exists: {ref.path}")
+                if kind == "update" and not exists:
+                    raise NotFound(f"No document to update: {ref.path}")
+                pending[ref.path] = kind != "delete"
+            results = []
+            for kind, ref, data, merge, _ in ops:
+                store = self._store(ref._collection_path)
+                current = store.docs.get(ref.id)
+                if kind == "delete":
+                    store.remove(ref.id)
+                    self.stats["deletes"] += 1
+                    self._tally(ref.path, "deletes")
+                else:
+                    if kind in ("set", "create") and not merge:
+                        new = _resolve(data, _MISSING, now)
+                    elif kind == "set" and merge is True:
+                        new = _copy(current.data) if current else {}
+                        _merge(new, data, now)
+                    elif kind == "set":
+                        new = _copy(current.data) if current else {}
+                        for field in merge:
+                            value = get_field(data, field)
+                            if value is not _MISSING:
+                                _set_path(new, field.split("."), value, now)
+                    else:
+                        new = _copy(current.data)
+                        for field, value in data.items():
+                            _set_path(new, field.split("."), value, now)
+                    store.put(ref.id, new, now)
+                    self.stats["writes"] += 1
+                    self._tally(ref.path, "writes")
+                results.append(WriteResult(now))
+            return results
+
+    # --- 쿼리 실행 ---
+
+    def _query_stores(self, query):
+        if not query._all_descendants:
+            store = self._stores.get(query._path)
+            return [store] if store else []
+        return [s for p, s in self._stores.items() if p.split("/")[-1] == query._path]
+
+    @staticmethod
+    def _effective_orders(query):
+        orders = list(query._orders)
+        if not orders:
+            for f in query._filters:
+                if f.op in _RANGE_OPS or f.op in ("!=", "not-in"):
+                    orders.append((f.field, Query.ASCENDING))
+                    break
+        if not orders or orders[-1][0] != "__name__":
+            direction = orders[-1][1] if orders else Query.ASCENDING
+            orders.append(("__name__", direction))
+        return orders
+
+    @staticmethod
+    def _cursor_keys(cursor, orders):
+        values, _ = cursor
+        if isinstance(values, DocumentSnapshot):
+            data = values._data or {}
+            keys = []
+            for field, _ in orders:
+                if field == "__name__":
+                    keys.append((4, values.id))
+                else:
+                    value = get_field(data, field)
+                    keys.append(value_key(None if value is _MISSING else value))
+            return keys
+        if isinstance(values, dict):
+            keys = []
+            for field, _ in orders:
+                if field == "__name__":
+                    if "__name__" not in values:
+                        break
+                    keys.append((4, values["__name__"]))
+                    continue
+                value = get_field(values, field)
+                if value is _MISSING:
+                    break
+                keys.append(value_key(value))
+            return keys
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+        keys = []
+        for (field, _), value in zip(orders, values):
+            if field == "__name__":
+                value = value.id if isinstance(value, DocumentReference) else value.split("/")[-1]
+                keys.append((4, value))
+            else:
+                keys.append(value_key(value))
+        return keys
+
+    @staticmethod
+    def _doc_keys(doc_id, data, orders):
+        keys = []
+        for field, _ in orders:
+            if field == "__name__":
+                keys.append((4, doc_id))
+            else:
+                value = get_field(data, field)
+                if value is _MISSING:
+                    return None
+                keys.append(value_key(value))
+        return keys
+
+    @staticmethod
+    def _compare(doc_keys, cursor_keys, orders):
+        """쿼리 순서 기준 비교: 문서가 커서보다 앞이면 -1"""
+        for (field, direction), a, b in zip(orders, doc_keys, cursor_keys):
+            if a == b:
+                continue
+            result = -1 if a < b else 1
+            return -result if direction == Query.DESCENDING else result
+        return 0
+
+    def _within_cursors(self, query, doc_keys, orders, start_keys, end_keys):
+        if start_keys is not None:
+            c = self._compare(doc_keys, start_keys, orders)
+            if c < 0 or (c == 0 and not query._start[1]):
+                return "before"
+        if end_keys is not None:
+            c = self._compare(doc_keys, end_keys, orders)
+            if c > 0 or (c == 0 and not query._end[1]):
+                return "after"
+        return "inside"
+
+    def _candidates(self, store, filters):
+        """해시 인덱스로 후보 문서 ID 집합 계산 (없으면 None = 전체)"""
+        best = None
+        for f in filters:
+            if f.field == "__name__":
+                continue
+            if f.op == "==":
+                ids = store.hash_index(f.field).get(value_key(f.value), set())
+            elif f.op == "in":
+                index = store.hash_index(f.field)
+                ids = set().union(*(index.get(value_key(v), set()) for v in f.value))
+            elif f.op == "array_contains":
+                ids = store.array_index(f.field).get(value_key(f.value), set())
+            elif f.op == "array_contains_any":
+                index = store.array_index(f.field)
+                ids = set().union(*(index.get(value_key(v), set()) for v in f.value))
+            else:
+                continue
+            if best is None or len(ids) < len(best):
+                best = ids
+        return best
+
+    @staticmethod
+    def _range_bounds(index, field, filters):
+        """정렬 인덱스에서 범위 조건에 해당하는 [lo, hi) 위치"""
+        lo, hi = 0, len(index)
+        for f in filters:
+            if f.field != field or f.op not in _RANGE_OPS:
+                continue
+            key = value_key(f.value)
+            if f.op in (">", ">="):
+                fn = bisect.bisect_right if f.op == ">" else bisect.bisect_left
+                lo = max(lo, fn(index, key, key=lambda e: e[0]))
+                # 다른 타입 값은 범위 조건에서 제외
+                hi = min(hi, bisect.bisect_left(index, (key[0] + 1,), key=lambda e: e[0][:1]))
+            else:
+                fn = bisect.bisect_left if f.op == "<" else bisect.bisect_right
+                hi = min(hi, fn(index, key, key=lambda e: e[0]))
+                lo = max(lo, bisect.bisect_left(index, (key[0],), key=lambda e: e[0][:1]))
+        return lo, hi
+
+    def _scan_sorted(self, store, field, descending, filters, start_keys):
+        """정렬 인덱스를 청크 단위로 순회 (동시 쓰기에 안전)"""
+        with self._lock:
+            index = store.sorted_index(field)
+            lo, hi = self._range_bounds(index, field, filters)
+            if start_keys:
+                # 시작 커서 위치로 바로 이동 (페이지네이션이 앞부분을 다시 읽지 않도록)
+                key = start_keys[0]
+                if len(start_keys) > 1:
+                    seek = (key, start_keys[1][1])
+                    if descending:
+                        hi = min(hi, bisect.bisect_right(index, seek))
+                    else:
+                        lo = max(lo, bisect.bisect_left(index, seek))
+                elif descending:
+                    hi = min(hi, bisect.bisect_right(index, key, key=lambda e: e[0]))
+                else:
+                    lo = max(lo, bisect.bisect_left(index, key, key=lambda e: e[0]))
+            if lo >= hi:
+                return
+            first, last = index[lo], index[hi - 1]
+        position = last if descending else first
+        inclusive = True
+        while True:
+            with self._lock:
+                index = store.sorted_index(field)
+                if descending:
+                    end = (bisect.bisect_right if inclusive else bisect.bisect_left)(index, position)
+                    start = max(0, end - STREAM_CHUNK)
+                    start = max(start, bisect.bisect_left(index, first))
+                    chunk = index[start:end][::-1]
+                else:
+                    start = (bisect.bisect_left if inclusive else bisect.bisect_right)(index, position)
+                    end = min(start + STREAM_CHUNK, bisect.bisect_right(index, last))
+                    chunk = index[start:end]
+                rows = [(doc_id, store.docs[doc_id]) for _, doc_id in chunk if doc_id in store.docs]
+            if not chunk:
+                return
+            for row in rows:
+                yield row
+            position, inclusive = chunk[-1], False
+
+    def _matching(self, query, orders, start_keys):
+        """필터를 만족하는 (doc_id, store_doc, doc_keys)를 쿼리 순서대로 생성"""
+        filters = query._filters
+        stores = self._query_stores(query)
+        primary, direction = orders[0]
+        descending = direction == Query.DESCENDING
+        single_order = len(orders) == 1 or (len(orders) == 2 and orders[1][0] == "__name__"
+                                            and orders[1][1] == direction)
+
+        if len(stores) == 1 and single_order:
+            store = stores[0]
+            with self._lock:
+                candidates = self._candidates(store, filters)
+            # 후보가 많고 limit가 있으면 정렬 후 자르는 것보다 정렬 인덱스 순회가 빠르다
+            wide = (candidates is not None and query._limit is not None
+                    and not query._limit_to_last and len(candidates) * 8 > len(store.docs))
+            if candidates is None or wide:
+                # 정렬 인덱스 순회: limit가 있으면 조기 종료 가능
+                for doc_id, doc in self._scan_sorted(store, primary, descending, filters, start_keys):
+                    if wide and doc_id not in candidates:
+                        continue
+                    if all(f.matches(doc_id, doc.data) for f in filters):
+                        keys = self._doc_keys(doc_id, doc.data, orders)
+                        if keys is not None:
+                            yield doc_id, doc, keys
+                return
+            with self._lock:
+                rows = [(i, store.docs[i]) for i in candidates if i in store.docs]
+        else:
+            rows = []
+            with self._lock:
+                for store in stores:
+                    candidates = self._candidates(store, filters)
+                    ids = candidates if candidates is not None else list(store.docs)
+                    rows.extend((i, store.docs[i]) for i in ids if i in store.docs)
+
+        matched = []
+        for doc_id, doc in rows:
+            if all(f.matches(doc_id, doc.data) for f in filters):
+                keys = self._doc_keys(doc_id, doc.data, orders)
+                if keys is not None:
+                    matched.append((doc_id, doc, keys))
+        for position in range(len(orders) - 1, -1, -1):
+            matched.sort(key=lambda row: row[2][position],
+                         reverse=orders[position][1] == Query.DESCENDING)
+        yield from matched
+
+    def _select(self, query):
+        orders = self._effective_orders(query)
+        start_keys = self._cursor_keys(query._start, orders) if query._start else None
+        end_keys = self._cursor_keys(query._end, orders) if query._end else None
+        skipped = 0
+        for doc_id, doc, keys in self._matching(query, orders, start_keys):
+            position = self._within_cursors(query, keys, orders, start_keys, end_keys)
+            if position == "before":
+                continue
+            if position == "after":
+                return
+            if skipped < query._offset:
+                skipped += 1
+                continue
+            yield doc_id, doc
+
+    def _run_query(self, query):
+        self._rpc("query", 0, query._path)
+        rows = self._select(query)
+        if query._limit is not None:
+            if query._limit_to_last:
+                rows = list(rows)[-query._limit:]
+            else:
+                rows = itertools.islice(rows, query._limit)
+        return self._snapshots(query, rows)
+
+    def _snapshots(self, query, rows):
+        now = datetime.now(timezone.utc)
+        count = 0
+        try:
+            for doc_id, doc in rows:
+                count += 1
+                if self.per_doc_latency and count % 100 == 0:
+                    time.sleep(self.per_doc_latency * 100)
+                data = doc.data
+                if query._projection is not None:
+                    data = {}
+                    for field in query._projection:
+                        value = get_field(doc.data, field)
+                        if value is not _MISSING:
+                            _set_path(data, field.split("."), value, now)
+                path = self._doc_path(query, doc_id, doc)
+                yield DocumentSnapshot(DocumentReference(self, path), data,
+                                       doc.create_time, doc.update_time, now)
+        finally:
+            with self._lock:
+                self.stats["reads"] += max(count, 1)
+                self._tally(query._path, "reads", max(count, 1))
+
+    def _doc_path(self, query, doc_id, doc):
+        if not query._all_descendants:
+            return f"{query._path}/{doc_id}"
+        for store in self._query_stores(query):
+            if store.docs.get(doc_id) is doc:
+                return f"{store.path}/{doc_id}"
+        return f"{query._path}/{doc_id}"
+
+    def _count(self, query):
+        self._rpc("query", 0, query._path)
+        filters = query._filters
+        with self._lock:
+            stores = self._query_stores(query)
+            simple = (not query._orders and query._start is None and query._end is None
+                      and not query._offset
+                      and len(filters) <= 1
+                      and all(f.op in ("==", "array_contains") and f.field != "__name__" for f in filters))
+            if simple:
+                # 인덱스 크기만으로 집계 (문서를 읽지 않음)
+                total = 0
+                for store in stores:
+                    candidates = self._candidates(store, filters)
+                    total += len(store.docs) if candidates is None else len(candidates)
+                if query._limit is not None:
+                    total = min(total, query._limit)
+            else:
+                total = None
+        if total is None:
+            rows = self._select(query)
+            if query._limit is not None:
+                rows = itertools.islice(rows, query._limit)
+            total = sum(1 for _ in rows)
+        with self._lock:
+            # Firestore 과금: 인덱스 항목 1000개당 1회 읽기
+            self.stats["reads"] += max(1, (total + 999) // 1000)
+            self._tally(query._path, "reads", max(1, (total + 999) // 1000))
+        return total
+
+
+# ---------------------------------------------------------------------------
+# firebase_admin 대체 모듈 설치
+# ---------------------------------------------------------------------------
+
+
+def install(client=None):
+    """
+    sys.modules 에 가짜 firebase_admin / credentials / firestore 모듈을 등록한다.
+    이후 import 하는 스크립트는 수정 없이 이 클라이언트를 사용한다.
+    """
+    client = client or FakeFirestore()
+
+    admin = types.ModuleType("firebase_admin")
+    admin._apps = {}
+
+    def initialize_app(credential=None, options=None, name="[DEFAULT]"):
+        app = types.SimpleNamespace(name=name, credential=credential, options=options or {})
+        admin._apps[name] = app
+        return app
+
+    def get_app(name="[DEFAULT]"):
+        if name not in admin._apps:
+            raise ValueError(f"The default Firebase app does not exist: {name}")
+        return admin._apps[name]
+
+    admin.initialize_app = initialize_app
+    admin.get_app = get_app
+
+    creds = types.ModuleType("firebase_admin.credentials")
+    creds.Certificate = lambda cert: types.SimpleNamespace(cert=cert)
+    creds.ApplicationDefault = lambda: types.SimpleNamespace(cert=None)
+
+    fs = types.ModuleType("firebase_admin.firestore")
+    fs.client = lambda app=None: client
+    for name in ("SERVER_TIMESTAMP", "DELETE_FIELD", "ArrayUnion", "ArrayRemove", "Increment",
+                 "FieldFilter", "Query", "transactional", "DocumentSnapshot",
+                 "DocumentReference", "CollectionReference", "WriteBatch"):
+        setattr(fs, name, globals()[name])
+
+    admin.credentials = creds
+    admin.firestore = fs
+    sys.modules["firebase_admin"] = admin
+    sys.modules["firebase_admin.credentials"] = creds
+    sys.modules["firebase_admin.firestore"] = fs
+    return client
+
+
+def load_seed(client, path):
+    """{collection: {doc_id: data}} 형태의 JSON 파일 적재 (firestore_common 인코딩)"""
+    from firestore_common import decode_value
+
+    with open(path, encoding="utf-8") as f:
+        client.load(decode_value(json.load(f)))
+
+
+def print_stats(client, elapsed):
+    stats = client.stats
+    print("\n" + "=" * 60)
+    print("📊 가짜 Firestore 통계")
+    print("=" * 60)
+    print(f"   RPC: {stats['rpcs']:,}회  읽기: {stats['reads']:,}  쓰기: {stats['writes']:,}  "
+          f"삭제: {stats['deletes']:,}  오류: {stats['errors']:,}")
+    print(f"   소요 시간: {elapsed:.3f}초")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _client_from_args(args):
+    return FakeFirestore(latency=args.latency_ms / 1000.0,
+                         per_doc_latency=args.per_doc_latency_ms / 1000.0,
+                         error_rate=args.error_rate, write_rate=args.write_rate,
+                         seed=args.random_seed)
+
+
+def run_script(args):
+    client = install(_client_from_args(args))
+    if args.seed:
+        load_seed(client, args.seed)
+    sys.argv = [args.script] + args.script_args
+    started = time.perf_counter()
+    exit_code = 0
+    try:
+        runpy.run_path(args.script, run_name="__main__")
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    print_stats(client, time.perf_counter() - started)
+    return exit_code
+
+
+def _synthetic_patient(i, rng, base):
+    return {
+        "organization_id": f"CENTER_{i % 50:02d}",
+        "name": f"환자{i}",
+        "patient_code": f"P{i:07d}",
+        "status": "ACTIVE" if rng.random() < 0.8 else "INACTIVE",
+        "therapist_id": f"user_t{i % 500}",
+        "guardian_uids": [f"user_g{i}"],
+        "tags": rng.sample(["ASD", "감각", "부력", "ROM", "균형"], 2),
+        "birth_date": base - timedelta(days=rng.randint(365, 365 * 15)),
+        "created_at": base - timedelta(minutes=i),
+    }
+
+
+def bench(args):
+    rng = random.Random(args.random_seed)
+    client = _client_from_args(args)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    print("=" * 60)
+    print(f"🏁 가짜 Firestore 벤치마크 ({args.docs:,}건)")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    docs = {f"p{i:08d}": _synthetic_patient(i, rng, base) for i in range(args.docs)}
+    print(f"   데이터 생성: {time.perf_counter() - started:.2f}초")
+    started = time.perf_counter()
+    client.load({"patients": docs})
+    del docs
+    print(f"   적재: {time.perf_counter() - started:.2f}초")
+
+    patients = client.collection("patients")
+    cases = [
+        ("==", lambda: patients.where("organization_id", "==", "CENTER_07").get()),
+        ("== + == 교집합", lambda: patients.where("organization_id", "==", "CENTER_09")
+                                        .where("therapist_id", "==", "user_t9").get()),
+        ("array_contains", lambda: patients.where("tags", "array_contains", "ROM").limit(100).get()),
+        ("range + order + limit", lambda: patients.where("created_at", ">=", base - timedelta(days=3))
+                                                  .order_by("created_at").limit(100).get()),
+        ("order desc + limit", lambda: patients.order_by("created_at", direction=Query.DESCENDING)
+                                               .limit(10).get()),
+        ("__name__ 페이지", lambda: patients.order_by("__name__")
+                                          .start_after({"__name__": f"p{args.docs // 2:08d}"}).limit(500).get()),
+        ("count (인덱스)", lambda: patients.where("status", "==", "ACTIVE").count().get()),
+    ]
+    print(f"   {'쿼리':<24} {'최초(인덱스 생성)':>14} {'재실행':>10}")
+    for label, fn in cases:
+        timings = []
+        for _ in range(2):
+            started = time.perf_counter()
+            result = fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        size = result[0][0].value if label.startswith("count") else len(result)
+        print(f"   {label:<24} {timings[0]:12.2f}ms {timings[1]:9.2f}ms  ({size:,}건)")
+
+    started = time.perf_counter()
+    batch = client.batch()
+    for i in range(MAX_BATCH_WRITES):
+        batch.update(patients.document(f"p{i:08d}"), {"status": "INACTIVE", "updated_at": SERVER_TIMESTAMP})
+    batch.commit()
+    print(f"   batch update 500건 (인덱스 갱신) {(time.perf_counter() - started) * 1000:9.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인메모리 Firestore 엔진")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_injection_args(p):
+        p.add_argument("--latency-ms", type=float, default=0.0, help="RPC당 지연 (ms)")
+        p.add_argument("--per-doc-latency-ms", type=float, default=0.0, help="문서당 추가 지연 (ms)")
+        p.add_argument("--error-rate", type=float, default=0.0, help="RPC당 오류 확률 (0~1)")
+        p.add_argument("--write-rate", type=float, default=None, help="초당 허용 쓰기 수")
+        p.add_argument("--random-seed", type=int, default=None)
+
+    run_p = sub.add_parser("run", help="스크립트를 가짜 Firestore 위에서 실행")
+    run_p.add_argument("script")
+    run_p.add_argument("--seed", help="초기 데이터 JSON ({collection: {doc_id: data}})")
+    add_injection_args(run_p)
+
+    bench_p = sub.add_parser("bench", help="인덱스 쿼리 벤치마크")
+    bench_p.add_argument("--docs", type=int, default=100_000)
+    add_injection_args(bench_p)
+
+    # '--' 뒤의 인자는 실행할 스크립트에 그대로 전달
+    argv = sys.argv[1:]
+    script_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, script_args = argv[:split], argv[split + 1:]
+    args = parser.parse_args(argv)
+    args.script_args = script_args
+    if args.command == "run":
+        sys.exit(run_script(args))
+    bench(args)
+
+
+if __name__ == "__main__":
+    main()
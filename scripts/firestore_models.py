@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+users / patients / appointments / attendances / sessions / session_reports 문서용 경량 모델 (__slots__)
+
+스크립트마다 반복되던
+    patient_data.get('guardianUids', patient_data.get('guardian_uids', []))
+같은 camelCase / snake_case 대체 조회를 디코딩 시점에 한 번만 처리한다.
+
+- 필드마다 허용하는 철자(별칭) 목록을 두고, 처음 발견된 값을 사용
+  (보호자 목록처럼 여러 철자에 나뉘어 저장된 필드는 합집합)
+- organization_id, status 같은 반복 문자열은 sys.intern 으로 공유
+- 리스트는 튜플로 저장, 모르는 필드는 keep_extra=True 일 때만 extra 에 보관
+- 스냅샷은 공개 API(to_dict()) 로만 읽고, 모델에 담은 뒤 원본 dict 는 바로 버린다
+
+사용법:
+    from firestore_models import Patient, iter_models
+    for patient in iter_models(db, Patient):
+        print(patient.name, len(patient.guardian_ids))
+
+    python scripts/firestore_models.py bench --docs 100000 --repeat 7    # dict 대비 메모리/디코딩 시간
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+_intern = sys.intern
+
+
+# ---------------------------------------------------------------------------
+# 값 변환
+# ---------------------------------------------------------------------------
+
+
+def _raw(value):
+    return value
+
+
+def _str(value):
+    return value if isinstance(value, str) else None
+
+
+def _interned(value):
+    return _intern(value) if isinstance(value, str) else None
+
+
+def _upper_interned(value):
+    return _intern(value.upper()) if isinstance(value, str) else None
+
+
+def _interned_tuple(value):
+    if not isinstance(value, (list, tuple)):
+        return ()
+    return tuple(_intern(v) if isinstance(v, str) else v for v in value)
+
+
+def _time(value):
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return None
+
+
+def _bool(value):
+    return bool(value) if value is not None else False
+
+
+def _roles(value):
+    """roles Map → 활성 역할 이름 튜플 (소문자, AppUser.fromFirestore 와 동일)"""
+    if not isinstance(value, dict):
+        return ()
+    return tuple(sorted(_intern(str(k).lower()) for k, v in value.items() if v is True))
+
+
+# ---------------------------------------------------------------------------
+# 모델
+# ---------------------------------------------------------------------------
+
+
+class Model:
+    """
+    FIELDS: (속성 이름, 별칭 튜플, 변환 함수, 합집합 여부)
+    첫 번째 별칭이 앱(Dart 모델)이 읽는 정식 필드 이름이다
+    """
+
+    COLLECTION = None
+    FIELDS = ()
+    __slots__ = ("id", "extra")
+
+    @classmethod
+    def from_dict(cls, doc_id, data, keep_extra=False):
+        decode = cls.__dict__.get("_decode")
+        if decode is None:
+            decode = cls._decode = _compile_decoder(cls)
+        obj = cls.__new__(cls)
+        obj.id = _intern(doc_id)
+        decode(obj, data)
+        if keep_extra:
+            known = cls._known_keys()
+            obj.extra = {k: v for k, v in data.items() if k not in known} or None
+        else:
+            obj.extra = None
+        return obj
+
+    @classmethod
+    def from_snapshot(cls, doc, keep_extra=False):
+        """DocumentSnapshot → 모델"""
+        return cls.from_dict(doc.id, doc.to_dict() or {}, keep_extra)
+
+    @classmethod
+    def _known_keys(cls):
+        known = cls.__dict__.get("_KNOWN")
+        if known is None:
+            known = frozenset(key for _, aliases, _, _ in cls.FIELDS for key in aliases)
+            cls._KNOWN = known
+        return known
+
+    def to_dict(self):
+        """정식 필드 이름(snake_case) 기준 dict (리포트용, 다시 쓰기 전에 원본 구조 확인 필요)"""
+        data = {aliases[0]: getattr(self, attr) for attr, aliases, _, _ in self.FIELDS}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        name = getattr(self, "name", None)
+        return f"<{type(self).__name__} {self.id}{f' {name}' if name else ''}>"
+
+
+def _compile_decoder(cls):
+    """
+    FIELDS 로부터 필드 대입문을 펼친 디코딩 함수 생성 (namedtuple 과 같은 방식)
+    문서마다 별칭 목록을 순회하는 것보다 빠르다
+    """
+    lines = ["def decode(obj, data):", "    get = data.get"]
+    namespace = {}
+    for index, (attr, aliases, convert, union) in enumerate(cls.FIELDS):
+        conv = f"_c{index}"
+        namespace[conv] = convert
+        if union:
+            lines.append("    merged = []")
+            for key in aliases:
+                lines.append(f"    values = get({key!r})")
+                lines.append("    if values:")
+                lines.append("        merged.extend(v for v in values if v not in merged)")
+            lines.append(f"    obj.{attr} = {conv}(merged)")
+            continue
+        lines.append(f"    value = get({aliases[0]!r})")
+        for key in aliases[1:]:
+            lines.append("    if value is None:")
+            lines.append(f"        value = get({key!r})")
+        if convert is _interned:
+            lines.append(f"    obj.{attr} = _intern(value) if value.__class__ is str else None")
+        elif convert is _str:
+            lines.append(f"    obj.{attr} = value if value.__class__ is str else None")
+        elif convert is _raw:
+            lines.append(f"    obj.{attr} = value")
+        else:
+            lines.append(f"    obj.{attr} = {conv}(value)")
+    namespace["_intern"] = _intern
+    exec("\n".join(lines), namespace)
+    return namespace["decode"]
+
+
+def _fields(*specs):
+    """(속성, 별칭 튜플, 변환, 합집합 여부) 정의에서 __slots__ 와 FIELDS 생성"""
+    return tuple(spec[0] for spec in specs), specs
+
+
+class User(Model):
+    COLLECTION = "users"
+    __slots__, FIELDS = _fields(
+        ("organization_id", ("organization_id", "organizationId"), _interned, False),
+        ("email", ("email",), _str, False),
+        ("name", ("name",), _str, False),
+        ("role", ("role",), _interned, False),
+        ("roles", ("roles",), _roles, False),
+        ("phone", ("phone", "phoneNumber", "phone_number"), _str, False),
+        ("profile_image_url", ("profile_image_url", "profileImageUrl"), _str, False),
+        ("permissions", ("permissions",), _interned_tuple, False),
+        ("linked_patient_ids", ("linked_patient_ids", "linkedPatientIds"), _interned_tuple, True),
+        ("created_at", ("created_at", "createdAt"), _time, False),
+    )
+
+    def has_role(self, role):
+        return role in self.roles or (self.role or "").lower() == role
+
+
+class Patient(Model):
+    COLLECTION = "patients"
+    __slots__, FIELDS = _fields(
+        ("organization_id", ("organization_id", "organizationId"), _interned, False),
+        ("patient_code", ("patient_code", "patientCode"), _str, False),
+        ("name", ("name",), _str, False),
+        ("birth_date", ("birth_date", "birthDate"), _time, False),
+        ("gender", ("gender",), _interned, False),
+        ("diagnosis", ("diagnosis",), _interned_tuple, False),
+        ("guardian_ids", ("guardian_ids", "guardian_uids", "guardianIds", "guardianUids"),
+         _interned_tuple, True),
+        ("assigned_therapist_id", ("assigned_therapist_id", "assignedTherapistId", "therapist_id",
+                                   "primary_therapist_uid", "primaryTherapistUid"), _interned, False),
+        ("status", ("status",), _upper_interned, False),
+        ("tags", ("tags",), _interned_tuple, False),
+        ("created_at", ("created_at", "createdAt"), _time, False),
+    )
+
+
+class Appointment(Model):
+    COLLECTION = "appointments"
+    __slots__, FIELDS = _fields(
+        ("patient_id", ("patient_id", "patientId"), _interned, False),
+        ("patient_name", ("patient_name", "patientName"), _str, False),
+        ("guardian_id", ("guardian_id", "guardianId", "guardian_uid"), _interned, False),
+        ("therapist_id", ("therapist_id", "therapistId", "therapist_uid"), _interned, False),
+        ("therapist_name", ("therapist_name", "therapistName"), _str, False),
+        ("appointment_date", ("appointment_date", "appointmentDate", "date"), _time, False),
+        ("time_slot", ("time_slot", "timeSlot"), _interned, False),
+        ("status", ("status",), _upper_interned, False),
+        ("notes", ("notes",), _str, False),
+        ("attended", ("attended",), _bool, False),
+        ("session_recorded", ("session_recorded", "sessionRecorded"), _bool, False),
+        ("session_id", ("session_id", "sessionId"), _str, False),
+        ("is_makeup", ("is_makeup", "isMakeup"), _bool, False),
+        ("makeup_ticket_id", ("makeup_ticket_id", "makeupTicketId"), _str, False),
+        ("created_at", ("created_at", "createdAt"), _time, False),
+        ("updated_at", ("updated_at", "updatedAt"), _time, False),
+    )
+
+
+class Attendance(Model):
+    COLLECTION = "attendances"
+    __slots__, FIELDS = _fields(
+        ("patient_id", ("patient_id", "patientId"), _interned, False),
+        ("therapist_id", ("therapist_id", "therapistId"), _interned, False),
+        ("session_id", ("session_id", "sessionId"), _str, False),
+        ("schedule_date", ("schedule_date", "scheduleDate"), _time, False),
+        ("time_slot", ("time_slot", "timeSlot"), _interned, False),
+        ("status", ("status",), _upper_interned, False),
+        ("created_at", ("created_at", "createdAt"), _time, False),
+    )
+
+
+class Session(Model):
+    COLLECTION = "sessions"
+    __slots__, FIELDS = _fields(
+        ("patient_id", ("patient_id", "patientId"), _interned, False),
+        ("therapist_id", ("therapist_id", "therapistId"), _interned, False),
+        ("session_date", ("session_date", "sessionDate"), _time, False),
+        ("status", ("status",), _upper_interned, False),
+        ("created_at", ("created_at", "createdAt"), _time, False),
+    )
+
+
+class SessionReport(Session):
+    """시드 / 테스트 스크립트가 쓰는 session_reports (필드 구성은 sessions 와 같음)"""
+
+    COLLECTION = "session_reports"
+    __slots__ = ()
+
+
+class PatientLinks(Model):
+    """
+    verify_firestore_structure.py 용 환자 뷰: 리부트 표준 필드만 읽음
+    (Patient 와 달리 guardian_ids / assigned_therapist_id 철자는 인정하지 않고 합집합도 만들지 않음)
+    """
+
+    COLLECTION = "patients"
+    __slots__, FIELDS = _fields(
+        ("name", ("name",), _str, False),
+        ("organization_id", ("organization_id",), _raw, False),
+        ("guardian_uids", ("guardianUids", "guardian_uids"), _interned_tuple, False),
+        ("primary_therapist_uid", ("primaryTherapistUid", "primary_therapist_uid"), _raw, False),
+    )
+
+
+MODELS = {model.COLLECTION: model for model in (User, Patient, Appointment, Attendance, Session, SessionReport)}
+
+
+def iter_models(db, model, page_size=1000, keep_extra=False):
+    """컬렉션 전체를 모델로 순회"""
+    from firestore_common import iter_collection
+
+    for doc in iter_collection(db, model.COLLECTION, page_size=page_size):
+        yield model.from_snapshot(doc, keep_extra)
+
+
+def load_snapshot_models(reader, model, keep_extra=False):
+    """firestore_snapshot 스냅샷 파일에서 모델 순회"""
+    for doc_id, data, _ in reader.iter_docs(model.COLLECTION):
+        yield model.from_dict(doc_id, data, keep_extra)
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크
+# ---------------------------------------------------------------------------
+
+
+def _measure(label, build, repeat):
+    """
+    시간은 tracemalloc 없이 repeat 회 측정한 중앙값 (timeit 처럼 측정 중 GC 끔),
+    유지 메모리는 tracemalloc 으로 따로 측정
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            items = build()
+            times.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+        del items
+    times.sort()
+    elapsed = times[len(times) // 2]
+    gc.collect()
+    tracemalloc.start()
+    items = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {label:<22} {elapsed:7.2f}초 (중앙값, {times[0]:.2f}~{times[-1]:.2f})  "
+          f"{current / 1024 / 1024:8.1f} MB  ({len(items):,}건)")
+    return items, elapsed, current
+
+
+def bench(args):
+    from firestore_fake import FakeFirestore, _synthetic_patient
+
+    rng = random.Random(args.random_seed)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    client = FakeFirestore()
+    client.load({"patients": {f"p{i:08d}": _synthetic_patient(i, rng, base) for i in range(args.docs)}})
+    docs = list(client.collection("patients").stream())
+
+    print("=" * 60)
+    print(f"🏁 문서 모델 벤치마크 (patients {args.docs:,}건)")
+    print("=" * 60)
+
+    dicts, dict_time, dict_mem = _measure("dict (to_dict)", lambda: [d.to_dict() for d in docs], args.repeat)
+    del dicts
+    models, model_time, model_mem = _measure("Patient (__slots__)",
+                                             lambda: [Patient.from_snapshot(d) for d in docs], args.repeat)
+
+    print(f"\n   메모리: {model_mem / max(dict_mem, 1):.0%}  디코딩 시간: {model_time / max(dict_time, 1e-9):.0%} (dict 대비)")
+    sample = models[0]
+    print(f"   예: {sample!r} guardian_ids={sample.guardian_ids} status={sample.status}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Firestore 문서 모델")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_parser = sub.add_parser("bench", help="dict 대비 메모리/디코딩 시간 측정")
+    bench_parser.add_argument("--docs", type=int, default=100000)
+    bench_parser.add_argument("--random-seed", type=int, default=42)
+    bench_parser.add_argument("--repeat", type=int, default=7, help="디코딩 시간 측정 횟수 (중앙값 사용)")
+    args = parser.parse_args()
+
+    success = bench(args)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+유지보수 스크립트 실행 계획 (--plan): 읽기/쓰기/바이트/요금/소요 시간 추정
+
+스크립트를 실제 Firestore 대신 가짜 클라이언트(firestore_fake.py) 위에서 실행한다.
+스크립트가 처음 접근하는 컬렉션마다 실제 데이터(또는 스냅샷)에서
+
+    - count() 집계로 전체 문서 수
+    - 무작위 위치에서 시작하는 구간 샘플 (기본 200건)
+
+을 가져와 가짜 클라이언트에 적재한다. 스크립트는 같은 샘플의 절반(부분집합)과 전체 위에서
+두 번 실행하고, 컬렉션별 RPC/읽기/쓰기/삭제 횟수를
+
+    횟수 = 고정분 + 샘플 문서당 증가분 × 샘플 수
+
+로 나누어 증가분만 전체 문서 수로 확장한다. 전체 스캔이나 문서별 수정처럼 문서 수에 비례하는
+작업은 확장되고, 고정 ID 문서 조회/기록이나 add() 로 한두 건 만드는 작업은 한 번만 센다.
+샘플이 없는 컬렉션(새로 만드는 컬렉션)의 증가분은 샘플 비례 읽기가 있는 컬렉션 중 가장 큰
+확장 비율을 따른다. 실제 Firestore 에는 쓰기를 하지 않는다.
+
+두 번의 실행은 각각 임시 디렉토리를 cwd 로 삼아 돌린다. 스크립트가 plan_script() 에 알려 준
+로컬 상태/출력 경로(--root, --state, --db, --cache ...)는 실행마다 임시 디렉토리 안 복사본을
+가리키게 하므로, 계획 중 기록한 진행 상태/워터마크/캐시가 실제 파일에 남지 않는다.
+
+사용법:
+    python scripts/verify_firestore_structure.py --plan
+    python scripts/migrate_firestore_structure.py --plan --plan-sample 500 --concurrency 8
+    python scripts/dedupe_documents.py --plan --plan-source snapshots/latest -- --apply
+    python scripts/firestore_plan.py scripts/fix_missing_organization_id.py -- --max-inflight 32
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import runpy
+import shutil
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DEFAULT_SAMPLE = 200
+SAMPLE_CHUNKS = 4
+SCAN_PAGE_SIZE = 1000       # iter_collection 기본 페이지 크기
+# USD / 10만 건 (multi-region 기준, 리전 요금은 --price-* 로 지정)
+PRICE_READ = 0.06
+PRICE_WRITE = 0.18
+PRICE_DELETE = 0.02
+
+
+# ---------------------------------------------------------------------------
+# 문서 크기 (Firestore 저장 크기 계산 규칙)
+# ---------------------------------------------------------------------------
+
+
+def value_size(value):
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, datetime)):
+        return 8
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(value_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(len(str(k).encode("utf-8")) + 1 + value_size(v) for k, v in value.items())
+    if hasattr(value, "latitude"):
+        return 16
+    if hasattr(value, "path"):
+        return document_name_size(value.path)
+    return 8
+
+
+def document_name_size(path):
+    return sum(len(part.encode("utf-8")) + 1 for part in path.split("/")) + 16
+
+
+def document_size(path, data):
+    return document_name_size(path) + value_size(data or {}) + 32
+
+
+# ---------------------------------------------------------------------------
+# 샘플 원본
+# ---------------------------------------------------------------------------
+
+
+class LiveSource:
+    """실제 Firestore: count() + 무작위 자동 ID 위치에서 시작하는 구간 읽기"""
+
+    def __init__(self, db):
+        self.db = db
+        self.rpc_times = []         # (초, 문서 수)
+
+    def _timed(self, fn):
+        started = time.perf_counter()
+        result = fn()
+        return result, time.perf_counter() - started
+
+    def count(self, collection):
+        result, elapsed = self._timed(lambda: self.db.collection(collection).count().get())
+        self.rpc_times.append((elapsed, 0))
+        return result[0][0].value
+
+    def sample(self, collection, size):
+        col = self.db.collection(collection)
+        chars = string.ascii_letters + string.digits
+        docs = {}
+        per_chunk = max(1, size // SAMPLE_CHUNKS)
+        for _ in range(SAMPLE_CHUNKS):
+            start = col.document("".join(random.choice(chars) for _ in range(20)))
+            query = col.order_by("__name__").start_at([start]).limit(per_chunk)
+            page, elapsed = self._timed(lambda: list(query.stream()))
+            if len(page) < per_chunk:
+                more, extra = self._timed(lambda: list(col.order_by("__name__").limit(per_chunk - len(page)).stream()))
+                page += more
+                elapsed += extra
+            self.rpc_times.append((elapsed, len(page)))
+            for doc in page:
+                docs[doc.id] = doc.to_dict() or {}
+        return docs
+
+    def latency(self):
+        """(RPC당 지연, 문서당 추가 시간) 추정"""
+        empty = [t for t, n in self.rpc_times if n == 0]
+        rpc = sum(empty) / len(empty) if empty else 0.05
+        loaded = [(t - rpc, n) for t, n in self.rpc_times if n > 0]
+        per_doc = max(0.0, sum(t for t, _ in loaded) / max(1, sum(n for _, n in loaded)))
+        return rpc, per_doc
+
+
+class SnapshotSource:
+    """firestore_snapshot.py 스냅샷 디렉토리 (저수지 샘플링)"""
+
+    def __init__(self, path, rpc_latency, per_doc_latency):
+        from firestore_snapshot import SnapshotReader
+
+        self.reader = SnapshotReader(path)
+        self._latency = (rpc_latency, per_doc_latency)
+        self._counts = {}
+
+    def count(self, collection):
+        if collection not in self._counts:
+            info = self.reader.manifest.get("collections", {}).get(collection)
+            if isinstance(info, dict) and "count" in info:
+                self._counts[collection] = info["count"]
+            elif os.path.exists(self.reader.collection_file(collection)):
+                with open(self.reader.collection_file(collection), "rb") as f:
+                    self._counts[collection] = sum(1 for _ in f)
+            else:
+                self._counts[collection] = 0
+        return self._counts[collection]
+
+    def sample(self, collection, size):
+        rng = random.Random(collection)
+        reservoir = []
+        for i, (doc_id, data, _) in enumerate(self.reader.iter_docs(collection)):
+            if i < size:
+                reservoir.append((doc_id, data))
+            else:
+                j = rng.randrange(i + 1)
+                if j < size:
+                    reservoir[j] = (doc_id, data)
+        return dict(reservoir)
+
+    def latency(self):
+        return self._latency
+
+
+# ---------------------------------------------------------------------------
+# 샘플링 가짜 클라이언트
+# ---------------------------------------------------------------------------
+
+
+def _sampling_client(source, sample_size, cache, half=False):
+    """
+    cache: 컬렉션 → (전체 문서 수, 샘플) — 두 번의 실행이 같은 샘플을 공유
+    half: 샘플의 절반만 적재 (전체 샘플의 부분집합). ID 순으로 한 건씩 거르면 ID 에 주기가 있는
+          데이터(p0000, p0004 ... 만 대상인 경우 등)와 겹쳐 증가분이 0 으로 보일 수 있어
+          컬렉션 이름을 시드로 한 무작위 절반을 쓴다.
+    """
+    from firestore_fake import FakeFirestore
+
+    class SamplingFirestore(FakeFirestore):
+        """컬렉션에 처음 접근할 때 원본에서 샘플을 적재"""
+
+        def __init__(self):
+            super().__init__()
+            self.samples = {}       # 컬렉션 → {"count", "sampled", "bytes"}
+
+        def _ensure_sample(self, path):
+            name = path.split("/", 1)[0]
+            if not name or name in self.samples:
+                return
+            if name not in cache:
+                count = source.count(name)
+                cache[name] = (count, source.sample(name, sample_size) if count else {})
+            count, docs = cache[name]
+            if half:
+                keep = random.Random(name).sample(sorted(docs), (len(docs) + 1) // 2)
+                docs = {doc_id: docs[doc_id] for doc_id in sorted(keep)}
+            sizes = [document_size(f"{name}/{doc_id}", data) for doc_id, data in docs.items()]
+            self.samples[name] = {
+                "count": count,
+                "sampled": len(docs),
+                "bytes": sum(sizes) / len(sizes) if sizes else 0,
+            }
+            if docs:
+                self.load({name: docs})
+
+        def collection(self, *path):
+            ref = super().collection(*path)
+            self._ensure_sample(ref.path)
+            return ref
+
+        def document(self, *path):
+            ref = super().document(*path)
+            self._ensure_sample(ref.path)
+            return ref
+
+    return SamplingFirestore()
+
+
+# ---------------------------------------------------------------------------
+# 계획 실행
+# ---------------------------------------------------------------------------
+
+
+def _fit(full, half, x_full, x_half, target):
+    """두 샘플 크기(x_full, x_half)에서 센 횟수 → 고정분 + 증가분 × target"""
+    if x_full <= x_half:
+        return full
+    per_doc = max(0.0, (full - half) / (x_full - x_half))
+    fixed = max(0.0, full - per_doc * x_full)
+    return fixed + per_doc * target
+
+
+def estimate(client, half_client, latency, concurrency, prices):
+    """전체 / 절반 샘플 실행 통계 → 컬렉션별 / 합계 추정치"""
+    rpc_latency, per_doc = latency
+    empty = {"rpcs": 0, "queries": 0, "reads": 0, "writes": 0, "deletes": 0}
+    no_sample = {"count": 0, "sampled": 0, "bytes": 0}
+
+    def axis(name):
+        """(전체 실행 x, 절반 실행 x, 확장 대상 x)"""
+        sample = client.samples.get(name, no_sample)
+        half = half_client.samples.get(name, no_sample)
+        return sample["sampled"], half["sampled"], sample["count"]
+
+    # 샘플이 없는 컬렉션의 증가분이 따를 비율: 읽기가 샘플에 비례한 컬렉션 중 가장 큰 확장 비율
+    driver = 1.0
+    for name, counts in client.collection_stats.items():
+        x_full, x_half, count = axis(name)
+        half_reads = half_client.collection_stats.get(name, empty)["reads"]
+        if x_full > x_half and counts["reads"] > half_reads:
+            driver = max(driver, count / x_full)
+
+    rows = []
+    totals = {"reads": 0, "writes": 0, "deletes": 0, "rpcs": 0, "bytes": 0.0}
+    for name, counts in sorted(client.collection_stats.items()):
+        sample = client.samples.get(name, no_sample)
+        half_counts = half_client.collection_stats.get(name, empty)
+        x_full, x_half, target = axis(name)
+        if not x_full:
+            x_full, x_half, target = 1.0, 0.5, driver
+
+        def fit(key):
+            return _fit(counts[key], half_counts[key], x_full, x_half, target)
+
+        scale = sample["count"] / sample["sampled"] if sample["sampled"] else driver
+        row = {"collection": name, "count": sample["count"], "sampled": sample["sampled"], "scale": scale}
+        for key in ("reads", "writes", "deletes"):
+            row[key] = fit(key)
+            totals[key] += row[key]
+        # 샘플 전체를 읽는 쿼리(스캔)는 페이지 수만큼, 일부만 읽는 조회 쿼리는 횟수대로 증가
+        queries = counts["queries"]
+        query_rpcs = fit("queries")
+        if queries and counts["reads"] / queries >= sample["sampled"] / 2:
+            query_rpcs = max(query_rpcs, row["reads"] / SCAN_PAGE_SIZE)
+        other_rpcs = _fit(counts["rpcs"] - queries, half_counts["rpcs"] - half_counts["queries"],
+                          x_full, x_half, target)
+        row["rpcs"] = other_rpcs + query_rpcs
+        totals["rpcs"] += row["rpcs"]
+        row["bytes"] = (row["reads"] + row["writes"]) * sample["bytes"]
+        totals["bytes"] += row["bytes"]
+        rows.append(row)
+    totals["cost"] = (totals["reads"] * prices[0] + totals["writes"] * prices[1]
+                      + totals["deletes"] * prices[2]) / 100000
+    totals["seconds"] = (totals["rpcs"] * rpc_latency
+                         + (totals["reads"] + totals["writes"]) * per_doc) / max(1, concurrency)
+    return rows, totals
+
+
+def _format_duration(seconds):
+    if seconds < 60:
+        return f"{seconds:.1f}초"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}분"
+    return f"{seconds / 3600:.1f}시간"
+
+
+def _option_index(args, option):
+    """args 에서 option 값의 위치와 '--opt=값' 형식 여부 (없으면 (None, False))"""
+    for i, arg in enumerate(args):
+        if arg == option and i + 1 < len(args):
+            return i + 1, False
+        if arg.startswith(option + "="):
+            return i, True
+    return None, False
+
+
+def _copy_path(source, target):
+    """파일/디렉토리 복사 (원본이 없으면 부모 디렉토리만 만든다)"""
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    if os.path.isdir(source):
+        shutil.copytree(source, target)
+    elif os.path.isfile(source):
+        shutil.copy2(source, target)
+
+
+def _isolated_args(script_args, workdir, state_paths=None, fixed_args=None):
+    """
+    workdir 를 cwd 로 실행할 인자 목록
+
+    state_paths: {옵션: 기본값} 스크립트의 로컬 상태/출력 경로. 옵션으로 준 경로는
+                 workdir/<옵션>/ 아래 복사본으로 바꾸고, 옵션이 없으면 (상대 경로) 기본값 위치를
+                 workdir 안 같은 상대 위치로 복사한다.
+    fixed_args: {옵션: 값} 계획 실행에서 강제할 값 (없으면 끝에 붙인다)
+    나머지 인자 중 이미 있는 상대 경로(입력 파일/디렉토리)는 절대 경로로 바꾼다.
+    """
+    args = list(script_args)
+    rewritten = set()
+    for option, default in (state_paths or {}).items():
+        i, inline = _option_index(args, option)
+        if i is None:
+            if default and not os.path.isabs(default):
+                _copy_path(default, os.path.join(workdir, default))
+            continue
+        value = args[i].split("=", 1)[1] if inline else args[i]
+        target = os.path.join(workdir, option.lstrip("-"), os.path.basename(os.path.normpath(value)))
+        _copy_path(value, target)
+        args[i] = f"{option}={target}" if inline else target
+        rewritten.add(i)
+    for i, arg in enumerate(args):
+        if i not in rewritten and not arg.startswith("-") and not os.path.isabs(arg) and os.path.exists(arg):
+            args[i] = os.path.abspath(arg)
+    for option, value in (fixed_args or {}).items():
+        i, inline = _option_index(args, option)
+        if i is None:
+            args += [option, str(value)]
+        else:
+            args[i] = f"{option}={value}" if inline else str(value)
+    return args
+
+
+def _run_script(script, script_args, client, cwd=None):
+    """client 를 설치하고 (cwd 에서) script 실행 → (종료 코드, 출력 줄, 초)"""
+    import firestore_fake
+
+    firestore_fake.install(client)
+    output = io.StringIO()
+    saved_argv, saved_cwd = sys.argv, os.getcwd()
+    sys.argv = [script] + list(script_args)
+    exit_code = 0
+    started = time.perf_counter()
+    try:
+        if cwd:
+            os.chdir(cwd)
+        with contextlib.redirect_stdout(output):
+            runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+    return exit_code, output.getvalue().splitlines(), time.perf_counter() - started
+
+
+def _run_isolated(script, script_args, client, state_paths, fixed_args):
+    """임시 디렉토리에서 실행: 스크립트의 로컬 상태/출력은 복사본에만 기록된다"""
+    with tempfile.TemporaryDirectory(prefix="firestore_plan_") as workdir:
+        args = _isolated_args(script_args, workdir, state_paths, fixed_args)
+        return _run_script(script, args, client, cwd=workdir)
+
+
+def run_plan(script, script_args, source_spec=None, sample_size=DEFAULT_SAMPLE, concurrency=1,
+             cred=None, prices=(PRICE_READ, PRICE_WRITE, PRICE_DELETE),
+             rpc_latency_ms=50.0, show_output=False, state_paths=None, fixed_args=None):
+    """script 를 샘플 데이터 위에서 실행하고 비용 추정 출력 (state_paths / fixed_args: _isolated_args)"""
+
+    try:
+
+        if source_spec:
+            # 샘플은 스크립트 실행 중(임시 cwd) 처음 접근할 때 읽으므로 절대 경로로
+            source = SnapshotSource(os.path.abspath(source_spec), rpc_latency_ms / 1000.0, 0.0002)
+        else:
+            from firestore_common import get_db
+            source = LiveSource(get_db(cred))   # 가짜 모듈 설치 전에 실제 클라이언트 생성
+
+        cache = {}
+        half_client = _sampling_client(source, sample_size, cache, half=True)
+        client = _sampling_client(source, sample_size, cache)
+
+        print("=" * 70)
+        print(f"🧮 실행 계획: {os.path.basename(script)} {' '.join(script_args)}")
+        print("=" * 70)
+        print(f"   원본: {source_spec or 'Firestore'}  샘플: 컬렉션당 {sample_size}건  동시성: {concurrency}")
+
+        # 고정분 / 증가분 구분용 절반 실행. 두 실행 모두 로컬 상태의 같은 원본 복사본에서 시작
+        _run_isolated(script, script_args, half_client, state_paths, fixed_args)
+        exit_code, lines, elapsed = _run_isolated(script, script_args, client, state_paths, fixed_args)
+        if show_output:
+            for line in lines:
+                print(f"   │ {line}")
+        print(f"   샘플 실행: {elapsed:.2f}초, 종료 코드 {exit_code}, 출력 {len(lines)}줄")
+
+        rows, totals = estimate(client, half_client, source.latency(), concurrency, prices)
+        print(f"\n{'컬렉션':<20}{'문서 수':>10}{'샘플':>7}{'읽기':>12}{'쓰기':>12}{'삭제':>10}{'MB':>9}")
+        for row in rows:
+            print(f"{row['collection']:<20}{row['count']:>10,}{row['sampled']:>7,}"
+                  f"{row['reads']:>12,.0f}{row['writes']:>12,.0f}{row['deletes']:>10,.0f}"
+                  f"{row['bytes'] / 1024 / 1024:>9,.1f}")
+
+        print("\n" + "=" * 70)
+        print(f"📊 예상 읽기 {totals['reads']:,.0f}  쓰기 {totals['writes']:,.0f}  삭제 {totals['deletes']:,.0f}  "
+              f"RPC {totals['rpcs']:,.0f}")
+        print(f"   전송량 약 {totals['bytes'] / 1024 / 1024:,.1f} MB, 요금 약 ${totals['cost']:,.4f}, "
+              f"소요 시간 약 {_format_duration(totals['seconds'])} (동시성 {concurrency})")
+        print("   ※ 실제 Firestore 에는 아무것도 쓰지 않았습니다.")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def _parser():
+    parser = argparse.ArgumentParser(description="유지보수 스크립트 실행 계획 (비용 추정)")
+    parser.add_argument("--plan", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--plan-source", help="Firestore 대신 샘플링할 스냅샷 디렉토리")
+    parser.add_argument("--plan-sample", type=int, default=DEFAULT_SAMPLE, help="컬렉션당 샘플 수")
+    parser.add_argument("--concurrency", type=int, default=1, help="소요 시간 계산용 동시 작업 수")
+    parser.add_argument("--plan-cred", help="Admin SDK JSON")
+    parser.add_argument("--rpc-latency-ms", type=float, default=50.0, help="스냅샷 원본일 때 가정할 RPC 지연")
+    parser.add_argument("--price-read", type=float, default=PRICE_READ, help="USD / 10만 읽기")
+    parser.add_argument("--price-write", type=float, default=PRICE_WRITE, help="USD / 10만 쓰기")
+    parser.add_argument("--price-delete", type=float, default=PRICE_DELETE, help="USD / 10만 삭제")
+    parser.add_argument("--show-output", action="store_true", help="샘플 실행 중 스크립트 출력 표시")
+    return parser
+
+
+def plan_script(script, argv=None, state_paths=None, fixed_args=None):
+    """
+    스크립트의 `--plan` 진입점: 계획 옵션을 제외한 인자는 스크립트로 전달
+    (스크립트 인자가 계획 옵션과 겹치면 `--` 뒤에 둔다)
+
+    state_paths: {옵션: 기본값} 스크립트가 읽고 쓰는 로컬 상태/출력 경로 (기본값은 상대 경로)
+    fixed_args: {옵션: 값} 계획 실행에서 강제할 인자. 작업 프로세스가 Firestore 를 읽고 쓰는
+                스크립트는 --workers 1 로 돌려야 자식 프로세스의 읽기/쓰기가 통계에 잡힌다.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if "--" in argv:
+        split = argv.index("--")
+        argv, script_args = argv[:split], argv[split + 1:]
+        args, rest = _parser().parse_known_args(argv)
+        script_args = rest + script_args
+    else:
+        args, script_args = _parser().parse_known_args(argv)
+    success = run_plan(os.path.abspath(script), script_args, args.plan_source, args.plan_sample,
+                       args.concurrency, args.plan_cred,
+                       (args.price_read, args.price_write, args.price_delete),
+                       args.rpc_latency_ms, args.show_output, state_paths, fixed_args)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1].startswith("-"):
+        print("사용법: python scripts/firestore_plan.py <script.py> [계획 옵션] [-- 스크립트 인자]")
+        sys.exit(2)
+    sys.exit(plan_script(sys.argv[1], sys.argv[2:]))
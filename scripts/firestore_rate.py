@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Firestore 동시 작업 수 자동 조절 (AIMD)
+
+병렬로 쓰기를 보내면 RESOURCE_EXHAUSTED(할당량) / ABORTED(트랜잭션 경합)가 발생한다.
+AdaptiveLimiter 는 TCP 혼잡 제어와 같은 방식으로 동시 작업 수(in-flight)를 조절한다.
+
+- 성공: 현재 한도만큼 작업이 성공할 때마다 한도 +1 (additive increase)
+- 할당량/경합/일시 오류: 한도 x0.5 (multiplicative decrease) 후 지수 백오프로 재시도
+  (감소 이후에 시작된 작업의 오류만 다시 감소시켜, 한 번의 과부하로 여러 번 줄이지 않음)
+- 컬렉션별 500/50/5 규칙: 처음에는 초당 500회, 5분마다 50%씩 상한 증가
+
+사용법:
+    from firestore_rate import AdaptiveLimiter, add_rate_arguments
+
+    limiter = AdaptiveLimiter.from_args(args)
+    for item, result, error in limiter.map(update_one, items, collection="patients"):
+        ...
+    limiter.print_summary()
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+# 재시도 대상 오류 (google.api_core.exceptions 클래스 이름 기준, 가짜 클라이언트도 같은 이름 사용)
+THROTTLE_ERRORS = {"ResourceExhausted", "TooManyRequests"}
+CONTENTION_ERRORS = {"Aborted"}
+TRANSIENT_ERRORS = {"ServiceUnavailable", "DeadlineExceeded", "InternalServerError"}
+
+RAMP_BASE_RATE = 500        # 초당 작업 수
+RAMP_FACTOR = 1.5           # 50% 증가
+RAMP_INTERVAL = 300         # 5분
+
+
+def classify_error(error):
+    """오류 → 'throttle' | 'contention' | 'transient' | None (재시도 불가)"""
+    for cls in type(error).__mro__:
+        if cls.__name__ in THROTTLE_ERRORS:
+            return "throttle"
+        if cls.__name__ in CONTENTION_ERRORS:
+            return "contention"
+        if cls.__name__ in TRANSIENT_ERRORS:
+            return "transient"
+    return None
+
+
+class AdaptiveLimiter:
+    """AIMD 동시성 한도 + 컬렉션별 ramp-up 속도 상한"""
+
+    def __init__(self, initial=4, min_limit=1, max_limit=64, decrease=0.5,
+                 ramp=True, base_rate=RAMP_BASE_RATE, max_retries=8,
+                 backoff=0.05, max_backoff=10.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.ramp = ramp
+        self.base_rate = base_rate
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.in_flight = 0
+        self.peak_limit = self.limit
+        self.stats = Counter()
+        self._epoch = 0
+        self._cond = threading.Condition()
+        self._buckets = {}          # collection → [tokens, 마지막 충전 시각, 시작 시각]
+        self._started = time.monotonic()
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(initial=args.initial_inflight, max_limit=args.max_inflight,
+                   ramp=not args.no_ramp, base_rate=args.base_rate)
+
+    # --- 한도 ---
+
+    def _acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            return self._epoch
+
+    def _release(self, epoch, kind, retry=False):
+        with self._cond:
+            self.in_flight -= 1
+            if retry:
+                self.stats["retries"] += 1
+            if kind is None:
+                self.stats["ok"] += 1
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self.peak_limit = max(self.peak_limit, self.limit)
+            else:
+                self.stats[kind] += 1
+                if epoch == self._epoch:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._epoch += 1
+                    self.stats["decreases"] += 1
+            self._cond.notify_all()
+
+    # --- 500/50/5 ramp-up ---
+
+    def rate_cap(self, collection):
+        """컬렉션의 현재 초당 작업 상한 (ramp 미사용 시 None)"""
+        if not self.ramp or collection is None:
+            return None
+        bucket = self._buckets.get(collection)
+        elapsed = time.monotonic() - bucket[2] if bucket else 0.0
+        return self.base_rate * RAMP_FACTOR ** int(elapsed // RAMP_INTERVAL)
+
+    def _throttle(self, collection, ops):
+        if not self.ramp or collection is None:
+            return
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                bucket = self._buckets.get(collection)
+                if bucket is None:
+                    bucket = self._buckets[collection] = [float(self.base_rate), now, now]
+                cap = self.rate_cap(collection)
+                bucket[0] = min(cap, bucket[0] + (now - bucket[1]) * cap)
+                bucket[1] = now
+                if bucket[0] >= ops or bucket[0] >= cap:
+                    bucket[0] -= ops
+                    return
+                delay = (ops - bucket[0]) / cap
+            time.sleep(delay)
+
+    # --- 실행 ---
+
+    def call(self, fn, *args, collection=None, ops=1, **kwargs):
+        """
+        fn 실행 (한도 대기 → 실행 → 재시도 가능한 오류면 백오프 후 재시도)
+        ops: 속도 상한에 계산할 작업 수 (배치 커밋이면 배치 크기)
+        """
+        for attempt in range(self.max_retries + 1):
+            self._throttle(collection, ops)
+            epoch = self._acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                kind = classify_error(e)
+                retry = kind is not None and attempt < self.max_retries
+                self._release(epoch, kind or "failed", retry)
+                if not retry:
+                    raise
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                time.sleep(delay * (0.5 + random.random() / 2))
+                continue
+            self._release(epoch, None)
+            return result
+
+    def map(self, fn, items, collection=None, ops=1, workers=None):
+        """
+        items 를 병렬 처리하며 (item, 결과, 오류) 를 완료 순으로 생성
+        제출 대기열을 작업자 수의 2배로 제한해 큰 입력도 메모리에 모두 올리지 않는다
+        """
+        workers = workers or self.max_limit
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for item in items:
+                futures[pool.submit(self.call, fn, item, collection=collection, ops=ops)] = item
+                if len(futures) >= workers * 2:
+                    done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._outcome(futures.pop(future), future)
+            for future in as_completed(list(futures)):
+                yield self._outcome(futures.pop(future), future)
+
+    @staticmethod
+    def _outcome(item, future):
+        error = future.exception()
+        return item, (None if error else future.result()), error
+
+    # --- 요약 ---
+
+    def summary(self):
+        elapsed = time.monotonic() - self._started
+        with self._cond:
+            return {
+                "elapsed": elapsed,
+                "ok": self.stats["ok"],
+                "ops_per_sec": self.stats["ok"] / elapsed if elapsed else 0.0,
+                "limit": int(self.limit),
+                "peak_limit": int(self.peak_limit),
+                "throttled": self.stats["throttle"],
+                "contention": self.stats["contention"],
+                "transient": self.stats["transient"],
+                "failed": self.stats["failed"],
+                "retries": self.stats["retries"],
+                "decreases": self.stats["decreases"],
+                "rate_caps": {c: self.rate_cap(c) for c in self._buckets},
+            }
+
+    def print_summary(self):
+        s = self.summary()
+        print(f"\n⚙️  동시성 제어: 현재 한도 {s['limit']} (최대 {s['peak_limit']}), "
+              f"감소 {s['decreases']}회, 재시도 {s['retries']}회")
+        print(f"   성공 {s['ok']:,}건, {s['ops_per_sec']:,.0f}건/초  "
+              f"(할당량 {s['throttled']}, 경합 {s['contention']}, 일시 오류 {s['transient']})")
+        for collection, cap in s["rate_caps"].items():
+            if cap:
+                print(f"   {collection}: ramp-up 상한 {cap:,.0f}건/초")
+
+
+def add_rate_arguments(parser):
+    """스크립트 공통 동시성 옵션"""
+    parser.add_argument("--initial-inflight", type=int, default=4, help="초기 동시 작업 수")
+    parser.add_argument("--max-inflight", type=int, default=64, help="최대 동시 작업 수")
+    parser.add_argument("--base-rate", type=int, default=RAMP_BASE_RATE, help="ramp-up 시작 속도 (건/초)")
+    parser.add_argument("--no-ramp", action="store_true", help="500/50/5 ramp-up 상한 사용 안 함 (기존 트래픽이 있는 컬렉션)")
@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+Firestore 로컬 복제본 (SQLite, 변경분 동기화)
+
+"ACTIVE 환자 중 therapist_id 가 없는 환자 수", "지난 날짜인데 아직 예약 상태인 일정" 같은
+질문마다 운영 Firestore 를 읽는 스크립트를 새로 만들지 않도록, 주요 컬렉션을 로컬
+SQLite 파일에 복제해 두고 SQL 로 바로 조회한다.
+
+테이블:
+    docs(collection, doc_id, update_time, data)   모든 컬렉션의 원본 문서 (encode_value JSON)
+    users / patients / appointments / attendances / makeup_tickets / payments / vouchers /
+    sessions                                       정규화 테이블 (firestore_models 별칭 통합,
+                                                  시각은 UTC 'YYYY-MM-DD HH:MM:SS')
+    user_roles / patient_guardians / user_linked_patients   배열/Map 필드 → 행
+    sync_state(collection, watermark, synced_at, count)
+
+동기화:
+    sync          처음에는 전체 조회, 이후 update_time watermark 이후 변경분만
+                  (updated_at / created_at 조회 후 update_time 으로 재확인, firestore_backup 과 동일)
+    sync --watch  --interval 초마다 변경분 동기화 반복
+    listen        on_snapshot 리스너로 실시간 반영 (시작 시 컬렉션 전체를 한 번 받음)
+
+기존 스크립트는 run 으로 복제본 위에서 실행한다 (가짜 Firestore 에 컬렉션을 처음 접근할 때
+적재, 스크립트의 쓰기는 메모리에만 반영되고 운영 데이터/복제본에는 기록되지 않음).
+
+DuckDB 로 조회하려면 DuckDB 의 sqlite 확장으로 이 파일을 ATTACH 하면 된다.
+
+사용법:
+    python scripts/firestore_replica.py sync                       # 최초 전체, 이후 변경분
+    python scripts/firestore_replica.py sync --detect-deletes --watch --interval 300
+    python scripts/firestore_replica.py checks                     # 기본 점검 쿼리
+    python scripts/firestore_replica.py sql "SELECT status, COUNT(*) FROM patients GROUP BY status"
+    python scripts/firestore_replica.py run verify_organization_id.py
+"""
+
+import argparse
+import json
+import os
+import queue
+import runpy
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from firestore_backup import _changed_docs, _list_ids, _scans, add_mode_argument, run_watermark, warn_field_mode
+from firestore_common import decode_value, encode_value, get_db, iter_collection
+from firestore_models import Appointment, Attendance, Patient, Session, User
+from firestore_snapshot import DEFAULT_COLLECTIONS
+
+DEFAULT_DB = "replica.sqlite"
+COMMIT_EVERY = 2000
+
+
+def _aliases(model, attr):
+    """firestore_models 의 필드 별칭 (스크립트 / 복제본이 같은 철자와 우선순위로 읽도록)"""
+    return next(aliases for name, aliases, _, _ in model.FIELDS if name == attr)
+
+
+# 정규화 테이블: 컬럼 → (별칭, 종류)  종류: text | upper | int | real | bool | time
+# 모델이 있는 컬렉션은 firestore_models 의 별칭을 쓰고, 모델에 없는 컬럼만 여기서 정의
+TABLES = {
+    "users": {
+        "email": (_aliases(User, "email"), "text"),
+        "name": (_aliases(User, "name"), "text"),
+        "role": (_aliases(User, "role"), "upper"),
+        "organization_id": (_aliases(User, "organization_id"), "text"),
+        "phone": (_aliases(User, "phone"), "text"),
+        "created_at": (_aliases(User, "created_at"), "time"),
+        "updated_at": (("updated_at", "updatedAt"), "time"),
+    },
+    "patients": {
+        "organization_id": (_aliases(Patient, "organization_id"), "text"),
+        "patient_code": (_aliases(Patient, "patient_code"), "text"),
+        "name": (_aliases(Patient, "name"), "text"),
+        "birth_date": (_aliases(Patient, "birth_date"), "time"),
+        "gender": (_aliases(Patient, "gender"), "upper"),
+        "status": (_aliases(Patient, "status"), "upper"),
+        "therapist_id": (("therapist_id", "therapistId"), "text"),
+        "assigned_therapist_id": (_aliases(Patient, "assigned_therapist_id"), "text"),
+        "created_at": (_aliases(Patient, "created_at"), "time"),
+        "updated_at": (("updated_at", "updatedAt"), "time"),
+    },
+    "appointments": {
+        "patient_id": (_aliases(Appointment, "patient_id"), "text"),
+        "guardian_id": (_aliases(Appointment, "guardian_id"), "text"),
+        "therapist_id": (_aliases(Appointment, "therapist_id"), "text"),
+        "appointment_date": (_aliases(Appointment, "appointment_date"), "time"),
+        "time_slot": (_aliases(Appointment, "time_slot"), "text"),
+        "status": (_aliases(Appointment, "status"), "upper"),
+        "attended": (_aliases(Appointment, "attended"), "bool"),
+        "session_recorded": (_aliases(Appointment, "session_recorded"), "bool"),
+        "is_makeup": (_aliases(Appointment, "is_makeup"), "bool"),
+        "makeup_ticket_id": (_aliases(Appointment, "makeup_ticket_id"), "text"),
+        "is_draft": (("is_draft",), "bool"),
+        "created_at": (_aliases(Appointment, "created_at"), "time"),
+        "updated_at": (_aliases(Appointment, "updated_at"), "time"),
+    },
+    "attendances": {
+        "patient_id": (_aliases(Attendance, "patient_id"), "text"),
+        "therapist_id": (_aliases(Attendance, "therapist_id"), "text"),
+        "session_id": (_aliases(Attendance, "session_id"), "text"),
+        "schedule_date": (_aliases(Attendance, "schedule_date"), "time"),
+        "time_slot": (_aliases(Attendance, "time_slot"), "text"),
+        "status": (_aliases(Attendance, "status"), "upper"),
+        "has_makeup": (("has_makeup", "hasMakeup"), "bool"),
+        "created_at": (_aliases(Attendance, "created_at"), "time"),
+    },
+    "makeup_tickets": {
+        "patient_id": (("patient_id", "patientId"), "text"),
+        "therapist_id": (("therapist_id", "therapistId"), "text"),
+        "status": (("status",), "upper"),
+        "original_date": (("original_date", "originalDate"), "time"),
+        "expiry_date": (("expiry_date", "expiryDate"), "time"),
+        "used_date": (("used_date", "usedDate"), "time"),
+        "created_at": (("created_at", "createdAt"), "time"),
+    },
+    "payments": {
+        "patient_id": (("patient_id", "patientId"), "text"),
+        "organization_id": (("organization_id", "organizationId"), "text"),
+        "therapist_id": (("therapist_id", "therapistId"), "text"),
+        "amount": (("amount",), "real"),
+        "discount": (("discount",), "real"),
+        "final_amount": (("final_amount", "finalAmount"), "real"),
+        "payment_method": (("payment_method", "paymentMethod"), "text"),
+        "use_voucher": (("use_voucher", "useVoucher"), "bool"),
+        "created_at": (("created_at", "createdAt"), "time"),
+    },
+    "vouchers": {
+        "patient_id": (("patient_id", "patientId"), "text"),
+        "total_sessions": (("total_sessions", "totalSessions"), "int"),
+        "remaining_sessions": (("remaining_sessions", "remainingSessions"), "int"),
+        "used_sessions": (("used_sessions", "usedSessions"), "int"),
+        "expiry_date": (("expiry_date", "expiryDate"), "time"),
+        "created_at": (("created_at", "createdAt"), "time"),
+    },
+    "sessions": {
+        "patient_id": (_aliases(Session, "patient_id"), "text"),
+        "therapist_id": (_aliases(Session, "therapist_id"), "text"),
+        "session_date": (_aliases(Session, "session_date"), "time"),
+        "status": (_aliases(Session, "status"), "upper"),
+        "created_at": (_aliases(Session, "created_at"), "time"),
+    },
+}
+
+# 배열/Map 필드 → 자식 테이블: 테이블 → (부모 컬렉션, 부모 컬럼, 값 컬럼, 별칭, 종류)
+CHILD_TABLES = {
+    "patient_guardians": ("patients", "patient_id", "guardian_id", _aliases(Patient, "guardian_ids"), "list"),
+    "user_roles": ("users", "user_id", "role", ("roles",), "role_map"),
+    "user_linked_patients": ("users", "user_id", "patient_id", _aliases(User, "linked_patient_ids"), "list"),
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS users_org ON users (organization_id, role)",
+    "CREATE INDEX IF NOT EXISTS users_email ON users (email)",
+    "CREATE INDEX IF NOT EXISTS patients_org ON patients (organization_id, status)",
+    "CREATE INDEX IF NOT EXISTS patients_therapist ON patients (therapist_id)",
+    "CREATE INDEX IF NOT EXISTS appointments_status ON appointments (status, appointment_date)",
+    "CREATE INDEX IF NOT EXISTS appointments_patient ON appointments (patient_id, appointment_date)",
+    "CREATE INDEX IF NOT EXISTS appointments_therapist ON appointments (therapist_id, appointment_date)",
+    "CREATE INDEX IF NOT EXISTS attendances_patient ON attendances (patient_id, schedule_date)",
+    "CREATE INDEX IF NOT EXISTS makeup_tickets_patient ON makeup_tickets (patient_id, status)",
+    "CREATE INDEX IF NOT EXISTS payments_org ON payments (organization_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS vouchers_patient ON vouchers (patient_id)",
+    "CREATE INDEX IF NOT EXISTS sessions_patient ON sessions (patient_id, session_date)",
+    "CREATE INDEX IF NOT EXISTS patient_guardians_guardian ON patient_guardians (guardian_id)",
+    "CREATE INDEX IF NOT EXISTS user_roles_role ON user_roles (role)",
+]
+
+CHECKS = {
+    "ACTIVE 환자 중 therapist_id 없음":
+        "SELECT id, name FROM patients WHERE status = 'ACTIVE' "
+        "AND assigned_therapist_id IS NULL",
+    "organization_id 없는 환자":
+        "SELECT id, name FROM patients WHERE organization_id IS NULL",
+    "organization_id 없는 사용자":
+        "SELECT id, email FROM users WHERE organization_id IS NULL",
+    "지난 날짜인데 예약 상태인 일정":
+        "SELECT id, patient_id, appointment_date, status FROM appointments "
+        "WHERE status IN ('SCHEDULED', 'PENDING', 'CONFIRMED') AND appointment_date < datetime('now')",
+    "보호자가 없는 환자":
+        "SELECT p.id, p.name FROM patients p "
+        "WHERE NOT EXISTS (SELECT 1 FROM patient_guardians g WHERE g.patient_id = p.id)",
+    "보호자 연결이 한쪽만 있는 환자":
+        "SELECT g.patient_id, g.guardian_id FROM patient_guardians g "
+        "WHERE NOT EXISTS (SELECT 1 FROM user_linked_patients l "
+        "                  WHERE l.user_id = g.guardian_id AND l.patient_id = g.patient_id)",
+    "만료일이 지났는데 사용 가능한 보강권":
+        "SELECT id, patient_id, expiry_date FROM makeup_tickets "
+        "WHERE status = 'AVAILABLE' AND expiry_date < datetime('now')",
+}
+
+
+# ---------------------------------------------------------------------------
+# 값 변환
+# ---------------------------------------------------------------------------
+
+
+def sql_time(value):
+    """datetime → UTC 'YYYY-MM-DD HH:MM:SS' (SQLite datetime() 과 비교 가능)"""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _convert(value, kind):
+    if value is None:
+        return None
+    if kind == "time":
+        return sql_time(value)
+    if kind == "bool":
+        return 1 if value else 0
+    if kind == "int":
+        return int(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    if kind == "real":
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    if kind == "upper":
+        return value.upper() if isinstance(value, str) else None
+    return value if isinstance(value, str) else str(value)
+
+
+def _first(data, aliases):
+    for key in aliases:
+        value = data.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def table_row(collection, doc_id, data):
+    columns = TABLES[collection]
+    return (doc_id, *(_convert(_first(data, aliases), kind) for aliases, kind in columns.values()))
+
+
+def child_rows(table, doc_id, data):
+    _, _, _, aliases, kind = CHILD_TABLES[table]
+    values = []
+    if kind == "role_map":
+        roles = data.get(aliases[0])
+        if isinstance(roles, dict):
+            values = sorted({str(k).lower() for k, v in roles.items() if v is True})
+        if isinstance(data.get("role"), str):
+            values = sorted(set(values) | {data["role"].lower()})
+    else:
+        for key in aliases:
+            for value in data.get(key) or ():
+                if isinstance(value, str) and value not in values:
+                    values.append(value)
+    return [(doc_id, value) for value in values]
+
+
+# ---------------------------------------------------------------------------
+# SQLite 복제본
+# ---------------------------------------------------------------------------
+
+
+class Replica:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-262144")
+        statements = [
+            """CREATE TABLE IF NOT EXISTS docs (
+                collection TEXT NOT NULL, doc_id TEXT NOT NULL, update_time TEXT, data TEXT NOT NULL,
+                PRIMARY KEY (collection, doc_id)
+            ) WITHOUT ROWID""",
+            """CREATE TABLE IF NOT EXISTS sync_state (
+                collection TEXT PRIMARY KEY, watermark TEXT, synced_at TEXT, count INTEGER
+            )""",
+        ]
+        for table, columns in TABLES.items():
+            cols = ", ".join(f"{name} {self._sql_type(kind)}" for name, (_, kind) in columns.items())
+            statements.append(f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, {cols})")
+        for table, (_, parent, value, _, _) in CHILD_TABLES.items():
+            statements.append(f"CREATE TABLE IF NOT EXISTS {table} ({parent} TEXT NOT NULL, {value} TEXT NOT NULL, "
+                              f"PRIMARY KEY ({parent}, {value})) WITHOUT ROWID")
+        for statement in statements + INDEXES:
+            self.conn.execute(statement)
+        self.conn.commit()
+        self._children = {}
+        for table, (collection, *_) in CHILD_TABLES.items():
+            self._children.setdefault(collection, []).append(table)
+
+    @staticmethod
+    def _sql_type(kind):
+        return {"int": "INTEGER", "bool": "INTEGER", "real": "REAL"}.get(kind, "TEXT")
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    # --- 동기화 상태 ---
+
+    def watermark(self, collection):
+        row = self.conn.execute("SELECT watermark FROM sync_state WHERE collection = ?", (collection,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def set_synced(self, collection, watermark):
+        count = self.conn.execute("SELECT COUNT(*) FROM docs WHERE collection = ?", (collection,)).fetchone()[0]
+        self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                          (collection, watermark.isoformat() if watermark else None,
+                           datetime.now(timezone.utc).isoformat(), count))
+
+    def synced_collections(self):
+        return [row[0] for row in self.conn.execute("SELECT collection FROM sync_state ORDER BY collection")]
+
+    # --- 쓰기 ---
+
+    def clear(self, collection):
+        self.conn.execute("DELETE FROM docs WHERE collection = ?", (collection,))
+        if collection in TABLES:
+            self.conn.execute(f"DELETE FROM {collection}")
+        for table in self._children.get(collection, ()):
+            self.conn.execute(f"DELETE FROM {table}")
+
+    def upsert_many(self, collection, docs):
+        """[(doc_id, data, update_time)] 반영"""
+        docs = list(docs)
+        if not docs:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)",
+            [(collection, doc_id, update_time.isoformat() if update_time else None,
+              json.dumps(encode_value(data), ensure_ascii=False, sort_keys=True))
+             for doc_id, data, update_time in docs])
+        if collection in TABLES:
+            placeholders = ", ".join("?" * (len(TABLES[collection]) + 1))
+            self.conn.executemany(f"INSERT OR REPLACE INTO {collection} VALUES ({placeholders})",
+                                  [table_row(collection, doc_id, data) for doc_id, data, _ in docs])
+        for table in self._children.get(collection, ()):
+            parent = CHILD_TABLES[table][1]
+            self.conn.executemany(f"DELETE FROM {table} WHERE {parent} = ?", [(doc_id,) for doc_id, _, _ in docs])
+            self.conn.executemany(f"INSERT OR IGNORE INTO {table} VALUES (?, ?)",
+                                  [row for doc_id, data, _ in docs for row in child_rows(table, doc_id, data)])
+
+    def delete_many(self, collection, doc_ids):
+        rows = [(doc_id,) for doc_id in doc_ids]
+        self.conn.executemany("DELETE FROM docs WHERE collection = ? AND doc_id = ?",
+                              [(collection, doc_id) for doc_id in doc_ids])
+        if collection in TABLES:
+            self.conn.executemany(f"DELETE FROM {collection} WHERE id = ?", rows)
+        for table in self._children.get(collection, ()):
+            self.conn.executemany(f"DELETE FROM {table} WHERE {CHILD_TABLES[table][1]} = ?", rows)
+
+    def doc_ids(self, collection):
+        return {row[0] for row in self.conn.execute("SELECT doc_id FROM docs WHERE collection = ?", (collection,))}
+
+    # --- 읽기 ---
+
+    def iter_docs(self, collection):
+        """(doc_id, data) — ID 순"""
+        for doc_id, data in self.conn.execute(
+                "SELECT doc_id, data FROM docs WHERE collection = ? ORDER BY doc_id", (collection,)):
+            yield doc_id, decode_value(json.loads(data))
+
+
+# ---------------------------------------------------------------------------
+# 동기화
+# ---------------------------------------------------------------------------
+
+
+def _sync_collection(db, replica, collection, full, mode, overlap, detect_deletes):
+    """컬렉션 하나 동기화 → (반영 문서 수, 삭제 수, 전체 조회 여부)"""
+    watermark = None if full else replica.watermark(collection)
+    mark = run_watermark(overlap)
+    pending = []
+    count = 0
+    scanned = set()
+
+    if watermark is None:
+        replica.clear(collection)
+        source = iter_collection(db, collection)
+    else:
+        source = _changed_docs(db, collection, watermark, mode, overlap, scanned)
+
+    for doc in source:
+        pending.append((doc.id, doc.to_dict() or {}, doc.update_time))
+        if len(pending) >= COMMIT_EVERY:
+            replica.upsert_many(collection, pending)
+            count += len(pending)
+            pending = []
+    replica.upsert_many(collection, pending)
+    count += len(pending)
+
+    deleted = 0
+    if detect_deletes and watermark is not None:
+        current = scanned if _scans(watermark, mode) else _list_ids(db, collection)
+        removed = replica.doc_ids(collection) - current
+        replica.delete_many(collection, removed)
+        deleted = len(removed)
+
+    replica.set_synced(collection, mark)
+    replica.conn.commit()
+    return count, deleted, watermark is None
+
+
+def sync(args):
+    """변경분 동기화 (--watch 이면 반복)"""
+
+    try:
+        db = get_db(args.cred)
+        replica = Replica(args.db)
+        overlap = timedelta(minutes=args.overlap_minutes)
+
+        print("=" * 70)
+        print(f"🔁 Firestore 로컬 복제본 동기화 → {args.db}")
+        print("=" * 70)
+        warn_field_mode(args.mode)
+
+        full = args.full
+        while True:
+            started = time.perf_counter()
+            for collection in args.collections:
+                count, deleted, was_full = _sync_collection(
+                    db, replica, collection, full, args.mode, overlap, args.detect_deletes)
+                kind = "전체" if was_full else "변경"
+                print(f"   ✅ {collection}: {kind} {count:,}건" + (f", 삭제 {deleted:,}건" if deleted else ""))
+            print(f"   ⏱️  {time.perf_counter() - started:.1f}초 ({datetime.now():%H:%M:%S})")
+            if not args.watch:
+                break
+            full = False
+            time.sleep(args.interval)
+
+        replica.close()
+        print("\n" + "=" * 70)
+        print(f"✅ 복제본 저장: {args.db} ({os.path.getsize(args.db) / 1024 / 1024:,.1f} MB)")
+        print("=" * 70)
+        return True
+
+    except KeyboardInterrupt:
+        print("\n⏹️  동기화 중단")
+        return True
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def listen(args):
+    """on_snapshot 리스너로 변경 사항을 실시간 반영 (SQLite 쓰기는 메인 스레드에서만)"""
+
+    try:
+        db = get_db(args.cred)
+        replica = Replica(args.db)
+        changes = queue.Queue()
+
+        print("=" * 70)
+        print(f"👂 실시간 동기화 → {args.db} (Ctrl+C 로 종료)")
+        print("=" * 70)
+
+        watches = []
+        for collection in args.collections:
+            def on_snapshot(snapshots, updates, read_time, collection=collection):
+                changes.put((collection, updates, read_time))
+            watches.append(db.collection(collection).on_snapshot(on_snapshot))
+
+        try:
+            while True:
+                collection, updates, read_time = changes.get()
+                upserts, removed = [], []
+                for change in updates:
+                    doc = change.document
+                    if change.type.name == "REMOVED":
+                        removed.append(doc.id)
+                        continue
+                    upserts.append((doc.id, doc.to_dict() or {}, doc.update_time))
+                replica.upsert_many(collection, upserts)
+                replica.delete_many(collection, removed)
+                # 스냅샷은 read_time 까지의 변경을 모두 담으므로 read_time 이 그대로 watermark
+                replica.set_synced(collection, read_time or replica.watermark(collection))
+                replica.conn.commit()
+                print(f"   {datetime.now():%H:%M:%S} {collection}: 반영 {len(upserts):,}건, 삭제 {len(removed):,}건")
+        except KeyboardInterrupt:
+            print("\n⏹️  실시간 동기화 중단")
+        finally:
+            for watch in watches:
+                watch.unsubscribe()
+            replica.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 조회
+# ---------------------------------------------------------------------------
+
+
+def _print_rows(cursor, limit):
+    columns = [c[0] for c in cursor.description or ()]
+    rows = cursor.fetchmany(limit + 1)
+    if columns:
+        print("   " + " | ".join(columns))
+    for row in rows[:limit]:
+        print("   " + " | ".join("" if v is None else str(v) for v in row))
+    if len(rows) > limit:
+        print(f"   ... (--limit {limit} 초과)")
+    return len(rows)
+
+
+def _open_existing(path):
+    if not os.path.exists(path):
+        print(f"❌ 복제본 파일이 없습니다: {path} (먼저 sync 실행)")
+        return None
+    return Replica(path)
+
+
+def sql(args):
+    replica = _open_existing(args.db)
+    if replica is None:
+        return False
+    try:
+        started = time.perf_counter()
+        cursor = replica.conn.execute(args.query)
+        _print_rows(cursor, args.limit)
+        print(f"\n   ({(time.perf_counter() - started) * 1000:.1f}ms)")
+        return True
+    except sqlite3.Error as e:
+        print(f"❌ SQL 오류: {e}")
+        return False
+    finally:
+        replica.close()
+
+
+def checks(args):
+    replica = _open_existing(args.db)
+    if replica is None:
+        return False
+
+    print("=" * 70)
+    print(f"🔍 복제본 점검 ({args.db})")
+    print("=" * 70)
+    for collection, synced_at, count in replica.conn.execute(
+            "SELECT collection, synced_at, count FROM sync_state ORDER BY collection"):
+        print(f"   {collection}: {count:,}건 (동기화 {synced_at[:19]})")
+
+    found = 0
+    for title, query in CHECKS.items():
+        started = time.perf_counter()
+        total = replica.conn.execute(f"SELECT COUNT(*) FROM ({query})").fetchone()[0]
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"\n{'✅' if not total else '❌'} {title}: {total:,}건 ({elapsed:.1f}ms)")
+        if total:
+            found += 1
+            _print_rows(replica.conn.execute(query), args.limit)
+    replica.close()
+    print("\n" + "=" * 70)
+    return found == 0
+
+
+def replica_client(path):
+    """복제본을 읽는 가짜 Firestore 클라이언트 (컬렉션을 처음 접근할 때 적재)"""
+    from firestore_fake import FakeFirestore
+
+    replica = Replica(path)
+
+    class ReplicaFirestore(FakeFirestore):
+        def __init__(self):
+            super().__init__()
+            self._loaded = set()
+
+        def _ensure_loaded(self, path):
+            name = path.split("/", 1)[0]
+            if name in self._loaded:
+                return
+            self._loaded.add(name)
+            docs = dict(replica.iter_docs(name))
+            if docs:
+                self.load({name: docs})
+
+        def collection(self, *path):
+            ref = super().collection(*path)
+            self._ensure_loaded(ref.path)
+            return ref
+
+        def document(self, *path):
+            ref = super().document(*path)
+            self._ensure_loaded(ref.path)
+            return ref
+
+        def collections(self):
+            for name in replica.synced_collections():
+                self._ensure_loaded(name)
+            return super().collections()
+
+    return ReplicaFirestore()
+
+
+def run(args):
+    """기존 스크립트를 복제본 위에서 실행 (쓰기는 메모리에만 반영)"""
+    import firestore_fake
+
+    if not os.path.exists(args.db):
+        print(f"❌ 복제본 파일이 없습니다: {args.db} (먼저 sync 실행)")
+        return False
+    client = firestore_fake.install(replica_client(args.db))
+    script = args.script if os.path.exists(args.script) else os.path.join(os.path.dirname(__file__), args.script)
+    print(f"📦 복제본 {args.db} 위에서 실행: {os.path.basename(script)}\n")
+    sys.argv = [script] + args.script_args
+    code = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    if client.stats["writes"]:
+        print(f"\n⚠️  스크립트의 쓰기 {client.stats['writes']:,}건은 복제본/운영 데이터에 반영되지 않았습니다.")
+    return code == 0
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--db": DEFAULT_DB}))
+
+    parser = argparse.ArgumentParser(description="Firestore 로컬 SQLite 복제본")
+    parser.add_argument("--db", default=DEFAULT_DB, help="복제본 SQLite 파일")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = sub.add_parser("sync", help="전체 / 변경분 동기화")
+    sync_parser.add_argument("--collections", nargs="+", default=DEFAULT_COLLECTIONS)
+    sync_parser.add_argument("--full", action="store_true", help="전체 다시 동기화")
+    add_mode_argument(sync_parser)
+    sync_parser.add_argument("--overlap-minutes", type=int, default=10, help="updated_at 조회 여유 시간")
+    sync_parser.add_argument("--detect-deletes", action="store_true", help="삭제된 문서 제거 (ID 목록 조회)")
+    sync_parser.add_argument("--watch", action="store_true", help="--interval 마다 반복")
+    sync_parser.add_argument("--interval", type=int, default=300, help="반복 간격 (초)")
+    sync_parser.add_argument("--cred", help="Admin SDK JSON")
+
+    listen_parser = sub.add_parser("listen", help="on_snapshot 리스너로 실시간 동기화")
+    listen_parser.add_argument("--collections", nargs="+", default=DEFAULT_COLLECTIONS)
+    listen_parser.add_argument("--cred", help="Admin SDK JSON")
+
+    sql_parser = sub.add_parser("sql", help="SQL 조회")
+    sql_parser.add_argument("query")
+    sql_parser.add_argument("--limit", type=int, default=50)
+
+    checks_parser = sub.add_parser("checks", help="기본 점검 쿼리 실행")
+    checks_parser.add_argument("--limit", type=int, default=10)
+
+    run_parser = sub.add_parser("run", help="기존 스크립트를 복제본 위에서 실행")
+    run_parser.add_argument("script")
+    run_parser.add_argument("script_args", nargs=argparse.REMAINDER)
+
+    args = parser.parse_args()
+    handlers = {"sync": sync, "listen": listen, "sql": sql, "checks": checks, "run": run}
+    success = handlers[args.command](args)
+    sys.exit(0 if success else 1)
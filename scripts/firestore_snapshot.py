@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Firestore 컬렉션 스냅샷 (로컬 JSONL 파일)
+
+스냅샷 디렉토리 구조:
+    manifest.json           생성 시각, 원본, 컬렉션별 문서 수
+    <collection>.jsonl      {"id", "update_time", "data"} 한 줄에 문서 하나, 문서 ID 오름차순
+
+사용법:
+    python scripts/firestore_snapshot.py --out snapshots/2026-01-20 --collections users patients
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from firestore_common import decode_value, encode_value, get_db, iter_collection
+
+DEFAULT_COLLECTIONS = [
+    "users", "patients", "appointments", "session_reports", "session_records",
+    "assessments", "goals", "progress_records", "attendances", "makeup_tickets",
+    "payments", "vouchers", "notices", "invites", "contents", "recurring_rules",
+]
+
+MANIFEST = "manifest.json"
+
+
+def encode_doc_line(doc_id, data, update_time=None):
+    record = {
+        "id": doc_id,
+        "update_time": update_time.isoformat() if update_time else None,
+        "data": encode_value(data),
+    }
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def decode_doc_line(line, db=None):
+    """JSONL 한 줄 → (doc_id, data, update_time). db 를 주면 참조를 DocumentReference 로 복원"""
+    record = json.loads(line)
+    update_time = record.get("update_time")
+    return (record["id"], decode_value(record["data"], db),
+            datetime.fromisoformat(update_time) if update_time else None)
+
+
+class SnapshotReader:
+    """스냅샷 디렉토리 읽기 (ID 순 스트리밍, 바이트 오프셋 기반 범위 읽기)"""
+
+    def __init__(self, path):
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST)
+        self.manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def collection_file(self, collection):
+        return os.path.join(self.path, f"{collection}.jsonl")
+
+    def collections(self):
+        return sorted(name[:-len(".jsonl")] for name in os.listdir(self.path) if name.endswith(".jsonl"))
+
+    def fingerprint(self, collection):
+        """캐시 무효화용 (크기, 수정 시각)"""
+        stat = os.stat(self.collection_file(collection))
+        return [stat.st_size, int(stat.st_mtime)]
+
+    def iter_docs(self, collection, with_offsets=False):
+        """(doc_id, data, update_time[, offset]) 생성"""
+        file_path = self.collection_file(collection)
+        if not os.path.exists(file_path):
+            return
+        with open(file_path, "rb") as f:
+            offset = 0
+            for raw in f:
+                doc_id, data, update_time = decode_doc_line(raw)
+                if with_offsets:
+                    yield doc_id, data, update_time, offset
+                else:
+                    yield doc_id, data, update_time
+                offset += len(raw)
+
+    def read_range(self, collection, offset, end_id=None):
+        """offset부터 end_id(미포함) 전까지의 문서"""
+        with open(self.collection_file(collection), "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                doc_id, data, update_time = decode_doc_line(raw)
+                if end_id is not None and doc_id >= end_id:
+                    return
+                yield doc_id, data, update_time
+
+
+def write_collection(db, collection, out_dir, page_size=1000):
+    """컬렉션 하나를 ID 순으로 <collection>.jsonl 에 기록, (문서 수, 바이트) 반환"""
+    file_path = os.path.join(out_dir, f"{collection}.jsonl")
+    tmp_path = file_path + ".tmp"
+    count = 0
+    size = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for doc in iter_collection(db, collection, page_size=page_size):
+            line = encode_doc_line(doc.id, doc.to_dict(), doc.update_time)
+            f.write(line)
+            size += len(line.encode("utf-8"))
+            count += 1
+    os.replace(tmp_path, file_path)
+    return count, size
+
+
+def write_manifest(out_dir, source, collections):
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source": source,
+        "collections": collections,
+    }
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def create_snapshot(out_dir, collections, cred_path=None, page_size=1000):
+    """Firestore 컬렉션 스냅샷 생성"""
+
+    try:
+        db = get_db(cred_path)
+        os.makedirs(out_dir, exist_ok=True)
+
+        print("=" * 70)
+        print("📦 Firestore 스냅샷 생성")
+        print("=" * 70)
+
+        summary = {}
+        for collection in collections:
+            count, size = write_collection(db, collection, out_dir, page_size)
+            summary[collection] = {"count": count, "bytes": size}
+            print(f"   ✅ {collection}: {count:,}건 ({size / 1024:,.1f} KB)")
+
+        write_manifest(out_dir, cred_path or "default", summary)
+
+        print("\n" + "=" * 70)
+        print(f"✅ 스냅샷 저장 완료: {out_dir}")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--out": None}))
+
+    parser = argparse.ArgumentParser(description="Firestore 컬렉션 스냅샷 생성")
+    parser.add_argument("--out", required=True, help="스냅샷 디렉토리")
+    parser.add_argument("--collections", nargs="+", default=DEFAULT_COLLECTIONS)
+    parser.add_argument("--cred", help="Admin SDK JSON (기본: /opt/flutter/firebase-admin-sdk.json)")
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    success = create_snapshot(args.out, args.collections, args.cred, args.page_size)
+    sys.exit(0 if success else 1)
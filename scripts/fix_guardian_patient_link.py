@@ -3,9 +3,18 @@
 보호자-환자 양방향 연결 수정 스크립트
 """
 
+import sys
+
+# --plan 은 아래 모듈 수준 Firebase 초기화 전에 처리 (인증 정보/운영 연결 없이 가짜 클라이언트로 실행)
+if __name__ == "__main__" and "--plan" in sys.argv:
+    from firestore_plan import plan_script
+    sys.exit(plan_script(__file__))
+
 import firebase_admin
 from firebase_admin import credentials, firestore
 
+from firestore_models import Patient, User
+
 # Firebase Admin SDK 초기화
 cred = credentials.Certificate("/opt/flutter/firebase-admin-sdk.json")
 if not firebase_admin._apps:
@@ -31,12 +40,12 @@ def fix_guardian_patient_link():
         print(f"❌ 보호자 계정({guardian_id}) 없음")
         return
     
-    guardian_data = guardian_doc.to_dict()
+    guardian = User.from_snapshot(guardian_doc)
     print(f"\n📋 보호자 계정 정보:")
     print(f"   ID: {guardian_id}")
-    print(f"   이메일: {guardian_data.get('email')}")
-    print(f"   이름: {guardian_data.get('name')}")
-    print(f"   현재 linkedPatientIds: {guardian_data.get('linked_patient_ids', [])}")
+    print(f"   이메일: {guardian.email}")
+    print(f"   이름: {guardian.name}")
+    print(f"   현재 linkedPatientIds: {list(guardian.linked_patient_ids)}")
     
     # 2. 환자 확인
     patient_ref = db.collection("patients").document(patient_id)
@@ -46,18 +55,18 @@ def fix_guardian_patient_link():
         print(f"\n❌ 환자({patient_id}) 없음")
         return
     
-    patient_data = patient_doc.to_dict()
+    patient = Patient.from_snapshot(patient_doc)
     print(f"\n📋 환자 정보:")
     print(f"   ID: {patient_id}")
-    print(f"   이름: {patient_data.get('name')}")
-    print(f"   현재 guardianUids: {patient_data.get('guardian_uids', [])}")
+    print(f"   이름: {patient.name}")
+    print(f"   현재 guardianUids: {list(patient.guardian_ids)}")
     
     # 3. 양방향 연결 수정
     print(f"\n🔧 양방향 연결 수정 중...")
     
     # 보호자 → 환자 연결
-    current_linked = guardian_data.get('linked_patient_ids', [])
-    if patient_id not in current_linked:
+    # 모델이 camelCase / snake_case 철자를 합쳐 두므로 어느 쪽에 연결돼 있어도 다시 쓰지 않음
+    if patient_id not in guardian.linked_patient_ids:
         guardian_ref.update({
             "linked_patient_ids": firestore.ArrayUnion([patient_id])
         })
@@ -66,8 +75,7 @@ def fix_guardian_patient_link():
         print(f"   ℹ️  보호자 → 환자 연결 이미 존재")
     
     # 환자 → 보호자 연결
-    current_guardians = patient_data.get('guardian_uids', [])
-    if guardian_id not in current_guardians:
+    if guardian_id not in patient.guardian_ids:
         patient_ref.update({
             "guardian_uids": firestore.ArrayUnion([guardian_id])
         })
@@ -81,12 +89,12 @@ def fix_guardian_patient_link():
     print("=" * 60)
     
     # 다시 읽어서 확인
-    guardian_data = guardian_ref.get().to_dict()
-    patient_data = patient_ref.get().to_dict()
+    guardian = User.from_snapshot(guardian_ref.get())
+    patient = Patient.from_snapshot(patient_ref.get())
     
     print(f"\n📊 최종 상태:")
-    print(f"   보호자 linkedPatientIds: {guardian_data.get('linked_patient_ids', [])}")
-    print(f"   환자 guardianUids: {patient_data.get('guardian_uids', [])}")
+    print(f"   보호자 linkedPatientIds: {list(guardian.linked_patient_ids)}")
+    print(f"   환자 guardianUids: {list(patient.guardian_ids)}")
     
     print(f"\n✅ 테스트 방법:")
     print(f"   1. 보호자 로그인 (aqu8275@naver.com)")
@@ -3,12 +3,17 @@
 누락된 patients에 organization_id 추가
 """
 
+import argparse
 import firebase_admin
 from firebase_admin import credentials, firestore
 import sys
 
-def fix_missing_organization_id():
-    """patients에 organization_id 추가"""
+from firestore_rate import AdaptiveLimiter, add_rate_arguments
+
+DEFAULT_ORG_ID = "CENTER_AQULAB_WIRYE"
+
+def fix_missing_organization_id(limiter):
+    """patients에 organization_id 추가 (동시 업데이트 수는 limiter가 자동 조절)"""
     
     try:
         # Firebase 초기화
@@ -27,31 +32,31 @@ def fix_missing_organization_id():
         patients = patients_ref.get()
         
         updated_count = 0
+        failed_count = 0
+        
+        # organization_id가 없는 경우 CENTER_AQULAB_WIRYE를 기본값으로 설정
+        targets = (doc for doc in patients if not (doc.to_dict() or {}).get('organization_id'))
         
-        for patient_doc in patients:
-            patient_data = patient_doc.to_dict()
-            patient_id = patient_doc.id
-            name = patient_data.get('name', 'N/A')
-            org_id = patient_data.get('organization_id')
-            
-            if not org_id:
-                # organization_id가 없는 경우
-                # CENTER_AQULAB_WIRYE를 기본값으로 설정
-                default_org_id = "CENTER_AQULAB_WIRYE"
-                
-                print(f"\n🔧 수정 중: {name} (ID: {patient_id})")
-                print(f"   organization_id 추가: {default_org_id}")
-                
-                # 업데이트
-                db.collection('patients').document(patient_id).update({
-                    'organization_id': default_org_id
-                })
-                
-                updated_count += 1
-                print(f"   ✅ 업데이트 완료")
+        def update(patient_doc):
+            patient_doc.reference.update({'organization_id': DEFAULT_ORG_ID})
+        
+        for patient_doc, _, error in limiter.map(update, targets, collection='patients'):
+            name = (patient_doc.to_dict() or {}).get('name', 'N/A')
+            if error:
+                failed_count += 1
+                print(f"   ❌ {name} (ID: {patient_doc.id}): {error}")
+                continue
+            updated_count += 1
+            print(f"   ✅ {name} (ID: {patient_doc.id}) → organization_id: {DEFAULT_ORG_ID}")
+        
+        limiter.print_summary()
         
         print("\n" + "=" * 70)
         print(f"✅ 총 {updated_count}명의 환자 데이터 업데이트 완료")
+        if failed_count:
+            print(f"❌ {failed_count}명 업데이트 실패")
+            print("=" * 70)
+            sys.exit(1)
         print("=" * 70)
         
     except Exception as e:
@@ -61,4 +66,11 @@ def fix_missing_organization_id():
         sys.exit(1)
 
 if __name__ == "__main__":
-    fix_missing_organization_id()
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__))
+
+    parser = argparse.ArgumentParser(description="누락된 patients organization_id 추가")
+    add_rate_arguments(parser)
+    args = parser.parse_args()
+    fix_missing_organization_id(AdaptiveLimiter.from_args(args))
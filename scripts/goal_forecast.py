@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+목표 달성 예측 (progress_records 시계열 → goals)
+
+goals.progress_percentage 는 치료사가 직접 입력하고, progress_records.metric_value
+(예: 한 발 서기 초) 는 차트로만 보여준다. 이 스크립트는 전체 성과 기록을 한 번에 읽어
+(환자, 지표) 시계열마다 최근 기록에 가중치를 둔 선형 추세를 구하고, 진행 중인 목표마다
+
+    - 기준값: goal.baseline_value, 없으면 목표 시작일(start_date/created_at) 이후 첫 기록
+    - 현재값: 마지막 기록 시점의 추세값 (기록이 --min-points 미만이면 마지막 기록값)
+    - 목표값: goal.target_value, 없으면 목표 문장(goal_text/title/description/smart_criteria)에서
+              지표 단위와 같은 단위의 숫자 (예: "10초 이상" + metric_unit "초" → 10)
+    - 진행률: (현재값 - 기준값) / (목표값 - 기준값), 0~100%
+    - 예측: target_date 시점 추세값, 달성 여부(on_track), 추세가 목표에 닿는 예상일
+
+을 goals/<id>.forecast 에 기록한다 (--set-progress 면 progress_percentage 도 계산값으로 갱신).
+
+목표와 지표 연결: goal.metric_name → 환자 지표가 하나뿐이면 그 지표 → 지표 이름과 목표 문장의
+공통 단어가 가장 많은 지표. 연결하지 못한 목표는 건너뛴다.
+
+계산은 (환자, 지표) 순 정렬 한 번 후 np.bincount 구간 합으로 모든 시계열의 가중
+최소제곱을 동시에 푼다 (시계열 길이가 달라도 패딩 없음).
+
+사용법:
+    python scripts/goal_forecast.py                      # dry-run: 예측 요약
+    python scripts/goal_forecast.py --apply
+    python scripts/goal_forecast.py --apply --set-progress --half-life-days 45
+    python scripts/goal_forecast.py bench --patients 20000 --records 25   # 성과 기록 100만 건
+"""
+
+import argparse
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from firestore_common import get_db
+
+RECORD_FIELDS = ["patient_id", "metric_name", "metric_value", "metric_unit", "record_date"]
+PAGE_SIZE = 5000
+BATCH_SIZE = 500
+EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+TEXT_FIELDS = ("goal_text", "title", "description")
+NUMBER_WITH_UNIT = r"(\d+(?:\.\d+)?)\s*{unit}"
+MAX_PROJECTION_DAYS = 3650          # 추세가 거의 평평하면 예상일을 기록하지 않음
+
+
+def _days(value):
+    """datetime → 2000-01-01 기준 일수 (없으면 nan)"""
+    if not isinstance(value, datetime):
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH).total_seconds() / 86400.0
+
+
+def _date(days):
+    return EPOCH + timedelta(days=float(days))
+
+
+def _words(text):
+    return {w for w in re.split(r"[^0-9A-Za-z가-힣]+", text or "") if len(w) >= 2}
+
+
+# ---------------------------------------------------------------------------
+# 성과 기록 → 열 배열
+# ---------------------------------------------------------------------------
+
+
+class Series:
+    """(환자, 지표) 시계열 열 배열 — 시계열 번호, 시각 순 정렬"""
+
+    def __init__(self, keys, units, series, x, y):
+        self.keys = keys                    # 시계열 번호 → (patient_id, metric_name)
+        self.units = units                  # 시계열 번호 → metric_unit
+        order = np.lexsort((x, series))
+        self.series, self.x, self.y = series[order], x[order], y[order]
+        n_series = len(keys)
+        self.count = np.bincount(self.series, minlength=n_series)
+        self.start = np.r_[0, np.cumsum(self.count)[:-1]]
+        self.by_patient = defaultdict(list)
+        for index, (patient_id, _) in enumerate(keys):
+            if self.count[index]:
+                self.by_patient[patient_id].append(index)
+
+    def find(self, series_ids, days):
+        """시계열별 days 이후 첫 기록 위치 (없으면 -1) — 시계열 번호 × 일수 키로 한 번에 searchsorted"""
+        span = float(np.nanmax(self.x) - np.nanmin(self.x) + 2) if len(self.x) else 1.0
+        base = np.nanmin(self.x) if len(self.x) else 0.0
+        keys = self.series * span + (self.x - base)
+        goal_keys = series_ids * span + np.clip(np.nan_to_num(days - base, nan=0.0), 0, span - 1)
+        pos = np.searchsorted(keys, goal_keys)
+        end = self.start[series_ids] + self.count[series_ids]
+        return np.where(pos < end, pos, -1)
+
+
+def load_series(db):
+    """progress_records 전체를 필요한 필드만 페이지 단위로 읽어 열 배열로 변환"""
+    index = {}
+    units = []
+    series, xs, ys = [], [], []
+    col = db.collection("progress_records")
+    last = None
+    reads = 0
+    while True:
+        query = col.order_by("__name__").select(RECORD_FIELDS).limit(PAGE_SIZE)
+        if last is not None:
+            query = query.start_after([last])
+        page = list(query.stream())
+        reads += len(page)
+        for doc in page:
+            data = doc.to_dict() or {}
+            value = data.get("metric_value")
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            key = (data.get("patient_id"), data.get("metric_name"))
+            if not key[0] or not key[1]:
+                continue
+            sid = index.get(key)
+            if sid is None:
+                sid = index[key] = len(units)
+                units.append(data.get("metric_unit") or "")
+            series.append(sid)
+            xs.append(_days(data.get("record_date") or data.get("created_at")))
+            ys.append(float(value))
+        if len(page) < PAGE_SIZE:
+            break
+        last = page[-1].reference
+
+    x = np.array(xs, dtype=np.float64)
+    valid = ~np.isnan(x)
+    keys = [None] * len(index)
+    for key, sid in index.items():
+        keys[sid] = key
+    return Series(keys, units, np.array(series, dtype=np.int64)[valid], x[valid],
+                  np.array(ys, dtype=np.float64)[valid]), reads
+
+
+# ---------------------------------------------------------------------------
+# 추세 (가중 최소제곱, 시계열 전체 동시 계산)
+# ---------------------------------------------------------------------------
+
+
+def fit_trends(s, half_life_days, min_points):
+    """
+    시계열별 y = level + slope × (x - center)
+    가중치: 시계열 마지막 기록에서 멀어질수록 반감기 half_life_days 로 감소
+    → dict(center, level, slope, last_x, last_y) (기록 부족 시 slope = nan)
+    """
+    n_series = len(s.keys)
+    nonempty = s.count > 0
+    last = np.full(n_series, -1, dtype=np.int64)
+    last[nonempty] = s.start[nonempty] + s.count[nonempty] - 1
+    last_x = np.where(nonempty, s.x[np.maximum(last, 0)], np.nan)
+    last_y = np.where(nonempty, s.y[np.maximum(last, 0)], np.nan)
+
+    w = 0.5 ** ((last_x[s.series] - s.x) / half_life_days)
+    sw = np.bincount(s.series, w, n_series)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        center = np.bincount(s.series, w * s.x, n_series) / sw
+        level = np.bincount(s.series, w * s.y, n_series) / sw
+        dx = s.x - center[s.series]
+        sxx = np.bincount(s.series, w * dx * dx, n_series)
+        sxy = np.bincount(s.series, w * dx * (s.y - level[s.series]), n_series)
+        slope = np.where((s.count >= min_points) & (sxx > 1e-9), sxy / sxx, np.nan)
+    return {"center": center, "level": level, "slope": slope, "last_x": last_x, "last_y": last_y}
+
+
+def predict(trend, series_ids, days):
+    slope = trend["slope"][series_ids]
+    fitted = trend["level"][series_ids] + slope * (days - trend["center"][series_ids])
+    return np.where(np.isnan(slope), trend["last_y"][series_ids], fitted)
+
+
+# ---------------------------------------------------------------------------
+# 목표 ↔ 지표
+# ---------------------------------------------------------------------------
+
+
+def goal_text(goal):
+    parts = [goal.get(field) or "" for field in TEXT_FIELDS]
+    criteria = goal.get("smart_criteria")
+    if isinstance(criteria, dict):
+        parts.extend(str(v) for v in criteria.values() if isinstance(v, str))
+    return " ".join(parts)
+
+
+def match_metric(s, goal, text):
+    """목표 → 시계열 번호 (없으면 None)"""
+    candidates = s.by_patient.get(goal.get("patient_id"), [])
+    if not candidates:
+        return None
+    if goal.get("metric_name"):
+        for sid in candidates:
+            if s.keys[sid][1] == goal["metric_name"]:
+                return sid
+        return None
+    if len(candidates) == 1:
+        return candidates[0]
+    words = _words(text)
+    scored = sorted(((len(words & _words(s.keys[sid][1])), sid) for sid in candidates), reverse=True)
+    if scored[0][0] == 0 or (len(scored) > 1 and scored[0][0] == scored[1][0]):
+        return None
+    return scored[0][1]
+
+
+def target_value(goal, text, unit):
+    value = goal.get("target_value")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if unit:
+        found = re.findall(NUMBER_WITH_UNIT.format(unit=re.escape(unit)), text)
+        if found:
+            return float(found[-1])
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+
+def _forecast_changed(old, new):
+    if not isinstance(old, dict):
+        return True
+    return any(old.get(k) != v for k, v in new.items() if k != "computed_at")
+
+
+def goal_forecast(half_life_days, min_points, set_progress, apply):
+    try:
+        db = get_db()
+
+        print("=" * 70)
+        print("🎯 목표 달성 예측 (progress_records 추세)")
+        print("=" * 70)
+        if not apply:
+            print("🔍 dry-run: 예측 결과만 출력합니다 (--apply 로 기록)")
+
+        started = time.perf_counter()
+        s, reads = load_series(db)
+        print(f"📥 성과 기록 {reads:,}건 → 시계열 {len(s.keys):,}개 ({time.perf_counter() - started:.1f}초)")
+
+        started = time.perf_counter()
+        goals = list(db.collection("goals").where("status", "==", "IN_PROGRESS").stream())
+        skipped = Counter()
+        goal_ids, rows = [], []
+        for doc in goals:
+            goal = doc.to_dict() or {}
+            text = goal_text(goal)
+            sid = match_metric(s, goal, text)
+            if sid is None:
+                skipped["지표 연결 실패"] += 1
+                continue
+            target = target_value(goal, text, s.units[sid])
+            target_day = _days(goal.get("target_date"))
+            if target is None or np.isnan(target_day):
+                skipped["목표값/목표일 없음"] += 1
+                continue
+            baseline = goal.get("baseline_value")
+            baseline = float(baseline) if isinstance(baseline, (int, float)) and not isinstance(baseline, bool) \
+                else np.nan
+            goal_ids.append((doc, goal))
+            rows.append((sid, target, target_day, baseline, _days(goal.get("start_date") or goal.get("created_at"))))
+        print(f"📋 진행 중 목표 {len(goals):,}개 → 예측 대상 {len(rows):,}개"
+              + "".join(f", {reason} {n:,}개" for reason, n in skipped.items()))
+        if not rows:
+            print("✅ 예측할 목표가 없습니다.")
+            return True
+
+        trend = fit_trends(s, half_life_days, min_points)
+        sid, target, target_day, baseline, start_day = (np.array(col) for col in zip(*rows))
+        sid = sid.astype(np.int64)
+
+        first = s.find(sid, start_day)
+        first = np.where(first >= 0, first, s.start[sid])
+        baseline = np.where(np.isnan(baseline), s.y[first], baseline)
+        current = predict(trend, sid, trend["last_x"][sid])
+        predicted = predict(trend, sid, target_day)
+
+        direction = np.sign(target - baseline)
+        span = target - baseline
+        with np.errstate(divide="ignore", invalid="ignore"):
+            progress = np.where(span != 0, (current - baseline) / span * 100.0, 100.0)
+            progress = np.clip(np.nan_to_num(progress, nan=0.0), 0.0, 100.0)
+            reached = (current - target) * direction >= 0
+            on_track = reached | ((predicted - target) * direction >= 0)
+            slope = trend["slope"][sid]
+            crossing = trend["center"][sid] + (target - trend["level"][sid]) / slope
+            projected = np.where(reached, trend["last_x"][sid],
+                                 np.where(slope * direction > 0, crossing, np.nan))
+            projected[projected > trend["last_x"][sid] + MAX_PROJECTION_DAYS] = np.nan
+        elapsed = time.perf_counter() - started
+        print(f"🧮 추세/예측 계산 {elapsed:.2f}초 — 달성 예상 {int(on_track.sum()):,}개, "
+              f"미달 예상 {int((~on_track).sum()):,}개, 평균 진행률 {progress.mean():.1f}%")
+
+        now = datetime.now(timezone.utc)
+        updates = []
+        for k, (doc, goal) in enumerate(goal_ids):
+            forecast = {
+                "metric_name": s.keys[sid[k]][1],
+                "baseline": round(float(baseline[k]), 3),
+                "current": round(float(current[k]), 3),
+                "target": round(float(target[k]), 3),
+                "progress_percentage": round(float(progress[k]), 1),
+                "predicted_at_target_date": round(float(predicted[k]), 3),
+                "on_track": bool(on_track[k]),
+                "projected_date": None if np.isnan(projected[k]) else _date(projected[k]).replace(microsecond=0),
+                "slope_per_week": None if np.isnan(slope[k]) else round(float(slope[k]) * 7, 4),
+                "records": int(s.count[sid[k]]),
+                "computed_at": now,
+            }
+            update = {}
+            if _forecast_changed(goal.get("forecast"), forecast):
+                update["forecast"] = forecast
+            if set_progress and goal.get("progress_percentage") != forecast["progress_percentage"]:
+                update["progress_percentage"] = forecast["progress_percentage"]
+            if update:
+                updates.append((doc.reference, update))
+
+        for ref, update in updates[:5]:
+            f = update.get("forecast")
+            if f:
+                print(f"   {ref.id}: {f['metric_name']} {f['baseline']} → {f['current']} / {f['target']} "
+                      f"({f['progress_percentage']}%, {'✅' if f['on_track'] else '⚠️'})")
+        print(f"✏️  갱신할 목표 {len(updates):,}개")
+
+        if not apply:
+            return True
+
+        for i in range(0, len(updates), BATCH_SIZE):
+            batch = db.batch()
+            for ref, update in updates[i:i + BATCH_SIZE]:
+                batch.update(ref, update)
+            batch.commit()
+
+        print("\n" + "=" * 70)
+        print(f"✅ 목표 {len(updates):,}개 예측 기록")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크
+# ---------------------------------------------------------------------------
+
+
+def bench(args):
+    """가짜 Firestore 에 환자당 지표 2개 × 기록 N건을 넣고 전체 예측 시간 측정"""
+    import random
+
+    import firestore_fake
+
+    rng = random.Random(args.random_seed)
+    metrics = [("균형감각 (한 발 서기 시간)", "초", 3.0, 0.25), ("하체 근력 (스쿼트 횟수)", "회", 5.0, 0.4)]
+    start = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    records, goals = {}, {}
+    for p in range(args.patients):
+        patient_id = f"p{p:06d}"
+        for m, (name, unit, base, rate) in enumerate(metrics):
+            speed = rate * rng.uniform(0.2, 1.8)
+            for r in range(args.records):
+                records[f"r{p:06d}_{m}_{r:03d}"] = {
+                    "patient_id": patient_id, "metric_name": name, "metric_unit": unit,
+                    "metric_value": round(max(0.0, base + speed * r + rng.gauss(0, 0.8)), 1),
+                    "record_date": start + timedelta(days=3 * r), "notes": "",
+                }
+            goals[f"g{p:06d}_{m}"] = {
+                "patient_id": patient_id, "status": "IN_PROGRESS", "start_date": start,
+                "target_date": start + timedelta(days=3 * args.records + 30),
+                "goal_text": f"{name.split(' ')[0]} 향상: {round(base + rate * (args.records + 10))}{unit} 이상",
+                "progress_percentage": 30,
+            }
+
+    client = firestore_fake.FakeFirestore()
+    client.load({"progress_records": records, "goals": goals})
+    firestore_fake.install(client)
+    del records
+    print(f"🏁 성과 기록 {args.patients * len(metrics) * args.records:,}건, 목표 {len(goals):,}개")
+
+    started = time.perf_counter()
+    success = goal_forecast(args.half_life_days, 3, False, apply=True)
+    print(f"   전체 {time.perf_counter() - started:.1f}초, 읽기 {client.stats['reads']:,} / 쓰기 {client.stats['writes']:,}")
+    return success
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench_parser = argparse.ArgumentParser(description="목표 달성 예측 벤치마크")
+        bench_parser.add_argument("--patients", type=int, default=20000)
+        bench_parser.add_argument("--records", type=int, default=25, help="환자·지표당 기록 수")
+        bench_parser.add_argument("--half-life-days", type=float, default=60.0)
+        bench_parser.add_argument("--random-seed", type=int, default=42)
+        args = bench_parser.parse_args(sys.argv[2:])
+        sys.exit(0 if bench(args) else 1)
+
+    parser = argparse.ArgumentParser(description="progress_records 추세로 목표 달성 예측")
+    parser.add_argument("--half-life-days", type=float, default=60.0, help="최근 기록 가중치 반감기 (일)")
+    parser.add_argument("--min-points", type=int, default=3, help="추세를 계산할 최소 기록 수")
+    parser.add_argument("--set-progress", action="store_true", help="progress_percentage 를 계산값으로 갱신")
+    parser.add_argument("--apply", action="store_true", help="예측 기록 (기본은 dry-run)")
+    args = parser.parse_args()
+
+    success = goal_forecast(args.half_life_days, args.min_points, args.set_progress, args.apply)
+    sys.exit(0 if success else 1)
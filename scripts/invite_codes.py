@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+초대 코드 대량 발급 / 사용 감사
+
+초대 코드는 invite_management_screen 에서 한 건씩 만든다 (InviteService.createInvite).
+이 스크립트는 센터 단위로 초대 코드를 대량 발급하고, 사용된 초대를 users 와 맞춰 본다.
+
+코드 형식은 앱과 같다: 혼동 문자를 뺀 32자 8자리, 저장은 code_hash = SHA256(code + center_id) 와
+조회용 code_lookup = SHA256(code + LOOKUP_PEPPER). 앱의 verifyInviteCode 는 센터를 모르면 입력 코드만으로
+code_lookup 을 계산해 invites 를 바로 조회하고 (초대 수/센터 목록과 무관), 찾은 초대의 center_id 로
+code_hash 를 확인한다. 한 코드가 여러 센터에서 유효하면 어느 초대인지 모호해지므로, 새 코드는
+"기존 초대가 있는 모든 센터의 salt 로 해시했을 때 어떤 기존 code_hash 와도 겹치지 않아야" 한다
+(code_lookup 이 없는 이전 초대까지 확인).
+
+generate:
+    1. 기존 초대의 code_hash / center_id 를 한 번만 조회해 Bloom filter 에 적재 (코드마다 조회하지 않음)
+    2. secrets 로 코드 생성 → 모든 센터 salt 해시를 Bloom filter 로 확인, 걸리면 버리고 다시 생성
+       (이번에 만든 코드끼리는 평문 집합으로 확인)
+       (오탐은 코드 하나를 다시 만드는 비용뿐이므로 정확한 집합을 메모리에 둘 필요가 없음)
+    3. 500건씩 배치 커밋 (AdaptiveLimiter 로 병렬), 커밋된 배치의 평문 코드만 --out CSV 에 기록
+       (평문은 Firestore 에 저장되지 않으므로 CSV 가 유일한 사본)
+
+audit:
+    accepted 초대를 used_by_uid 로 users 와 join (get_all) 해
+    - 사용자 문서 없음 / 사용자 센터 불일치 / 역할 불일치
+    - 보호자 초대인데 환자 문서에 보호자 연결 없음 (guardian_uids 등 또는 acceptInvite 가 쓰는 guardians)
+    - 만료일이 지났는데 invited 상태 (--fix-expired --apply 로 expired 처리)
+    를 보고한다.
+
+사용법:
+    python scripts/invite_codes.py generate --center CENTER_ID --count 1000 --role guardian --out codes.csv
+    python scripts/invite_codes.py generate --center CENTER_ID --count 1000 --role guardian --out codes.csv --apply
+    python scripts/invite_codes.py audit --center CENTER_ID
+    python scripts/invite_codes.py audit --fix-expired --apply
+    python scripts/invite_codes.py bench --count 100000
+"""
+
+import argparse
+import csv
+import hashlib
+import math
+import os
+import secrets
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+from firestore_common import get_db
+from firestore_models import Patient, User
+from firestore_rate import AdaptiveLimiter, add_rate_arguments
+
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"    # InviteService._generateInviteCode 와 동일
+CODE_LENGTH = 8
+# 32자이므로 난수 바이트 % 32 가 편향 없이 문자 하나에 대응
+CODE_TABLE = bytes(CODE_ALPHABET[b % len(CODE_ALPHABET)].encode("ascii")[0] for b in range(256))
+INVITE_LINK = "https://rehab-nexus.app/invite?code={code}"
+LOOKUP_PEPPER = "rehab-nexus-invite"     # InviteService._lookupPepper 와 동일
+DEFAULT_OUT = "invite_codes.csv"
+BATCH_SIZE = 500
+GET_ALL_CHUNK = 100
+PATIENT_GUARDIAN_FIELDS = ("guardians",)    # Patient.guardian_ids 별칭 외에 acceptInvite 가 쓰는 필드
+
+
+def code_hash(code, center_id):
+    """InviteService._hashInviteCode 와 같은 SHA256(code + salt)"""
+    return hashlib.sha256((code + center_id).encode("utf-8")).digest()
+
+
+def code_lookup(code):
+    """InviteService._lookupInviteCode 와 같은 조회용 해시 (hex)"""
+    return code_hash(code, LOOKUP_PEPPER).hex()
+
+
+class BloomFilter:
+    """기존 code_hash 용 Bloom filter (SHA256 digest 를 그대로 이중 해싱에 사용)"""
+
+    def __init__(self, capacity, error_rate=1e-6):
+        capacity = max(capacity, 1000)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest):
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, digest):
+        for pos in self._positions(digest):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, digest):
+        bits = self.bits
+        for pos in self._positions(digest):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+# ---------------------------------------------------------------------------
+# generate
+# ---------------------------------------------------------------------------
+
+
+def load_existing(db, center_id):
+    """기존 초대 code_hash → Bloom filter, center_id 목록"""
+    digests = []
+    centers = {center_id}
+    for doc in db.collection("invites").select(["code_hash", "center_id"]).stream():
+        data = doc.to_dict() or {}
+        if data.get("center_id"):
+            centers.add(data["center_id"])
+        try:
+            digests.append(bytes.fromhex(data.get("code_hash") or ""))
+        except ValueError:
+            continue
+    bloom = BloomFilter(len(digests))
+    for digest in digests:
+        bloom.add(digest)
+    return bloom, centers, len(digests)
+
+
+def generate_codes(count, bloom, centers):
+    """
+    기존 코드와도, 서로 간에도 겹치지 않는 코드 count 개 → (코드 목록, 다시 만든 횟수)
+
+    해시가 같으면 (code + center_id) 문자열이 같다는 뜻이므로, 기존 코드와 같은지는 모든 센터 salt
+    해시를 Bloom filter 로, 이번에 만든 코드끼리는 평문 집합으로 확인한다.
+    """
+    salts = sorted(centers)
+    codes = set()
+    rejected = 0
+    while len(codes) < count:
+        need = count - len(codes)
+        raw = secrets.token_bytes(need * CODE_LENGTH).translate(CODE_TABLE).decode("ascii")
+        for i in range(0, len(raw), CODE_LENGTH):
+            code = raw[i:i + CODE_LENGTH]
+            if code in codes or any(code_hash(code, salt) in bloom for salt in salts):
+                rejected += 1
+                continue
+            codes.add(code)
+    return sorted(codes), rejected
+
+
+def generate(args, limiter):
+    try:
+        db = get_db()
+
+        print("=" * 70)
+        print(f"🎟️  초대 코드 대량 발급: {args.center} / {args.role} × {args.count:,}")
+        print("=" * 70)
+        if not args.apply:
+            print("🔍 dry-run: 코드 생성과 충돌 확인만 합니다 (--apply 로 기록)")
+
+        started = time.perf_counter()
+        bloom, centers, existing = load_existing(db, args.center)
+        print(f"📥 기존 초대 {existing:,}건, 센터 {len(centers):,}곳 → Bloom filter "
+              f"{len(bloom.bits) / 1024 / 1024:.1f}MB, 해시 {bloom.hashes}개 "
+              f"({time.perf_counter() - started:.1f}초)")
+
+        started = time.perf_counter()
+        codes, rejected = generate_codes(args.count, bloom, centers)
+        print(f"🎲 코드 {len(codes):,}개 생성, 충돌/오탐으로 다시 생성 {rejected:,}회 "
+              f"({time.perf_counter() - started:.1f}초)")
+
+        if not args.apply:
+            for code in codes[:5]:
+                print(f"   {code}")
+            return True
+
+        center_name = args.center_name
+        if center_name is None:
+            center = db.collection("organizations").document(args.center).get()
+            center_name = (center.to_dict() or {}).get("name") if center.exists else None
+        now = datetime.now(timezone.utc)
+        batch_id = f"bulk_{now:%Y%m%d%H%M%S}_{uuid.uuid4().hex[:6]}"
+        base = {
+            "email": "",
+            "role": args.role,
+            "center_id": args.center,
+            "center_name": center_name,
+            "patient_id": None,
+            "patient_name": None,
+            "expires_at": now + timedelta(days=args.expires_days),
+            "used_at": None,
+            "used_by_uid": None,
+            "status": "invited",
+            "created_at": now,
+            "created_by_uid": args.created_by,
+            "created_by_name": args.created_by_name,
+            "bulk_batch_id": batch_id,
+        }
+
+        chunks = [codes[i:i + BATCH_SIZE] for i in range(0, len(codes), BATCH_SIZE)]
+
+        def commit(chunk):
+            batch = db.batch()
+            rows = []
+            for code in chunk:
+                ref = db.collection("invites").document()
+                batch.set(ref, dict(base, code_hash=code_hash(code, args.center).hex(),
+                                    code_lookup=code_lookup(code)))
+                rows.append((ref.id, code))
+            batch.commit()
+            return rows
+
+        started = time.perf_counter()
+        written = failed = 0
+        exists = os.path.exists(args.out)
+        with open(args.out, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if not exists:
+                writer.writerow(["invite_id", "code", "link", "center_id", "role", "expires_at", "bulk_batch_id"])
+            collection = "invites" if args.ramp else None
+            for chunk, rows, error in limiter.map(commit, chunks, collection=collection, ops=BATCH_SIZE):
+                if error:
+                    failed += len(chunk)
+                    print(f"   ❌ 배치 {len(chunk)}건 실패: {error}")
+                    continue
+                for invite_id, code in rows:
+                    writer.writerow([invite_id, code, INVITE_LINK.format(code=code), args.center, args.role,
+                                     base["expires_at"].isoformat(), batch_id])
+                written += len(rows)
+        limiter.print_summary()
+
+        print("\n" + "=" * 70)
+        print(f"✅ 초대 {written:,}건 기록 ({time.perf_counter() - started:.1f}초), 배치 ID {batch_id}")
+        print(f"📄 코드 목록: {args.out} (평문 코드는 이 파일에만 있습니다)")
+        if failed:
+            print(f"❌ {failed:,}건 기록 실패 — CSV 에 없는 코드는 발급되지 않았습니다.")
+        print("=" * 70)
+        return failed == 0
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# audit
+# ---------------------------------------------------------------------------
+
+
+def _get_all(db, collection, ids):
+    found = {}
+    ids = sorted(ids)
+    for i in range(0, len(ids), GET_ALL_CHUNK):
+        refs = [db.collection(collection).document(doc_id) for doc_id in ids[i:i + GET_ALL_CHUNK]]
+        for snapshot in db.get_all(refs):
+            if snapshot.exists:
+                found[snapshot.id] = snapshot
+    return found
+
+
+def audit(args):
+    try:
+        db = get_db()
+
+        print("=" * 70)
+        print("🔍 초대 사용 감사 (invites ⨝ users)")
+        print("=" * 70)
+
+        query = db.collection("invites")
+        if args.center:
+            query = query.where("center_id", "==", args.center)
+        invites = list(query.stream())
+        now = datetime.now(timezone.utc)
+
+        status_count = Counter()
+        accepted, stale = [], []
+        for doc in invites:
+            data = doc.to_dict() or {}
+            status = data.get("status") or "invited"
+            status_count[status] += 1
+            if status == "accepted":
+                accepted.append((doc.id, data))
+            elif status == "invited" and isinstance(data.get("expires_at"), datetime) and data["expires_at"] < now:
+                stale.append(doc)
+        print(f"📋 초대 {len(invites):,}건: " + ", ".join(f"{k} {v:,}" for k, v in sorted(status_count.items())))
+
+        users = _get_all(db, "users", {d.get("used_by_uid") for _, d in accepted if d.get("used_by_uid")})
+        patients = _get_all(db, "patients", {d.get("patient_id") for _, d in accepted
+                                            if d.get("role") == "guardian" and d.get("patient_id")})
+
+        problems = defaultdict(list)
+        used_by = Counter(d.get("used_by_uid") for _, d in accepted if d.get("used_by_uid"))
+        for invite_id, data in accepted:
+            uid = data.get("used_by_uid")
+            if not uid:
+                problems["사용자 UID 없음"].append(invite_id)
+                continue
+            if uid not in users:
+                problems["사용자 문서 없음"].append(f"{invite_id} → {uid}")
+                continue
+            user = User.from_snapshot(users[uid])
+            if user.organization_id != data.get("center_id"):
+                problems["센터 불일치"].append(f"{invite_id}: 초대 {data.get('center_id')} / 사용자 {user.organization_id}")
+            if data.get("role") and not user.has_role(data["role"]):
+                problems["역할 불일치"].append(f"{invite_id}: 초대 {data['role']} / 사용자 {user.role}")
+            if used_by[uid] > 1:
+                problems["한 사용자가 여러 초대 사용"].append(f"{invite_id} → {uid}")
+            if data.get("role") == "guardian" and data.get("patient_id"):
+                snapshot = patients.get(data["patient_id"])
+                if snapshot is None:
+                    problems["연결 환자 문서 없음"].append(f"{invite_id} → {data['patient_id']}")
+                    continue
+                raw = snapshot.to_dict() or {}
+                guardians = set(Patient.from_snapshot(snapshot).guardian_ids)
+                for field in PATIENT_GUARDIAN_FIELDS:
+                    guardians.update(raw.get(field) or ())
+                if uid not in guardians:
+                    problems["환자에 보호자 연결 없음"].append(f"{invite_id}: {data['patient_id']} ✗ {uid}")
+        if stale:
+            problems["만료일 지난 invited 초대"].extend(doc.id for doc in stale)
+
+        for title, items in problems.items():
+            print(f"\n❌ {title}: {len(items):,}건")
+            for item in items[:args.limit]:
+                print(f"   - {item}")
+            if len(items) > args.limit:
+                print(f"   ... 외 {len(items) - args.limit:,}건")
+        if not problems:
+            print("\n✅ 문제 없음")
+
+        if args.fix_expired and stale:
+            if not args.apply:
+                print(f"\n🔍 dry-run: {len(stale):,}건을 expired 로 바꾸려면 --apply")
+            else:
+                for i in range(0, len(stale), BATCH_SIZE):
+                    batch = db.batch()
+                    for doc in stale[i:i + BATCH_SIZE]:
+                        batch.update(doc.reference, {"status": "expired", "updated_at": now})
+                    batch.commit()
+                print(f"\n✅ {len(stale):,}건 expired 처리")
+
+        print("\n" + "=" * 70)
+        return not problems
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크
+# ---------------------------------------------------------------------------
+
+
+def bench(args):
+    """가짜 Firestore: 기존 초대가 있는 상태에서 코드 대량 발급 시간 측정"""
+    import tempfile
+
+    import firestore_fake
+
+    now = datetime.now(timezone.utc)
+    invites = {}
+    for i in range(args.existing):
+        center = f"org_{i % args.centers:02d}"
+        code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+        invites[f"inv{i:07d}"] = {"center_id": center, "code_hash": code_hash(code, center).hex(),
+                                  "role": "guardian", "status": "invited", "expires_at": now + timedelta(days=7)}
+    client = firestore_fake.FakeFirestore(latency=args.latency_ms / 1000.0)
+    client.load({"invites": invites})
+    firestore_fake.install(client)
+    print(f"🏁 기존 초대 {args.existing:,}건 (센터 {args.centers}곳), 새 코드 {args.count:,}개")
+
+    with tempfile.TemporaryDirectory() as root:
+        run_args = argparse.Namespace(center="org_00", center_name="벤치 센터", count=args.count, role="guardian",
+                                      expires_days=30, created_by="bench", created_by_name="벤치", ramp=False,
+                                      out=os.path.join(root, "codes.csv"), apply=True)
+        started = time.perf_counter()
+        success = generate(run_args, AdaptiveLimiter(initial=8, max_limit=64, ramp=False))
+        print(f"   전체 {time.perf_counter() - started:.1f}초, 쓰기 {client.stats['writes']:,}")
+        with open(run_args.out, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        sample = rows[len(rows) // 2]
+        stored = client.collection("invites").document(sample["invite_id"]).get().to_dict()
+        print(f"   CSV {len(rows):,}행, 해시 확인: {stored['code_hash'] == code_hash(sample['code'], 'org_00').hex()}")
+    return success
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--out": DEFAULT_OUT}))
+
+    parser = argparse.ArgumentParser(description="초대 코드 대량 발급 / 사용 감사")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen_parser = sub.add_parser("generate", help="센터 초대 코드 대량 발급")
+    gen_parser.add_argument("--center", required=True, help="center_id (organization_id)")
+    gen_parser.add_argument("--center-name", help="center_name (기본: organizations/<center>.name)")
+    gen_parser.add_argument("--count", type=int, required=True)
+    gen_parser.add_argument("--role", choices=["guardian", "therapist"], default="guardian")
+    gen_parser.add_argument("--expires-days", type=int, default=30, help="만료 일수")
+    gen_parser.add_argument("--created-by", default="bulk_script", help="created_by_uid")
+    gen_parser.add_argument("--created-by-name", default="일괄 발급")
+    gen_parser.add_argument("--out", default=DEFAULT_OUT, help="평문 코드 CSV (추가 기록)")
+    gen_parser.add_argument("--ramp", action="store_true", help="invites 쓰기에 500/50/5 ramp-up 상한 적용")
+    gen_parser.add_argument("--apply", action="store_true", help="초대 기록 (기본은 dry-run)")
+    add_rate_arguments(gen_parser)
+
+    audit_parser = sub.add_parser("audit", help="사용된 초대와 users 대조")
+    audit_parser.add_argument("--center", help="center_id 로 제한")
+    audit_parser.add_argument("--fix-expired", action="store_true", help="만료일 지난 invited 초대를 expired 로")
+    audit_parser.add_argument("--limit", type=int, default=10, help="항목별 출력 개수")
+    audit_parser.add_argument("--apply", action="store_true", help="--fix-expired 기록 (기본은 dry-run)")
+
+    bench_parser = sub.add_parser("bench", help="가짜 Firestore 로 발급 시간 측정")
+    bench_parser.add_argument("--count", type=int, default=100000)
+    bench_parser.add_argument("--existing", type=int, default=50000)
+    bench_parser.add_argument("--centers", type=int, default=20)
+    bench_parser.add_argument("--latency-ms", type=float, default=20.0)
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        success = generate(args, AdaptiveLimiter.from_args(args))
+    elif args.command == "audit":
+        success = audit(args)
+    else:
+        success = bench(args)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+유지보수 스크립트 파이프라인 (DAG 실행 + 컬렉션 스캔 공유 + 변경 없는 단계 건너뛰기)
+
+create_test_patient → fix_guardian_patient_link → fix_missing_organization_id →
+verify_firestore_structure / verify_organization_id 를 손으로 순서대로 실행하면
+각 스크립트가 같은 컬렉션을 처음부터 다시 읽는다. 이 러너는
+
+    - 단계마다 읽는 컬렉션(reads)과 쓰는 컬렉션(writes)을 선언하고, 선언 순서상 앞 단계가
+      쓴 컬렉션을 읽거나 쓰는 단계만 그 뒤에 실행한다 (나머지는 스레드로 병렬 실행)
+    - 스크립트를 같은 프로세스에서 실행하면서 firestore.client() 를 캐시 클라이언트로
+      바꿔, 컬렉션 전체 조회는 처음 한 번만 Firestore 에서 읽고 이후에는 캐시를 쓴다
+      (단계가 수정한 문서만 다음 조회 때 get_all 로 다시 읽음)
+    - 단계 입력 해시(스크립트 내용 + 인자 + 읽는 컬렉션의 문서 내용 해시)가 지난번 성공한
+      실행의 실행 전 / 실행 후 / 파이프라인 종료 시점 해시 중 하나와 같으면 건너뛴다
+      (실행 후 상태와 같다는 것은 이미 고칠 것이 없는 상태)
+
+진행 결과는 --state 파일(기본 pipeline_state.json)에 단계별로 기록한다.
+
+create_test_patient 는 실행할 때마다 테스트 예약/세션 보고서를 add() 로 새로 만드므로
+기본 실행에서는 빠지고, --stages 에 이름을 적었을 때만 실행한다 (opt_in 단계).
+
+사용법:
+    python scripts/maintenance_pipeline.py                     # opt_in 을 뺀 전체 실행 (변경 없는 단계 건너뜀)
+    python scripts/maintenance_pipeline.py --list              # 단계와 선행 관계 출력
+    python scripts/maintenance_pipeline.py --stages fix_missing_organization_id verify_firestore_structure
+    python scripts/maintenance_pipeline.py --force --workers 4 --verbose
+    python scripts/maintenance_pipeline.py --stages create_test_patient fix_guardian_patient_link   # 테스트 데이터 포함
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from firestore_common import doc_hash, get_db, iter_collection
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STATE = "pipeline_state.json"
+
+
+class Stage:
+    def __init__(self, name, script, reads=(), writes=(), args=(), opt_in=False):
+        self.name = name
+        self.script = os.path.join(SCRIPTS_DIR, script)
+        self.reads = tuple(reads)
+        self.writes = tuple(writes)
+        self.args = tuple(args)
+        self.opt_in = opt_in        # True 면 --stages 에 이름을 적었을 때만 실행
+
+
+STAGES = [
+    Stage("create_test_patient", "create_test_patient.py",
+          reads=("users",), writes=("patients", "users", "appointments", "session_reports"), opt_in=True),
+    Stage("fix_guardian_patient_link", "fix_guardian_patient_link.py",
+          reads=("users", "patients"), writes=("users", "patients")),
+    Stage("fix_missing_organization_id", "fix_missing_organization_id.py",
+          reads=("patients",), writes=("patients",)),
+    Stage("verify_firestore_structure", "verify_firestore_structure.py",
+          reads=("users", "patients", "appointments", "sessions", "vouchers", "recurring_rules")),
+    Stage("verify_organization_id", "verify_organization_id.py",
+          reads=("users", "patients")),
+]
+
+
+def select_stages(names):
+    """--stages 로 지정한 단계 (지정하지 않으면 opt_in 을 뺀 전체), 선언 순서 유지"""
+    if names:
+        return [s for s in STAGES if s.name in names]
+    return [s for s in STAGES if not s.opt_in]
+
+
+def dependencies(stages):
+    """{단계 이름: 선행 단계 이름 집합} — 앞 단계와 쓰기/읽기 또는 쓰기/쓰기가 겹치면 선행"""
+    deps = {stage.name: set() for stage in stages}
+    for i, later in enumerate(stages):
+        for earlier in stages[:i]:
+            if (set(earlier.writes) & (set(later.reads) | set(later.writes))
+                    or set(later.writes) & set(earlier.reads)):
+                deps[later.name].add(earlier.name)
+    return deps
+
+
+# ---------------------------------------------------------------------------
+# 캐시 클라이언트
+# ---------------------------------------------------------------------------
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.docs = None            # doc_id → DocumentSnapshot (ID 순)
+        self.hashes = {}            # doc_id → 내용 해시
+        self.dirty = set()          # 수정되어 다시 읽어야 할 문서 ID
+
+
+class CachingClient:
+    """
+    Firestore 클라이언트 프록시
+    - 컬렉션 전체 get()/stream(): 첫 호출에서 한 번 스캔 후 캐시
+    - 문서 쓰기(set/update/delete/create/add, 배치 포함): 해당 문서를 dirty 로 표시
+    - 캐시된 문서 get(): 캐시에서 반환
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = Counter()
+        self.scans = Counter()
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    # --- 공개 API (스크립트가 쓰는 부분) ---
+
+    def collection(self, *path):
+        return CollectionProxy(self, self._db.collection(*path))
+
+    def document(self, *path):
+        return DocumentProxy(self, self._db.document(*path))
+
+    def batch(self):
+        return BatchProxy(self, self._db.batch())
+
+    def get_all(self, references, *args, **kwargs):
+        for snapshot in self._db.get_all([_unwrap(r) for r in references], *args, **kwargs):
+            yield SnapshotProxy(self, snapshot)
+
+    # --- 캐시 ---
+
+    def _entry(self, path):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                entry = self._entries[path] = _Entry()
+            return entry
+
+    def touch(self, doc_path):
+        collection, doc_id = doc_path.rsplit("/", 1)
+        with self._lock:
+            entry = self._entries.get(collection)
+        if entry is not None:
+            with entry.lock:
+                entry.dirty.add(doc_id)
+
+    def scan(self, path):
+        """컬렉션 전체 스냅샷 목록 (처음 한 번만 스캔, 이후 변경분만 다시 읽음)"""
+        entry = self._entry(path)
+        with entry.lock:
+            if entry.docs is None:
+                entry.docs = {doc.id: doc for doc in iter_collection(self._db, path)}
+                entry.dirty.clear()
+                self.scans[path] += 1
+                self.stats["reads"] += len(entry.docs)
+            elif entry.dirty:
+                ids = sorted(entry.dirty)
+                entry.dirty.clear()
+                col = self._db.collection(path)
+                for i in range(0, len(ids), 100):
+                    for doc in self._db.get_all([col.document(d) for d in ids[i:i + 100]]):
+                        entry.hashes.pop(doc.id, None)
+                        if doc.exists:
+                            entry.docs[doc.id] = doc
+                        else:
+                            entry.docs.pop(doc.id, None)
+                entry.docs = dict(sorted(entry.docs.items()))
+                self.stats["refetched"] += len(ids)
+                self.stats["reads"] += len(ids)
+            else:
+                self.stats["cache_hits"] += 1
+            return list(entry.docs.values())
+
+    def cached_doc(self, doc_path):
+        collection, doc_id = doc_path.rsplit("/", 1)
+        with self._lock:
+            entry = self._entries.get(collection)
+        if entry is None:
+            return None
+        with entry.lock:
+            if entry.docs is None or doc_id in entry.dirty:
+                return None
+            self.stats["cache_hits"] += 1
+            # 캐시에 없는 문서 = 존재하지 않는 문서이지만, 스냅샷 생성을 위해 Firestore 에서 읽는다
+            return entry.docs.get(doc_id)
+
+    def collection_hash(self, path):
+        """컬렉션 내용 해시 (문서 ID + 내용, 변경된 문서만 다시 계산)"""
+        docs = self.scan(path)
+        entry = self._entry(path)
+        digest = hashlib.sha256()
+        with entry.lock:
+            for doc in docs:
+                value = entry.hashes.get(doc.id)
+                if value is None:
+                    data = getattr(doc, "_data", None)
+                    value = entry.hashes[doc.id] = doc_hash(data if data is not None else doc.to_dict() or {})
+                digest.update(doc.id.encode("utf-8"))
+                digest.update(value)
+        return digest.hexdigest()
+
+
+def _unwrap(obj):
+    return obj._ref if isinstance(obj, (DocumentProxy, CollectionProxy)) else obj
+
+
+class QueryProxy:
+    """쿼리 결과의 reference 를 DocumentProxy 로 감싸 쓰기를 추적"""
+
+    def __init__(self, client, query):
+        self._client = client
+        self._query = query
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            args = [_unwrap(a) for a in args]
+            result = attr(*args, **kwargs)
+            return QueryProxy(self._client, result) if hasattr(result, "stream") and hasattr(result, "where") else result
+        return call
+
+    def stream(self, *args, **kwargs):
+        for snapshot in self._query.stream(*args, **kwargs):
+            yield SnapshotProxy(self._client, snapshot)
+
+    def get(self, *args, **kwargs):
+        return list(self.stream(*args, **kwargs))
+
+
+class CollectionProxy(QueryProxy):
+    def __init__(self, client, ref):
+        super().__init__(client, ref)
+        self._ref = ref
+
+    def document(self, document_id=None):
+        return DocumentProxy(self._client, self._ref.document(document_id))
+
+    def add(self, document_data, document_id=None):
+        result = self._ref.add(document_data, document_id)
+        self._client.touch(result[1].path)
+        return result[0], DocumentProxy(self._client, result[1])
+
+    def stream(self, *args, **kwargs):
+        if args or kwargs:
+            yield from super().stream(*args, **kwargs)
+            return
+        for snapshot in self._client.scan(self._ref.path):
+            yield SnapshotProxy(self._client, snapshot)
+
+
+class DocumentProxy:
+    def __init__(self, client, ref):
+        self._client = client
+        self._ref = ref
+
+    def __getattr__(self, name):
+        return getattr(self._ref, name)
+
+    def collection(self, collection_id):
+        return CollectionProxy(self._client, self._ref.collection(collection_id))
+
+    def get(self, *args, **kwargs):
+        if not args and not kwargs:
+            snapshot = self._client.cached_doc(self._ref.path)
+            if snapshot is not None:
+                return SnapshotProxy(self._client, snapshot)
+        return SnapshotProxy(self._client, self._ref.get(*args, **kwargs))
+
+    def _write(self, method, *args, **kwargs):
+        result = getattr(self._ref, method)(*args, **kwargs)
+        self._client.touch(self._ref.path)
+        return result
+
+    def set(self, *args, **kwargs):
+        return self._write("set", *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._write("update", *args, **kwargs)
+
+    def create(self, *args, **kwargs):
+        return self._write("create", *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._write("delete", *args, **kwargs)
+
+
+class SnapshotProxy:
+    def __init__(self, client, snapshot):
+        self._client = client
+        self._snapshot = snapshot
+
+    def __getattr__(self, name):
+        return getattr(self._snapshot, name)
+
+    @property
+    def reference(self):
+        return DocumentProxy(self._client, self._snapshot.reference)
+
+
+class BatchProxy:
+    def __init__(self, client, batch):
+        self._client = client
+        self._batch = batch
+        self._paths = []
+
+    def __getattr__(self, name):
+        return getattr(self._batch, name)
+
+    def __len__(self):
+        return len(self._batch)
+
+    def _op(self, method, reference, *args, **kwargs):
+        self._paths.append(_unwrap(reference).path)
+        getattr(self._batch, method)(_unwrap(reference), *args, **kwargs)
+        return self
+
+    def set(self, reference, *args, **kwargs):
+        return self._op("set", reference, *args, **kwargs)
+
+    def update(self, reference, *args, **kwargs):
+        return self._op("update", reference, *args, **kwargs)
+
+    def create(self, reference, *args, **kwargs):
+        return self._op("create", reference, *args, **kwargs)
+
+    def delete(self, reference, *args, **kwargs):
+        return self._op("delete", reference, *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        try:
+            return self._batch.commit(*args, **kwargs)
+        finally:
+            for path in self._paths:
+                self._client.touch(path)
+            self._paths = []
+
+
+# ---------------------------------------------------------------------------
+# 스레드별 argv / stdout
+# ---------------------------------------------------------------------------
+
+
+class _ThreadArgv(list):
+    """단계 스레드마다 다른 sys.argv (argparse 는 sys.argv[0], sys.argv[1:] 만 사용)"""
+
+    def __init__(self, default):
+        super().__init__(default)
+        self.local = threading.local()
+
+    def _current(self):
+        return getattr(self.local, "argv", None) or list(super().__iter__())
+
+    def __getitem__(self, index):
+        return self._current()[index]
+
+    def __iter__(self):
+        return iter(self._current())
+
+    def __len__(self):
+        return len(self._current())
+
+    def __contains__(self, item):
+        return item in self._current()
+
+
+class _ThreadStdout:
+    """단계 스레드의 출력은 버퍼로, 나머지는 원래 stdout 으로"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        buffer = getattr(self.local, "buffer", None)
+        (buffer or self.stream).flush()
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def input_hash(client, stage):
+    digest = hashlib.sha256()
+    with open(stage.script, "rb") as f:
+        digest.update(f.read())
+    digest.update(json.dumps(stage.args).encode("utf-8"))
+    for collection in stage.reads:
+        digest.update(collection.encode("utf-8"))
+        digest.update(client.collection_hash(collection).encode("ascii"))
+    return digest.hexdigest()
+
+
+def run_stage(client, stage, argv, stdout):
+    """스크립트를 __main__ 으로 실행 → (종료 코드, 출력)"""
+    buffer = io.StringIO()
+    argv.local.argv = [stage.script, *stage.args]
+    stdout.local.buffer = buffer
+    code = 0
+    try:
+        runpy.run_path(stage.script, run_name="__main__")
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        buffer.write(f"❌ 오류 발생: {e}\n")
+        code = 1
+    finally:
+        argv.local.argv = None
+        stdout.local.buffer = None
+    return code, buffer.getvalue()
+
+
+def execute(client, stage, previous, force, argv, stdout):
+    """
+    단계 하나: 입력 해시 비교 → 실행
+    (상태, 종료 코드, 출력, 소요 시간, 새 상태 기록 또는 None) 반환
+    """
+    started = time.perf_counter()
+    before = input_hash(client, stage)
+    if not force and previous.get("ok") and before in (previous.get("before"), previous.get("after"),
+                                                       previous.get("settled")):
+        return "skipped", 0, "", time.perf_counter() - started, None
+
+    code, output = run_stage(client, stage, argv, stdout)
+    after = input_hash(client, stage)
+    record = {"ok": code == 0, "before": before, "after": after, "exit_code": code,
+              "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    return ("ok" if code == 0 else "failed"), code, output, time.perf_counter() - started, record
+
+
+def _install_client(client):
+    """firestore.client() / get_db() 가 캐시 클라이언트를 반환하도록 교체 (복원 함수 반환)"""
+    from firebase_admin import firestore
+
+    original = firestore.client
+    firestore.client = lambda app=None: client
+    return lambda: setattr(firestore, "client", original)
+
+
+def maintenance_pipeline(names, state_path, workers, force, verbose):
+    """선택한 단계를 DAG 순서로 실행"""
+
+    try:
+        stages = select_stages(names)
+        deps = dependencies(stages)
+        db = get_db()
+        client = CachingClient(db)
+        state = load_state(state_path)
+
+        print("=" * 70)
+        print(f"🧩 유지보수 파이프라인: {len(stages)}단계, 병렬 {workers}")
+        print("=" * 70)
+
+        restore = _install_client(client)
+        argv, stdout = _ThreadArgv(sys.argv), _ThreadStdout(sys.stdout)
+        saved = sys.argv, sys.stdout
+        sys.argv, sys.stdout = argv, stdout
+        results = {}
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                running = {}
+                while len(results) < len(stages):
+                    for stage in stages:
+                        if stage.name in results or stage.name in running.values():
+                            continue
+                        if any(results.get(d) in ("failed", "blocked") for d in deps[stage.name]):
+                            results[stage.name] = "blocked"
+                            print(f"   ⏭️  {stage.name}: 선행 단계 실패로 건너뜀")
+                            continue
+                        if all(d in results for d in deps[stage.name]):
+                            running[pool.submit(execute, client, stage, state.get(stage.name, {}),
+                                                force, argv, stdout)] = stage.name
+                    if not running:
+                        continue
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        status, code, output, elapsed, record = future.result()
+                        results[name] = status
+                        if record is not None:
+                            state[name] = record
+                            save_state(state_path, state)
+                        icon = {"ok": "✅", "skipped": "⏭️ ", "failed": "❌"}[status]
+                        label = {"ok": "완료", "skipped": "입력 변경 없음", "failed": f"실패 (종료 코드 {code})"}[status]
+                        print(f"   {icon} {name}: {label} ({elapsed:.1f}초)")
+                        if output and (verbose or status == "failed"):
+                            for line in output.rstrip().splitlines():
+                                print(f"      │ {line}")
+            # 뒤 단계가 입력을 바꿨을 수 있으므로, 파이프라인이 끝난 상태도 "고칠 것 없음"으로 기록
+            for stage in stages:
+                if results.get(stage.name) in ("ok", "skipped") and stage.name in state:
+                    state[stage.name]["settled"] = input_hash(client, stage)
+            save_state(state_path, state)
+        finally:
+            sys.argv, sys.stdout = saved
+            restore()
+
+        print("\n" + "=" * 70)
+        scans = ", ".join(f"{c} {n}회" for c, n in sorted(client.scans.items())) or "없음"
+        print(f"📊 전체 스캔: {scans}")
+        print(f"   읽기 {client.stats['reads']:,}건 (변경 문서 재조회 {client.stats['refetched']:,}건, "
+              f"캐시 사용 {client.stats['cache_hits']:,}회), {time.perf_counter() - started:.1f}초")
+        failed = [name for name, status in results.items() if status in ("failed", "blocked")]
+        if failed:
+            print(f"❌ 실패/중단: {', '.join(failed)}")
+        else:
+            print("✅ 모든 단계 완료")
+        print("=" * 70)
+        return not failed
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def print_stages():
+    deps = dependencies(STAGES)
+    for stage in STAGES:
+        after = ", ".join(sorted(deps[stage.name])) or "-"
+        opt_in = " (--stages 로 지정할 때만 실행)" if stage.opt_in else ""
+        print(f"{stage.name}{opt_in}\n   읽기: {', '.join(stage.reads) or '-'}  쓰기: {', '.join(stage.writes) or '-'}"
+              f"\n   선행: {after}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="유지보수 스크립트 파이프라인")
+    parser.add_argument("--stages", nargs="+", choices=[s.name for s in STAGES], help="실행할 단계 (기본: create_test_patient 를 뺀 전체)")
+    parser.add_argument("--state", default=DEFAULT_STATE, help="단계별 입력 해시 기록 파일")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 실행할 단계 수")
+    parser.add_argument("--force", action="store_true", help="입력이 같아도 모든 단계 실행")
+    parser.add_argument("--verbose", action="store_true", help="단계 출력 표시")
+    parser.add_argument("--list", action="store_true", help="단계 목록과 선행 관계만 출력")
+    args = parser.parse_args()
+
+    if args.list:
+        print_stages()
+        sys.exit(0)
+
+    success = maintenance_pipeline(args.stages, args.state, args.workers, args.force, args.verbose)
+    sys.exit(0 if success else 1)
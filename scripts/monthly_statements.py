@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+보호자별 월간 이용 명세서 (출석 + 이용권 + 결제 → 청구/잔액)
+
+앱에서는 결제/출석을 환자 한 명씩만 조회한다. 이 스크립트는 한 달을 마감하면서
+센터(organization_id)마다
+
+    1. 환자 목록 → 보호자(guardian_uids) 묶음
+    2. 해당 월 출석(attendances, 환자 30명씩 'in' 조회), 이용권(vouchers), 결제(payments)
+    3. 환자별 청구액: 이용권 적용 회차 × 본인부담금 + 나머지 회차 × 기본 수업료
+    4. 보호자별 잔액: 전월 명세서 잔액 + 청구액 - 실제 결제액(현금/카드/계좌이체)
+    5. 명세서 텍스트 렌더링 후 billing_statements/<YYYY-MM>_<센터>_<보호자> 에 배치 기록
+
+을 처리한다. 센터 단위로 작업 프로세스에 나누어 병렬 실행하며, 완료한 센터는
+<root>/statements_<YYYY-MM>.json 에 기록해 중단 후 다시 실행하면 남은 센터만 처리한다.
+(명세서 문서 ID 가 고정이므로 중간에 끊긴 센터를 다시 처리해도 결과는 같다.)
+
+환자에게 보호자가 여럿이면 모든 보호자 명세서에 표시하되, 청구는 첫 번째 보호자에게만 한다.
+
+사용법:
+    python scripts/monthly_statements.py --month 2026-09                  # dry-run: 센터별 합계
+    python scripts/monthly_statements.py --month 2026-09 --apply --workers 8
+    python scripts/monthly_statements.py --month 2026-09 --apply --centers org_a org_b --out statements
+    python scripts/monthly_statements.py bench --centers 40 --patients 400    # 가짜 Firestore 로 시간 측정
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+from firestore_common import get_db
+from firestore_models import Patient
+
+KST = timezone(timedelta(hours=9))
+STATEMENT_COLLECTION = "billing_statements"
+DEFAULT_ROOT = "statements_state"
+DEFAULT_SESSION_PRICE = 50000       # 이용권이 없는 회차의 기본 수업료 (원)
+ACTUAL_PAYMENT_METHODS = {"cash", "card", "transfer"}   # Payment.isActualPayment 와 동일
+BILLABLE_STATUSES = {"PRESENT", "MAKEUP"}
+IN_LIMIT = 30                       # Firestore 'in' 조건 최대 값 수
+BATCH_SIZE = 500
+
+
+# ---------------------------------------------------------------------------
+# 기간 / 상태 파일
+# ---------------------------------------------------------------------------
+
+
+def month_range(month):
+    """'2026-09' → (KST 월 시작, 다음 달 시작)"""
+    start = datetime.strptime(month, "%Y-%m").replace(tzinfo=KST)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def previous_month(month):
+    start, _ = month_range(month)
+    return (start - timedelta(days=1)).strftime("%Y-%m")
+
+
+def statement_id(month, center, guardian_id):
+    return f"{month}_{center}_{guardian_id}"
+
+
+def load_state(root, month):
+    path = os.path.join(root, f"statements_{month}.json")
+    if not os.path.exists(path):
+        return {"month": month, "centers": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(root, state):
+    path = os.path.join(root, f"statements_{state['month']}.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------------------------------
+# 센터 데이터 조회
+# ---------------------------------------------------------------------------
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _as_kst(value):
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(KST)
+
+
+def load_center(db, center, month):
+    """센터 한 곳의 월 데이터 → (환자, 출석 집계, 이용권, 결제 합계, 보호자 이름, 전월 잔액)"""
+    start, end = month_range(month)
+
+    patients = {}
+    for doc in db.collection("patients").where("organization_id", "==", center).stream():
+        patient = Patient.from_snapshot(doc)
+        if patient.guardian_ids:
+            patients[patient.id] = patient
+    patient_ids = sorted(patients)
+
+    attendance = defaultdict(Counter)
+    vouchers = defaultdict(list)
+    for chunk in _chunks(patient_ids, IN_LIMIT):
+        query = (db.collection("attendances")
+                 .where("patient_id", "in", chunk)
+                 .where("schedule_date", ">=", start)
+                 .where("schedule_date", "<", end))
+        for doc in query.stream():
+            data = doc.to_dict() or {}
+            attendance[data.get("patient_id")][str(data.get("status", "")).upper()] += 1
+        for doc in db.collection("vouchers").where("patient_id", "in", chunk).stream():
+            data = doc.to_dict() or {}
+            expiry = _as_kst(data.get("expiry_date"))
+            created = _as_kst(data.get("created_at"))
+            if (expiry is None or expiry >= start) and (created is None or created < end):
+                vouchers[data.get("patient_id")].append(data)
+
+    payments = Counter()
+    query = (db.collection("payments")
+             .where("organization_id", "==", center)
+             .where("created_at", ">=", start)
+             .where("created_at", "<", end)
+             .order_by("created_at", direction="DESCENDING"))
+    for doc in query.stream():
+        data = doc.to_dict() or {}
+        if data.get("payment_method", "cash") in ACTUAL_PAYMENT_METHODS:
+            payments[data.get("patient_id")] += data.get("final_amount") or 0
+
+    guardian_ids = sorted({g for p in patients.values() for g in p.guardian_ids})
+    names = {}
+    balances = {}
+    prev = previous_month(month)
+    for chunk in _chunks(guardian_ids, 100):
+        for doc in db.get_all([db.collection("users").document(g) for g in chunk]):
+            if doc.exists:
+                names[doc.id] = (doc.to_dict() or {}).get("name") or ""
+        previous = {statement_id(prev, center, g): g for g in chunk}
+        for doc in db.get_all([db.collection(STATEMENT_COLLECTION).document(i) for i in previous]):
+            if doc.exists:
+                balances[previous[doc.id]] = (doc.to_dict() or {}).get("closing_balance") or 0
+    return patients, attendance, vouchers, payments, names, balances
+
+
+# ---------------------------------------------------------------------------
+# 청구 계산 / 렌더링
+# ---------------------------------------------------------------------------
+
+
+def voucher_terms(voucher, settings):
+    """이용권 → (이름, 총 회차, 회당 본인부담, 회당 지원금) (값이 없으면 voucher_settings 참조)"""
+    setting = settings.get(voucher.get("voucher_setting_id")) or {}
+
+    def pick(*keys):
+        for source in (voucher, setting):
+            for key in keys:
+                if source.get(key) is not None:
+                    return source[key]
+        return None
+
+    name = pick("program_name", "voucher_name", "name") or "이용권"
+    sessions = pick("total_sessions", "sessions") or 0
+    self_pay = pick("self_payment_per_session", "self_payment") or 0
+    support = pick("support_per_session") or 0
+    return name, int(sessions), float(self_pay), float(support)
+
+
+def patient_charges(patient_id, counts, vouchers, settings, session_price):
+    """환자 한 명의 월 청구 내역"""
+    attended = sum(counts[s] for s in BILLABLE_STATUSES)
+    line = {
+        "attended": attended,
+        "makeup": counts["MAKEUP"],
+        "absent": counts["ABSENT"],
+        "cancelled": counts["CANCELLED"],
+        "voucher": None,
+        "voucher_sessions": 0,
+        "self_payment": 0.0,
+        "support": 0.0,
+        "regular_sessions": attended,
+        "regular_amount": attended * session_price,
+    }
+    if vouchers:
+        # 지원 회차가 가장 많이 남은 이용권 하나를 적용
+        voucher = max(vouchers, key=lambda v: v.get("remaining_sessions") or 0)
+        name, sessions, self_pay, support = voucher_terms(voucher, settings)
+        covered = min(attended, sessions) if sessions else attended
+        line.update({
+            "voucher": name,
+            "voucher_sessions": covered,
+            "self_payment": covered * self_pay,
+            "support": covered * support,
+            "regular_sessions": attended - covered,
+            "regular_amount": (attended - covered) * session_price,
+        })
+    line["charge"] = line["self_payment"] + line["regular_amount"]
+    return line
+
+
+def _won(amount):
+    return f"{amount:,.0f}원"
+
+
+def render_statement(month, guardian_name, lines, opening, charges, paid, closing):
+    out = [f"[{month} 이용 명세서] 보호자 {guardian_name or '-'}"]
+    for line in lines:
+        out.append(f"- {line['patient_name']}: 출석 {line['attended']}회 (보강 {line['makeup']}), "
+                   f"결석 {line['absent']}, 취소 {line['cancelled']}"
+                   + ("" if line["billed"] else " — 다른 보호자에게 청구"))
+        if line["voucher_sessions"]:
+            out.append(f"  {line['voucher']} {line['voucher_sessions']}회: 본인부담 {_won(line['self_payment'])}"
+                       f" (지원 {_won(line['support'])})")
+        if line["regular_sessions"]:
+            out.append(f"  일반 {line['regular_sessions']}회: {_won(line['regular_amount'])}")
+    out.append(f"전월 잔액 {_won(opening)} / 이번 달 청구 {_won(charges)} / 납부 {_won(paid)} / 잔액 {_won(closing)}")
+    return "\n".join(out)
+
+
+def build_statements(center, month, data, settings, session_price):
+    """보호자별 명세서 문서 [(문서 ID, data)]"""
+    patients, attendance, vouchers, payments, names, balances = data
+    by_guardian = defaultdict(list)
+    for patient in patients.values():
+        for guardian_id in patient.guardian_ids:
+            by_guardian[guardian_id].append(patient)
+
+    now = datetime.now(timezone.utc)
+    statements = []
+    for guardian_id in sorted(by_guardian):
+        lines = []
+        charges = paid = 0.0
+        for patient in sorted(by_guardian[guardian_id], key=lambda p: p.id):
+            line = patient_charges(patient.id, attendance.get(patient.id, Counter()),
+                                   vouchers.get(patient.id), settings, session_price)
+            line["patient_id"] = patient.id
+            line["patient_name"] = patient.name or ""
+            line["billed"] = patient.guardian_ids[0] == guardian_id
+            if line["billed"]:
+                charges += line["charge"]
+                paid += payments.get(patient.id, 0)
+            lines.append(line)
+        opening = balances.get(guardian_id, 0)
+        closing = opening + charges - paid
+        statements.append((statement_id(month, center, guardian_id), {
+            "month": month,
+            "organization_id": center,
+            "guardian_id": guardian_id,
+            "guardian_name": names.get(guardian_id, ""),
+            "patient_ids": [line["patient_id"] for line in lines],
+            "lines": lines,
+            "opening_balance": opening,
+            "charges": charges,
+            "payments": paid,
+            "closing_balance": closing,
+            "text": render_statement(month, names.get(guardian_id), lines, opening, charges, paid, closing),
+            "created_at": now,
+        }))
+    return statements
+
+
+def write_statements(db, statements):
+    col = db.collection(STATEMENT_COLLECTION)
+    batch = db.batch()
+    for doc_id, data in statements:
+        batch.set(col.document(doc_id), data)
+        if len(batch) >= BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+    if len(batch):
+        batch.commit()
+
+
+# ---------------------------------------------------------------------------
+# 작업 프로세스
+# ---------------------------------------------------------------------------
+
+
+def close_center(center, month, session_price, apply, out_dir=None):
+    """센터 한 곳 마감 (작업 프로세스에서 실행) → 요약 dict"""
+    started = time.perf_counter()
+    db = get_db()
+    settings = {doc.id: doc.to_dict() or {} for doc in db.collection("voucher_settings").stream()}
+    data = load_center(db, center, month)
+    statements = build_statements(center, month, data, settings, session_price)
+    if apply:
+        write_statements(db, statements)
+    if out_dir:
+        os.makedirs(os.path.join(out_dir, month), exist_ok=True)
+        with open(os.path.join(out_dir, month, f"{center}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n\n".join(s["text"] for _, s in statements) + "\n")
+    return {
+        "center": center,
+        "patients": len(data[0]),
+        "guardians": len(statements),
+        "charges": sum(s["charges"] for _, s in statements),
+        "payments": sum(s["payments"] for _, s in statements),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def list_centers(db):
+    """patients 의 organization_id 목록 (필드 하나만 조회)"""
+    centers = set()
+    for doc in db.collection("patients").select(["organization_id"]).stream():
+        center = (doc.to_dict() or {}).get("organization_id")
+        if center:
+            centers.add(center)
+    return sorted(centers)
+
+
+def _mp_context(db):
+    """
+    gRPC 채널은 fork 후 사용할 수 없으므로 실제 Firestore 는 spawn.
+    가짜 클라이언트(firestore_fake)는 이 프로세스 메모리에만 있으므로 fork.
+    """
+    fake = sys.modules.get("firestore_fake")
+    if fake is not None and isinstance(db, fake.FakeFirestore):
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def monthly_statements(month, centers, root, workers, session_price, apply, out_dir=None):
+    """전체 센터 월 마감"""
+
+    try:
+        db = get_db()
+        month = month or (datetime.now(KST).replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
+        month_range(month)
+
+        print("=" * 70)
+        print(f"🧾 {month} 보호자별 이용 명세서 {'(적용)' if apply else '(dry-run)'}")
+        print("=" * 70)
+
+        os.makedirs(root, exist_ok=True)
+        state = load_state(root, month) if apply else {"month": month, "centers": {}}
+        centers = centers or list_centers(db)
+        pending = [c for c in centers if not state["centers"].get(c, {}).get("done")]
+        print(f"   센터 {len(centers)}곳 (완료 {len(centers) - len(pending)}, 남음 {len(pending)}), "
+              f"작업 프로세스 {workers}개")
+
+        started = time.perf_counter()
+        failed = []
+
+        def record(result):
+            state["centers"][result["center"]] = dict(result, done=True)
+            if apply:
+                save_state(root, state)
+            print(f"   ✅ {result['center']}: 보호자 {result['guardians']:,}명, 청구 {_won(result['charges'])}, "
+                  f"납부 {_won(result['payments'])} ({result['seconds']}초)")
+
+        if workers <= 1:
+            for center in pending:
+                try:
+                    record(close_center(center, month, session_price, apply, out_dir))
+                except Exception as e:
+                    failed.append(center)
+                    print(f"   ❌ {center}: {e}")
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(db)) as pool:
+                futures = {pool.submit(close_center, c, month, session_price, apply, out_dir): c for c in pending}
+                for future in as_completed(futures):
+                    try:
+                        record(future.result())
+                    except Exception as e:
+                        failed.append(futures[future])
+                        print(f"   ❌ {futures[future]}: {e}")
+
+        done = [entry for entry in state["centers"].values() if entry.get("done")]
+        print("\n" + "=" * 70)
+        print(f"📊 보호자 {sum(e['guardians'] for e in done):,}명, 청구 {_won(sum(e['charges'] for e in done))}, "
+              f"납부 {_won(sum(e['payments'] for e in done))} ({time.perf_counter() - started:.1f}초)")
+        if failed:
+            print(f"⚠️  실패한 센터 {len(failed)}곳: {', '.join(failed)} (다시 실행하면 이어서 처리)")
+        elif apply:
+            print(f"✅ {STATEMENT_COLLECTION} 기록 완료")
+        else:
+            print("⚠️  dry-run (--apply 로 기록)")
+        print("=" * 70)
+        return not failed
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크
+# ---------------------------------------------------------------------------
+
+
+def bench(args):
+    """가짜 Firestore 에 합성 센터 데이터를 넣고 전체 마감 시간 측정"""
+    import tempfile
+
+    import firestore_fake
+
+    rng = random.Random(args.random_seed)
+    month = "2026-09"
+    start, end = month_range(month)
+    days = (end - start).days
+    data = {"patients": {}, "users": {}, "attendances": {}, "vouchers": {}, "payments": {},
+            "voucher_settings": {"vs1": {"program_name": "발달재활", "sessions": 8,
+                                         "self_payment": 12000, "support_per_session": 40000}}}
+    for c in range(args.centers):
+        center = f"org_{c:03d}"
+        for p in range(args.patients):
+            patient_id = f"p{c:03d}_{p:05d}"
+            guardians = [f"g{c:03d}_{p // 2:05d}"] + ([f"g{c:03d}_x{p:05d}"] if rng.random() < 0.1 else [])
+            data["patients"][patient_id] = {"name": f"환자{p}", "organization_id": center, "guardian_uids": guardians}
+            for g in guardians:
+                data["users"][g] = {"name": f"보호자{g[-5:]}", "role": "GUARDIAN", "organization_id": center}
+            for _ in range(rng.randrange(4, 13)):
+                day = start + timedelta(days=rng.randrange(days), hours=10)
+                data["attendances"][f"a{len(data['attendances']):08d}"] = {
+                    "patient_id": patient_id, "schedule_date": day,
+                    "status": rng.choice(["PRESENT"] * 6 + ["ABSENT", "CANCELLED", "MAKEUP"]),
+                }
+            if rng.random() < 0.6:
+                data["vouchers"][f"v{len(data['vouchers']):07d}"] = {
+                    "patient_id": patient_id, "voucher_setting_id": "vs1", "total_sessions": 8,
+                    "remaining_sessions": rng.randrange(9), "expiry_date": end + timedelta(days=60),
+                }
+            if rng.random() < 0.7:
+                data["payments"][f"pay{len(data['payments']):07d}"] = {
+                    "patient_id": patient_id, "organization_id": center, "payment_method": rng.choice(["card", "cash", "voucher"]),
+                    "final_amount": rng.choice([96000, 150000, 300000]), "created_at": start + timedelta(days=rng.randrange(days)),
+                }
+
+    client = firestore_fake.FakeFirestore(latency=args.latency_ms / 1000.0)
+    client.load(data)
+    firestore_fake.install(client)
+    print(f"🏁 합성 데이터: 센터 {args.centers}곳, 환자 {len(data['patients']):,}명, "
+          f"출석 {len(data['attendances']):,}건, RPC 지연 {args.latency_ms}ms")
+    with tempfile.TemporaryDirectory() as root:
+        started = time.perf_counter()
+        success = monthly_statements(month, None, root, args.workers, DEFAULT_SESSION_PRICE, apply=True)
+        print(f"   전체 {time.perf_counter() - started:.1f}초 (작업 프로세스 {args.workers}개)")
+    return success
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        # 작업 프로세스의 읽기/쓰기는 계획 통계에 잡히지 않으므로 한 프로세스로 실행
+        sys.exit(plan_script(__file__, state_paths={"--root": DEFAULT_ROOT, "--out": None},
+                             fixed_args={"--workers": 1}))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench_parser = argparse.ArgumentParser(description="월간 명세서 벤치마크")
+        bench_parser.add_argument("--centers", type=int, default=40)
+        bench_parser.add_argument("--patients", type=int, default=400, help="센터당 환자 수")
+        bench_parser.add_argument("--workers", type=int, default=8)
+        bench_parser.add_argument("--latency-ms", type=float, default=20.0, help="가짜 Firestore RPC 지연")
+        bench_parser.add_argument("--random-seed", type=int, default=42)
+        args = bench_parser.parse_args(sys.argv[2:])
+        sys.exit(0 if bench(args) else 1)
+
+    parser = argparse.ArgumentParser(description="보호자별 월간 이용 명세서 생성")
+    parser.add_argument("--month", help="마감할 월 YYYY-MM (기본: 지난달)")
+    parser.add_argument("--centers", nargs="+", help="처리할 organization_id (기본: 환자가 있는 전체 센터)")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="진행 상태 파일 디렉토리")
+    parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1), help="작업 프로세스 수")
+    parser.add_argument("--session-price", type=float, default=DEFAULT_SESSION_PRICE,
+                        help="이용권이 적용되지 않는 회차의 수업료 (원)")
+    parser.add_argument("--out", help="명세서 텍스트 파일 디렉토리 (<out>/<월>/<센터>.txt)")
+    parser.add_argument("--apply", action="store_true", help="명세서 기록 (기본은 dry-run)")
+    args = parser.parse_args()
+
+    success = monthly_statements(args.month, args.centers, args.root, args.workers,
+                                 args.session_price, args.apply, args.out)
+    sys.exit(0 if success else 1)
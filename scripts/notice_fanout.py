@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+공지사항 보호자 수신함 fan-out
+
+앱의 보호자 화면은 센터 공지 전체(notices where organization_id == 센터)를 읽은 뒤
+메모리에서 대상/유효기간을 거른다. 공지가 쌓일수록 보호자 한 명이 매번 읽는 문서가 늘어나므로,
+공지를 게시할 때 대상 사용자마다 수신함 문서를 만들어 두고
+
+    users/<uid>/notice_inbox/<notice_id>     (공지 필드 복사 + notice_id, delivered_at)
+
+앱은 users/<uid>/notice_inbox 를 type 으로 거르고 publish_date 내림차순으로 limit 조회만 하면 된다
+(type + publish_date 복합 인덱스, NoticeService.getInboxNotices).
+
+대상 사용자:
+    - target_user_ids 가 있으면 해당 사용자만
+    - 없으면 organization_id + 역할 조회 (role == 'GUARDIAN' 또는 roles.guardian == true)
+      CUSTOMER 공지 → 보호자, CENTER 공지 → 직원 (CENTER_ADMIN / THERAPIST, roles 의 owner / admin 등)
+
+기록:
+    - 대상 ID 를 정렬해 500개씩 배치 커밋, AdaptiveLimiter 로 병렬 실행
+      (수신함 경로가 users/<uid> 아래로 분산되어 있어 기본적으로 ramp-up 상한 없음, --ramp 로 사용)
+    - 연속으로 완료된 마지막 사용자 ID 를 상태 파일에 주기적으로 저장해, 중단 후 다시 실행하면
+      그 다음 사용자부터 이어서 기록 (문서 ID 가 고정이므로 겹쳐 기록해도 결과는 같음)
+    - merge 로 기록하므로 다시 실행해도 보호자의 읽음 표시(is_read)는 유지
+    - 완료 후 notices/<id> 에 fanout_status='DELIVERED', fanout_count 기록
+
+사용법:
+    python scripts/notice_fanout.py NOTICE_ID                 # dry-run: 대상 수만 확인
+    python scripts/notice_fanout.py NOTICE_ID --apply
+    python scripts/notice_fanout.py --pending --apply         # 게시일이 지났고 아직 전달하지 않은 공지 전체
+    python scripts/notice_fanout.py bench --guardians 100000  # 가짜 Firestore (지연 + 쓰기 제한) 로 시간 측정
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from firestore_common import get_db
+from firestore_rate import AdaptiveLimiter, add_rate_arguments
+
+INBOX_COLLECTION = "notice_inbox"
+DEFAULT_STATE = "notice_fanout_state.json"
+BATCH_SIZE = 500
+CHECKPOINT_INTERVAL = 2.0           # 상태 파일 저장 간격 (초)
+RETRY_ROUNDS = 3                    # limiter 재시도 후에도 실패한 배치를 다시 모아 기록하는 횟수
+# 공지 유형 → (role 필드 값, roles Map 키). role 은 앱의 UserRole.value (update_user_roles.py 가 쓰는
+# 이전 값 ADMIN 포함), roles Map 키는 AppUser.hasRole 이 쓰는 value 소문자와 센터장 화면의 owner / admin
+TARGET_ROLES = {
+    "CUSTOMER": (("GUARDIAN",), ("guardian",)),
+    "CENTER": (("CENTER_ADMIN", "ADMIN", "THERAPIST"), ("center_admin", "owner", "admin", "therapist")),
+}
+# 수신함에 복사하지 않는 필드 (공지 문서에서만 관리)
+SKIP_FIELDS = {"view_count", "target_user_ids", "fanout_status", "fanout_count", "fanout_at"}
+
+
+# ---------------------------------------------------------------------------
+# 상태 파일
+# ---------------------------------------------------------------------------
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {"notices": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------------------------------
+# 대상 조회
+# ---------------------------------------------------------------------------
+
+
+def resolve_targets(db, notice):
+    """공지 → 정렬된 대상 사용자 ID 목록 (organization_id + 역할 equality 조회, ID 만)"""
+    explicit = notice.get("target_user_ids") or []
+    if explicit:
+        return sorted(set(explicit))
+
+    organization_id = notice.get("organization_id")
+    values, keys = TARGET_ROLES.get((notice.get("type") or "CENTER").upper(), TARGET_ROLES["CENTER"])
+    users = db.collection("users").where("organization_id", "==", organization_id)
+    queries = [users.where("role", "==", value) for value in values]
+    queries += [users.where(f"roles.{key}", "==", True) for key in keys]
+    targets = set()
+    for query in queries:
+        targets.update(doc.id for doc in query.select([]).stream())
+    return sorted(targets)
+
+
+def inbox_entry(notice_id, notice, delivered_at):
+    entry = {k: v for k, v in notice.items() if k not in SKIP_FIELDS}
+    entry["type"] = (notice.get("type") or "CENTER").upper()     # 앱은 type == 'CUSTOMER' 로 조회
+    entry["notice_id"] = notice_id
+    entry["delivered_at"] = delivered_at
+    return entry
+
+
+# ---------------------------------------------------------------------------
+# fan-out
+# ---------------------------------------------------------------------------
+
+
+def deliver(db, limiter, notice_id, notice, targets, state, state_path, ramp):
+    """대상 사용자 수신함에 기록 → (기록 수, 실패 배치 수)"""
+    progress = state["notices"].setdefault(notice_id, {"targets": len(targets), "checkpoint": None})
+    checkpoint = progress.get("checkpoint")
+    remaining = [uid for uid in targets if checkpoint is None or uid > checkpoint]
+    chunks = [remaining[i:i + BATCH_SIZE] for i in range(0, len(remaining), BATCH_SIZE)]
+    if checkpoint:
+        print(f"   ↪️  체크포인트 {checkpoint} 이후 {len(remaining):,}명부터 이어서 기록")
+
+    entry = inbox_entry(notice_id, notice, datetime.now(timezone.utc))
+
+    def commit(index):
+        batch = db.batch()
+        for uid in chunks[index]:
+            ref = db.collection("users").document(uid).collection(INBOX_COLLECTION).document(notice_id)
+            batch.set(ref, entry, merge=True)
+        batch.commit()
+
+    done = [False] * len(chunks)
+    prefix = 0                      # chunks[:prefix] 모두 완료
+    written = 0
+    last_saved = time.monotonic()
+    started = time.perf_counter()
+    collection = INBOX_COLLECTION if ramp else None
+
+    pending = list(range(len(chunks)))
+    for round_no in range(RETRY_ROUNDS + 1):
+        if round_no and pending:
+            print(f"   🔁 실패 배치 {len(pending)}개 다시 기록 ({round_no}/{RETRY_ROUNDS})")
+        failed = []
+        for index, _, error in limiter.map(commit, pending, collection=collection, ops=BATCH_SIZE):
+            if error:
+                failed.append(index)
+                if round_no == RETRY_ROUNDS:
+                    print(f"   ❌ {chunks[index][0]} ~ {chunks[index][-1]}: {error}")
+                continue
+            done[index] = True
+            written += len(chunks[index])
+            while prefix < len(chunks) and done[prefix]:
+                prefix += 1
+            if prefix and time.monotonic() - last_saved >= CHECKPOINT_INTERVAL:
+                progress["checkpoint"] = chunks[prefix - 1][-1]
+                save_state(state_path, state)
+                last_saved = time.monotonic()
+                print(f"   ⏳ {written:,}/{len(remaining):,}명 ({time.perf_counter() - started:.1f}초)")
+        pending = sorted(failed)
+        if not pending:
+            break
+
+    if prefix:
+        progress["checkpoint"] = chunks[prefix - 1][-1]
+    progress["written"] = progress.get("written", 0) + written
+    save_state(state_path, state)
+    return written, len(pending)
+
+
+def pending_notices(db):
+    """게시일이 지났고 아직 fan-out 하지 않은 공지 ID"""
+    now = datetime.now(timezone.utc)
+    ids = []
+    for doc in db.collection("notices").where("publish_date", "<=", now).stream():
+        if (doc.to_dict() or {}).get("fanout_status") != "DELIVERED":
+            ids.append(doc.id)
+    return ids
+
+
+def notice_fanout(notice_ids, pending, limiter, state_path, apply, ramp=False):
+    try:
+        db = get_db()
+
+        print("=" * 70)
+        print("📨 공지사항 보호자 수신함 fan-out")
+        print("=" * 70)
+        if not apply:
+            print("🔍 dry-run: 대상 수만 확인합니다 (--apply 로 기록)")
+
+        if pending:
+            notice_ids = list(notice_ids or []) + pending_notices(db)
+        if not notice_ids:
+            print("✅ 전달할 공지가 없습니다.")
+            return True
+
+        state = load_state(state_path)
+        total_failed = 0
+        for notice_id in notice_ids:
+            snapshot = db.collection("notices").document(notice_id).get()
+            if not snapshot.exists:
+                print(f"\n❌ 공지 없음: {notice_id}")
+                total_failed += 1
+                continue
+            notice = snapshot.to_dict() or {}
+            started = time.perf_counter()
+            targets = resolve_targets(db, notice)
+            print(f"\n📌 {notice.get('title', notice_id)} ({notice_id})")
+            print(f"   센터 {notice.get('organization_id')} / {notice.get('type', 'CENTER')} → "
+                  f"대상 {len(targets):,}명 (조회 {time.perf_counter() - started:.1f}초)")
+            if not apply or not targets:
+                continue
+
+            written, failed = deliver(db, limiter, notice_id, notice, targets, state, state_path, ramp)
+            elapsed = time.perf_counter() - started
+            print(f"   ✅ 수신함 {written:,}건 기록 ({elapsed:.1f}초, {written / elapsed if elapsed else 0:,.0f}건/초)")
+            if failed:
+                total_failed += failed
+                print(f"   ❌ 실패 배치 {failed}개 — 다시 실행하면 체크포인트 이후부터 재시도합니다.")
+                continue
+            db.collection("notices").document(notice_id).update({
+                "fanout_status": "DELIVERED",
+                "fanout_count": len(targets),
+                "fanout_at": datetime.now(timezone.utc),
+            })
+            state["notices"].pop(notice_id, None)
+            save_state(state_path, state)
+
+        if apply:
+            limiter.print_summary()
+        print("\n" + "=" * 70)
+        print("✅ fan-out 완료" if not total_failed else f"❌ 실패 {total_failed}건")
+        print("=" * 70)
+        return total_failed == 0
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크
+# ---------------------------------------------------------------------------
+
+
+def bench(args):
+    """가짜 Firestore (RPC 지연 + 초당 쓰기 제한) 에 보호자를 넣고 공지 1건 fan-out 시간 측정"""
+    import tempfile
+
+    import firestore_fake
+
+    now = datetime.now(timezone.utc)
+    users = {}
+    for i in range(args.guardians):
+        users[f"g{i:07d}"] = {"name": f"보호자{i}", "organization_id": "org_bench", "role": "GUARDIAN"}
+    for i in range(args.guardians // 10):
+        users[f"x{i:07d}"] = {"name": f"타센터{i}", "organization_id": "org_other", "role": "GUARDIAN"}
+    for i in range(200):
+        users[f"t{i:05d}"] = {"name": f"치료사{i}", "organization_id": "org_bench", "role": "THERAPIST"}
+    notice = {"organization_id": "org_bench", "title": "추석 연휴 휴원 안내", "content": "연휴 기간 휴원합니다.",
+              "type": "CUSTOMER", "priority": "IMPORTANT", "target_user_ids": [], "publish_date": now,
+              "is_pinned": True, "view_count": 0, "author_id": "admin", "author_name": "관리자", "created_at": now}
+
+    client = firestore_fake.FakeFirestore(latency=args.latency_ms / 1000.0, write_rate=args.write_rate)
+    client.load({"users": users, "notices": {"n_bench": notice}})
+    firestore_fake.install(client)
+    print(f"🏁 보호자 {args.guardians:,}명, RPC 지연 {args.latency_ms}ms, 쓰기 제한 {args.write_rate:,}건/초")
+
+    limiter = AdaptiveLimiter(initial=args.initial_inflight, max_limit=args.max_inflight, ramp=False)
+    with tempfile.TemporaryDirectory() as root:
+        started = time.perf_counter()
+        success = notice_fanout(["n_bench"], False, limiter, os.path.join(root, "state.json"), apply=True)
+        elapsed = time.perf_counter() - started
+
+    delivered = client.collection_group(INBOX_COLLECTION).count().get()[0][0].value
+    inbox = client.collection("users").document("g0000000").collection(INBOX_COLLECTION)
+    client.reset_stats()
+    rows = inbox.where("type", "==", "CUSTOMER").order_by("publish_date", direction="DESCENDING").limit(20).get()
+    print(f"\n   전체 {elapsed:.1f}초, 수신함 {delivered:,}건")
+    print(f"   보호자 조회: {len(rows)}건 / 읽기 {client.stats['reads']}회")
+    return success and elapsed < 60
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--state": DEFAULT_STATE}))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench_parser = argparse.ArgumentParser(description="공지 fan-out 벤치마크")
+        bench_parser.add_argument("--guardians", type=int, default=100000)
+        bench_parser.add_argument("--latency-ms", type=float, default=50.0, help="가짜 Firestore RPC 지연")
+        bench_parser.add_argument("--write-rate", type=int, default=5000, help="가짜 Firestore 초당 쓰기 제한")
+        bench_parser.add_argument("--initial-inflight", type=int, default=4)
+        bench_parser.add_argument("--max-inflight", type=int, default=64)
+        args = bench_parser.parse_args(sys.argv[2:])
+        sys.exit(0 if bench(args) else 1)
+
+    parser = argparse.ArgumentParser(description="공지사항 보호자 수신함 fan-out")
+    parser.add_argument("notice_ids", nargs="*", help="전달할 공지 ID")
+    parser.add_argument("--pending", action="store_true", help="게시일이 지났고 아직 전달하지 않은 공지 전체")
+    parser.add_argument("--state", default=DEFAULT_STATE, help="체크포인트 파일")
+    parser.add_argument("--ramp", action="store_true", help="수신함 쓰기에 500/50/5 ramp-up 상한 적용")
+    parser.add_argument("--apply", action="store_true", help="수신함 기록 (기본은 dry-run)")
+    add_rate_arguments(parser)
+    args = parser.parse_args()
+
+    limiter = AdaptiveLimiter.from_args(args)
+    success = notice_fanout(args.notice_ids, args.pending, limiter, args.state, args.apply, args.ramp)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+patients / users 검색 인덱스 (로컬 SQLite, 한글 초성 지원)
+
+Firestore는 부분 문자열 검색이 없어 patient_service.searchPatientsByName 은 센터 환자를
+전부 읽고, create_test_patient.py 는 GUARDIAN 사용자를 전부 순회해 이메일을 찾는다.
+이 스크립트는 name, patient_code, tags, email, 전화번호로 역색인을 만들어
+SQLite 파일(postings 테이블, token 순 B-tree)에 저장한다.
+
+토큰:
+    이름/태그     공백 제거 후 모든 접미사 ("김아쿠" → 김아쿠, 아쿠, 쿠)  → 부분 문자열 검색
+                 초성 접미사 ("ㄱㅇㅋ", "ㅇㅋ", "ㅋ")                 → "ㄱㅇㅋ", "김ㅇㅋ" 검색
+    patient_code 소문자 전체 코드, 숫자 부분                            → "KIM0", "0123"
+    email        전체 주소, 도메인
+    전화번호      숫자만 전체, 국번 이후, 뒤 4자리                     → "5678", "01012345678"
+
+검색은 토큰 접두사 범위 조회(token >= q AND token < q + U+FFFF)이므로
+문서 수와 무관하게 밀리초 단위로 끝난다.
+
+사용법:
+    python scripts/search_index.py build                       # 최초 전체 생성, 이후 변경분만 반영
+    python scripts/search_index.py build --full --detect-deletes
+    python scripts/search_index.py search "ㄱㅇㅋ"
+    python scripts/search_index.py search aqu8275 --collection users
+    python scripts/search_index.py bench --docs 1000000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+DEFAULT_DB = "search_index.sqlite"
+SEARCH_FIELDS = {
+    "patients": {
+        "name": "text",
+        "patient_code": "code",
+        "tags": "text",
+        "emergency_contact.phone": "phone",
+    },
+    "users": {
+        "name": "text",
+        "email": "email",
+        "phone": "phone",
+    },
+}
+MAX_SUFFIX_CHARS = 24       # 긴 문자열은 앞부분만 접미사 토큰으로 생성
+MIN_PHONE_SUFFIX = 4
+COMMIT_EVERY = 5000
+MAX_MIXED_CANDIDATES = 20000  # 초성 혼합 질의에서 이름을 다시 확인할 최대 후보 수
+
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_HANGUL_START, _HANGUL_END = 0xAC00, 0xD7A3
+
+
+# ---------------------------------------------------------------------------
+# 토큰화
+# ---------------------------------------------------------------------------
+
+
+def is_chosung(ch):
+    return ch in CHOSUNG
+
+
+def chosung_of(ch):
+    """한글 음절 → 초성 (음절이 아니면 그대로)"""
+    code = ord(ch)
+    if _HANGUL_START <= code <= _HANGUL_END:
+        return CHOSUNG[(code - _HANGUL_START) // 588]
+    return ch
+
+
+def to_chosung(text):
+    return "".join(chosung_of(ch) for ch in text)
+
+
+def _normalize(text):
+    return "".join(str(text).lower().split())
+
+
+def _suffixes(text, minimum=1):
+    text = text[:MAX_SUFFIX_CHARS]
+    return [text[i:] for i in range(len(text) - minimum + 1)] if len(text) >= minimum else []
+
+
+def _digits(value):
+    return "".join(ch for ch in str(value) if ch.isdigit())
+
+
+def field_tokens(kind, value):
+    """(token, 초성 여부) 목록"""
+    values = value if isinstance(value, (list, tuple)) else [value]
+    tokens = set()
+    for item in values:
+        if item is None or item == "":
+            continue
+        if kind == "text":
+            text = _normalize(item)
+            tokens.update((t, False) for t in _suffixes(text))
+            if any(_HANGUL_START <= ord(ch) <= _HANGUL_END for ch in text):
+                tokens.update((t, True) for t in _suffixes(to_chosung(text)))
+        elif kind == "code":
+            # 전체 코드, 숫자 부분, 앞자리 0을 뗀 숫자 ("KIM0001234" → kim0001234, 0001234, 1234)
+            code = _normalize(item)
+            number = code.lstrip("abcdefghijklmnopqrstuvwxyz-_")
+            tokens.update((t, False) for t in (code, number, number.lstrip("0")) if t)
+        elif kind == "email":
+            email = _normalize(item)
+            tokens.add((email, False))
+            if "@" in email:
+                tokens.add((email.split("@", 1)[1], False))
+        elif kind == "phone":
+            # 전체 번호, 국번 이후 번호, 뒤 4자리 ("010-1234-5678" → 01012345678, 12345678, 5678)
+            digits = _digits(item)
+            if len(digits) >= MIN_PHONE_SUFFIX:
+                tokens.update((t, False) for t in (digits, digits[3:], digits[-MIN_PHONE_SUFFIX:]) if t)
+    return tokens
+
+
+def _get_path(data, path):
+    for part in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
+
+
+def doc_postings(collection, data):
+    """문서 → [(token, field)] (초성 토큰은 field 뒤에 ':cho')"""
+    postings = set()
+    for field, kind in SEARCH_FIELDS[collection].items():
+        for token, cho in field_tokens(kind, _get_path(data, field)):
+            postings.add((token, f"{field}:cho" if cho else field))
+    return sorted(postings)
+
+
+def _label(collection, data):
+    if collection == "patients":
+        return f"{data.get('name', '')} ({data.get('patient_code', '')})"
+    return f"{data.get('name', '')} <{data.get('email', '')}>"
+
+
+def _fingerprint(postings, label):
+    return hashlib.sha256(json.dumps([postings, label], ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+# ---------------------------------------------------------------------------
+# SQLite 저장소
+# ---------------------------------------------------------------------------
+
+
+class SearchIndex:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-262144")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS postings (
+                token TEXT NOT NULL, collection TEXT NOT NULL, doc_id TEXT NOT NULL, field TEXT NOT NULL,
+                PRIMARY KEY (token, collection, doc_id, field)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS docs (
+                collection TEXT NOT NULL, doc_id TEXT NOT NULL, label TEXT, name TEXT, fingerprint TEXT,
+                PRIMARY KEY (collection, doc_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._ensure_doc_index()
+
+    def _ensure_doc_index(self):
+        self.conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (collection, doc_id)")
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    # --- 메타 ---
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # --- 쓰기 ---
+
+    def clear(self, collection):
+        """전체 재생성 준비: 컬렉션 항목 삭제 후 대량 삽입을 위해 보조 인덱스 제거"""
+        self.conn.execute("DROP INDEX IF EXISTS postings_doc")
+        self.conn.execute("DELETE FROM postings WHERE collection = ?", (collection,))
+        self.conn.execute("DELETE FROM docs WHERE collection = ?", (collection,))
+
+    def bulk_insert(self, collection, docs):
+        """
+        (doc_id, data) 스트림 대량 삽입 (clear 이후), 문서 수 반환
+        토큰을 정렬 없는 임시 테이블에 모은 뒤 token 순으로 한 번에 옮긴다
+        (token 키 B-tree 에 무작위 순서로 넣는 것보다 훨씬 빠름)
+        """
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS staging (token, collection, doc_id, field)")
+        count = 0
+        postings_rows = []
+        doc_rows = []
+        for doc_id, data in docs:
+            postings = doc_postings(collection, data)
+            label = _label(collection, data)
+            postings_rows.extend((token, collection, doc_id, field) for token, field in postings)
+            doc_rows.append((collection, doc_id, label, data.get("name"), _fingerprint(postings, label)))
+            count += 1
+            if len(doc_rows) >= COMMIT_EVERY:
+                self._flush(postings_rows, doc_rows)
+        self._flush(postings_rows, doc_rows)
+        self.conn.execute("INSERT OR IGNORE INTO postings SELECT * FROM staging "
+                          "ORDER BY token, collection, doc_id, field")
+        self.conn.execute("DROP TABLE staging")
+        self._ensure_doc_index()
+        self.conn.commit()
+        return count
+
+    def _flush(self, postings_rows, doc_rows):
+        self.conn.executemany("INSERT INTO staging VALUES (?, ?, ?, ?)", postings_rows)
+        self.conn.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?)", doc_rows)
+        postings_rows.clear()
+        doc_rows.clear()
+
+    def upsert(self, collection, doc_id, data):
+        """문서 하나 갱신 (토큰이 같으면 건너뜀), 변경 여부 반환"""
+        postings = doc_postings(collection, data)
+        label = _label(collection, data)
+        fingerprint = _fingerprint(postings, label)
+        row = self.conn.execute("SELECT fingerprint FROM docs WHERE collection = ? AND doc_id = ?",
+                                (collection, doc_id)).fetchone()
+        if row and row[0] == fingerprint:
+            return False
+        self.conn.execute("DELETE FROM postings WHERE collection = ? AND doc_id = ?", (collection, doc_id))
+        self.conn.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?)",
+                              [(token, collection, doc_id, field) for token, field in postings])
+        self.conn.execute("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?)",
+                          (collection, doc_id, label, data.get("name"), fingerprint))
+        return True
+
+    def delete(self, collection, doc_id):
+        self.conn.execute("DELETE FROM postings WHERE collection = ? AND doc_id = ?", (collection, doc_id))
+        self.conn.execute("DELETE FROM docs WHERE collection = ? AND doc_id = ?", (collection, doc_id))
+
+    def doc_ids(self, collection):
+        return {row[0] for row in self.conn.execute("SELECT doc_id FROM docs WHERE collection = ?", (collection,))}
+
+    # --- 검색 ---
+
+    def search(self, query, collection=None, limit=20):
+        """
+        접두사 검색 → [(collection, doc_id, label)]
+        초성이 섞인 질의("김ㅇㅋ")는 초성 토큰으로 후보를 찾고 이름과 글자 단위로 다시 확인
+        """
+        text = _normalize(query)
+        if not text:
+            return []
+        has_cho = any(is_chosung(ch) for ch in text)
+        if has_cho and not is_chosung(text[0]):
+            # "김ㅇㅋ": 앞의 완성 글자("김")로 후보를 찾고 나머지 초성은 이름과 대조
+            token = text[:next(i for i, ch in enumerate(text) if is_chosung(ch))]
+            fields_sql = "field NOT LIKE '%:cho'"
+            mixed = True
+        elif has_cho:
+            token = to_chosung(text)
+            fields_sql = "field LIKE '%:cho'"
+            mixed = token != text
+        else:
+            token = text
+            fields_sql = "field NOT LIKE '%:cho'"
+            mixed = False
+        col_sql = " AND +p.collection = ?" if collection else ""  # postings_doc 인덱스 대신 token 범위 사용
+        col_params = [collection] if collection else []
+
+        def candidates():
+            # 정확히 일치하는 토큰을 먼저, 그다음 접두사 일치
+            # 커서를 필요한 만큼만 읽으므로 범위 전체를 읽지 않는다
+            seen = set()
+            for condition, params in (("p.token = ?", [token]),
+                                      ("p.token >= ? AND p.token < ?", [token, token + "\uffff"])):
+                sql = (f"SELECT DISTINCT p.collection, p.doc_id, d.label, d.name "
+                       f"FROM postings p JOIN docs d USING (collection, doc_id) "
+                       f"WHERE {condition} AND {fields_sql}{col_sql}")
+                for row in self.conn.execute(sql, params + col_params):
+                    if row[:2] not in seen:
+                        seen.add(row[:2])
+                        yield row
+
+        results = []
+        for examined, (col, doc_id, label, name) in enumerate(candidates()):
+            if examined >= MAX_MIXED_CANDIDATES:
+                break
+            if mixed and not _mixed_match(text, _normalize(name or "")):
+                continue
+            results.append((col, doc_id, label))
+            if len(results) >= limit:
+                break
+        return results
+
+
+def _mixed_match(query, name):
+    """질의 글자가 초성이면 이름 글자의 초성과, 음절이면 글자 그대로 비교 (부분 문자열)"""
+    for start in range(len(name) - len(query) + 1):
+        if all((chosung_of(name[start + i]) == ch) if is_chosung(ch) else (name[start + i] == ch)
+               for i, ch in enumerate(query)):
+            return True
+    return False
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+
+def build(args):
+    """Firestore → 인덱스 (최초/--full 은 전체, 이후는 변경분만)"""
+    from firestore_backup import _changed_docs, _list_ids, _scans, run_watermark, warn_field_mode
+    from firestore_common import get_db, iter_collection
+
+    try:
+        db = get_db(args.cred)
+        index = SearchIndex(args.db)
+
+        print("=" * 70)
+        print("🔎 검색 인덱스 갱신")
+        print("=" * 70)
+        warn_field_mode(args.mode)
+
+        for collection in args.collections:
+            key = f"watermark:{collection}"
+            watermark = None if args.full else index.get_meta(key)
+            started = time.perf_counter()
+            overlap = timedelta(minutes=args.overlap_minutes)
+            mark = run_watermark(overlap)
+            scanned = set()
+
+            if watermark is None:
+                index.clear(collection)
+
+                def rows():
+                    for doc in iter_collection(db, collection):
+                        yield doc.id, doc.to_dict() or {}
+
+                count = index.bulk_insert(collection, rows())
+                print(f"   ✅ {collection}: 전체 {count:,}건 색인 ({time.perf_counter() - started:.1f}초)")
+            else:
+                changed = 0
+                seen = 0
+                for doc in _changed_docs(db, collection, datetime.fromisoformat(watermark), args.mode, overlap,
+                                         scanned):
+                    seen += 1
+                    if index.upsert(collection, doc.id, doc.to_dict() or {}):
+                        changed += 1
+                print(f"   ✅ {collection}: 변경 후보 {seen:,}건 중 {changed:,}건 갱신")
+
+            if args.detect_deletes and watermark is not None:
+                # scan 조회는 방금 모든 문서를 읽었으므로 ID 목록을 다시 조회하지 않음
+                current = scanned if _scans(watermark, args.mode) else _list_ids(db, collection)
+                removed = index.doc_ids(collection) - current
+                for doc_id in removed:
+                    index.delete(collection, doc_id)
+                print(f"   🗑️  {collection}: 삭제된 문서 {len(removed):,}건 제거")
+
+            index.set_meta(key, mark.isoformat())
+            index.conn.commit()
+
+        index.close()
+        print("\n" + "=" * 70)
+        print(f"✅ 인덱스 저장: {args.db} ({os.path.getsize(args.db) / 1024 / 1024:,.1f} MB)")
+        print("=" * 70)
+        return True
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def search(args):
+    if not os.path.exists(args.db):
+        print(f"❌ 인덱스 파일이 없습니다: {args.db} (먼저 build 실행)")
+        return False
+    index = SearchIndex(args.db)
+    started = time.perf_counter()
+    results = index.search(args.query, args.collection, args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"🔎 '{args.query}': {len(results)}건 ({elapsed:.1f}ms)")
+    for collection, doc_id, label in results:
+        print(f"   - [{collection}] {label}  (ID: {doc_id})")
+    index.close()
+    return True
+
+
+_SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+_SYLLABLES = "민서지현우준도하윤아은수영호진성예나연유재승혜원태경"
+
+
+def bench(args):
+    """합성 환자 데이터로 색인/검색 시간 측정 (Firestore 없이)"""
+    rng = random.Random(args.random_seed)
+    path = args.db if args.db != DEFAULT_DB else f"bench_{DEFAULT_DB}"
+    if os.path.exists(path):
+        os.remove(path)
+    index = SearchIndex(path)
+
+    def rows():
+        for i in range(args.docs):
+            yield f"p{i:08d}", {
+                "name": rng.choice(_SURNAMES) + rng.choice(_SYLLABLES) + rng.choice(_SYLLABLES),
+                "patient_code": f"{rng.choice(['KIM', 'LEE', 'PARK', 'P'])}{i:07d}",
+                "tags": rng.sample(["ASD", "감각", "부력", "ROM", "균형"], 2),
+                "emergency_contact": {"phone": f"010-{rng.randrange(10000):04d}-{rng.randrange(10000):04d}"},
+            }
+
+    print("=" * 60)
+    print(f"🏁 검색 인덱스 벤치마크 (patients {args.docs:,}건)")
+    print("=" * 60)
+    started = time.perf_counter()
+    index.clear("patients")
+    index.bulk_insert("patients", rows())
+    print(f"   색인: {time.perf_counter() - started:.1f}초, {os.path.getsize(path) / 1024 / 1024:,.0f} MB")
+
+    for query in ["ㄱㅇ", "ㄱㅇㅎ", "김ㅇ", "김아", "민서", "KIM0", "0012345", "5678", "감각"]:
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            results = index.search(query, "patients", 20)
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"   {query:<10} {len(results):3d}건  {min(timings):6.2f}ms")
+    index.close()
+    os.remove(path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return True
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__, state_paths={"--db": DEFAULT_DB}))
+
+    from firestore_backup import add_mode_argument
+
+    parser = argparse.ArgumentParser(description="patients / users 검색 인덱스")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = sub.add_parser("build", help="인덱스 생성 / 변경분 반영")
+    build_parser.add_argument("--collections", nargs="+", default=list(SEARCH_FIELDS), choices=list(SEARCH_FIELDS))
+    build_parser.add_argument("--full", action="store_true", help="전체 재생성")
+    build_parser.add_argument("--detect-deletes", action="store_true", help="삭제된 문서 제거 (ID 목록 조회)")
+    add_mode_argument(build_parser)
+    build_parser.add_argument("--overlap-minutes", type=int, default=10, help="updated_at 조회 여유 시간")
+    build_parser.add_argument("--cred", help="Admin SDK JSON")
+
+    search_parser = sub.add_parser("search", help="검색")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--collection", choices=list(SEARCH_FIELDS))
+    search_parser.add_argument("--limit", type=int, default=20)
+
+    bench_parser = sub.add_parser("bench", help="합성 데이터 벤치마크")
+    bench_parser.add_argument("--docs", type=int, default=1000000)
+    bench_parser.add_argument("--random-seed", type=int, default=42)
+
+    for p in (build_parser, search_parser, bench_parser):
+        p.add_argument("--db", default=DEFAULT_DB, help="SQLite 인덱스 파일")
+
+    args = parser.parse_args()
+    handlers = {"build": build, "search": search, "bench": bench}
+    success = handlers[args.command](args)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,32 @@
+"""
+scripts/ 테스트 공용 픽스처
+
+스크립트는 scripts/ 를 작업 디렉토리로 두고 서로를 최상위 모듈로 import 하므로 경로에 추가한다.
+Firestore 는 firestore_fake 의 인메모리 클라이언트로 대체한다 (firebase_admin 불필요).
+"""
+
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import firestore_fake  # noqa: E402
+
+FIREBASE_MODULES = ("firebase_admin", "firebase_admin.credentials", "firebase_admin.firestore")
+
+
+@pytest.fixture
+def firebase_modules(monkeypatch):
+    """테스트 안에서 firestore_fake.install() 로 바꾼 firebase_admin 모듈을 테스트가 끝나면 복원"""
+    for name in FIREBASE_MODULES:
+        monkeypatch.setitem(sys.modules, name, None)
+
+
+@pytest.fixture
+def fake(firebase_modules):
+    """가짜 firebase_admin 모듈을 설치한 FakeFirestore"""
+    return firestore_fake.install(firestore_fake.FakeFirestore())
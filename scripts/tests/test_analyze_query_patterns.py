@@ -0,0 +1,74 @@
+import textwrap
+
+from analyze_query_patterns import (
+    DEFAULT_MODELS_DIR,
+    DEFAULT_OUTPUT,
+    DEFAULT_SERVICES_DIR,
+    analyze_query_patterns,
+    build_indexes,
+    parse_services,
+)
+
+SERVICE = """
+class AppointmentService {
+  static const String _appointments = 'appointments';
+
+  Future<List<Appointment>> getPatientAppointments(String patientId) async {
+    final snapshot = await _firestore
+        .collection(_appointments)
+        .where('patient_id', isEqualTo: patientId)
+        .orderBy('appointment_date', descending: true)
+        .get();
+    return snapshot.docs.map((d) => Appointment.fromFirestore(d.data(), d.id)).toList();
+  }
+
+  Future<List<Appointment>> getUpcoming(String therapistId, String? status, DateTime day) async {
+    Query query = _firestore
+        .collection('appointments')
+        .where('therapist_id', isEqualTo: therapistId);
+    if (status != null) {
+      query = query.where('status', isEqualTo: status);
+    }
+    final snapshot = await query.get();
+    final startOfDay = DateTime(day.year, day.month, day.day);
+    final endOfDay = startOfDay.add(const Duration(days: 1));
+    final list = snapshot.docs.map((d) => Appointment.fromFirestore(d.data(), d.id)).toList();
+    return list
+        .where((a) => a.appointmentDate.isAfter(startOfDay) && a.appointmentDate.isBefore(endOfDay))
+        .toList()
+      ..sort((a, b) => a.appointmentDate.compareTo(b.appointmentDate));
+  }
+
+  Future<void> cancel(String id) async {
+    await _firestore.collection('appointments').doc(id).update({'status': 'CANCELLED'});
+  }
+}
+"""
+
+
+def test_parses_server_chain_conditionals_and_client_post_processing(tmp_path):
+    (tmp_path / "appointment_service.dart").write_text(textwrap.dedent(SERVICE), encoding="utf-8")
+    patterns = {p.function: p for p in parse_services(str(tmp_path), {"appointmentDate": "appointment_date"})}
+    assert sorted(patterns) == ["getPatientAppointments", "getUpcoming"]
+
+    history = patterns["getPatientAppointments"]
+    assert history.filters == [("patient_id", "==", False)]
+    assert history.orders == [("appointment_date", True)]
+    assert history.index_fields() == [{"fieldPath": "patient_id", "order": "ASCENDING"},
+                                      {"fieldPath": "appointment_date", "order": "DESCENDING"}]
+
+    upcoming = patterns["getUpcoming"]
+    assert upcoming.filters == [("therapist_id", "==", False), ("status", "==", True)]
+    assert upcoming.client_filters == [("appointment_date", "range")]
+    assert upcoming.client_sort == ("appointment_date", False)
+    assert upcoming.range_hint == "day"
+
+    # 조건부 필터가 있는 쿼리는 필터가 빠진 변형의 인덱스도 만든다
+    indexes = [[f["fieldPath"] for f in index["fields"]] for index in build_indexes(patterns.values())["indexes"]]
+    assert sorted(indexes) == [["patient_id", "appointment_date"],
+                               ["therapist_id", "appointment_date"],
+                               ["therapist_id", "status", "appointment_date"]]
+
+
+def test_committed_index_file_matches_services():
+    assert analyze_query_patterns(DEFAULT_SERVICES_DIR, DEFAULT_MODELS_DIR, DEFAULT_OUTPUT, None, 2.0, 30.0, True)
@@ -0,0 +1,72 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import archive_cold_records
+from archive_cold_records import archive_cold_records as run_archive
+
+MARCH = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def seed(fake, count=1200):
+    fake.load({"attendances": {
+        f"a{i:04d}": {"patient_id": f"p{i % 3}", "schedule_date": MARCH + timedelta(days=i % 20),
+                      "status": "PRESENT"} for i in range(count)}})
+
+
+def rollup(fake, patient_id):
+    return fake.collection("monthly_rollups").document(f"attendances_{patient_id}_2024-03").get().to_dict()
+
+
+def test_archives_rolls_up_and_deletes(fake, tmp_path):
+    seed(fake)
+    assert run_archive(["attendances"], str(tmp_path), 365, 120, True)
+    assert fake.collection("attendances").get() == []
+    assert sum(rollup(fake, f"p{k}")["count"] for k in range(3)) == 1200
+
+
+def test_document_changed_after_archiving_is_kept_and_archived_again(fake, tmp_path, monkeypatch):
+    seed(fake)
+    compute = archive_cold_records.compute_rollups
+    calls = []
+
+    def edit_before_delete(*args, **kwargs):
+        # 첫 샤드를 쓴 뒤, 원본을 지우기 전에 앱이 문서를 고친 경우
+        if not calls:
+            fake.collection("attendances").document("a0000").update({"status": "CANCELLED"})
+        calls.append(1)
+        return compute(*args, **kwargs)
+
+    monkeypatch.setattr(archive_cold_records, "compute_rollups", edit_before_delete)
+    assert run_archive(["attendances"], str(tmp_path), 365, 120, True)
+
+    assert fake.collection("attendances").get() == []
+    with open(os.path.join(tmp_path, "archive_state.json"), encoding="utf-8") as f:
+        shards = json.load(f)["shards"]
+    assert [entry["stale"] for entry in shards.values()] == [["a0000"], []]
+    # 이전 샤드의 사본은 빼고 다시 보관한 내용으로 한 번만 센다
+    p0 = rollup(fake, "p0")
+    assert p0["count"] == 400
+    assert p0["statuses"] == {"PRESENT": 399, "CANCELLED": 1}
+    assert len(p0["archive_shards"]) == 2
+
+
+def test_interrupted_delete_resumes_from_checkpoint(fake, tmp_path, monkeypatch):
+    seed(fake)
+    delete_chunk = archive_cold_records._delete_chunk
+    calls = []
+
+    def fail_second_chunk(*args):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("중단")
+        return delete_chunk(*args)
+
+    monkeypatch.setattr(archive_cold_records, "_delete_chunk", fail_second_chunk)
+    assert not run_archive(["attendances"], str(tmp_path), 365, 120, True)
+    assert len(fake.collection("attendances").get()) == 700
+
+    monkeypatch.setattr(archive_cold_records, "_delete_chunk", delete_chunk)
+    assert run_archive(["attendances"], str(tmp_path), 365, 120, True)
+    assert fake.collection("attendances").get() == []
+    assert sum(rollup(fake, f"p{k}")["count"] for k in range(3)) == 1200
@@ -0,0 +1,79 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from assessment_norms import PERCENTILE_COLLECTION, Columns, assessment_norms, cohort_stats  # noqa: E402
+
+BASE = datetime(2025, 6, 1, tzinfo=timezone.utc)
+ITEMS = ("balance", "coordination", "strength", "flexibility")
+
+
+def seed(fake, patients=60):
+    rng = random.Random(7)
+    fake.load({
+        "patients": {f"p{p:03d}": {"name": f"환자{p}", "organization_id": f"org_{p % 2}",
+                                   "birth_date": BASE - timedelta(days=365 * (4 + p % 10)),
+                                   "diagnosis": ["발달지연" if p % 3 else "뇌성마비"]}
+                     for p in range(patients)},
+        "assessments": {f"a{p:03d}": {"patient_id": f"p{p:03d}", "assessment_date": BASE,
+                                      "scores": {item: rng.randrange(1, 6) for item in ITEMS}}
+                        for p in range(patients)},
+    })
+
+
+def percentile_writes(fake):
+    return fake.collection_stats.get(PERCENTILE_COLLECTION, {}).get("writes", 0)
+
+
+def test_cohort_stats_mid_rank_percentiles_and_quantiles():
+    group = np.array([0, 0, 0, 0, 1, 1])
+    score = np.array([1.0, 2.0, 2.0, 3.0, 5.0, 5.0])
+    pct, z, table = cohort_stats(group, score, min_cohort=3)
+    assert pct[:4].tolist() == [12.5, 50.0, 50.0, 87.5]
+    assert np.isnan(pct[4:]).all()          # 코호트가 min_cohort 보다 작음
+    assert table["n"].tolist() == [4, 2]
+    assert table["quantiles"][0].tolist() == pytest.approx([1.3, 1.75, 2.0, 2.25, 2.7])
+    assert z[0] == pytest.approx(-1 / np.sqrt(0.5))
+
+
+def test_merge_keeps_latest_row_per_patient_item():
+    columns = Columns()
+    t = BASE.timestamp()
+    columns.merge([("p1", "balance", 2.0, t, "a1"), ("p1", "strength", 3.0, t, "a1")])
+    columns.merge([("p1", "balance", 4.0, t + 10, "a2"), ("p1", "balance", 1.0, t - 10, "a0")])
+    assert list(zip(columns.item.tolist(), columns.score.tolist(), columns.assessment.tolist())) == \
+        [("balance", 4.0, "a2"), ("strength", 3.0, "a1")]
+
+
+def test_incremental_run_rewrites_only_patients_with_own_changes(fake, tmp_path):
+    seed(fake)
+    cache = str(tmp_path / "norms.npz")
+    # 아래 쓰기는 updated_at 을 갱신하지 않으므로 scan 으로 변경분을 찾는다
+    assert assessment_norms(cache, False, 10, 5.0, apply=True, mode="scan")
+    assert percentile_writes(fake) == 60
+
+    # watermark overlap 때문에 다시 읽히는 같은 평가는 변경이 아니다
+    fake.reset_stats()
+    assert assessment_norms(cache, False, 10, 5.0, apply=True, mode="scan")
+    assert percentile_writes(fake) == 0
+
+    now = datetime.now(timezone.utc)
+    fake.collection("assessments").document("new").set(
+        {"patient_id": "p005", "assessment_date": now, "scores": {item: 5 for item in ITEMS}})
+    fake.collection("patients").document("p007").update({"diagnosis": ["다운증후군"]})
+    fake.reset_stats()
+    assert assessment_norms(cache, False, 10, 5.0, apply=True, mode="scan")
+    assert percentile_writes(fake) == 2
+    rewritten = fake.collection(PERCENTILE_COLLECTION).document("p005").get().to_dict()
+    assert rewritten["items"]["balance"]["assessment_id"] == "new"
+    assert fake.collection(PERCENTILE_COLLECTION).document("p007").get().to_dict()["diagnosis"] == "다운증후군"
+
+    # 기준을 낮추면 코호트 변화만으로 움직인 환자도 다시 기록한다
+    fake.collection("assessments").document("new2").set(
+        {"patient_id": "p010", "assessment_date": now, "scores": {item: 1 for item in ITEMS}})
+    fake.reset_stats()
+    assert assessment_norms(cache, False, 10, 0.5, apply=True, mode="scan")
+    assert percentile_writes(fake) > 1
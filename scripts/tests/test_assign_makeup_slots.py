@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+from assign_makeup_slots import MinCostFlow, assign, parse_time_slot, solve_therapist
+
+DAY = date(2026, 3, 2)     # 월요일
+
+
+def ticket(ticket_id, patient_id, expiry_days=13, therapist_id="t1", original=None):
+    return {"id": ticket_id, "patient_id": patient_id, "therapist_id": therapist_id,
+            "expiry": DAY + timedelta(days=expiry_days), "original_time_slot": original}
+
+
+def slot(days, hhmm):
+    start = parse_time_slot(hhmm)
+    return (DAY + timedelta(days=days),) + start
+
+
+def test_parse_time_slot():
+    assert parse_time_slot("09:00-10:30") == (540, 630)
+    assert parse_time_slot("09:00") is None
+    assert parse_time_slot(None) is None
+
+
+def test_min_cost_flow_maximizes_flow_before_cost():
+    # 0 → 1 → 3 (비용 1), 0 → 2 → 3 (비용 5), 1 → 2 교차 간선: 최대 유량 2, 최소 비용 6
+    mcf = MinCostFlow(4)
+    mcf.add_edge(0, 1, 1, 0)
+    mcf.add_edge(0, 2, 1, 0)
+    mcf.add_edge(1, 3, 1, 1)
+    mcf.add_edge(2, 3, 1, 5)
+    mcf.add_edge(1, 2, 1, 0)
+    assert mcf.flow(0, 3) == (2, 6)
+
+
+def test_solver_gives_contested_slot_to_ticket_that_expires_first():
+    # 이른 시간대를 먼저 잡는 탐욕 배정이면 b 가 배정받지 못한다
+    tickets = [ticket("a", "p1"), ticket("b", "p2", expiry_days=0)]
+    slots = [slot(0, "09:00-10:00"), slot(1, "09:00-10:00")]
+    assert solve_therapist(tickets, slots, {}, set(), DAY) == {"b": slots[0], "a": slots[1]}
+
+
+def test_solver_prefers_earlier_day_then_original_time():
+    slots = [slot(0, "09:00-10:00"), slot(0, "14:00-15:00"), slot(1, "14:00-15:00")]
+    result = solve_therapist([ticket("a", "p1", original="14:00-15:00")], slots, {}, set(), DAY)
+    assert result == {"a": slots[1]}
+
+
+def test_solver_skips_patient_busy_banned_and_expired_slots():
+    slots = [slot(0, "09:00-10:00"), slot(0, "10:00-11:00"), slot(1, "09:00-10:00"), slot(5, "09:00-10:00")]
+    busy = {"p1": {DAY: [(540, 600)]}}
+    banned = {("a", slots[1][0], slots[1][1])}
+    tickets = [ticket("a", "p1", expiry_days=1)]
+    assert solve_therapist(tickets, slots, busy, banned, DAY) == {"a": slots[2]}
+    assert solve_therapist(tickets, slots[3:], busy, banned, DAY) == {}
+
+
+def test_assign_resolves_patient_conflict_across_therapists():
+    # 같은 환자의 보강권 두 장이 서로 다른 치료사에게 같은 시각으로 배정되면 뒤쪽을 다시 푼다
+    tickets = [ticket("a", "p1", therapist_id="t1"), ticket("b", "p1", therapist_id="t2")]
+    free = {"t1": [slot(0, "09:00-10:00")], "t2": [slot(0, "09:00-10:00"), slot(0, "10:00-11:00")]}
+    assignments, rounds = assign(tickets, free, {}, DAY)
+    assert assignments == {"a": ("t1", DAY, 540, 600), "b": ("t2", DAY, 600, 660)}
+    assert rounds == 2
@@ -0,0 +1,79 @@
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from attendance_consistency import check, iter_issues, merge_patients
+from firestore_rate import AdaptiveLimiter
+
+DAY1 = datetime(2026, 3, 2, 1, 0, tzinfo=timezone.utc)     # KST 10:00
+DAY2 = DAY1 + timedelta(days=1)
+
+
+def seed(fake, with_unrepairable=True):
+    appointments = {
+        "a1": {"patient_id": "p1", "appointment_date": DAY1, "time_slot": "10:00-11:00",
+               "status": "COMPLETED", "attended": False, "session_recorded": False},
+        # 확정 전 보강 초안은 짝짓기에서 빠진다
+        "d1": {"patient_id": "p1", "appointment_date": DAY2, "time_slot": "10:00-11:00",
+               "status": "DRAFT", "is_draft": True, "attended": True},
+    }
+    attendances = {
+        # patientId 철자로 저장된 출석도 같은 환자로 합쳐진다
+        "at1": {"patientId": "p1", "schedule_date": DAY1, "time_slot": "10:00-11:00", "status": "PRESENT"},
+        "x1": {"patient_id": None, "schedule_date": DAY1, "status": "PRESENT"},
+    }
+    reports = {"r1": {"patient_id": "p1", "session_date": DAY1}}
+    sessions = {}
+    if with_unrepairable:
+        appointments["a2"] = {"patient_id": "p2", "appointment_date": DAY1, "status": "COMPLETED",
+                              "attended": True, "session_recorded": True, "session_id": "s2"}
+        sessions["s2"] = {"patient_id": "p2", "session_date": DAY1}
+        attendances["at2"] = {"patient_id": "p2", "schedule_date": DAY2, "status": "PRESENT"}
+    fake.load({"appointments": appointments, "attendances": attendances,
+               "session_reports": reports, "sessions": sessions})
+
+
+def check_args(**overrides):
+    args = argparse.Namespace(out=None, limit=5, page_size=2, repair=False, ramp=False, apply=False)
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+def test_merge_patients_aligns_sorted_streams():
+    a = iter([("p1", ["a"]), ("p3", ["c"])])
+    b = iter([("p2", ["b"]), ("p3", ["d"])])
+    assert list(merge_patients(a, b)) == [("p1", [["a"], []]), ("p2", [[], ["b"]]), ("p3", [["c"], ["d"]])]
+
+
+def test_iter_issues_joins_appointments_attendances_and_both_report_collections(fake):
+    seed(fake)
+    stats = Counter()
+    issues = {(kind, patient, apt, other) for kind, patient, _, apt, other, _ in iter_issues(fake, 2, stats)}
+    assert issues == {
+        ("stale_attended", "p1", "a1", "at1"),
+        ("stale_session_recorded", "p1", "a1", "r1"),
+        ("completed_no_attendance", "p2", "a2", None),
+        ("orphan_attendance", "p2", None, "at2"),
+    }
+    assert stats["patients"] == 2
+    assert stats["attendances_invalid"] == 1
+
+
+def test_check_repairs_flags_and_fails_while_issues_remain(fake):
+    seed(fake)
+    limiter = AdaptiveLimiter(ramp=False)
+    assert check(check_args(repair=True, apply=True), limiter) is False
+
+    a1 = fake.collection("appointments").document("a1").get().to_dict()
+    assert a1["attended"] is True and a1["session_recorded"] is True and a1["session_id"] == "r1"
+    # 고칠 수 없는 문제 (출석 없는 완료 예약, 예약 없는 출석) 는 남아 있다
+    assert check(check_args(), limiter) is False
+
+
+def test_check_succeeds_once_everything_is_repaired(fake):
+    seed(fake, with_unrepairable=False)
+    limiter = AdaptiveLimiter(ramp=False)
+    assert check(check_args(), limiter) is False
+    assert check(check_args(repair=True, apply=True), limiter) is True
+    assert check(check_args(), limiter) is True
@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+
+from content_import import (
+    COLLECTION,
+    _mp4_bytes,
+    _pdf_bytes,
+    _probe,
+    content_id,
+    import_library,
+    infer_meta,
+    normalize_difficulty,
+)
+from firestore_rate import AdaptiveLimiter
+
+BALANCE = "PT/균형/standing_balance_lv2"
+COPY = "수중/copy/standing_balance_lv2"
+GRIP = "OT/hand_grip"
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def library(root):
+    lib = os.path.join(root, "library")
+    video, guide = _mp4_bytes(125, b"\x01" * 4096), _pdf_bytes(3, b"payload")
+    write(os.path.join(lib, "PT", "균형", "_meta.json"), json.dumps({"tags": ["균형"], "equipment": ["매트"]}))
+    for key in (BALANCE, COPY):
+        write(os.path.join(lib, key + ".mp4"), video)
+        write(os.path.join(lib, key + ".pdf"), guide)
+    write(os.path.join(lib, BALANCE + ".json"),
+          json.dumps({"title": "한 발 서기", "contraindications": "급성 통증, 어지럼"}, ensure_ascii=False))
+    write(os.path.join(lib, COPY + ".json"), json.dumps({"tags": ["수중 균형"]}, ensure_ascii=False))
+    write(os.path.join(lib, GRIP + ".png"), b"\x89PNG grip")
+    return lib
+
+
+def import_args(root, lib, **overrides):
+    args = argparse.Namespace(root=lib, manifest=None, org="org_a", media_base="gs://bucket/contents",
+                              cache=os.path.join(root, "cache.json"), workers=1, rehash=False,
+                              duplicates="merge", prune=False, upload_list=None, ramp=False, apply=True)
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+def test_probe_and_path_metadata():
+    assert _probe(_mp4_bytes(125.4, b"x" * 100), ".mp4") == {"duration_seconds": 125.4}
+    assert _probe(_pdf_bytes(4, b""), ".pdf") == {"pages": 4}
+    assert _probe(b"not an mp4", ".mp4") == {}
+
+    assert normalize_difficulty(3) == "LEVEL_3"
+    assert normalize_difficulty("level_5") == "LEVEL_5"
+    assert normalize_difficulty("난이도2") == "LEVEL_2"
+    assert normalize_difficulty("LEVEL_9") is None
+    assert infer_meta("수중/하체/squat_lv4") == {"type": "AQUATIC", "category": ["하체"],
+                                              "difficulty_level": "LEVEL_4", "title": "squat"}
+
+
+def test_import_merges_duplicates_and_only_rewrites_changed_docs(fake, tmp_path):
+    root = str(tmp_path)
+    lib = library(root)
+    upload_list = os.path.join(root, "upload.tsv")
+    assert import_library(import_args(root, lib, upload_list=upload_list), AdaptiveLimiter(ramp=False))
+
+    docs = {d.id: d.to_dict() for d in fake.collection(COLLECTION).stream()}
+    assert set(docs) == {content_id("org_a", BALANCE), content_id("org_a", GRIP)}
+    balance = docs[content_id("org_a", BALANCE)]
+    assert (balance["title"], balance["type"], balance["difficulty_level"]) == ("한 발 서기", "PT", "LEVEL_2")
+    # 같은 파일 구성의 두 항목은 목록 필드를 합쳐 하나로 (type 등 나머지는 첫 항목 값)
+    assert balance["category"] == ["균형", "copy"]
+    assert balance["tags"] == ["균형", "수중 균형"]
+    assert balance["source_paths"] == [BALANCE, COPY]
+    assert balance["contraindications"] == ["급성 통증", "어지럼"]
+    assert [(m["type"], m.get("duration_seconds"), m.get("pages")) for m in balance["media"]] == [
+        ("VIDEO", 125.0, None), ("PDF", None, 3)]
+    assert balance["duration_minutes"] == 3
+    assert balance["rating"] == 0.0
+    with open(upload_list, encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 3
+
+    # 변경이 없으면 쓰지 않는다
+    writes = fake.stats["writes"]
+    assert import_library(import_args(root, lib), AdaptiveLimiter(ramp=False))
+    assert fake.stats["writes"] == writes
+
+    # 메타데이터를 고치면 같은 문서를 갱신하고 앱에서 매긴 평점은 유지
+    fake.document(f"{COLLECTION}/{content_id('org_a', BALANCE)}").update({"rating": 4.5})
+    write(os.path.join(lib, BALANCE + ".json"), json.dumps({"title": "한 발 서기 (개정)"}, ensure_ascii=False))
+    assert import_library(import_args(root, lib), AdaptiveLimiter(ramp=False))
+    balance = fake.document(f"{COLLECTION}/{content_id('org_a', BALANCE)}").get().to_dict()
+    assert (balance["title"], balance["rating"]) == ("한 발 서기 (개정)", 4.5)
+    assert fake.stats["writes"] == writes + 2
+
+
+def test_prune_removes_entries_missing_from_library(fake, tmp_path):
+    root = str(tmp_path)
+    lib = library(root)
+    assert import_library(import_args(root, lib), AdaptiveLimiter(ramp=False))
+    os.remove(os.path.join(lib, GRIP + ".png"))
+    assert import_library(import_args(root, lib, prune=True), AdaptiveLimiter(ramp=False))
+    assert [d.id for d in fake.collection(COLLECTION).stream()] == [content_id("org_a", BALANCE)]
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from dedupe_documents import DEFAULT_IGNORE_FIELDS, find_duplicates, remove_duplicates
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def seed(fake):
+    col = fake.collection("goals")
+    # 같은 내용을 시드 스크립트가 세 번 .add() — 생성 순서와 ID 순서가 다르다
+    for n, doc_id in enumerate(("z1", "a1", "m1")):
+        col.document(doc_id).set({"title": "균형 잡기", "patient_id": "p1", "created_at": BASE + timedelta(n)})
+    for n, doc_id in enumerate(("k2", "b2")):
+        col.document(doc_id).set({"title": "걷기", "patient_id": "p1", "created_at": BASE + timedelta(n)})
+    col.document("c3").set({"title": "걷기", "patient_id": "p2"})
+
+
+def read_pairs(path):
+    with open(path, encoding="utf-8") as f:
+        return sorted(tuple(line.rstrip("\n").split("\t")) for line in f)
+
+
+@pytest.mark.parametrize("partitions", [1, 4])
+def test_find_duplicates_keeps_earliest_created(fake, tmp_path, partitions):
+    seed(fake)
+    path, total, duplicates = find_duplicates(fake, "goals", DEFAULT_IGNORE_FIELDS, partitions, str(tmp_path))
+    assert (total, duplicates) == (6, 3)
+    assert read_pairs(path) == [("a1", "z1"), ("b2", "k2"), ("m1", "z1")]
+
+
+def test_remove_duplicates_archives_before_deleting(fake, tmp_path):
+    seed(fake)
+    path, _, _ = find_duplicates(fake, "goals", DEFAULT_IGNORE_FIELDS, 1, str(tmp_path))
+    assert remove_duplicates(fake, "goals", read_pairs(path), archive=True) == 3
+    assert sorted(doc.id for doc in fake.collection("goals").stream()) == ["c3", "k2", "z1"]
+    archived = fake.collection("goals_duplicates").document("m1").get().to_dict()
+    assert archived["duplicate_of"] == "z1" and archived["data"]["title"] == "균형 잡기"
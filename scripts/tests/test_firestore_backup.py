@@ -0,0 +1,106 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import firestore_backup
+from firestore_backup import delta_backup, full_backup, merged_lines
+
+NO_OVERLAP = timedelta(0)
+run_watermark = firestore_backup.run_watermark
+
+
+@pytest.fixture(autouse=True)
+def no_default_overlap(monkeypatch):
+    """full_backup 의 기본 overlap (10분) 을 없애 방금 적재한 문서가 다음 delta 에 다시 나오지 않게 함"""
+    monkeypatch.setattr(firestore_backup, "run_watermark", lambda overlap=NO_OVERLAP: run_watermark(overlap))
+
+
+def delta_ids(root, name, collection="patients"):
+    path = os.path.join(root, name, f"{collection}.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def seed(fake):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    fake.load({"patients": {f"p{i}": {"name": f"환자{i}", "updated_at": base} for i in range(10)}})
+
+
+def test_write_committed_during_scan_is_picked_up_by_next_delta(fake, tmp_path, monkeypatch):
+    seed(fake)
+    root = str(tmp_path)
+    full_backup(fake, root, ["patients"], 1000)
+    state = firestore_backup.load_state(root)
+    col = fake.collection("patients")
+
+    # 스캔 도중: 이미 지나간 p0 을 고친 뒤 아직 안 읽은 p9 를 고친다 (p9 의 update_time 이 더 늦음)
+    scan = firestore_backup.iter_collection
+
+    def racing_scan(db, collection, **kwargs):
+        for index, doc in enumerate(scan(db, collection, page_size=1)):
+            yield doc
+            if index == 0:
+                col.document("p0").update({"name": "스캔 중 수정"})
+                col.document("p9").update({"name": "스캔 중 수정"})
+
+    monkeypatch.setattr(firestore_backup, "iter_collection", racing_scan)
+    first = delta_backup(fake, root, state, ["patients"], "scan", NO_OVERLAP, False)
+    assert delta_ids(root, first) == ["p9"]
+
+    # 본 문서의 최대 update_time (p9) 을 watermark 로 쓰면 p0 을 영영 놓친다
+    monkeypatch.setattr(firestore_backup, "iter_collection", scan)
+    second = delta_backup(fake, root, state, ["patients"], "scan", NO_OVERLAP, False)
+    assert delta_ids(root, second) == ["p0", "p9"]
+    third = delta_backup(fake, root, state, ["patients"], "scan", NO_OVERLAP, False)
+    assert delta_ids(root, third) == []
+
+    merged = {doc_id: json.loads(line)["data"]["name"] for doc_id, line in merged_lines(root, state, "patients")}
+    assert merged["p0"] == merged["p9"] == "스캔 중 수정"
+    assert len(merged) == 10
+
+
+def test_field_mode_misses_writes_without_updated_at(fake, tmp_path):
+    seed(fake)
+    root = str(tmp_path)
+    full_backup(fake, root, ["patients"], 1000)
+    state = firestore_backup.load_state(root)
+    col = fake.collection("patients")
+    col.document("p1").update({"organization_id": "org_1"})
+    col.document("p2").update({"name": "수정", "updated_at": datetime.now(timezone.utc)})
+
+    scan_state = json.loads(json.dumps(state))
+    field = delta_backup(fake, root, state, ["patients"], "field", NO_OVERLAP, False)
+    scan = delta_backup(fake, root, scan_state, ["patients"], "scan", NO_OVERLAP, False)
+    assert delta_ids(root, field) == ["p2"]
+    assert delta_ids(root, scan) == ["p1", "p2"]
+
+
+def test_detect_deletes(fake, tmp_path):
+    seed(fake)
+    root = str(tmp_path)
+    full_backup(fake, root, ["patients"], 1000)
+    state = firestore_backup.load_state(root)
+    fake.collection("patients").document("p3").delete()
+    name = delta_backup(fake, root, state, ["patients"], "scan", NO_OVERLAP, True)
+    delta_backup(fake, root, state, ["patients"], "scan", NO_OVERLAP, True)
+    with open(os.path.join(root, name, "patients.deleted.txt"), encoding="utf-8") as f:
+        assert f.read().split() == ["p3"]
+    assert "p3" not in dict(merged_lines(root, state, "patients"))
+
+    # scan 은 변경분 조회에서 읽은 ID 로 삭제를 감지하고, field 만 ID 목록을 따로 조회한다
+    fake.collection("patients").document("p4").delete()
+    fake.reset_stats()
+    name = delta_backup(fake, root, state, ["patients"], "scan", NO_OVERLAP, True)
+    assert fake.stats["reads"] == 8
+    fake.collection("patients").document("p5").delete()
+    fake.reset_stats()
+    field = delta_backup(fake, root, state, ["patients"], "field", NO_OVERLAP, True)
+    # 빈 updated_at / created_at 조회 각 1건 + ID 목록 7건
+    assert fake.stats["reads"] == 2 + 7
+    for delta, deleted in ((name, "p4"), (field, "p5")):
+        with open(os.path.join(root, delta, "patients.deleted.txt"), encoding="utf-8") as f:
+            assert f.read().split() == [deleted]
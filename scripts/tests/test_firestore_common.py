@@ -0,0 +1,48 @@
+import json
+from datetime import datetime, timezone
+
+from firestore_common import DocumentPath, GeoPoint, decode_value, doc_hash, encode_value, iter_collection
+from firestore_snapshot import decode_doc_line, encode_doc_line
+
+
+def test_round_trip_preserves_types_and_hash(fake):
+    fake.collection("patients").document("p1").set({"name": "환자"})
+    data = {
+        "when": datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc),
+        "blob": b"\x00\xff",
+        "patient": fake.collection("patients").document("p1"),
+        "where": GeoPoint(37.5, 127.0),
+        "nested": {"list": [1, "a", None, {"at": datetime(2026, 1, 1, tzinfo=timezone.utc)}]},
+    }
+    encoded = json.loads(json.dumps(encode_value(data)))
+    assert encoded["patient"] == {"$ref": "patients/p1"}
+    assert encoded["where"] == {"$geo": [37.5, 127.0]}
+
+    # db 없이 복원 (스냅샷 쪽) 해도 실제 문서와 해시가 같다
+    offline = decode_value(encoded)
+    assert isinstance(offline["patient"], DocumentPath) and offline["patient"].id == "p1"
+    assert doc_hash(offline) == doc_hash(data)
+
+    online = decode_value(encoded, fake)
+    assert online["patient"].get().to_dict() == {"name": "환자"}
+    assert online["blob"] == b"\x00\xff" and online["when"] == data["when"]
+
+
+def test_doc_hash_ignores_key_order_and_ignored_fields():
+    assert doc_hash({"a": 1, "b": [1, 2]}) == doc_hash({"b": [1, 2], "a": 1})
+    assert doc_hash({"a": 1, "updated_at": 1}, ("updated_at",)) == doc_hash({"a": 1, "updated_at": 2}, ("updated_at",))
+    assert doc_hash({"a": [1, 2]}) != doc_hash({"a": [2, 1]})
+
+
+def test_doc_line_round_trip():
+    when = datetime(2026, 5, 1, tzinfo=timezone.utc)
+    line = encode_doc_line("d1", {"at": when, "ref": DocumentPath("users/u1")}, when)
+    doc_id, data, update_time = decode_doc_line(line)
+    assert (doc_id, data["at"], data["ref"], update_time) == ("d1", when, "users/u1", when)
+
+
+def test_iter_collection_pages_in_id_order(fake):
+    fake.load({"users": {f"u{i:03d}": {"n": i} for i in range(25)}})
+    assert [doc.id for doc in iter_collection(fake, "users", page_size=10)] == [f"u{i:03d}" for i in range(25)]
+    assert [doc.id for doc in iter_collection(fake, "users", page_size=10, start_after_id="u019")] == \
+        [f"u{i:03d}" for i in range(20, 25)]
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+
+from firestore_diff import FirestoreSource, SnapshotFileSource, TreeCache, build_tree, diff_collection
+from firestore_snapshot import write_collection
+
+
+def seed(fake):
+    fake.collection("patients").document("p000").set({"name": "참조 대상"})
+    fake.load({"appointments": {
+        f"a{i:03d}": {"patient": fake.collection("patients").document("p000"), "slot": i,
+                      "at": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+        for i in range(100)}})
+
+
+def test_build_tree_localizes_changes_to_buckets():
+    rows = [(f"d{i:03d}", {"v": i}, None) for i in range(40)]
+    tree = build_tree(iter(rows), bucket_size=8)
+    assert tree.boundaries == ["", "d008", "d016", "d024", "d032"]
+    assert tree.count == 40
+
+    changed = [(doc_id, {"v": -1} if doc_id == "d017" else data, None) for doc_id, data, _ in rows]
+    other = build_tree(iter(changed), tree.boundaries)
+    assert tree.mismatched_leaves(other) == [2]
+    assert tree.mismatched_leaves(build_tree(iter(rows), tree.boundaries)) == []
+
+
+def test_diff_snapshot_against_live_reads_only_changed_buckets(fake, tmp_path):
+    seed(fake)
+    snapshot_dir = tmp_path / "snap"
+    snapshot_dir.mkdir()
+    write_collection(fake, "appointments", str(snapshot_dir))
+
+    col = fake.collection("appointments")
+    col.document("a010").update({"slot": -1})
+    col.document("a050").delete()
+    col.document("a999").set({"slot": 999})
+
+    cache = TreeCache(str(tmp_path / "cache"), ())
+    snapshot = SnapshotFileSource(str(snapshot_dir))
+    live = FirestoreSource()
+    result = diff_collection("appointments", snapshot, live, cache, "", 16)
+    assert result["only_a"] == ["a050"]
+    assert result["only_b"] == ["a999"]
+    # 참조 / 시각 필드는 스냅샷 쪽과 같은 해시라 바뀐 필드만 나온다
+    assert result["changed"] == {"a010": ["slot"]}
+
+    # 라이브 트리를 신뢰하면 두 번째 비교는 다른 버킷 범위만 읽는다
+    live.reads = 0
+    result = diff_collection("appointments", snapshot, live, cache, "b", 16)
+    assert result["buckets"] == 3
+    assert live.reads < 100
+    assert result["changed"] == {"a010": ["slot"]}
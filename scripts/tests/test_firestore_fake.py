@@ -0,0 +1,212 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from firestore_fake import (
+    DELETE_FIELD,
+    SERVER_TIMESTAMP,
+    AlreadyExists,
+    ArrayRemove,
+    ArrayUnion,
+    FailedPrecondition,
+    FakeFirestore,
+    FieldFilter,
+    Increment,
+    NotFound,
+    Query,
+)
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    client = FakeFirestore()
+    client.load({"patients": {
+        "p1": {"org": "a", "age": 7, "tags": ["x", "y"], "seen": BASE},
+        "p2": {"org": "b", "age": 3, "tags": ["y"], "seen": BASE + timedelta(days=1)},
+        "p3": {"org": "a", "age": 12, "tags": [], "seen": BASE + timedelta(days=2)},
+        "p4": {"org": "a", "tags": ["x"]},
+        "p5": {"org": "c", "age": "9"},
+    }})
+    return client
+
+
+def ids(query):
+    return [doc.id for doc in query.stream()]
+
+
+def test_where_equality_in_and_array_contains(db):
+    col = db.collection("patients")
+    assert sorted(ids(col.where("org", "==", "a"))) == ["p1", "p3", "p4"]
+    assert sorted(ids(col.where("org", "in", ["b", "c"]))) == ["p2", "p5"]
+    assert sorted(ids(col.where("tags", "array_contains", "x"))) == ["p1", "p4"]
+    assert sorted(ids(col.where(filter=FieldFilter("org", "!=", "a")))) == ["p2", "p5"]
+
+
+def test_range_filters_do_not_cross_types(db):
+    # 숫자 범위 조건은 문자열 "9" 나 필드가 없는 문서와 일치하지 않는다
+    col = db.collection("patients")
+    assert sorted(ids(col.where("age", ">=", 5))) == ["p1", "p3"]
+    assert ids(col.where("age", ">", 0).where("age", "<", 8).order_by("age")) == ["p2", "p1"]
+
+
+def test_order_by_skips_missing_fields_and_breaks_ties_by_id(db):
+    col = db.collection("patients")
+    assert ids(col.order_by("seen")) == ["p1", "p2", "p3"]
+    assert ids(col.order_by("seen", direction=Query.DESCENDING)) == ["p3", "p2", "p1"]
+    assert ids(col.where("org", "==", "a").order_by("org")) == ["p1", "p3", "p4"]
+
+
+def test_cursors_with_values_and_snapshots(db):
+    query = db.collection("patients").order_by("seen")
+    first = query.limit(1).get()[0]
+    assert ids(query.start_after(first)) == ["p2", "p3"]
+    assert ids(query.start_at(first)) == ["p1", "p2", "p3"]
+    assert ids(query.start_at({"seen": BASE + timedelta(days=1)})) == ["p2", "p3"]
+    assert ids(query.end_before({"seen": BASE + timedelta(days=2)})) == ["p1", "p2"]
+    assert ids(query.end_at({"seen": BASE + timedelta(days=1)})) == ["p1", "p2"]
+
+
+def test_name_pagination_with_document_reference_cursor(db):
+    col = db.collection("patients")
+    query = col.order_by("__name__").limit(2)
+    pages, last = [], None
+    while True:
+        page = (query.start_after([last]) if last else query).get()
+        pages.append([doc.id for doc in page])
+        if len(page) < 2:
+            break
+        last = page[-1].reference
+    assert pages == [["p1", "p2"], ["p3", "p4"], ["p5"]]
+
+
+def test_limit_offset_and_count(db):
+    col = db.collection("patients")
+    assert ids(col.order_by("__name__").offset(1).limit(2)) == ["p2", "p3"]
+    assert ids(col.order_by("__name__").limit_to_last(2)) == ["p4", "p5"]
+    assert col.where("org", "==", "a").count().get()[0][0].value == 3
+    assert col.where("age", ">=", 5).count().get()[0][0].value == 2
+
+
+def test_select_projects_fields(db):
+    doc = db.collection("patients").where("org", "==", "b").select(["age"]).get()[0]
+    assert doc.to_dict() == {"age": 3}
+
+
+def test_set_merge_and_update_paths(db):
+    ref = db.collection("patients").document("p1")
+    ref.set({"profile": {"name": "가", "memo": "m"}}, merge=True)
+    ref.set({"profile": {"name": "나"}, "org": DELETE_FIELD}, merge=True)
+    data = ref.get().to_dict()
+    assert data["profile"] == {"name": "나", "memo": "m"}
+    assert "org" not in data and data["age"] == 7
+
+    ref.set({"age": 8, "profile": {"memo": "new"}}, merge=["profile.memo"])
+    data = ref.get().to_dict()
+    assert data["age"] == 7 and data["profile"] == {"name": "나", "memo": "new"}
+
+    ref.update({"profile.name": DELETE_FIELD, "stats.visits": 1})
+    data = ref.get().to_dict()
+    assert data["profile"] == {"memo": "new"} and data["stats"] == {"visits": 1}
+
+    ref.set({"only": True})
+    assert ref.get().to_dict() == {"only": True}
+
+
+def test_transforms(db):
+    ref = db.collection("patients").document("p1")
+    ref.update({"tags": ArrayUnion(["y", "z"]), "visits": Increment(2), "stamp": SERVER_TIMESTAMP})
+    ref.update({"visits": Increment(1), "missing": ArrayUnion(["a"])})
+    data = ref.get().to_dict()
+    assert data["tags"] == ["x", "y", "z"]
+    assert data["visits"] == 3
+    assert data["missing"] == ["a"]
+    assert isinstance(data["stamp"], datetime)
+
+    ref.update({"tags": ArrayRemove(["x", "nope"])})
+    assert ref.get().to_dict()["tags"] == ["y", "z"]
+    # 인덱스도 함께 갱신된다
+    assert sorted(ids(db.collection("patients").where("tags", "array_contains", "x"))) == ["p4"]
+
+
+def test_writes_keep_query_indexes_current(db):
+    col = db.collection("patients")
+    # 정렬은 타입 순서 (숫자 < 문자열) 를 따른다
+    assert ids(col.order_by("age")) == ["p2", "p1", "p3", "p5"]
+    col.document("p3").update({"age": 1, "org": "b"})
+    col.document("p2").delete()
+    col.document("p6").set({"age": 5, "org": "b"})
+    assert ids(col.order_by("age")) == ["p3", "p6", "p1", "p5"]
+    assert sorted(ids(col.where("org", "==", "b"))) == ["p3", "p6"]
+
+
+def test_bulk_writes_and_reload_rebuild_sorted_indexes(db):
+    col = db.collection("patients")
+    assert ids(col.order_by("age").limit(1)) == ["p2"]
+    # 대기 쓰기가 많으면 다음 조회 때 한 번에 정렬
+    batch = db.batch()
+    for i in range(200):
+        batch.set(col.document(f"n{i:03d}"), {"age": 1000 - i})
+    batch.delete(col.document("p2"))
+    batch.update(col.document("p1"), {"age": 2000})
+    batch.commit()
+    ages = ids(col.order_by("age"))
+    assert ages[:2] == ["p3", "n199"] and ages[-3:] == ["n000", "p1", "p5"]
+    assert len(ages) == 203
+
+    # load() 는 인덱스를 버리고 다음 쿼리에서 다시 만든다
+    db.load({"patients": {"p3": {"age": 5000, "org": "z"}}})
+    assert ids(col.order_by("age"))[-2:] == ["p3", "p5"]
+    assert ids(col.where("org", "==", "z")) == ["p3"]
+
+
+def test_batch_is_atomic(db):
+    col = db.collection("patients")
+    batch = db.batch()
+    batch.update(col.document("p1"), {"age": 100})
+    batch.create(col.document("p2"), {"age": 0})
+    with pytest.raises(AlreadyExists):
+        batch.commit()
+    assert col.document("p1").get().to_dict()["age"] == 7
+
+    with pytest.raises(NotFound):
+        col.document("nope").update({"age": 1})
+
+
+def test_update_time_preconditions(db):
+    ref = db.collection("patients").document("p1")
+    seen = ref.get().update_time
+    ref.update({"age": 8})
+    with pytest.raises(FailedPrecondition):
+        ref.delete(option=db.write_option(last_update_time=seen))
+
+    batch = db.batch()
+    batch.delete(db.collection("patients").document("p2"),
+                 option=db.write_option(last_update_time=db.collection("patients").document("p2").get().update_time))
+    batch.delete(ref, option=db.write_option(last_update_time=seen))
+    with pytest.raises(FailedPrecondition):
+        batch.commit()
+    assert db.collection("patients").document("p2").get().exists
+
+    ref.delete(option=db.write_option(last_update_time=ref.get().update_time))
+    assert not ref.get().exists
+    with pytest.raises(FailedPrecondition):
+        ref.update({"age": 1}, option=db.write_option(exists=True))
+
+
+def test_add_and_subcollections(db):
+    _, ref = db.collection("patients").document("p1").collection("notes").add({"text": "a"})
+    assert len(ref.id) == 20
+    assert [c.id for c in db.collection("patients").document("p1").collections()] == ["notes"]
+    assert [doc.id for doc in db.collection_group("notes").stream()] == [ref.id]
+
+
+def test_stats_count_reads_and_writes(db):
+    db.reset_stats()
+    db.collection("patients").where("org", "==", "a").get()
+    db.collection("patients").document("p1").get()
+    db.collection("patients").document("p1").update({"age": 1})
+    assert db.stats["reads"] == 4
+    assert db.stats["writes"] == 1
+    assert db.collection_stats["patients"]["queries"] == 1
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from firestore_models import Appointment, Patient, PatientLinks, User, iter_models
+
+
+def test_aliases_pick_first_spelling_and_union_guardians():
+    patient = Patient.from_dict("p1", {
+        "organizationId": "org-1",
+        "guardian_uids": ["g1", "g2"],
+        "guardianIds": ["g2", "g3"],
+        "primaryTherapistUid": "t1",
+        "status": "active",
+        "tags": ["a", "b"],
+        "createdAt": datetime(2026, 1, 1),
+    })
+    assert patient.organization_id == "org-1"
+    assert patient.guardian_ids == ("g1", "g2", "g3")
+    assert patient.assigned_therapist_id == "t1"
+    assert patient.status == "ACTIVE"
+    assert patient.tags == ("a", "b")
+    assert patient.created_at.tzinfo is timezone.utc
+    assert patient.name is None and patient.extra is None
+
+    # 정식 철자가 있으면 별칭보다 우선
+    both = Appointment.from_dict("a1", {"patient_id": "p1", "patientId": "p9", "isMakeup": 1})
+    assert both.patient_id == "p1"
+    assert both.is_makeup is True
+    assert both.attended is False
+
+
+def test_type_mismatches_decode_to_none_and_extra_is_opt_in():
+    user = User.from_dict("u1", {"name": 3, "roles": {"Therapist": True, "admin": False},
+                                 "role": "GUARDIAN", "nickname": "x"}, keep_extra=True)
+    assert user.name is None
+    assert user.roles == ("therapist",)
+    assert user.has_role("therapist") and user.has_role("guardian")
+    assert user.extra == {"nickname": "x"}
+    assert user.to_dict()["nickname"] == "x"
+
+    linked = User.from_dict("u2", {"linkedPatientIds": ["p1"], "linked_patient_ids": ["p2", "p1"]})
+    assert linked.linked_patient_ids == ("p2", "p1")
+
+
+def test_patient_links_keeps_baseline_spellings_only():
+    data = {"guardian_ids": ["g1"], "assignedTherapistId": "t1", "organization_id": 7}
+    links = PatientLinks.from_dict("p1", data)
+    # 검증 스크립트는 리부트 표준 철자만 인정하므로 다른 철자는 누락으로 본다
+    assert links.guardian_uids == ()
+    assert links.primary_therapist_uid is None
+    assert links.organization_id == 7
+    assert Patient.from_dict("p1", data).guardian_ids == ("g1",)
+
+    links = PatientLinks.from_dict("p2", {"guardianUids": ["g1"], "guardian_uids": ["g2"]})
+    assert links.guardian_uids == ("g1",)
+
+
+def test_iter_models_reads_snapshots_without_copying(fake):
+    fake.load({"patients": {f"p{i}": {"name": f"환자{i}", "guardianUids": [f"g{i}"]} for i in range(5)}})
+    patients = list(iter_models(fake, Patient, page_size=2))
+    assert [p.id for p in patients] == ["p0", "p1", "p2", "p3", "p4"]
+    assert patients[3].guardian_ids == ("g3",)
+    assert repr(patients[0]) == "<Patient p0 환자0>"
@@ -0,0 +1,126 @@
+import textwrap
+
+import pytest
+
+from firestore_plan import _fit, _isolated_args, _run_isolated, _run_script, _sampling_client, estimate
+
+SCRIPT = """
+from firestore_common import get_db, iter_collection
+
+db = get_db()
+db.collection("config").document("settings").get()
+for doc in iter_collection(db, "patients"):
+    if doc.to_dict().get("organization_id") is None:
+        doc.reference.update({"organization_id": "org_1"})
+db.collection("audit").add({"event": "backfill"})
+db.collection("summary").document("latest").set({"done": True})
+"""
+
+
+class DictSource:
+    """{컬렉션: (전체 문서 수, 샘플)} 로 정한 원본"""
+
+    def __init__(self, collections):
+        self.collections = collections
+
+    def count(self, collection):
+        return self.collections.get(collection, (0, {}))[0]
+
+    def sample(self, collection, size):
+        docs = self.collections.get(collection, (0, {}))[1]
+        return dict(sorted(docs.items())[:size])
+
+    def latency(self):
+        return 0.05, 0.0
+
+
+def test_fit_separates_fixed_and_per_document_counts():
+    assert _fit(201, 101, 200, 100, 10000) == pytest.approx(10001)
+    assert _fit(3, 3, 200, 100, 10000) == pytest.approx(3)
+    # 샘플이 한 건뿐이라 절반 실행과 크기가 같으면 센 그대로
+    assert _fit(1, 1, 1, 1, 5000) == 1
+
+
+def test_estimate_scales_sample_driven_work_only(tmp_path, firebase_modules):
+    script = tmp_path / "backfill.py"
+    script.write_text(textwrap.dedent(SCRIPT), encoding="utf-8")
+    # ID 순으로 네 건마다 한 건이 수정 대상: ID 순 한 건씩 거르는 절반 샘플이면 증가분이 0 으로 보인다
+    patients = {f"p{i:04d}": {"name": f"환자{i}", "organization_id": None if i % 4 == 0 else "org_0"}
+                for i in range(200)}
+    source = DictSource({"patients": (10000, patients), "config": (1, {"settings": {"v": 1}})})
+
+    cache = {}
+    half_client = _sampling_client(source, 200, cache, half=True)
+    client = _sampling_client(source, 200, cache)
+    assert _run_script(str(script), [], half_client)[0] == 0
+    assert _run_script(str(script), [], client)[0] == 0
+    rows, totals = estimate(client, half_client, source.latency(), 1, (0.06, 0.18, 0.02))
+    by_name = {row["collection"]: row for row in rows}
+
+    # 전체 스캔과 문서별 수정은 1만 건으로 확장, add() / 고정 ID 기록 / 설정 조회는 한 번
+    assert by_name["patients"]["reads"] == pytest.approx(10000)
+    # 수정 대상 (organization_id 없음) 비율은 샘플에서 추정하므로 표본 오차만큼 허용
+    assert by_name["patients"]["writes"] == pytest.approx(2500, rel=0.15)
+    assert by_name["audit"]["writes"] == pytest.approx(1)
+    assert by_name["summary"]["writes"] == pytest.approx(1)
+    assert by_name["config"]["reads"] == pytest.approx(1)
+    assert totals["writes"] == pytest.approx(by_name["patients"]["writes"] + 2)
+    assert totals["rpcs"] >= 10000 / 1000
+
+
+def test_isolated_args_copy_state_and_absolutise_inputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "state").mkdir()
+    (tmp_path / "state" / "progress.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "cache.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "library").mkdir()
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+
+    args = _isolated_args(["import", "--root", "library", "--state=state", "--workers", "8"], str(workdir),
+                          {"--state": None, "--cache": "cache.json", "--out": None}, {"--workers": 1})
+    assert args == ["import", "--root", str(tmp_path / "library"), f"--state={workdir / 'state' / 'state'}",
+                    "--workers", "1"]
+    # 옵션으로 준 경로는 복사본으로, 기본값(상대 경로)은 workdir 안 같은 위치로 복사
+    assert (workdir / "state" / "state" / "progress.json").exists()
+    assert (workdir / "cache.json").exists()
+
+
+STATEFUL = """
+import json, os, sys
+from firestore_common import get_db
+
+root = sys.argv[sys.argv.index("--root") + 1]
+state_path = os.path.join(root, "state.json")
+state = json.load(open(state_path)) if os.path.exists(state_path) else {"done": []}
+db = get_db()
+for doc in db.collection("patients").stream():
+    if doc.id not in state["done"]:
+        db.collection("marks").document(doc.id).set({"seen": True})
+        state["done"].append(doc.id)
+json.dump(state, open(state_path, "w"))
+json.dump({}, open("default_output.json", "w"))
+"""
+
+
+def test_plan_runs_do_not_touch_local_state(tmp_path, monkeypatch, firebase_modules):
+    script = tmp_path / "stateful.py"
+    script.write_text(textwrap.dedent(STATEFUL), encoding="utf-8")
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "state.json").write_text('{"done": ["p0000"]}', encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    source = DictSource({"patients": (1000, {f"p{i:04d}": {"n": i} for i in range(100)})})
+    cache = {}
+    half_client = _sampling_client(source, 100, cache, half=True)
+    client = _sampling_client(source, 100, cache)
+    for sample_client in (half_client, client):
+        assert _run_isolated(str(script), ["--root", "root"], sample_client, {"--root": None}, None)[0] == 0
+    rows, _ = estimate(client, half_client, source.latency(), 1, (0.06, 0.18, 0.02))
+
+    # 두 실행 모두 같은 원본 상태에서 시작하고, 실제 상태/출력 파일은 그대로
+    assert (root / "state.json").read_text(encoding="utf-8") == '{"done": ["p0000"]}'
+    assert not (tmp_path / "default_output.json").exists()
+    marks = {row["collection"]: row for row in rows}["marks"]
+    assert marks["writes"] == pytest.approx(990, rel=0.05)
@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+from firestore_fake import Aborted, FailedPrecondition, NotFound, ResourceExhausted, ServiceUnavailable
+from firestore_rate import AdaptiveLimiter, classify_error
+
+
+def limiter(**kwargs):
+    kwargs.setdefault("ramp", False)
+    kwargs.setdefault("backoff", 0.0)
+    return AdaptiveLimiter(**kwargs)
+
+
+def test_classify_error_by_exception_class_name():
+    assert classify_error(ResourceExhausted("quota")) == "throttle"
+    assert classify_error(Aborted("contention")) == "contention"
+    assert classify_error(ServiceUnavailable("down")) == "transient"
+    assert classify_error(NotFound("missing")) is None
+    assert classify_error(FailedPrecondition("stale")) is None
+    assert classify_error(ValueError()) is None
+
+    # 하위 클래스도 MRO 로 분류된다
+    class QuotaForProject(ResourceExhausted):
+        pass
+    assert classify_error(QuotaForProject("quota")) == "throttle"
+
+
+def test_additive_increase_then_multiplicative_decrease_once_per_overload():
+    rate = limiter(initial=4, max_limit=8)
+    for _ in range(4):
+        rate.call(lambda: None)
+    # 현재 한도만큼 성공하면 약 +1
+    assert 4.9 < rate.limit < 5.0
+
+    # 같은 한도 구간(epoch)에서 시작한 작업의 오류는 한 번만 감소시킨다
+    epochs = [rate._acquire() for _ in range(3)]
+    for epoch in epochs:
+        rate._release(epoch, "throttle")
+    assert rate.stats["decreases"] == 1
+    assert 2.4 < rate.limit < 2.5
+
+    for _ in range(100):
+        rate.call(lambda: None)
+    assert rate.limit == 8
+
+
+def test_call_retries_retryable_errors_and_raises_others():
+    rate = limiter(max_retries=3)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Aborted("contention")
+        return "ok"
+
+    assert rate.call(flaky) == "ok"
+    assert len(attempts) == 3
+    assert rate.stats["retries"] == 2
+    assert rate.stats["contention"] == 2
+
+    def missing():
+        attempts.append(1)
+        raise NotFound("gone")
+
+    attempts.clear()
+    with pytest.raises(NotFound):
+        rate.call(missing)
+    assert len(attempts) == 1
+    assert rate.stats["failed"] == 1
+
+    def always_busy():
+        raise ServiceUnavailable("down")
+
+    with pytest.raises(ServiceUnavailable):
+        rate.call(always_busy)
+    assert rate.stats["transient"] == 4
+
+
+def test_map_respects_in_flight_limit_and_reports_errors_per_item():
+    rate = limiter(initial=2, max_limit=2)
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def work(item):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        try:
+            if item == 3:
+                raise NotFound(str(item))
+            return item * 10
+        finally:
+            with lock:
+                running[0] -= 1
+
+    results = {item: (result, type(error).__name__ if error else None)
+               for item, result, error in rate.map(work, range(20), workers=8)}
+    assert running[1] <= 2
+    assert results[3] == (None, "NotFound")
+    assert results[7] == (70, None)
+    assert len(results) == 20
+
+
+def test_ramp_cap_starts_at_base_rate():
+    rate = AdaptiveLimiter(base_rate=500)
+    assert rate.rate_cap("patients") == 500
+    assert AdaptiveLimiter(ramp=False).rate_cap("patients") is None
+    rate.call(lambda: None, collection="patients")
+    assert rate.summary()["rate_caps"] == {"patients": 500}
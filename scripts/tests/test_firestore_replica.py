@@ -0,0 +1,121 @@
+import argparse
+import sqlite3
+import sys
+import textwrap
+from datetime import datetime, timedelta, timezone
+
+from firestore_models import Patient
+from firestore_replica import Replica, checks, child_rows, run, sync, table_row
+
+PAST = datetime(2026, 1, 5, 1, 0, tzinfo=timezone.utc)
+
+
+def seed(fake):
+    fake.load({
+        "patients": {
+            "p1": {"name": "김아쿠", "organizationId": "org_a", "status": "active", "therapist_id": "t1",
+                   "guardian_uids": ["g1"], "guardianIds": ["g1", "g2"]},
+            "p2": {"name": "이하늘", "organization_id": "org_a", "status": "ACTIVE"},
+        },
+        "users": {
+            "g1": {"email": "g1@aqu.com", "organization_id": "org_a", "role": "GUARDIAN",
+                   "roles": {"Guardian": True, "admin": False}, "linked_patient_ids": ["p1"]},
+            "g2": {"email": "g2@aqu.com", "organization_id": "org_a", "role": "GUARDIAN"},
+        },
+        "appointments": {
+            "a1": {"patientId": "p1", "appointmentDate": PAST, "status": "scheduled", "attended": None},
+        },
+    })
+
+
+def sync_args(db, **overrides):
+    args = argparse.Namespace(cred=None, db=db, collections=["patients", "users", "appointments"], full=False,
+                              mode="scan", overlap_minutes=0, detect_deletes=True, watch=False, interval=0)
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+def rows(db, query):
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+
+def test_rows_merge_aliases_and_normalise_types():
+    data = {"patientId": "p1", "appointmentDate": datetime(2026, 1, 5, 10, 0, tzinfo=timezone(timedelta(hours=9))),
+            "status": "scheduled", "isMakeup": 1, "attended": None}
+    row = table_row("appointments", "a1", data)
+    assert row[:5] == ("a1", "p1", None, None, "2026-01-05 01:00:00")
+    assert row[6:10] == ("SCHEDULED", None, None, 1)
+
+    patient = {"guardian_uids": ["g1"], "guardianIds": ["g1", "g2", 3]}
+    assert child_rows("patient_guardians", "p1", patient) == [("p1", "g1"), ("p1", "g2")]
+    # 담당 치료사 / 보호자 별칭은 스크립트용 모델과 같은 우선순위로 읽는다
+    patient = {"therapist_id": "t1", "primaryTherapistUid": "t2", "guardian_ids": ["g3"], "guardianUids": ["g1"]}
+    model = Patient.from_dict("p1", patient)
+    columns = dict(zip(("id", "organization_id", "patient_code", "name", "birth_date", "gender", "status",
+                        "therapist_id", "assigned_therapist_id"), table_row("patients", "p1", patient)))
+    assert columns["assigned_therapist_id"] == model.assigned_therapist_id == "t1"
+    assert [g for _, g in child_rows("patient_guardians", "p1", patient)] == list(model.guardian_ids)
+    user = {"role": "THERAPIST", "roles": {"Guardian": True, "admin": False}}
+    assert child_rows("user_roles", "u1", user) == [("u1", "guardian"), ("u1", "therapist")]
+
+
+def test_sync_full_then_changes_and_deletes(fake, tmp_path):
+    seed(fake)
+    db = str(tmp_path / "replica.sqlite")
+    assert sync(sync_args(db))
+    assert rows(db, "SELECT id, organization_id, status, therapist_id FROM patients ORDER BY id") == [
+        ("p1", "org_a", "ACTIVE", "t1"), ("p2", "org_a", "ACTIVE", None)]
+    assert rows(db, "SELECT guardian_id FROM patient_guardians ORDER BY guardian_id") == [("g1",), ("g2",)]
+
+    fake.document("patients/p2").update({"therapist_id": "t2", "guardian_uids": ["g2"]})
+    fake.document("patients/p1").delete()
+    assert sync(sync_args(db, collections=["patients"]))
+    assert rows(db, "SELECT id, therapist_id FROM patients") == [("p2", "t2")]
+    assert rows(db, "SELECT patient_id, guardian_id FROM patient_guardians") == [("p2", "g2")]
+    assert rows(db, "SELECT collection, count FROM sync_state WHERE collection = 'patients'") == [("patients", 1)]
+
+    replica = Replica(db)
+    try:
+        assert dict(replica.iter_docs("patients"))["p2"]["guardian_uids"] == ["g2"]
+    finally:
+        replica.close()
+
+
+def test_checks_find_stale_appointments_and_one_sided_guardian_links(fake, tmp_path, capsys):
+    seed(fake)
+    db = str(tmp_path / "replica.sqlite")
+    assert sync(sync_args(db))
+    capsys.readouterr()
+    assert not checks(argparse.Namespace(db=db, limit=10))
+    out = capsys.readouterr().out
+    assert "❌ 지난 날짜인데 예약 상태인 일정: 1건" in out
+    assert "❌ 보호자 연결이 한쪽만 있는 환자: 1건" in out
+    assert "❌ 보호자가 없는 환자: 1건" in out
+    assert "✅ organization_id 없는 환자: 0건" in out
+
+
+def test_run_executes_script_on_replica_without_writing_back(fake, tmp_path, monkeypatch, capsys):
+    seed(fake)
+    db = str(tmp_path / "replica.sqlite")
+    assert sync(sync_args(db))
+    script = tmp_path / "count.py"
+    script.write_text(textwrap.dedent("""
+        import sys
+        from firebase_admin import firestore
+
+        db = firestore.client()
+        names = sorted(d.to_dict()["name"] for d in db.collection("patients").stream())
+        db.collection("patients").document("p1").update({"name": "변경"})
+        print("patients", names, sys.argv[1:])
+    """), encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", list(sys.argv))
+    assert run(argparse.Namespace(db=db, script=str(script), script_args=["--x"]))
+    out = capsys.readouterr().out
+    assert "patients ['김아쿠', '이하늘'] ['--x']" in out
+    assert "쓰기 1건은 복제본/운영 데이터에 반영되지 않았습니다" in out
+    assert rows(db, "SELECT name FROM patients WHERE id = 'p1'") == [("김아쿠",)]
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from goal_forecast import Series, fit_trends, goal_forecast, match_metric, predict, target_value  # noqa: E402
+
+START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+BALANCE = "균형감각 (한 발 서기 시간)"
+SQUAT = "하체 근력 (스쿼트 횟수)"
+
+
+def day(n):
+    return START + timedelta(days=n)
+
+
+def series(rows):
+    """[(patient_id, metric, unit, x, y)] → Series"""
+    index, units = {}, []
+    sids = []
+    for patient_id, metric, unit, _, _ in rows:
+        key = (patient_id, metric)
+        if key not in index:
+            index[key] = len(units)
+            units.append(unit)
+        sids.append(index[key])
+    keys = sorted(index, key=index.get)
+    return Series(keys, units, np.array(sids), np.array([r[3] for r in rows], dtype=float),
+                  np.array([r[4] for r in rows], dtype=float))
+
+
+def test_weighted_trend_recovers_linear_series_and_falls_back_when_short():
+    s = series([("p1", BALANCE, "초", x, 2 + x / 7) for x in (28.0, 0.0, 14.0, 7.0, 21.0)]
+               + [("p2", BALANCE, "초", 0.0, 5.0), ("p2", BALANCE, "초", 7.0, 6.0)])
+    trend = fit_trends(s, half_life_days=10, min_points=3)
+    assert trend["slope"][0] == pytest.approx(1 / 7)
+    assert predict(trend, np.array([0]), np.array([56.0]))[0] == pytest.approx(10.0)
+    assert np.isnan(trend["slope"][1])
+    assert predict(trend, np.array([1]), np.array([56.0]))[0] == 6.0
+    # 목표 시작일 이후 첫 기록 위치 (정렬된 배열 기준)
+    assert list(s.find(np.array([0, 0, 1]), np.array([10.0, 99.0, -5.0]))) == [2, -1, 5]
+
+
+def test_goal_links_to_metric_and_reads_target_from_text():
+    s = series([("p1", BALANCE, "초", 0.0, 1.0), ("p1", SQUAT, "회", 0.0, 1.0), ("p2", SQUAT, "회", 0.0, 1.0)])
+    assert match_metric(s, {"patient_id": "p1", "metric_name": SQUAT}, "") == 1
+    assert match_metric(s, {"patient_id": "p1"}, "균형감각 향상") == 0
+    assert match_metric(s, {"patient_id": "p1"}, "전반적 향상") is None
+    assert match_metric(s, {"patient_id": "p2"}, "아무 문장") == 2
+    assert match_metric(s, {"patient_id": "p3"}, "균형감각") is None
+
+    assert target_value({}, "한 발 서기 3초에서 10.5초 이상", "초") == 10.5
+    assert target_value({}, "스쿼트 20회", "초") is None
+    assert target_value({"target_value": 7}, "10초", "초") == 7.0
+
+
+def seed(fake):
+    records = {}
+    for i in range(5):
+        records[f"a{i}"] = {"patient_id": "p1", "metric_name": BALANCE, "metric_unit": "초",
+                            "metric_value": 2 + i, "record_date": day(7 * i)}
+    for i in range(2):
+        records[f"b{i}"] = {"patient_id": "p2", "metric_name": SQUAT, "metric_unit": "회",
+                            "metric_value": 5 + i, "record_date": day(7 * i)}
+    records["bad"] = {"patient_id": "p2", "metric_name": SQUAT, "metric_value": "많이", "record_date": day(1)}
+    fake.load({"progress_records": records, "goals": {
+        "g1": {"patient_id": "p1", "status": "IN_PROGRESS", "start_date": day(7), "target_date": day(63),
+               "goal_text": "한 발 서기 10초 이상 유지", "progress_percentage": 30},
+        "g2": {"patient_id": "p2", "status": "IN_PROGRESS", "target_date": day(56), "target_value": 9,
+               "baseline_value": 4},
+        "g3": {"patient_id": "p9", "status": "IN_PROGRESS", "target_date": day(56), "target_value": 1},
+        "done": {"patient_id": "p1", "status": "COMPLETED", "target_date": day(56), "target_value": 1},
+    }})
+
+
+def test_forecast_written_once_and_progress_optional(fake):
+    seed(fake)
+    assert goal_forecast(half_life_days=30, min_points=3, set_progress=False, apply=True)
+
+    g1 = fake.document("goals/g1").get().to_dict()
+    f = g1["forecast"]
+    assert (f["baseline"], f["current"], f["target"]) == (3.0, 6.0, 10.0)
+    assert f["progress_percentage"] == pytest.approx(42.9)
+    assert f["predicted_at_target_date"] == pytest.approx(11.0)
+    assert f["on_track"] is True
+    assert abs(f["projected_date"] - day(56)) < timedelta(minutes=1)
+    assert f["slope_per_week"] == pytest.approx(1.0)
+    assert g1["progress_percentage"] == 30
+
+    # 기록이 부족하면 마지막 값 기준, 추세/예상일 없음
+    g2 = fake.document("goals/g2").get().to_dict()["forecast"]
+    assert (g2["baseline"], g2["current"], g2["progress_percentage"]) == (4.0, 6.0, 40.0)
+    assert g2["on_track"] is False and g2["projected_date"] is None and g2["slope_per_week"] is None
+    assert g2["records"] == 2
+
+    assert "forecast" not in fake.document("goals/g3").get().to_dict()
+    assert "forecast" not in fake.document("goals/done").get().to_dict()
+
+    # 결과가 같으면 다시 쓰지 않고, --set-progress 는 진행률만 갱신
+    writes = fake.stats["writes"]
+    assert goal_forecast(30, 3, False, apply=True)
+    assert fake.stats["writes"] == writes
+    assert goal_forecast(30, 3, True, apply=True)
+    assert fake.document("goals/g1").get().to_dict()["progress_percentage"] == pytest.approx(42.9)
+    assert fake.stats["writes"] == writes + 2
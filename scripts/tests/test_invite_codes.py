@@ -0,0 +1,106 @@
+import argparse
+import csv
+import os
+from datetime import datetime, timedelta, timezone
+
+import invite_codes
+from firestore_rate import AdaptiveLimiter
+from invite_codes import CODE_ALPHABET, BloomFilter, audit, code_hash, code_lookup, generate, generate_codes
+
+NOW = datetime.now(timezone.utc)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(100)
+    digests = [code_hash(f"CODE{i:04d}", "org_a") for i in range(1000)]
+    for digest in digests:
+        bloom.add(digest)
+    assert all(digest in bloom for digest in digests)
+    misses = sum(code_hash(f"MISS{i:04d}", "org_a") in bloom for i in range(1000))
+    assert misses <= 1
+
+
+def test_generated_codes_avoid_existing_hashes_under_any_center_salt(monkeypatch):
+    # 난수 바이트 b → CODE_ALPHABET[b % 32] 이므로 0 은 'A', 1 은 'B'
+    draws = iter([bytes(8) + bytes(8) + bytes([1] * 8), bytes([2] * 8)])
+    monkeypatch.setattr(invite_codes.secrets, "token_bytes", lambda n: next(draws))
+    bloom = BloomFilter(10)
+    bloom.add(code_hash("BBBBBBBB", "org_b"))
+
+    codes, rejected = generate_codes(2, bloom, {"org_a", "org_b"})
+    # AAAAAAAA 중복 1회, BBBBBBBB 는 다른 센터의 기존 코드와 같아 거절
+    assert codes == ["AAAAAAAA", "CCCCCCCC"]
+    assert rejected == 2
+    assert all(ch in CODE_ALPHABET for ch in "".join(codes))
+
+
+def generate_args(tmp_path, **overrides):
+    args = argparse.Namespace(center="org_a", center_name=None, count=7, role="guardian", expires_days=30,
+                              created_by="admin", created_by_name="관리자", ramp=False,
+                              out=os.path.join(str(tmp_path), "codes.csv"), apply=True)
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+def test_generate_writes_hashes_and_plaintext_csv(fake, tmp_path, monkeypatch):
+    monkeypatch.setattr(invite_codes, "BATCH_SIZE", 3)
+    fake.load({"organizations": {"org_a": {"name": "아쿠아 센터"}}})
+    args = generate_args(tmp_path)
+    assert generate(args, AdaptiveLimiter(ramp=False))
+
+    with open(args.out, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 7 and len({r["code"] for r in rows}) == 7
+    for row in rows:
+        stored = fake.document(f"invites/{row['invite_id']}").get().to_dict()
+        assert stored["code_hash"] == code_hash(row["code"], "org_a").hex()
+        # 앱은 센터를 모를 때 코드만으로 code_lookup 을 계산해 조회한다
+        assert stored["code_lookup"] == code_lookup(row["code"])
+        assert stored["center_name"] == "아쿠아 센터"
+        assert stored["status"] == "invited"
+        assert row["code"] not in str(stored)
+
+    # 두 번째 발급은 CSV 에 이어 쓰고 기존 코드와 겹치지 않는다
+    assert generate(generate_args(tmp_path, count=5), AdaptiveLimiter(ramp=False))
+    with open(args.out, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 12 and len({r["code"] for r in rows}) == 12
+
+
+def test_dry_run_writes_nothing(fake, tmp_path):
+    args = generate_args(tmp_path, apply=False)
+    assert generate(args, AdaptiveLimiter(ramp=False))
+    assert not os.path.exists(args.out)
+    assert fake.collection("invites").count().get()[0][0].value == 0
+
+
+def test_audit_reports_mismatches_and_expires_stale_invites(fake, capsys):
+    accepted = {"status": "accepted", "center_id": "org_a", "role": "guardian"}
+    fake.load({
+        "invites": {
+            "ok": dict(accepted, used_by_uid="g1", patient_id="p1"),
+            "moved": dict(accepted, used_by_uid="g2"),
+            "unlinked": dict(accepted, used_by_uid="g3", patient_id="p1"),
+            "ghost": dict(accepted, used_by_uid="nobody"),
+            "old": {"status": "invited", "center_id": "org_a", "expires_at": NOW - timedelta(days=1)},
+            "fresh": {"status": "invited", "center_id": "org_a", "expires_at": NOW + timedelta(days=1)},
+        },
+        "users": {
+            "g1": {"organization_id": "org_a", "role": "GUARDIAN"},
+            "g2": {"organization_id": "org_b", "roles": {"guardian": True}},
+            "g3": {"organization_id": "org_a", "role": "THERAPIST"},
+        },
+        # acceptInvite 가 쓰는 guardians 필드도 연결로 인정
+        "patients": {"p1": {"guardians": ["g1"]}},
+    })
+    args = argparse.Namespace(center="org_a", fix_expired=True, limit=10, apply=True)
+    assert not audit(args)
+    out = capsys.readouterr().out
+    assert "센터 불일치: 1건" in out and "moved: 초대 org_a / 사용자 org_b" in out
+    assert "역할 불일치: 1건" in out and "unlinked: 초대 guardian" in out
+    assert "환자에 보호자 연결 없음: 1건" in out and "p1 ✗ g3" in out
+    assert "사용자 문서 없음: 1건" in out
+    assert "만료일 지난 invited 초대: 1건" in out
+    assert fake.document("invites/old").get().to_dict()["status"] == "expired"
+    assert fake.document("invites/fresh").get().to_dict()["status"] == "invited"
@@ -0,0 +1,113 @@
+import json
+import textwrap
+
+import pytest
+
+import maintenance_pipeline
+from maintenance_pipeline import STAGES, CachingClient, Stage, dependencies, select_stages
+
+FIX_SCRIPT = """
+from firebase_admin import firestore
+
+db = firestore.client()
+batch = db.batch()
+for doc in db.collection("patients").stream():
+    if not doc.to_dict().get("organization_id"):
+        batch.update(doc.reference, {"organization_id": "org-1"})
+batch.commit()
+print("fixed")
+"""
+
+VERIFY_SCRIPT = """
+import sys
+from firebase_admin import firestore
+
+db = firestore.client()
+missing = [d.id for d in db.collection("patients").stream() if not d.to_dict().get("organization_id")]
+print("missing", missing)
+sys.exit(1 if missing else 0)
+"""
+
+
+def test_default_selection_skips_opt_in_stages():
+    names = [s.name for s in select_stages(None)]
+    assert "create_test_patient" not in names
+    assert names == [s.name for s in STAGES if not s.opt_in]
+    # 이름을 적으면 opt_in 단계도 선언 순서대로 포함
+    chosen = select_stages(["fix_guardian_patient_link", "create_test_patient"])
+    assert [s.name for s in chosen] == ["create_test_patient", "fix_guardian_patient_link"]
+
+
+def test_dependencies_follow_read_write_overlap():
+    deps = dependencies(STAGES)
+    assert deps["create_test_patient"] == set()
+    assert deps["fix_missing_organization_id"] == {"create_test_patient", "fix_guardian_patient_link"}
+    assert deps["verify_firestore_structure"] == {"create_test_patient", "fix_guardian_patient_link",
+                                                  "fix_missing_organization_id"}
+    # 둘 다 읽기만 하는 단계 사이에는 순서가 없다
+    assert "verify_firestore_structure" not in deps["verify_organization_id"]
+
+
+def test_caching_client_scans_once_and_refetches_written_docs(fake):
+    fake.load({"patients": {f"p{i}": {"n": i} for i in range(5)}})
+    client = CachingClient(fake)
+    assert len(list(client.collection("patients").stream())) == 5
+    client.collection("patients").document("p1").update({"n": 10})
+    client.collection("patients").document("p9").set({"n": 9})
+    batch = client.batch()
+    batch.delete(client.collection("patients").document("p2"))
+    batch.commit()
+
+    docs = {d.id: d.to_dict()["n"] for d in client.collection("patients").stream()}
+    assert docs == {"p0": 0, "p1": 10, "p3": 3, "p4": 4, "p9": 9}
+    assert client.scans["patients"] == 1
+    assert client.stats["refetched"] == 3
+    assert client.collection("patients").document("p3").get().to_dict() == {"n": 3}
+    assert client.stats["cache_hits"] == 1
+
+
+@pytest.fixture
+def stages(tmp_path, monkeypatch):
+    (tmp_path / "fix.py").write_text(textwrap.dedent(FIX_SCRIPT), encoding="utf-8")
+    (tmp_path / "verify.py").write_text(textwrap.dedent(VERIFY_SCRIPT), encoding="utf-8")
+    monkeypatch.setattr(maintenance_pipeline, "STAGES", [
+        Stage("fix", str(tmp_path / "fix.py"), reads=("patients",), writes=("patients",)),
+        Stage("verify", str(tmp_path / "verify.py"), reads=("patients",)),
+    ])
+    return str(tmp_path / "state.json")
+
+
+def test_pipeline_runs_in_order_then_skips_unchanged_inputs(fake, stages, capsys):
+    fake.load({"patients": {"p1": {"organization_id": "org-1"}, "p2": {}}})
+    assert maintenance_pipeline.maintenance_pipeline(None, stages, 2, False, False)
+    with open(stages, encoding="utf-8") as f:
+        state = json.load(f)
+    assert state["fix"]["ok"] and state["fix"]["before"] != state["fix"]["after"]
+    assert state["verify"]["ok"]
+    assert fake.document("patients/p2").get().to_dict() == {"organization_id": "org-1"}
+
+    capsys.readouterr()
+    assert maintenance_pipeline.maintenance_pipeline(None, stages, 2, False, False)
+    assert capsys.readouterr().out.count("입력 변경 없음") == 2
+
+    # 입력이 바뀌면 다시 실행
+    fake.document("patients/p3").set({"name": "new"})
+    assert maintenance_pipeline.maintenance_pipeline(None, stages, 2, False, False)
+    assert "입력 변경 없음" not in capsys.readouterr().out
+    assert fake.document("patients/p3").get().to_dict()["organization_id"] == "org-1"
+
+
+def test_failed_stage_blocks_dependants(fake, stages, capsys):
+    fix, verify = maintenance_pipeline.STAGES
+    # 앞 단계가 읽는 컬렉션에 쓰는 뒤 단계는 앞 단계 실패 시 실행하지 않는다
+    maintenance_pipeline.STAGES[:] = [verify, fix]
+    fake.load({"patients": {"p1": {}}})
+    assert not maintenance_pipeline.maintenance_pipeline(None, stages, 2, False, False)
+    out = capsys.readouterr().out
+    assert "missing ['p1']" in out
+    assert "fix: 선행 단계 실패로 건너뜀" in out
+    assert fake.document("patients/p1").get().to_dict() == {}
+    with open(stages, encoding="utf-8") as f:
+        state = json.load(f)
+    assert list(state) == ["verify"]
+    assert state["verify"]["exit_code"] == 1
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+import monthly_statements as statements_module
+from firestore_snapshot import write_collection, write_manifest
+from monthly_statements import (
+    STATEMENT_COLLECTION,
+    load_state,
+    monthly_statements,
+    patient_charges,
+    previous_month,
+    voucher_terms,
+)
+
+SETTINGS = {"vs1": {"program_name": "발달재활", "sessions": 8, "self_payment": 12000, "support_per_session": 40000}}
+
+
+def utc(day, hour):
+    return datetime(2026, 9, day, hour, tzinfo=timezone.utc)
+
+
+def seed(fake):
+    attendances = {
+        "a1": {"patient_id": "p1", "schedule_date": utc(2, 1), "status": "PRESENT"},
+        "a2": {"patient_id": "p1", "schedule_date": utc(9, 1), "status": "present"},
+        "a3": {"patient_id": "p1", "schedule_date": utc(16, 1), "status": "MAKEUP"},
+        "a4": {"patient_id": "p1", "schedule_date": utc(23, 1), "status": "ABSENT"},
+        # KST 9월 1일 00:30 → 9월, KST 8월 31일 23:30 → 제외
+        "a5": {"patient_id": "p1", "schedule_date": datetime(2026, 8, 31, 15, 30, tzinfo=timezone.utc),
+               "status": "PRESENT"},
+        "a6": {"patient_id": "p1", "schedule_date": datetime(2026, 8, 31, 14, 30, tzinfo=timezone.utc),
+               "status": "PRESENT"},
+        "b1": {"patient_id": "p2", "schedule_date": utc(3, 1), "status": "PRESENT"},
+        "b2": {"patient_id": "p2", "schedule_date": utc(10, 1), "status": "PRESENT"},
+        "b3": {"patient_id": "p2", "schedule_date": utc(17, 1), "status": "CANCELLED"},
+    }
+    fake.load({
+        "patients": {
+            "p1": {"name": "김아쿠", "organization_id": "org_a", "guardian_uids": ["g1", "g2"]},
+            "p2": {"name": "김하늘", "organization_id": "org_a", "guardianUids": ["g1"]},
+            "p3": {"name": "보호자 없음", "organization_id": "org_a"},
+            "q1": {"name": "다른 센터", "organization_id": "org_b", "guardian_uids": ["g9"]},
+        },
+        "users": {"g1": {"name": "보호자1"}, "g2": {"name": "보호자2"}, "g9": {"name": "보호자9"}},
+        "attendances": attendances,
+        "vouchers": {
+            "v1": {"patient_id": "p1", "voucher_setting_id": "vs1", "remaining_sessions": 6,
+                   "expiry_date": utc(30, 0)},
+            # 만료된 이용권은 적용하지 않는다
+            "v2": {"patient_id": "p2", "voucher_setting_id": "vs1", "remaining_sessions": 8,
+                   "expiry_date": datetime(2026, 8, 1, tzinfo=timezone.utc)},
+        },
+        "payments": {
+            "pay1": {"patient_id": "p1", "organization_id": "org_a", "payment_method": "card",
+                     "final_amount": 30000, "created_at": utc(5, 3)},
+            "pay2": {"patient_id": "p1", "organization_id": "org_a", "payment_method": "voucher",
+                     "final_amount": 99999, "created_at": utc(5, 3)},
+        },
+        "voucher_settings": SETTINGS,
+        STATEMENT_COLLECTION: {"2026-08_org_a_g1": {"closing_balance": 5000}},
+    })
+
+
+def test_voucher_terms_fall_back_to_settings_and_cap_covered_sessions():
+    assert previous_month("2026-01") == "2025-12"
+    assert voucher_terms({"voucher_setting_id": "vs1", "total_sessions": 2}, SETTINGS) == ("발달재활", 2, 12000.0, 40000.0)
+
+    counts = Counter({"PRESENT": 2, "MAKEUP": 1, "ABSENT": 4})
+    line = patient_charges("p1", counts, [{"voucher_setting_id": "vs1", "total_sessions": 2}], SETTINGS, 50000)
+    assert (line["attended"], line["voucher_sessions"], line["regular_sessions"]) == (3, 2, 1)
+    assert line["charge"] == 2 * 12000 + 50000
+    assert patient_charges("p2", counts, None, SETTINGS, 50000)["charge"] == 150000
+
+
+def test_statements_bill_first_guardian_and_carry_balance(fake, tmp_path):
+    seed(fake)
+    root = str(tmp_path)
+    assert monthly_statements("2026-09", None, root, 1, 50000, apply=True)
+
+    g1 = fake.document(f"{STATEMENT_COLLECTION}/2026-09_org_a_g1").get().to_dict()
+    assert g1["patient_ids"] == ["p1", "p2"]
+    p1, p2 = g1["lines"]
+    assert (p1["attended"], p1["absent"], p1["voucher_sessions"], p1["self_payment"]) == (4, 1, 4, 48000)
+    assert (p2["attended"], p2["cancelled"], p2["voucher"], p2["regular_amount"]) == (2, 1, None, 100000)
+    assert (g1["opening_balance"], g1["charges"], g1["payments"], g1["closing_balance"]) == (5000, 148000, 30000, 123000)
+    assert g1["guardian_name"] == "보호자1"
+
+    # 두 번째 보호자 명세서에는 표시만 하고 청구하지 않는다
+    g2 = fake.document(f"{STATEMENT_COLLECTION}/2026-09_org_a_g2").get().to_dict()
+    assert g2["lines"][0]["billed"] is False
+    assert g2["charges"] == 0 and g2["closing_balance"] == 0
+    assert "다른 보호자에게 청구" in g2["text"]
+
+    assert fake.document(f"{STATEMENT_COLLECTION}/2026-09_org_b_g9").get().exists
+    assert set(load_state(root, "2026-09")["centers"]) == {"org_a", "org_b"}
+
+    # 완료한 센터는 다시 처리하지 않는다
+    fake.document(f"{STATEMENT_COLLECTION}/2026-09_org_a_g1").delete()
+    assert monthly_statements("2026-09", None, root, 1, 50000, apply=True)
+    assert not fake.document(f"{STATEMENT_COLLECTION}/2026-09_org_a_g1").get().exists
+
+
+def test_dry_run_writes_nothing(fake, tmp_path):
+    seed(fake)
+    assert monthly_statements("2026-09", ["org_a"], str(tmp_path), 1, 50000, apply=False)
+    assert not fake.document(f"{STATEMENT_COLLECTION}/2026-09_org_a_g1").get().exists
+    assert not (tmp_path / "statements_2026-09.json").exists()
+
+
+def test_plan_counts_worker_writes_without_touching_state(fake, tmp_path):
+    seed(fake)
+    snapshot = tmp_path / "snapshot"
+    snapshot.mkdir()
+    counts = {c.id: {"count": write_collection(fake, c.id, str(snapshot))[0]} for c in fake.collections()}
+    write_manifest(str(snapshot), "fake", counts)
+
+    result = subprocess.run([sys.executable, os.path.abspath(statements_module.__file__), "--plan",
+                             "--plan-source", "snapshot", "--month", "2026-09", "--apply"],
+                            cwd=tmp_path, capture_output=True, text=True, encoding="utf-8", check=True)
+    # 작업 프로세스 없이 실행하므로 명세서 쓰기(보호자 3명)가 계획에 잡힌다
+    row = next(line for line in result.stdout.splitlines() if line.startswith(STATEMENT_COLLECTION))
+    assert row.split()[4] == "3"
+    assert sorted(os.listdir(tmp_path)) == ["snapshot"]
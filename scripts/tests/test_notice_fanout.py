@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+import firestore_fake
+import notice_fanout
+from firestore_rate import AdaptiveLimiter
+from notice_fanout import INBOX_COLLECTION, load_state, resolve_targets
+
+NOW = datetime.now(timezone.utc)
+
+
+def seed(fake, guardians=10):
+    users = {f"g{i:02d}": {"organization_id": "org_a", "role": "GUARDIAN"} for i in range(guardians)}
+    users.update({
+        "m1": {"organization_id": "org_a", "role": "THERAPIST", "roles": {"guardian": True}},
+        "t1": {"organization_id": "org_a", "role": "THERAPIST"},
+        "o1": {"organization_id": "org_a", "roles": {"owner": True}},
+        "c1": {"organization_id": "org_a", "role": "CENTER_ADMIN"},
+        "c2": {"organization_id": "org_a", "roles": {"center_admin": True}},
+        "x1": {"organization_id": "org_b", "role": "GUARDIAN"},
+    })
+    notice = {"organization_id": "org_a", "title": "휴원 안내", "type": "customer", "publish_date": NOW,
+              "view_count": 3, "target_user_ids": []}
+    fake.load({"users": users, "notices": {
+        "n1": notice,
+        "n2": dict(notice, type="CENTER"),
+        "n3": dict(notice, target_user_ids=["x1", "g01", "x1"]),
+        "later": dict(notice, publish_date=NOW + timedelta(days=1)),
+    }})
+
+
+def limiter():
+    return AdaptiveLimiter(ramp=False, max_retries=0, backoff=0.0)
+
+
+def inbox(fake, uid):
+    return {d.id: d.to_dict() for d in fake.collection("users", uid, INBOX_COLLECTION).stream()}
+
+
+def test_resolve_targets_by_role_roles_map_or_explicit_list(fake):
+    seed(fake, guardians=2)
+    notice = lambda notice_id: fake.document(f"notices/{notice_id}").get().to_dict()  # noqa: E731
+    assert resolve_targets(fake, notice("n1")) == ["g00", "g01", "m1"]
+    # 보호자 역할도 가진 치료사는 직원 공지 대상이기도 하다
+    assert resolve_targets(fake, notice("n2")) == ["c1", "c2", "m1", "o1", "t1"]
+    assert resolve_targets(fake, notice("n3")) == ["g01", "x1"]
+
+
+def test_fanout_writes_inbox_and_keeps_read_flags(fake, tmp_path):
+    seed(fake, guardians=3)
+    state_path = str(tmp_path / "state.json")
+    fake.document(f"users/g00/{INBOX_COLLECTION}/n1").set({"is_read": True})
+
+    assert notice_fanout.notice_fanout(None, True, limiter(), state_path, apply=True)
+    entry = inbox(fake, "g00")["n1"]
+    assert entry["is_read"] is True
+    assert entry["type"] == "CUSTOMER" and entry["notice_id"] == "n1"
+    assert "view_count" not in entry and "target_user_ids" not in entry
+    assert set(inbox(fake, "x1")) == {"n3"}
+    assert "later" not in inbox(fake, "g01")
+
+    n1 = fake.document("notices/n1").get().to_dict()
+    assert (n1["fanout_status"], n1["fanout_count"]) == ("DELIVERED", 4)
+    assert load_state(state_path) == {"notices": {}}
+    # 이미 전달한 공지는 --pending 에서 빠진다
+    assert notice_fanout.pending_notices(fake) == []
+
+
+def test_failed_batch_leaves_checkpoint_and_rerun_resumes(fake, tmp_path, monkeypatch):
+    seed(fake, guardians=10)
+    monkeypatch.setattr(notice_fanout, "BATCH_SIZE", 2)
+    state_path = str(tmp_path / "state.json")
+    commit = firestore_fake.WriteBatch.commit
+
+    def failing_commit(batch):
+        if any(op[1].path.startswith("users/g04/") for op in batch._ops):
+            batch._ops = []
+            raise firestore_fake.NotFound("injected")
+        return commit(batch)
+
+    monkeypatch.setattr(firestore_fake.WriteBatch, "commit", failing_commit)
+    assert not notice_fanout.notice_fanout(["n1"], False, limiter(), state_path, apply=True)
+    # 대상 g00..g09, m1 을 2명씩: [g00 g01] [g02 g03] [g04 g05] ... → 연속 완료는 g03 까지
+    progress = load_state(state_path)["notices"]["n1"]
+    assert progress["checkpoint"] == "g03"
+    assert "fanout_status" not in fake.document("notices/n1").get().to_dict()
+    assert "n1" not in inbox(fake, "g05")
+
+    monkeypatch.setattr(firestore_fake.WriteBatch, "commit", commit)
+    writes = fake.stats["writes"]
+    assert notice_fanout.notice_fanout(["n1"], False, limiter(), state_path, apply=True)
+    # 체크포인트 이후 g04..g09, m1 (7명) 만 다시 기록 + 공지 상태 갱신
+    assert fake.stats["writes"] - writes == 7 + 1
+    assert all("n1" in inbox(fake, f"g{i:02d}") for i in range(10))
+
+
+def test_dry_run_only_counts_targets(fake, tmp_path):
+    seed(fake, guardians=2)
+    assert notice_fanout.notice_fanout(["n1"], False, limiter(), str(tmp_path / "state.json"), apply=False)
+    assert inbox(fake, "g00") == {}
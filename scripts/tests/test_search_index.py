@@ -0,0 +1,84 @@
+import argparse
+
+import pytest
+
+from search_index import SearchIndex, build, doc_postings, field_tokens, to_chosung
+
+PATIENTS = {
+    "p1": {"name": "김아쿠", "patient_code": "KIM0001234", "tags": ["감각"],
+           "emergency_contact": {"phone": "010-1234-5678"}},
+    "p2": {"name": "김민서", "patient_code": "KIM0002000", "tags": ["부력"]},
+    "p3": {"name": "이아름", "patient_code": "LEE0000077", "emergency_contact": {"phone": "010-9999-5678"}},
+}
+USERS = {"u1": {"name": "보호자", "email": "Guardian@Aqu.com", "phone": "01055551111"}}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.sqlite"))
+    for collection, docs in (("patients", PATIENTS), ("users", USERS)):
+        index.clear(collection)
+        index.bulk_insert(collection, iter(docs.items()))
+    yield index
+    index.close()
+
+
+def ids(results):
+    return sorted(doc_id for _, doc_id, _ in results)
+
+
+def test_tokens_cover_suffixes_chosung_codes_and_phones():
+    assert to_chosung("김아쿠") == "ㄱㅇㅋ"
+    assert field_tokens("text", "김 아쿠") == {("김아쿠", False), ("아쿠", False), ("쿠", False),
+                                             ("ㄱㅇㅋ", True), ("ㅇㅋ", True), ("ㅋ", True)}
+    assert field_tokens("code", "KIM0001234") == {("kim0001234", False), ("0001234", False), ("1234", False)}
+    assert field_tokens("phone", "010-1234-5678") == {("01012345678", False), ("12345678", False),
+                                                     ("5678", False)}
+    assert field_tokens("phone", "123") == set()
+    assert field_tokens("email", "A@B.com") == {("a@b.com", False), ("b.com", False)}
+    assert ("ㄱㅇㅋ", "name:cho") in doc_postings("patients", PATIENTS["p1"])
+
+
+def test_search_substring_chosung_and_mixed_queries(index):
+    assert ids(index.search("아")) == ["p1", "p3"]
+    assert ids(index.search("ㄱㅇㅋ")) == ["p1"]
+    assert ids(index.search("ㄱ")) == ["p1", "p2"]
+    # 초성 혼합: 완성 글자는 그대로, 초성은 이름 글자의 초성과 비교
+    assert ids(index.search("김ㅁ")) == ["p2"]
+    assert ids(index.search("ㅇㅏ")) == []
+    assert ids(index.search("KIM0")) == ["p1", "p2"]
+    assert ids(index.search("77")) == ["p3"]
+    assert ids(index.search("5678")) == ["p1", "p3"]
+    assert ids(index.search("aqu.com")) == ["u1"]
+    assert ids(index.search("5555", collection="patients")) == []
+    assert len(index.search("김", limit=1)) == 1
+    assert index.search("  ") == []
+
+
+def test_upsert_skips_unchanged_and_replaces_tokens(index):
+    assert not index.upsert("patients", "p1", dict(PATIENTS["p1"]))
+    assert index.upsert("patients", "p1", {**PATIENTS["p1"], "name": "박하늘"})
+    assert ids(index.search("ㄱㅇㅋ")) == []
+    assert ids(index.search("하늘")) == ["p1"]
+    index.delete("patients", "p1")
+    assert ids(index.search("하늘")) == []
+    assert index.doc_ids("patients") == {"p2", "p3"}
+
+
+def test_build_indexes_changes_and_deletes_incrementally(fake, tmp_path):
+    fake.load({"patients": {k: dict(v) for k, v in PATIENTS.items()}, "users": dict(USERS)})
+    args = argparse.Namespace(cred=None, db=str(tmp_path / "index.sqlite"), collections=["patients", "users"],
+                              full=False, detect_deletes=True, mode="scan", overlap_minutes=0)
+    assert build(args)
+
+    fake.document("patients/p2").update({"name": "최민서"})
+    fake.document("patients/p3").delete()
+    assert build(args)
+
+    index = SearchIndex(args.db)
+    try:
+        assert ids(index.search("ㅊㅁㅅ")) == ["p2"]
+        assert ids(index.search("ㄱㅁㅅ")) == []
+        assert index.doc_ids("patients") == {"p1", "p2"}
+    finally:
+        index.close()
@@ -96,6 +96,10 @@ def update_user_roles():
         return False
 
 if __name__ == '__main__':
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__))
+
     print("=" * 60)
     print("하유정 계정 roles Map 구조 업데이트")
     print("=" * 60)
@@ -7,6 +7,8 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 import sys
 
+from firestore_models import PatientLinks
+
 def verify_firestore_structure():
     """Firestore 구조가 리부트 요구사항을 준수하는지 확인"""
     
@@ -66,13 +68,13 @@ def verify_firestore_structure():
         
         patient_count = 0
         for patient_doc in patients:
-            patient_data = patient_doc.to_dict()
+            patient = PatientLinks.from_snapshot(patient_doc)
             patient_count += 1
             
-            name = patient_data.get('name', 'N/A')
-            org_id = patient_data.get('organization_id')
-            guardian_uids = patient_data.get('guardianUids', patient_data.get('guardian_uids', []))
-            primary_therapist = patient_data.get('primaryTherapistUid', patient_data.get('primary_therapist_uid'))
+            name = patient.name or 'N/A'
+            org_id = patient.organization_id
+            guardian_uids = patient.guardian_uids
+            primary_therapist = patient.primary_therapist_uid
             
             print(f"\n   환자: {name}")
             print(f"   - organization_id: {'✅' if org_id else '❌ 누락'}")
@@ -89,11 +91,11 @@ def verify_firestore_structure():
         appointments_ref = db.collection('appointments')
         appointments = appointments_ref.get()
         
-        appointment_count = len(appointments.docs) if appointments else 0
+        appointment_count = len(appointments)
         print(f"   총 일정 수: {appointment_count}건")
         
         if appointment_count > 0:
-            sample = appointments.docs[0].to_dict()
+            sample = appointments[0].to_dict()
             print(f"   샘플 필드: {list(sample.keys())[:10]}")
         else:
             print("   ⚠️  appointments 데이터 없음")
@@ -103,11 +105,11 @@ def verify_firestore_structure():
         sessions_ref = db.collection('sessions')
         sessions = sessions_ref.get()
         
-        session_count = len(sessions.docs) if sessions else 0
+        session_count = len(sessions)
         print(f"   총 세션 수: {session_count}건")
         
         if session_count > 0:
-            sample = sessions.docs[0].to_dict()
+            sample = sessions[0].to_dict()
             print(f"   샘플 필드: {list(sample.keys())}")
         else:
             print("   ⚠️  sessions 데이터 없음")
@@ -117,7 +119,7 @@ def verify_firestore_structure():
         vouchers_ref = db.collection('vouchers')
         vouchers = vouchers_ref.get()
         
-        voucher_count = len(vouchers.docs) if vouchers else 0
+        voucher_count = len(vouchers)
         print(f"   총 이용권 수: {voucher_count}건")
         
         # 6. Recurring Rules 검증
@@ -125,7 +127,7 @@ def verify_firestore_structure():
         recurring_ref = db.collection('recurring_rules')
         recurring = recurring_ref.get()
         
-        recurring_count = len(recurring.docs) if recurring else 0
+        recurring_count = len(recurring)
         print(f"   총 고정수업 규칙: {recurring_count}건")
         
         if recurring_count == 0:
@@ -152,5 +154,9 @@ def verify_firestore_structure():
         return False
 
 if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__))
+
     success = verify_firestore_structure()
     sys.exit(0 if success else 1)
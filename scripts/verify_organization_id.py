@@ -117,4 +117,8 @@ def verify_organization_id():
         sys.exit(1)
 
 if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        from firestore_plan import plan_script
+        sys.exit(plan_script(__file__))
+
     verify_organization_id()